@@ -7,22 +7,57 @@ Scans for security vulnerabilities, compliance issues, and best practice violati
 
 Usage:
     python scripts/security_scanner.py [path/to/scan]
+    python scripts/security_scanner.py --since origin/main
     python scripts/security_scanner.py --help
 """
 
 import os
 import sys
 import argparse
+import hashlib
 import re
 import json
+import mmap
+import subprocess
+import time
+from abc import ABC, abstractmethod
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
-from typing import Dict, List, Any, Optional
+from typing import Dict, Iterator, List, Any, Optional, TextIO, Tuple
 from dataclasses import dataclass
+from urllib.parse import quote
 import logging
 
 logging.basicConfig(level=logging.INFO, format='%(levelname)s: %(message)s')
 logger = logging.getLogger(__name__)
 
+SCANNED_SUFFIXES = ['.py', '.js', '.ts', '.java', '.cpp', '.c', '.go', '.rs']
+
+# Directory scans switch to a process pool above this many files; below it,
+# worker start-up costs more than the scan itself.
+PARALLEL_SCAN_MIN_FILES = 64
+SCAN_CHUNK_SIZE = 16
+
+# Files are scanned through a memory map one line-aligned window at a time,
+# so memory use is bounded by the window (plus the longest line), not the file
+SCAN_WINDOW_BYTES = 1 << 20
+
+# Files larger than this are skipped by the CLI unless --max-file-size says otherwise
+DEFAULT_MAX_FILE_BYTES = 10 * 1024 * 1024
+
+# Per-file findings cache used by the CLI; bump SCAN_CACHE_VERSION whenever
+# matching or exclusion logic changes, so stale findings are discarded
+DEFAULT_SCAN_CACHE = '.security_scan_cache.json'
+SCAN_CACHE_VERSION = 2
+
+SARIF_VERSION = '2.1.0'
+SARIF_SCHEMA = 'https://json.schemastore.org/sarif-2.1.0.json'
+SARIF_LEVELS = {'critical': 'error', 'high': 'error', 'medium': 'warning', 'low': 'note', 'info': 'note'}
+
+# An mtime this close to the moment it was recorded may hide a later write in
+# the same timestamp tick, so such entries are confirmed by content hash
+RACY_MTIME_NS = 2_000_000_000
+
 @dataclass
 class SecurityFinding:
     """Security finding from scan"""
@@ -34,6 +69,417 @@ class SecurityFinding:
     code_snippet: str
     recommendation: str
 
+class CompiledRuleset:
+    """
+    Compiled form of the scanner's ordered pattern rules.
+
+    Each rule is compiled once. A file is scanned as one buffer: every rule
+    is searched across the whole text, restarting at the next line after a
+    hit, which yields the candidate lines for that rule. Candidates are then
+    confirmed with the per-line pattern, so findings are identical to
+    matching each line separately.
+
+    ASCII text is lowercased once and searched with case-sensitive copies of
+    the rules, which lets the regex engine use its literal-prefix search
+    instead of case-folding at every position. A single alternation of all
+    rules is deliberately not used: it defeats that search and is several
+    times slower in CPython's re.
+
+    Raw file bytes are scanned in line-aligned windows. ASCII windows without
+    carriage returns are searched as bytes; any other window is decoded and
+    newline-translated exactly as a text-mode read would, then searched as
+    str, since Unicode case folding and whitespace cannot be reproduced on bytes.
+    """
+
+    def __init__(self, rules: List[Tuple[str, Dict[str, Any], bool]]):
+        """
+        Args:
+            rules: Ordered (name, rule, honour exclude_pattern) triples
+        """
+        self.rules = [(name, info) for name, info, _ in rules]
+        self.line_patterns = [re.compile(info['pattern'], re.IGNORECASE) for _, info, _ in rules]
+        self.exclude_patterns = [
+            re.compile(info['exclude_pattern'], re.IGNORECASE) if use_exclude and 'exclude_pattern' in info else None
+            for _, info, use_exclude in rules
+        ]
+        self.text_patterns = [re.compile(info['pattern'], re.IGNORECASE | re.MULTILINE) for _, info, _ in rules]
+
+        # Patterns for lowercased ASCII haystacks. Lowercasing a pattern is
+        # only equivalent when no uppercase letter is part of an escape such
+        # as \S or \W, or a group name; other rules keep IGNORECASE.
+        lowered = [
+            (info['pattern'], re.IGNORECASE) if re.search(r'\\[A-Z]|\(\?P', info['pattern'])
+            else (info['pattern'].lower(), 0)
+            for _, info, _ in rules
+        ]
+        self.ascii_patterns = [re.compile(pattern, flags | re.MULTILINE) for pattern, flags in lowered]
+        try:
+            self.byte_patterns: Optional[List[re.Pattern]] = [
+                re.compile(pattern.encode('ascii'), flags | re.MULTILINE) for pattern, flags in lowered
+            ]
+        except UnicodeEncodeError:
+            self.byte_patterns = None
+
+    @staticmethod
+    def _candidate_lines(haystack, patterns: List[re.Pattern]) -> Iterator[Tuple[int, int]]:
+        newline = b'\n' if isinstance(haystack, bytes) else '\n'
+        for index, pattern in enumerate(patterns):
+            position = 0
+            while True:
+                match = pattern.search(haystack, position)
+                if match is None:
+                    break
+                yield haystack.rfind(newline, 0, match.start()) + 1, index
+                position = haystack.find(newline, match.start()) + 1
+                if position == 0:
+                    break
+
+    def candidate_lines(self, text: str) -> Iterator[Tuple[int, int]]:
+        """Yield (line start offset, rule index) for lines a rule may match"""
+        if text.isascii():
+            return self._candidate_lines(text.lower(), self.ascii_patterns)
+        return self._candidate_lines(text, self.text_patterns)
+
+    def _confirmed(self, haystack, candidates: Iterator[Tuple[int, int]]) -> Iterator[Tuple[int, str, int]]:
+        newline = b'\n' if isinstance(haystack, bytes) else '\n'
+        line_number, counted_to = 1, 0
+        for line_start, index in sorted(set(candidates)):
+            line_end = haystack.find(newline, line_start) + 1 or len(haystack)
+            line = haystack[line_start:line_end]
+            if isinstance(line, bytes):
+                line = line.decode('ascii')
+            if not self.line_patterns[index].search(line):
+                continue
+            exclude = self.exclude_patterns[index]
+            if exclude is not None and exclude.search(line):
+                continue
+
+            line_number += haystack.count(newline, counted_to, line_start)
+            counted_to = line_start
+            yield line_number, line, index
+
+    def matches(self, text: str) -> Iterator[Tuple[int, str, int]]:
+        """
+        Yield (line number, line, rule index) for every rule matching a line.
+
+        Lines keep their trailing newline, as readlines() returns them, and
+        results are ordered by line and then by rule.
+        """
+        return self._confirmed(text, self.candidate_lines(text))
+
+    def buffer_matches(self, buffer, window_bytes: int = SCAN_WINDOW_BYTES) -> Iterator[Tuple[int, str, int]]:
+        """
+        Yield matches() for the raw bytes of a file, as read in text mode
+        with UTF-8 and errors='ignore'.
+
+        Args:
+            buffer: bytes or mmap of the file
+            window_bytes: Bytes searched at a time, extended to the next newline
+        """
+        line_offset, start, size = 0, 0, len(buffer)
+        while start < size:
+            # Windows end just after a newline, which never occurs inside a
+            # UTF-8 sequence or between the \r and \n of a line ending
+            end = buffer.find(b'\n', min(start + window_bytes, size) - 1) + 1 or size
+            raw = buffer[start:end]
+            if self.byte_patterns is not None and raw.isascii() and b'\r' not in raw:
+                window, results = raw, self._confirmed(raw, self._candidate_lines(raw.lower(), self.byte_patterns))
+            else:
+                window = raw.decode('utf-8', errors='ignore')
+                if '\r' in window:
+                    window = window.replace('\r\n', '\n').replace('\r', '\n')
+                results = self.matches(window)
+
+            for line_number, line, index in results:
+                yield line_offset + line_number, line, index
+            line_offset += window.count(b'\n' if isinstance(window, bytes) else '\n')
+            start = end
+
+def _file_digest(file_path: Path) -> str:
+    """SHA-256 of a file's bytes"""
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+class ScanCache:
+    """
+    Persistent per-file findings cache for incremental scans.
+
+    Entries are keyed by absolute path. A file whose size and mtime are
+    unchanged is served without being read; when only the mtime changed, a
+    SHA-256 of its content decides, so touched-but-identical files stay
+    cached. The whole cache is discarded when the ruleset hash differs.
+
+    The JSON file holds only the stat, digest and finding count of each
+    file. Findings are kept in a sidecar findings file, one JSON line per
+    file with findings, and read back only when the file is emitted, so
+    memory does not grow with the number of cached findings. Each save
+    writes a new findings file and switches the JSON file over to it.
+    """
+
+    def __init__(self, path: Path, ruleset_hash: str):
+        """
+        Args:
+            path: JSON file holding the cache
+            ruleset_hash: SecurityScanner.ruleset_hash() of the scanning rules
+        """
+        self.path = Path(path)
+        self.ruleset_hash = ruleset_hash
+        self.entries: Dict[str, Dict[str, Any]] = {}
+        self._pending: Dict[str, Dict[str, Any]] = {}
+        # Entries whose findings are already in the new findings file
+        self._written = set()
+        self._findings_path: Optional[Path] = None
+        self._findings_file = None
+        self._new_findings_path = self.path.with_name(f'{self.path.name}.{os.getpid()}-{time.time_ns()}.findings')
+        self._new_findings_file = None
+        self._dirty = False
+        self._load()
+
+    def _load(self) -> None:
+        try:
+            data = json.loads(self.path.read_text(encoding='utf-8'))
+        except (OSError, ValueError):
+            return
+        if (isinstance(data, dict) and data.get('version') == SCAN_CACHE_VERSION
+                and data.get('ruleset') == self.ruleset_hash):
+            self.entries = data.get('files', {})
+            if data.get('findings'):
+                self._findings_path = self.path.with_name(data['findings'])
+        else:
+            logger.debug(f"Discarding scan cache {self.path}: ruleset or format changed")
+
+    def lookup(self, file_path: Path) -> bool:
+        """
+        Whether a file's cached findings are still valid.
+
+        On a miss the file's stat (and hash, if computed) is remembered so
+        store() records the state the scan started from.
+        """
+        key = os.path.abspath(file_path)
+        try:
+            stat = os.stat(file_path)
+        except OSError:
+            return False
+
+        pending = {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns, 'checked_ns': time.time_ns()}
+        entry = self.entries.get(key)
+        if entry is not None and entry['size'] == stat.st_size:
+            racy = entry['mtime_ns'] + RACY_MTIME_NS >= entry['checked_ns']
+            if entry['mtime_ns'] != stat.st_mtime_ns or racy:
+                pending['sha256'] = _file_digest(file_path)
+                if pending['sha256'] != entry['sha256']:
+                    entry = None
+                else:
+                    entry.update(mtime_ns=stat.st_mtime_ns, checked_ns=pending['checked_ns'])
+                    self._dirty = True
+        else:
+            entry = None
+
+        if entry is None:
+            self._pending[key] = pending
+            return False
+        return True
+
+    def findings(self, file_path: Path) -> Optional[List[SecurityFinding]]:
+        """
+        Read the cached findings of a file lookup() found valid.
+
+        Returns None, and treats the file as a miss, if the findings file
+        cannot be read.
+        """
+        key = os.path.abspath(file_path)
+        entry = self.entries[key]
+        if not entry['count']:
+            return []
+        try:
+            line = self._read_findings(entry)
+            return [SecurityFinding(file_path=str(file_path), **finding) for finding in json.loads(line)]
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            logger.debug(f"Rescanning {file_path}: cached findings unreadable ({e})")
+            del self.entries[key]
+            self._pending[key] = {name: entry[name] for name in ('size', 'mtime_ns', 'checked_ns', 'sha256')}
+            return None
+
+    def store(self, file_path: Path, findings: List[SecurityFinding]) -> None:
+        """Record the findings of a file that lookup() missed"""
+        key = os.path.abspath(file_path)
+        entry = self._pending.pop(key, None)
+        if entry is None:
+            return
+        try:
+            entry.setdefault('sha256', _file_digest(file_path))
+        except OSError:
+            return
+        entry['count'] = len(findings)
+        if findings:
+            line = json.dumps([
+                {name: value for name, value in vars(finding).items() if name != 'file_path'}
+                for finding in findings
+            ]).encode('utf-8') + b'\n'
+            self._write_findings(entry, line)
+        self.entries[key] = entry
+        self._written.add(key)
+        self._dirty = True
+
+    def save(self) -> None:
+        """Write the cache atomically, dropping entries for deleted files"""
+        if not self._dirty:
+            return
+        self.entries = {key: entry for key, entry in self.entries.items() if os.path.exists(key)}
+        # Carry the findings of files not rescanned over to the new findings file
+        for key, entry in list(self.entries.items()):
+            if entry['count'] and key not in self._written:
+                try:
+                    line = self._read_findings(entry)
+                except (OSError, ValueError, KeyError) as e:
+                    logger.debug(f"Dropping cache entry {key}: cached findings unreadable ({e})")
+                    del self.entries[key]
+                    continue
+                self._write_findings(entry, line)
+        self._written.update(self.entries)
+
+        if self._new_findings_file is not None:
+            self._new_findings_file.flush()
+            os.fsync(self._new_findings_file.fileno())
+        findings_name = self._new_findings_path.name if self._new_findings_file is not None else None
+        tmp_path = self.path.with_name(self.path.name + '.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'version': SCAN_CACHE_VERSION, 'ruleset': self.ruleset_hash,
+                       'findings': findings_name, 'files': self.entries}, f)
+        os.replace(tmp_path, self.path)
+        self._dirty = False
+
+        # The old findings file is no longer referenced; later saves start a new one
+        self._close_findings()
+        if self._findings_path is not None and self._findings_path != self._new_findings_path:
+            try:
+                self._findings_path.unlink()
+            except FileNotFoundError:
+                pass
+        self._findings_path = self._new_findings_path if findings_name else None
+        self._new_findings_path = self.path.with_name(f'{self.path.name}.{os.getpid()}-{time.time_ns()}.findings')
+        self._written = set()
+
+    def close(self) -> None:
+        """Close the findings files; an unsaved new findings file is removed"""
+        self._close_findings()
+        try:
+            self._new_findings_path.unlink()
+        except FileNotFoundError:
+            pass
+
+    def _read_findings(self, entry: Dict[str, Any]) -> bytes:
+        if self._findings_path is None:
+            raise ValueError("no findings file")
+        if self._findings_file is None:
+            self._findings_file = open(self._findings_path, 'rb')
+        self._findings_file.seek(entry['offset'])
+        line = self._findings_file.read(entry['length'])
+        if len(line) != entry['length']:
+            raise ValueError("findings file truncated")
+        return line
+
+    def _write_findings(self, entry: Dict[str, Any], line: bytes) -> None:
+        if self._new_findings_file is None:
+            self._new_findings_file = open(self._new_findings_path, 'wb')
+        entry['offset'] = self._new_findings_file.tell()
+        entry['length'] = len(line)
+        self._new_findings_file.write(line)
+
+    def _close_findings(self) -> None:
+        for handle in (self._findings_file, self._new_findings_file):
+            if handle is not None:
+                handle.close()
+        self._findings_file = self._new_findings_file = None
+
+class FindingWriter(ABC):
+    """
+    Writes findings to a text stream while the scan runs.
+
+    The scanner calls begin() with its ordered (name, rule) pairs, write()
+    once per unique finding, flush() after each file that had findings,
+    and end() with the severity summary.
+    """
+
+    def __init__(self, stream: TextIO):
+        self.stream = stream
+
+    def begin(self, rules: List[Tuple[str, Dict[str, Any]]]) -> None:
+        pass
+
+    @abstractmethod
+    def write(self, finding: SecurityFinding) -> None:
+        """Write one finding"""
+
+    def flush(self) -> None:
+        self.stream.flush()
+
+    def end(self, summary: Dict[str, Any]) -> None:
+        self.flush()
+
+class JsonlFindingWriter(FindingWriter):
+    """One JSON object per finding, then a final {"scan_summary": ...} line"""
+
+    def write(self, finding: SecurityFinding) -> None:
+        self.stream.write(json.dumps(vars(finding)) + '\n')
+
+    def end(self, summary: Dict[str, Any]) -> None:
+        self.stream.write(json.dumps({'scan_summary': summary}) + '\n')
+        self.flush()
+
+class SarifFindingWriter(FindingWriter):
+    """
+    SARIF 2.1.0 log with a single run.
+
+    The tool and rules are written up front and each result as it is
+    found; the summary goes into the run's properties when the log is
+    closed, so the document is only valid JSON after end().
+    """
+
+    def begin(self, rules: List[Tuple[str, Dict[str, Any]]]) -> None:
+        self._rule_index = {name: index for index, (name, _) in enumerate(rules)}
+        self._first = True
+        driver = {
+            'name': 'HEE/HEER Security Scanner',
+            'rules': [{
+                'id': name,
+                'shortDescription': {'text': info['description']},
+                'help': {'text': info['recommendation']},
+                'defaultConfiguration': {'level': SARIF_LEVELS.get(info['severity'], 'warning')},
+                'properties': {'severity': info['severity']}
+            } for name, info in rules]
+        }
+        self.stream.write(f'{{"version": "{SARIF_VERSION}", "$schema": {json.dumps(SARIF_SCHEMA)}, '
+                          f'"runs": [{{"tool": {json.dumps({"driver": driver})}, "results": [')
+
+    def write(self, finding: SecurityFinding) -> None:
+        path = Path(finding.file_path)
+        result = {
+            'ruleId': finding.finding_type,
+            'level': SARIF_LEVELS.get(finding.severity, 'warning'),
+            'message': {'text': finding.description},
+            'locations': [{'physicalLocation': {
+                'artifactLocation': {'uri': path.as_uri() if path.is_absolute() else quote(path.as_posix())},
+                'region': {'startLine': finding.line_number, 'snippet': {'text': finding.code_snippet}}
+            }}],
+            'properties': {'severity': finding.severity}
+        }
+        # ruleIndex must point into the driver's rules; omit it for unknown rules
+        if finding.finding_type in self._rule_index:
+            result['ruleIndex'] = self._rule_index[finding.finding_type]
+        self.stream.write(('\n' if self._first else ',\n') + json.dumps(result))
+        self._first = False
+
+    def end(self, summary: Dict[str, Any]) -> None:
+        self.stream.write(f'\n], "properties": {json.dumps(summary)}}}]}}\n')
+        self.flush()
+
+# Output formats written while scanning rather than after it
+STREAMING_WRITERS = {'jsonl': JsonlFindingWriter, 'sarif': SarifFindingWriter}
+
 class SecurityScanner:
     """
     Comprehensive security scanner for HEE/HEER codebases.
@@ -42,8 +488,20 @@ class SecurityScanner:
     and best practice violations specific to HEE/HEER implementations.
     """
 
-    def __init__(self):
+    def __init__(self, cache_path: Optional[Path] = None, max_file_bytes: Optional[int] = None):
+        """
+        Args:
+            cache_path: Persistent findings cache; unchanged files are not rescanned
+            max_file_bytes: Skip (and count) files larger than this; None scans every file
+        """
         self.findings: List[SecurityFinding] = []
+        self.scan_stats = {'files': 0, 'bytes': 0, 'seconds': 0.0, 'cached': 0, 'skipped': 0}
+        self.cache_path = cache_path
+        self.max_file_bytes = max_file_bytes
+        self.writer: Optional[FindingWriter] = None
+        self.severity_counts: Dict[str, int] = {}
+        self._ruleset: Optional[CompiledRuleset] = None
+        self._ruleset_key = None
 
         # Security patterns to scan for
         self.security_patterns = {
@@ -141,6 +599,26 @@ class SecurityScanner:
             }
         }
 
+    def _rules(self) -> List[Tuple[str, Dict[str, Any], bool]]:
+        """Security patterns, then HEE/HEER patterns (which honour exclude_pattern)"""
+        return ([(name, info, False) for name, info in self.security_patterns.items()]
+                + [(name, info, True) for name, info in self.hee_patterns.items()])
+
+    def compiled_ruleset(self) -> CompiledRuleset:
+        """Ruleset compiled from the current patterns, recompiled if they change"""
+        rules = self._rules()
+        key = tuple((name, info['pattern'], info.get('exclude_pattern'), use_exclude)
+                    for name, info, use_exclude in rules)
+        if key != self._ruleset_key:
+            self._ruleset = CompiledRuleset(rules)
+            self._ruleset_key = key
+        return self._ruleset
+
+    def ruleset_hash(self) -> str:
+        """Version hash of the rules, size limit and cache format, for invalidating cached findings"""
+        payload = json.dumps([SCAN_CACHE_VERSION, self.max_file_bytes, self._rules()], sort_keys=True)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
     def scan_file(self, file_path: Path) -> None:
         """
         Scan a single file for security issues.
@@ -148,40 +626,32 @@ class SecurityScanner:
         Args:
             file_path: Path to file to scan
         """
-        try:
-            with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
-                lines = f.readlines()
+        # Every line of an excluded file would be skipped anyway
+        if self._is_excluded_file(file_path):
+            return
 
-            for line_num, line in enumerate(lines, 1):
-                # Check general security patterns
-                for pattern_name, pattern_info in self.security_patterns.items():
-                    if re.search(pattern_info['pattern'], line, re.IGNORECASE):
+        try:
+            with open(file_path, 'rb') as f:
+                size = os.fstat(f.fileno()).st_size
+                if self.max_file_bytes is not None and size > self.max_file_bytes:
+                    logger.warning(f"Skipping {file_path}: {size} bytes exceeds the "
+                                   f"{self.max_file_bytes} byte limit")
+                    self.scan_stats['skipped'] += 1
+                    return
+
+                self.scan_stats['files'] += 1
+                self.scan_stats['bytes'] += size
+                if size == 0:
+                    return
+
+                ruleset = self.compiled_ruleset()
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+                    for line_num, line, index in ruleset.buffer_matches(buffer):
                         # Skip if it's in a comment or test file
                         if self._is_excluded_line(line, file_path):
                             continue
 
-                        finding = SecurityFinding(
-                            file_path=str(file_path),
-                            line_number=line_num,
-                            finding_type=pattern_name,
-                            severity=pattern_info['severity'],
-                            description=pattern_info['description'],
-                            code_snippet=line.strip(),
-                            recommendation=pattern_info['recommendation']
-                        )
-                        self.findings.append(finding)
-
-                # Check HEE/HEER specific patterns
-                for pattern_name, pattern_info in self.hee_patterns.items():
-                    if re.search(pattern_info['pattern'], line, re.IGNORECASE):
-                        # Check exclude pattern if present
-                        if 'exclude_pattern' in pattern_info:
-                            if re.search(pattern_info['exclude_pattern'], line, re.IGNORECASE):
-                                continue
-
-                        if self._is_excluded_line(line, file_path):
-                            continue
-
+                        pattern_name, pattern_info = ruleset.rules[index]
                         finding = SecurityFinding(
                             file_path=str(file_path),
                             line_number=line_num,
@@ -211,6 +681,18 @@ class SecurityScanner:
         if line.strip().startswith('#'):
             return True
 
+        return self._is_excluded_file(file_path)
+
+    def _is_excluded_file(self, file_path: Path) -> bool:
+        """
+        Check if every line of a file is excluded from security scanning.
+
+        Args:
+            file_path: Path to the file
+
+        Returns:
+            True if the file should be excluded
+        """
         # Skip test files
         if 'test' in file_path.name.lower():
             return True
@@ -221,15 +703,16 @@ class SecurityScanner:
 
         return False
 
-    def scan_directory(self, directory: Path, exclude_patterns: Optional[List[str]] = None) -> None:
+    def collect_files(self, directory: Path, exclude_patterns: Optional[List[str]] = None) -> List[Path]:
         """
-        Scan a directory recursively for security issues.
+        List the code files a directory scan covers, in walk order.
 
         Args:
             directory: Directory to scan
             exclude_patterns: Patterns of files/directories to exclude
         """
         exclude_patterns = exclude_patterns or ['__pycache__', '.git', 'node_modules', '.venv']
+        file_paths = []
 
         for root, dirs, files in os.walk(directory):
             # Filter out excluded directories
@@ -237,16 +720,200 @@ class SecurityScanner:
 
             for file in files:
                 file_path = Path(root) / file
+                if self._is_collected(file_path, exclude_patterns):
+                    file_paths.append(file_path)
 
-                # Skip non-code files
-                if file_path.suffix not in ['.py', '.js', '.ts', '.java', '.cpp', '.c', '.go', '.rs']:
-                    continue
+        return file_paths
 
-                # Skip excluded patterns
-                if any(pattern in str(file_path) for pattern in exclude_patterns):
-                    continue
+    def _is_collected(self, file_path: Path, exclude_patterns: List[str]) -> bool:
+        """Check if a file is a code file not matched by any exclude pattern"""
+        # Skip non-code files
+        if file_path.suffix not in SCANNED_SUFFIXES:
+            return False
+
+        # Skip excluded patterns (this also covers excluded directories)
+        return not any(pattern in str(file_path) for pattern in exclude_patterns)
+
+    def changed_files(self, directory: Path, since: str,
+                      exclude_patterns: Optional[List[str]] = None) -> List[Path]:
+        """
+        List the code files under a directory changed since a git ref.
+
+        Covers committed, staged and unstaged changes plus untracked files;
+        deleted files are left out.
 
-                self.scan_file(file_path)
+        Args:
+            directory: Directory inside a git work tree
+            since: Git ref to compare the work tree against
+            exclude_patterns: Patterns of files/directories to exclude
+
+        Raises:
+            ValueError: If the directory is not in a git work tree or the ref is unknown
+        """
+        exclude_patterns = exclude_patterns or ['__pycache__', '.git', 'node_modules', '.venv']
+        directory = Path(directory)
+
+        def git(*args: str) -> str:
+            result = subprocess.run(['git', *args], cwd=directory, capture_output=True, text=True)
+            if result.returncode != 0:
+                raise ValueError(f"git {' '.join(args)} failed: {result.stderr.strip()}")
+            return result.stdout
+
+        top_level = Path(git('rev-parse', '--show-toplevel').strip())
+        names = git('diff', '--name-only', '-z', '--diff-filter=d', since, '--', '.').split('\0')
+        names += git('ls-files', '--others', '--exclude-standard', '-z', '--full-name', '.').split('\0')
+
+        root = directory.resolve()
+        file_paths = []
+        for name in sorted(set(filter(None, names))):
+            absolute = (top_level / name).resolve()
+            try:
+                file_path = directory / absolute.relative_to(root)
+            except ValueError:
+                continue
+            if absolute.is_file() and self._is_collected(file_path, exclude_patterns):
+                file_paths.append(file_path)
+
+        return file_paths
+
+    def scan_directory(self, directory: Path, exclude_patterns: Optional[List[str]] = None,
+                       max_workers: Optional[int] = None, since: Optional[str] = None) -> None:
+        """
+        Scan a directory recursively for security issues.
+
+        Large trees are scanned in a process pool; findings keep the serial
+        order.
+
+        Args:
+            directory: Directory to scan
+            exclude_patterns: Patterns of files/directories to exclude
+            max_workers: Worker processes (default: CPU count; 1 scans serially)
+            since: Only scan files changed since this git ref
+        """
+        if since is not None:
+            file_paths = self.changed_files(directory, since, exclude_patterns)
+        else:
+            file_paths = self.collect_files(directory, exclude_patterns)
+        self.scan_files(file_paths, max_workers)
+
+    def scan_files(self, file_paths: List[Path], max_workers: Optional[int] = None) -> None:
+        """
+        Scan a list of files, in parallel when it is large enough.
+
+        With a cache_path, files unchanged since they were cached are not
+        read again and the cache is saved afterwards.
+
+        Args:
+            file_paths: Files to scan
+            max_workers: Worker processes (default: CPU count; 1 scans serially)
+        """
+        start = time.perf_counter()
+        workers = max_workers or os.cpu_count() or 1
+        cache = ScanCache(self.cache_path, self.ruleset_hash()) if self.cache_path else None
+
+        # Whether each file's cached findings are valid; the findings
+        # themselves are only read from the cache when the file is emitted
+        fresh = [False] * len(file_paths)
+        if cache is not None:
+            for position, file_path in enumerate(file_paths):
+                if not self._is_excluded_file(file_path):
+                    fresh[position] = cache.lookup(file_path)
+        pending = [file_path for file_path, hit in zip(file_paths, fresh) if not hit]
+        self.scan_stats['cached'] += len(file_paths) - len(pending)
+
+        # Merge cached and scanned findings in file order as each file completes
+        scanned = self._scan_pending(pending, workers)
+        try:
+            for position, file_path in enumerate(file_paths):
+                findings = cache.findings(file_path) if fresh[position] else None
+                if findings is None:
+                    if fresh[position]:
+                        # The cached findings could not be read back
+                        self.scan_stats['cached'] -= 1
+                        findings = self._scan_file_findings(file_path)
+                    else:
+                        findings = next(scanned)
+                    if cache is not None:
+                        cache.store(file_path, findings)
+                self._emit(findings)
+
+            if cache is not None:
+                try:
+                    cache.save()
+                except OSError as e:
+                    logger.error(f"Error saving scan cache {cache.path}: {e}")
+        finally:
+            if cache is not None:
+                cache.close()
+
+        self.scan_stats['seconds'] += time.perf_counter() - start
+
+    def _scan_pending(self, file_paths: List[Path], workers: int) -> Iterator[List[SecurityFinding]]:
+        """Yield the findings of each file in order, from a process pool for large lists"""
+        if workers <= 1 or len(file_paths) < PARALLEL_SCAN_MIN_FILES:
+            for file_path in file_paths:
+                yield self._scan_file_findings(file_path)
+            return
+
+        chunks = [file_paths[i:i + SCAN_CHUNK_SIZE] for i in range(0, len(file_paths), SCAN_CHUNK_SIZE)]
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_scan_worker,
+                                 initargs=(self.security_patterns, self.hee_patterns,
+                                           self.max_file_bytes)) as executor:
+            for per_file, stats in executor.map(_scan_file_chunk, chunks):
+                for name in ('files', 'bytes', 'skipped'):
+                    self.scan_stats[name] += stats[name]
+                yield from per_file
+
+    def _emit(self, findings: List[SecurityFinding]) -> None:
+        """Collect one file's findings, or write them to the stream and count their severities"""
+        if self.writer is None:
+            self.findings.extend(findings)
+            return
+
+        # Nothing is kept per finding, so memory does not grow with the scan
+        for finding in findings:
+            self.severity_counts[finding.severity] = self.severity_counts.get(finding.severity, 0) + 1
+            self.writer.write(finding)
+        if findings:
+            self.writer.flush()
+
+    def stream_findings(self, writer: 'FindingWriter') -> None:
+        """
+        Write findings to a writer as files are scanned instead of collecting them.
+
+        Severities are counted as findings are written; call close_stream()
+        when done.
+        """
+        self.writer = writer
+        self.severity_counts = {}
+        writer.begin([(name, info) for name, info, _ in self._rules()])
+
+    def close_stream(self) -> Dict[str, Any]:
+        """Finish the stream with its summary and return the summary"""
+        summary = {
+            'total_findings': sum(self.severity_counts.values()),
+            'severity_breakdown': dict(self.severity_counts)
+        }
+        self.writer.end(summary)
+        self.writer = None
+        return summary
+
+    def _scan_file_findings(self, file_path: Path) -> List[SecurityFinding]:
+        """Scan one file and return its findings instead of accumulating them"""
+        findings, self.findings = self.findings, []
+        try:
+            self.scan_file(file_path)
+            return self.findings
+        finally:
+            self.findings = findings
+
+    def throughput(self) -> Dict[str, float]:
+        """Files/sec and MB/sec of the scans so far"""
+        seconds = self.scan_stats['seconds'] or float('inf')
+        return {
+            'files_per_sec': round(self.scan_stats['files'] / seconds, 1),
+            'mb_per_sec': round(self.scan_stats['bytes'] / 1e6 / seconds, 2)
+        }
 
     def generate_report(self, output_format: str = 'text') -> str:
         """
@@ -335,13 +1002,38 @@ class SecurityScanner:
             breakdown[finding.severity] = breakdown.get(finding.severity, 0) + 1
         return breakdown
 
+_worker_scanner: Optional[SecurityScanner] = None
+
+def _init_scan_worker(security_patterns: Dict[str, Dict[str, Any]], hee_patterns: Dict[str, Dict[str, Any]],
+                      max_file_bytes: Optional[int]) -> None:
+    """Process pool initializer: one scanner (and compiled ruleset) per worker"""
+    global _worker_scanner
+    _worker_scanner = SecurityScanner(max_file_bytes=max_file_bytes)
+    _worker_scanner.security_patterns = security_patterns
+    _worker_scanner.hee_patterns = hee_patterns
+
+def _scan_file_chunk(file_paths: List[Path]) -> Tuple[List[List[SecurityFinding]], Dict[str, int]]:
+    """Scan a chunk of files in a worker; returns (findings per file, scan_stats delta)"""
+    scanner = _worker_scanner
+    before = dict(scanner.scan_stats)
+    per_file = [scanner._scan_file_findings(file_path) for file_path in file_paths]
+    return per_file, {name: scanner.scan_stats[name] - before[name] for name in ('files', 'bytes', 'skipped')}
+
 def main():
     """Main entry point"""
     parser = argparse.ArgumentParser(description='HEE/HEER Security Scanner')
     parser.add_argument('path', nargs='?', default='.', help='Path to scan (default: current directory)')
-    parser.add_argument('--format', choices=['text', 'json'], default='text', help='Output format')
+    parser.add_argument('--format', choices=['text', 'json', *STREAMING_WRITERS], default='text',
+                        help='Output format (jsonl and sarif are written while scanning)')
     parser.add_argument('--exclude', nargs='*', help='Patterns to exclude')
     parser.add_argument('--verbose', '-v', action='store_true', help='Verbose output')
+    parser.add_argument('--workers', type=int, help='Worker processes for directory scans (default: CPU count)')
+    parser.add_argument('--since', metavar='GIT_REF', help='Only scan files changed since a git ref')
+    parser.add_argument('--cache', default=DEFAULT_SCAN_CACHE,
+                        help=f'Findings cache for unchanged files (default: {DEFAULT_SCAN_CACHE})')
+    parser.add_argument('--no-cache', action='store_true', help='Rescan every file and do not update the cache')
+    parser.add_argument('--max-file-size', type=int, default=DEFAULT_MAX_FILE_BYTES, metavar='BYTES',
+                        help=f'Skip files larger than this (default: {DEFAULT_MAX_FILE_BYTES}; 0 for no limit)')
 
     args = parser.parse_args()
 
@@ -353,20 +1045,43 @@ def main():
         print(f"Error: Path {scan_path} does not exist")
         sys.exit(1)
 
-    scanner = SecurityScanner()
+    scanner = SecurityScanner(cache_path=None if args.no_cache else Path(args.cache),
+                              max_file_bytes=args.max_file_size or None)
 
     if scan_path.is_file():
-        scanner.scan_file(scan_path)
+        file_paths = [scan_path]
     else:
         exclude_patterns = args.exclude or ['__pycache__', '.git', 'node_modules', '.venv']
-        scanner.scan_directory(scan_path, exclude_patterns)
-
-    report = scanner.generate_report(args.format)
-    print(report)
+        try:
+            if args.since:
+                file_paths = scanner.changed_files(scan_path, args.since, exclude_patterns)
+            else:
+                file_paths = scanner.collect_files(scan_path, exclude_patterns)
+        except ValueError as e:
+            print(f"Error: {e}")
+            sys.exit(1)
+
+    streaming = args.format in STREAMING_WRITERS
+    if streaming:
+        scanner.stream_findings(STREAMING_WRITERS[args.format](sys.stdout))
+    scanner.scan_files(file_paths, args.workers)
+
+    throughput = scanner.throughput()
+    logger.info(f"Scanned {scanner.scan_stats['files']} files "
+                f"({scanner.scan_stats['bytes'] / 1e6:.1f} MB) in {scanner.scan_stats['seconds']:.2f}s: "
+                f"{throughput['files_per_sec']} files/sec, {throughput['mb_per_sec']} MB/sec; "
+                f"{scanner.scan_stats['cached']} unchanged files served from cache, "
+                f"{scanner.scan_stats['skipped']} over the size limit skipped")
+
+    if streaming:
+        severity_counts = scanner.close_stream()['severity_breakdown']
+    else:
+        report = scanner.generate_report(args.format)
+        print(report)
+        severity_counts = scanner._get_severity_breakdown()
 
     # Exit with error code if critical/high severity findings
-    critical_high = sum(1 for f in scanner.findings
-                       if f.severity in ['critical', 'high'])
+    critical_high = severity_counts.get('critical', 0) + severity_counts.get('high', 0)
     if critical_high > 0:
         sys.exit(1)
 
@@ -0,0 +1,521 @@
+#!/usr/bin/env python3
+"""
+Differential Tests for the Security Scanner
+Checks the compiled whole-file scanner against the original line-by-line,
+pattern-by-pattern implementation on a fixed corpus, generated inputs and
+this repository, including memory-mapped scans in small windows, the
+incremental (cached and --since) scan modes and streamed JSONL/SARIF output.
+
+Run directly to print files/sec and MB/sec on a synthetic large checkout:
+    python scripts/test_security_scanner.py --bench
+"""
+
+import io
+import json
+import logging
+import random
+import re
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+import unittest
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(REPO_ROOT / "scripts"))
+
+from security_scanner import (SecurityScanner, SecurityFinding, RACY_MTIME_NS,
+                              FindingWriter, JsonlFindingWriter, SarifFindingWriter)
+
+logging.disable(logging.CRITICAL)
+
+
+def reference_scan_file(scanner, file_path):
+    """Original scan_file, kept verbatim as the oracle; returns its findings"""
+    findings = []
+    with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
+        lines = f.readlines()
+
+    for line_num, line in enumerate(lines, 1):
+        for pattern_name, pattern_info in scanner.security_patterns.items():
+            if re.search(pattern_info['pattern'], line, re.IGNORECASE):
+                if scanner._is_excluded_line(line, file_path):
+                    continue
+                findings.append(SecurityFinding(str(file_path), line_num, pattern_name, pattern_info['severity'],
+                                                pattern_info['description'], line.strip(),
+                                                pattern_info['recommendation']))
+
+        for pattern_name, pattern_info in scanner.hee_patterns.items():
+            if re.search(pattern_info['pattern'], line, re.IGNORECASE):
+                if 'exclude_pattern' in pattern_info:
+                    if re.search(pattern_info['exclude_pattern'], line, re.IGNORECASE):
+                        continue
+                if scanner._is_excluded_line(line, file_path):
+                    continue
+                findings.append(SecurityFinding(str(file_path), line_num, pattern_name, pattern_info['severity'],
+                                                pattern_info['description'], line.strip(),
+                                                pattern_info['recommendation']))
+    return findings
+
+
+def window_findings(scanner, file_path, window_bytes):
+    """scan_file's findings for a file, scanned in windows of window_bytes"""
+    ruleset = scanner.compiled_ruleset()
+    findings = []
+    for line_number, line, index in ruleset.buffer_matches(file_path.read_bytes(), window_bytes):
+        if scanner._is_excluded_line(line, file_path):
+            continue
+        name, info = ruleset.rules[index]
+        findings.append(SecurityFinding(str(file_path), line_number, name, info['severity'],
+                                        info['description'], line.strip(), info['recommendation']))
+    return findings
+
+
+DIFFERENTIAL_CORPUS = [
+    "",
+    "x = 1\n",
+    "result = eval(expr)\nvalue = EXEC (code)\n",
+    "password = 'hunter2'\nAPI_KEY: \"abc\"\n",
+    "password =\n'split across lines'\n",
+    "token = \"unterminated\nsecret = 'x'  # same line\n",
+    "cursor.execute(\"SELECT * FROM t WHERE id = %s\" % x)\n",
+    "select 1 -- %s\nDELETE %s\n",
+    "os.system('rm ' + path)\nsubprocess.call(cmd +\n  arg)\n",
+    "n = random.randint(1, 6)\nRandom.Random()\n",
+    "def handle(input):\ndef handle_input(x):   \ndef validate_input(x):\n",
+    "def f(input): return 1\n",
+    "obj = pickle.loads(blob)\nyaml.unsafe_load(doc)\n",
+    "open('../../etc/passwd')\n",
+    "# eval(x) in a comment\n    # password = 'x'\n",
+    "create_task(x)\ncreate_task(x)  # audit\nupdate_task(y, log=True)\n",
+    "sqlite3.connect(db).execute('x %d' % n)\n",
+    "ſelect %s and Key = 'kelvin'\n",
+    "café = eval(naïve)\r\nwindows = exec(x)\r\n",
+    "no newline at end: eval(x)",
+    "\n\n\neval(a) eval(b)\n\n",
+]
+
+# Raw bytes that text-mode reading decodes or translates: invalid UTF-8, a
+# BOM, split sequences before a newline and old Mac line endings
+BYTE_CORPUS = [
+    b"eval(x)\xff\n",
+    b"pass\xe2\x82\nexec(y)\n",
+    b"a\rb = eval(c)\r\rd = exec(e)\n",
+    b"x = 1\r\n\r\neval(z)\r\n",
+    b"\xef\xbb\xbfpassword = 'x'\n",
+    b"ok\n" * 5 + b"caf\xc3\xa9 = eval(n)\n" + b"ok\n" * 5 + b"exec(m)",
+]
+
+FUZZ_ALPHABET = list(" \t\n=:'\"()+%./#_") + [
+    "eval", "exec", "input", "password", "key", "token", "SELECT", "delete", "%s",
+    "os.system", "subprocess.call", "random.random", "def ", "pickle.load", "../",
+    "sqlite3", ".execute", "create_task", "audit", "validate", "é", "ſ", "\r\n",
+]
+
+
+def generated_sources(count=2000, seed=2026):
+    rng = random.Random(seed)
+    for _ in range(count):
+        yield "".join(rng.choice(FUZZ_ALPHABET) for _ in range(rng.randint(1, 60)))
+
+
+class TestCompiledScanner(unittest.TestCase):
+
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.path = Path(self._tmp.name) / "sample.py"
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def assert_same_findings(self, content):
+        self.path.write_text(content, encoding='utf-8', newline='')
+        scanner = SecurityScanner()
+        scanner.scan_file(self.path)
+        self.assertEqual(scanner.findings, reference_scan_file(scanner, self.path), repr(content))
+
+    def test_corpus_matches_reference(self):
+        """Findings are identical on the fixed corpus"""
+        for content in DIFFERENTIAL_CORPUS:
+            with self.subTest(content=content):
+                self.assert_same_findings(content)
+
+    def test_generated_inputs_match_reference(self):
+        """Findings are identical on generated inputs, whole and in small windows"""
+        scanner = SecurityScanner()
+        for content in generated_sources():
+            self.assert_same_findings(content)
+            self.assertEqual(window_findings(scanner, self.path, 16), reference_scan_file(scanner, self.path))
+
+    def test_repository_matches_reference(self):
+        """Serial and parallel directory scans match the reference on this repository"""
+        serial = SecurityScanner()
+        files = serial.collect_files(REPO_ROOT)
+        serial.scan_files(files, max_workers=1)
+        expected = [finding for path in files for finding in reference_scan_file(serial, path)]
+        self.assertEqual(serial.findings, expected)
+
+        parallel = SecurityScanner()
+        parallel.scan_files(files * 2, max_workers=2)
+        self.assertEqual(parallel.findings, expected * 2)
+
+    def test_raw_bytes_match_reference(self):
+        """Findings are identical for bytes that text mode decodes or translates"""
+        for content in BYTE_CORPUS:
+            with self.subTest(content=content):
+                self.path.write_bytes(content)
+                scanner = SecurityScanner()
+                scanner.scan_file(self.path)
+                self.assertEqual(scanner.findings, reference_scan_file(scanner, self.path))
+
+    def test_small_windows_match_reference(self):
+        """Line-aligned windows of any size give the same findings"""
+        contents = [content.encode('utf-8') for content in DIFFERENTIAL_CORPUS] + BYTE_CORPUS
+        scanner = SecurityScanner()
+        for content in contents:
+            self.path.write_bytes(content)
+            expected = reference_scan_file(scanner, self.path)
+            for window_bytes in (1, 2, 7, 64):
+                with self.subTest(content=content, window_bytes=window_bytes):
+                    self.assertEqual(window_findings(scanner, self.path, window_bytes), expected)
+
+    def test_oversized_files_skipped(self):
+        """Files over max_file_bytes are skipped and counted"""
+        self.path.write_text("eval(x)\n" * 10)
+        scanner = SecurityScanner(max_file_bytes=79)
+        scanner.scan_file(self.path)
+        self.assertEqual((scanner.findings, scanner.scan_stats['files'], scanner.scan_stats['skipped']),
+                         ([], 0, 1))
+
+        scanner = SecurityScanner(max_file_bytes=80)
+        scanner.scan_file(self.path)
+        self.assertEqual((len(scanner.findings), scanner.scan_stats['skipped']), (10, 0))
+
+    def test_excluded_files_are_not_read(self):
+        """Test and documentation files are skipped without reading them"""
+        scanner = SecurityScanner()
+        scanner.scan_file(Path(self._tmp.name) / "test_missing.py")
+        self.assertEqual((scanner.findings, scanner.scan_stats['files']), ([], 0))
+
+
+class TestIncrementalScan(unittest.TestCase):
+
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.root = Path(self._tmp.name)
+        self.cache_path = self.root / "cache.json"
+        self.files = []
+        for index, content in enumerate(DIFFERENTIAL_CORPUS):
+            path = self.root / "src" / f"module{index}.py"
+            path.parent.mkdir(exist_ok=True)
+            path.write_text(content, encoding='utf-8', newline='')
+            # Age the files so size+mtime is trusted without hashing
+            old = path.stat().st_mtime_ns - 10 * RACY_MTIME_NS
+            os.utime(path, ns=(old, old))
+            self.files.append(path)
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def scan(self, **kwargs):
+        scanner = SecurityScanner(cache_path=self.cache_path)
+        scanner.scan_files(self.files, max_workers=1, **kwargs)
+        return scanner
+
+    def test_unchanged_files_served_from_cache(self):
+        """A second scan reads no files and reports the same findings"""
+        first = self.scan()
+        second = self.scan()
+        self.assertEqual(second.findings, first.findings)
+        self.assertEqual((second.scan_stats['files'], second.scan_stats['cached']), (0, len(self.files)))
+
+        uncached = SecurityScanner()
+        uncached.scan_files(self.files, max_workers=1)
+        self.assertEqual(second.findings, uncached.findings)
+
+    def test_findings_kept_out_of_cache_index(self):
+        """The cache index holds counts only; lost cached findings are rescanned"""
+        first = self.scan()
+        index = json.loads(self.cache_path.read_text(encoding='utf-8'))
+        self.assertEqual(sum(entry['count'] for entry in index['files'].values()), len(first.findings))
+        self.assertNotIn('code_snippet', self.cache_path.read_text(encoding='utf-8'))
+        self.assertEqual(sorted(path.name for path in self.root.glob("cache.json*")),
+                         ["cache.json", index['findings']])
+
+        (self.root / index['findings']).unlink()
+        second = self.scan()
+        self.assertEqual(second.findings, first.findings)
+        rescanned = len({finding.file_path for finding in first.findings})
+        self.assertEqual((second.scan_stats['files'], second.scan_stats['cached']),
+                         (rescanned, len(self.files) - rescanned))
+        self.assertEqual(self.scan().findings, first.findings)
+
+    def test_changed_files_rescanned(self):
+        """Modified files are rescanned; touched but identical files are not"""
+        self.scan()
+        self.files[1].write_text("eval(x)\n", encoding='utf-8')
+        os.utime(self.files[2])
+
+        scanner = self.scan()
+        self.assertEqual(scanner.scan_stats['files'], 1)
+        self.assertIn(SecurityFinding(str(self.files[1]), 1, 'dangerous_functions', 'high',
+                                      scanner.security_patterns['dangerous_functions']['description'],
+                                      'eval(x)',
+                                      scanner.security_patterns['dangerous_functions']['recommendation']),
+                      scanner.findings)
+
+    def test_same_size_rewrite_within_mtime_tick_rescanned(self):
+        """A same-size rewrite keeping the mtime is caught while the entry is racy"""
+        fresh = self.files[2]
+        fresh.write_text("eval(a)\n", encoding='utf-8')
+        stat = fresh.stat()
+        self.scan()
+
+        fresh.write_text("exec(b)\n", encoding='utf-8')
+        os.utime(fresh, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+        scanner = self.scan()
+        self.assertEqual([f.code_snippet for f in scanner.findings if f.file_path == str(fresh)], ["exec(b)"])
+
+    def test_ruleset_change_invalidates_cache(self):
+        """Changing any rule discards every cached entry"""
+        self.scan()
+        scanner = SecurityScanner(cache_path=self.cache_path)
+        scanner.security_patterns['path_traversal']['severity'] = 'critical'
+        scanner.scan_files(self.files, max_workers=1)
+        self.assertEqual(scanner.scan_stats['cached'], 0)
+        self.assertIn('critical', {f.severity for f in scanner.findings if f.finding_type == 'path_traversal'})
+
+    def test_changed_files_since_ref(self):
+        """--since lists committed, unstaged and untracked changes under the directory"""
+        def git(*args):
+            subprocess.run(['git', '-c', 'user.name=t', '-c', 'user.email=t@example.com', *args],
+                           cwd=self.root, check=True, capture_output=True)
+
+        git('init', '-q')
+        git('add', 'src')
+        git('commit', '-q', '-m', 'base')
+        (self.root / "src" / "module3.py").write_text("changed\n")
+        (self.root / "src" / "new.py").write_text("new\n")
+        (self.root / "src" / "notes.txt").write_text("not code\n")
+        (self.root / "other.py").write_text("outside\n")
+        self.files[4].unlink()
+
+        scanner = SecurityScanner()
+        changed = scanner.changed_files(self.root / "src", 'HEAD')
+        self.assertEqual(changed, [self.root / "src" / "module3.py", self.root / "src" / "new.py"])
+        with self.assertRaises(ValueError):
+            scanner.changed_files(self.root / "src", 'no-such-ref')
+
+
+class TestStreamingOutput(unittest.TestCase):
+
+    def setUp(self):
+        self.scanner = SecurityScanner()
+        self.files = [path for path in self.scanner.collect_files(REPO_ROOT)
+                      if not self.scanner._is_excluded_file(path)]
+        collected = SecurityScanner()
+        collected.scan_files(self.files, max_workers=1)
+        self.expected = collected.findings
+        self.expected_breakdown = collected._get_severity_breakdown()
+
+    def stream(self, writer_class, file_paths):
+        stream = io.StringIO()
+        self.scanner.stream_findings(writer_class(stream))
+        self.scanner.scan_files(file_paths, max_workers=1)
+        summary = self.scanner.close_stream()
+        return stream.getvalue(), summary
+
+    def test_jsonl_matches_collected_findings(self):
+        """JSONL lines are the collected findings in order, then the summary"""
+        output, summary = self.stream(JsonlFindingWriter, self.files)
+        records = [json.loads(line) for line in output.splitlines()]
+
+        self.assertEqual([SecurityFinding(**record) for record in records[:-1]], self.expected)
+        self.assertEqual(records[-1], {'scan_summary': summary})
+        self.assertEqual(summary['severity_breakdown'], self.expected_breakdown)
+        self.assertEqual(self.scanner.findings, [])
+
+    def test_memory_does_not_grow_with_findings(self):
+        """Streaming keeps no state per finding written, with or without the findings cache"""
+        with tempfile.TemporaryDirectory() as tmp:
+            files = []
+            for index in range(20):
+                path = Path(tmp) / f"module{index}.py"
+                path.write_text("".join(f"value_{line} = eval(data)\n" for line in range(500)))
+                files.append(path)
+
+            for cache_path in [None, Path(tmp) / "cache.json"]:
+                peaks = []
+                # Uncached, or a cold then a warm cache of each size
+                for count in ((5, 20) if cache_path is None else (5, 5, 20, 20)):
+                    with open(os.devnull, 'w', encoding='utf-8') as devnull:
+                        scanner = SecurityScanner(cache_path=cache_path)
+                        scanner.stream_findings(JsonlFindingWriter(devnull))
+                        tracemalloc.start()
+                        scanner.scan_files(files[:count], max_workers=1)
+                        peaks.append(tracemalloc.get_traced_memory()[1])
+                        tracemalloc.stop()
+                        summary = scanner.close_stream()
+                    self.assertEqual(summary['total_findings'], count * 500)
+
+                with self.subTest(cache=cache_path is not None):
+                    self.assertLess(max(peaks[len(peaks) // 2:]), min(peaks[:len(peaks) // 2]) * 1.5)
+
+    def test_sarif_document(self):
+        """SARIF output is a valid log with one result per finding"""
+        output, summary = self.stream(SarifFindingWriter, self.files)
+        run = json.loads(output)['runs'][0]
+        rules = run['tool']['driver']['rules']
+
+        self.assertEqual(len(run['results']), len(self.expected))
+        self.assertEqual(run['properties'], summary)
+        for result, finding in zip(run['results'], self.expected):
+            self.assertEqual(rules[result['ruleIndex']]['id'], finding.finding_type)
+            self.assertEqual(result['locations'][0]['physicalLocation']['region']['startLine'],
+                             finding.line_number)
+            self.assertEqual(result['level'], 'error' if finding.severity in ('critical', 'high') else 'warning')
+
+    def test_sarif_unknown_rule_has_no_rule_index(self):
+        """A finding of a rule the driver does not list is written without ruleIndex"""
+        stream = io.StringIO()
+        writer = SarifFindingWriter(stream)
+        writer.begin([(name, info) for name, info, _ in self.scanner._rules()])
+        writer.write(SecurityFinding('a.py', 1, 'retired_rule', 'low', 'Gone', 'x', 'None'))
+        writer.end({})
+        result = json.loads(stream.getvalue())['runs'][0]['results'][0]
+        self.assertEqual(result['ruleId'], 'retired_rule')
+        self.assertNotIn('ruleIndex', result)
+
+    def test_writer_requires_write(self):
+        """FindingWriter is abstract; subclasses must implement write()"""
+        with self.assertRaises(TypeError):
+            FindingWriter(io.StringIO())
+
+    def test_findings_written_while_scanning(self):
+        """Findings reach the stream before the last file is scanned"""
+        scanner = self.scanner
+        files_at_flush = []
+
+        class RecordingWriter(JsonlFindingWriter):
+            def flush(self):
+                files_at_flush.append(scanner.scan_stats['files'])
+
+        scanner.stream_findings(RecordingWriter(io.StringIO()))
+        scanner.scan_files(self.files, max_workers=1)
+        scanner.close_stream()
+        self.assertLess(files_at_flush[0], len(self.files))
+
+
+def run_benchmark(copies=20):
+    """Print files/sec and MB/sec for the reference, serial and parallel scans"""
+    with tempfile.TemporaryDirectory() as tmp:
+        sources = [path for path in SecurityScanner().collect_files(REPO_ROOT)
+                   if not SecurityScanner()._is_excluded_file(path)]
+        for copy in range(copies):
+            for index, path in enumerate(sources):
+                target = Path(tmp) / f"pkg{copy}" / f"{index}_{path.name}"
+                target.parent.mkdir(exist_ok=True)
+                shutil.copyfile(path, target)
+
+        scanner = SecurityScanner()
+        files = scanner.collect_files(Path(tmp))
+        size_mb = sum(path.stat().st_size for path in files) / 1e6
+
+        start = time.perf_counter()
+        for path in files:
+            reference_scan_file(scanner, path)
+        elapsed = time.perf_counter() - start
+        print(f"reference  {len(files)} files, {size_mb:.1f} MB: "
+              f"{len(files) / elapsed:8.1f} files/sec {size_mb / elapsed:6.2f} MB/sec")
+
+        for label, workers in [("serial", 1), ("pool x4", 4)]:
+            scanner = SecurityScanner()
+            scanner.scan_files(files, max_workers=workers)
+            throughput = scanner.throughput()
+            print(f"{label:10} {len(files)} files, {size_mb:.1f} MB: "
+                  f"{throughput['files_per_sec']:8.1f} files/sec {throughput['mb_per_sec']:6.2f} MB/sec")
+
+        cache_path = Path(tmp) / "cache.json"
+        for label in ["cold cache", "warm cache"]:
+            scanner = SecurityScanner(cache_path=cache_path)
+            scanner.scan_files(files, max_workers=1)
+            print(f"{label:10} {len(files)} files, {size_mb:.1f} MB: {scanner.scan_stats['seconds']:8.3f}s "
+                  f"({scanner.scan_stats['cached']} from cache)")
+
+        files[0].write_text(files[0].read_text() + "\n")
+        scanner = SecurityScanner(cache_path=cache_path)
+        scanner.scan_files(files, max_workers=1)
+        print(f"{'one edit':10} {len(files)} files, {size_mb:.1f} MB: {scanner.scan_stats['seconds']:8.3f}s "
+              f"({scanner.scan_stats['files']} rescanned)")
+
+
+
+def run_large_file_benchmark(size_mb=40):
+    """Print time and peak Python heap for one large generated file"""
+    with tempfile.TemporaryDirectory() as tmp:
+        scanner = SecurityScanner()
+        unit = "".join(path.read_text(encoding='utf-8').encode('ascii', 'replace').decode('ascii')
+                       for path in scanner.collect_files(REPO_ROOT / "scripts")
+                       if not scanner._is_excluded_file(path))
+        path = Path(tmp) / "bundle.py"
+        path.write_text(unit * (size_mb * 1000000 // len(unit) + 1))
+        size_mb = path.stat().st_size / 1e6
+
+        for label, scan in [("reference", lambda: reference_scan_file(scanner, path)),
+                            ("mmap", lambda: SecurityScanner().scan_file(path))]:
+            tracemalloc.start()
+            start = time.perf_counter()
+            scan()
+            elapsed = time.perf_counter() - start
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+            print(f"{label:10} 1 file, {size_mb:.1f} MB: {size_mb / elapsed:6.2f} MB/sec, "
+                  f"peak heap {peak / 1e6:7.1f} MB")
+
+
+def run_streaming_benchmark(files=100, findings_per_file=1000):
+    """Print peak heap and time to first output for collected JSON vs streamed JSONL"""
+    with tempfile.TemporaryDirectory() as tmp:
+        for index in range(files):
+            (Path(tmp) / f"module{index}.py").write_text("result = eval(expr)\n" * findings_per_file)
+        file_paths = SecurityScanner().collect_files(Path(tmp))
+
+        class FirstWriteStream(io.TextIOBase):
+            def __init__(self):
+                self.first_write = None
+
+            def write(self, text):
+                if self.first_write is None:
+                    self.first_write = time.perf_counter()
+                return len(text)
+
+        for label in ["json", "jsonl"]:
+            stream = FirstWriteStream()
+            tracemalloc.start()
+            start = time.perf_counter()
+            scanner = SecurityScanner()
+            if label == "jsonl":
+                scanner.stream_findings(JsonlFindingWriter(stream))
+                scanner.scan_files(file_paths, max_workers=1)
+                scanner.close_stream()
+            else:
+                scanner.scan_files(file_paths, max_workers=1)
+                stream.write(scanner.generate_report('json'))
+            elapsed = time.perf_counter() - start
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+            print(f"{label:10} {files * findings_per_file} findings: {elapsed:6.2f}s total, "
+                  f"first output after {stream.first_write - start:6.3f}s, peak heap {peak / 1e6:7.1f} MB")
+
+
+if __name__ == '__main__':
+    if "--bench" in sys.argv:
+        run_benchmark()
+        run_large_file_benchmark()
+        run_streaming_benchmark()
+        sys.exit(0)
+    unittest.main(verbosity=2)
@@ -0,0 +1,36 @@
+# HEE invariant enforcement package (I08 Lane Proof, I09 Words Not State, I10 Repeat Without Correction)
+#
+# Public names are resolved lazily (PEP 562) so that importing the package, or
+# a single submodule, does not pull in every sub-validator.
+
+import importlib
+
+_LAZY_EXPORTS = {
+    "InvariantEnforcementEngine": ".engine",
+    "InvariantResult": ".engine",
+    "InvariantViolation": ".engine",
+    "ValidationContext": ".engine",
+    "validate_hee_action": ".engine",
+    "AgentInvariantIntegration": ".agent_integration",
+    "AgentIntegrationMode": ".agent_integration",
+    "ProofValidator": ".proof.validator",
+    "StateChangeGatekeeper": ".state.gatekeeper",
+    "RepetitionPrevention": ".learning.prevention",
+    "EvidenceManager": ".evidence.manager",
+}
+
+__all__ = sorted(_LAZY_EXPORTS)
+
+
+def __getattr__(name):
+    module_name = _LAZY_EXPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+    value = getattr(importlib.import_module(module_name, __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
@@ -16,9 +16,6 @@ from dataclasses import dataclass
 from enum import Enum
 
 from .engine import InvariantEnforcementEngine, ValidationContext, InvariantResult
-from .proof.validator import ProofValidator
-from .state.gatekeeper import StateChangeGatekeeper
-from .learning.prevention import RepetitionPrevention
 
 logger = logging.getLogger(__name__)
 
@@ -115,7 +112,7 @@ class AgentInvariantIntegration:
         elif integration_mode == AgentIntegrationMode.PROPOSAL_ONLY:
             # Proposal validation for gpt-agent
             if claims:
-                proof_validator = ProofValidator(self.repo_path)
+                proof_validator = self.invariant_engine.proof_validator
                 for claim in claims:
                     proof_result = proof_validator.validate_claim(
                         agent_type=agent_type,
@@ -153,7 +150,7 @@ class AgentInvariantIntegration:
 
         # Check for repetition (applies to all agent types)
         if previous_attempts:
-            repetition_prevention = RepetitionPrevention(self.repo_path)
+            repetition_prevention = self.invariant_engine.repetition_prevention
             repeat_result = repetition_prevention.check_repetition(
                 context_hash=context.to_hash(),
                 previous_attempts=previous_attempts
@@ -10,19 +10,22 @@ This engine coordinates validation across all invariants before any action is ta
 """
 
 import logging
-from typing import Dict, List, Optional, Any, Tuple
+from typing import Dict, List, Optional, Any, Tuple, TYPE_CHECKING
 from dataclasses import dataclass
 from enum import Enum
+from functools import cached_property
 import json
 import hashlib
 from datetime import datetime
 import os
 
-from .proof.validator import ProofValidator
-from .state.gatekeeper import StateChangeGatekeeper
-from .learning.prevention import RepetitionPrevention
-from .evidence.manager import EvidenceManager
-from .agent_taming import AgentTamingEnforcer, validate_hee_taming
+# Sub-validators are imported on first use so that one-shot CLI hooks only pay
+# for the invariants they actually exercise.
+if TYPE_CHECKING:
+    from .proof.validator import ProofValidator
+    from .state.gatekeeper import StateChangeGatekeeper
+    from .learning.prevention import RepetitionPrevention
+    from .evidence.manager import EvidenceManager
 
 logger = logging.getLogger(__name__)
 
@@ -85,15 +88,40 @@ class InvariantEnforcementEngine:
             repo_path: Path to the repository root
         """
         self.repo_path = repo_path
-        self.evidence_manager = EvidenceManager(repo_path)
-        self.proof_validator = ProofValidator(repo_path)
-        self.state_gatekeeper = StateChangeGatekeeper(repo_path)
-        self.repetition_prevention = RepetitionPrevention(repo_path)
-        self.taming_enforcer = AgentTamingEnforcer(repo_path)
 
         # Track violations for learning
         self.violations_log = []
 
+    @cached_property
+    def evidence_manager(self) -> "EvidenceManager":
+        """Evidence manager, constructed on first access"""
+        from .evidence.manager import EvidenceManager
+        return EvidenceManager(self.repo_path)
+
+    @cached_property
+    def proof_validator(self) -> "ProofValidator":
+        """I08 proof validator, constructed on first access"""
+        from .proof.validator import ProofValidator
+        return ProofValidator(self.repo_path)
+
+    @cached_property
+    def state_gatekeeper(self) -> "StateChangeGatekeeper":
+        """I09 state change gatekeeper, constructed on first access"""
+        from .state.gatekeeper import StateChangeGatekeeper
+        return StateChangeGatekeeper(self.repo_path)
+
+    @cached_property
+    def repetition_prevention(self) -> "RepetitionPrevention":
+        """I10 repetition prevention, constructed on first access"""
+        from .learning.prevention import RepetitionPrevention
+        return RepetitionPrevention(self.repo_path)
+
+    @cached_property
+    def taming_enforcer(self) -> Any:
+        """Agent taming enforcer, constructed on first access"""
+        from .agent_taming import AgentTamingEnforcer
+        return AgentTamingEnforcer(self.repo_path)
+
     def validate_action(self, context: ValidationContext) -> Tuple[InvariantResult, List[InvariantViolation]]:
         """
         Validate an action against all invariants and agent taming constraints.
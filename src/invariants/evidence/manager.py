@@ -71,11 +71,15 @@ class EvidenceManager:
         self.evidence_root = os.path.join(repo_path, ".hee", "evidence")
         self.evidence_index_file = os.path.join(self.evidence_root, "evidence_index.json")
 
-        self._ensure_evidence_directories()
+        # Directories are created on first write, not at construction time
+        self._directories_ready = False
         self.evidence_index = self._load_evidence_index()
 
     def _ensure_evidence_directories(self):
         """Ensure evidence directories exist"""
+        if self._directories_ready:
+            return
+
         # Create main evidence directory
         os.makedirs(self.evidence_root, exist_ok=True)
 
@@ -84,6 +88,8 @@ class EvidenceManager:
             category_dir = os.path.join(self.evidence_root, category.value)
             os.makedirs(category_dir, exist_ok=True)
 
+        self._directories_ready = True
+
     def _load_evidence_index(self) -> Dict[str, EvidenceRecord]:
         """Load evidence index from disk"""
         if not os.path.exists(self.evidence_index_file):
@@ -100,6 +106,7 @@ class EvidenceManager:
     def _save_evidence_index(self):
         """Save evidence index to disk"""
         try:
+            self._ensure_evidence_directories()
             with open(self.evidence_index_file, 'w') as f:
                 data = {eid: record.__dict__ for eid, record in self.evidence_index.items()}
                 json.dump(data, f, indent=2)
@@ -132,6 +139,7 @@ class EvidenceManager:
 
         # Copy file to evidence storage
         try:
+            self._ensure_evidence_directories()
             shutil.copy2(file_path, storage_path)
         except Exception as e:
             logger.error(f"Failed to copy evidence file {file_path}: {e}")
@@ -71,7 +71,6 @@ class RepetitionPrevention:
         self.repo_path = repo_path
         self.failure_log_file = os.path.join(repo_path, ".hee", "learning", "failures.json")
         self.learning_log_file = os.path.join(repo_path, ".hee", "learning", "learning.json")
-        self._ensure_learning_directory()
 
         # Load existing records
         self.failure_records = self._load_failure_records()
@@ -111,6 +110,7 @@ class RepetitionPrevention:
     def _save_failure_records(self):
         """Save failure records to disk"""
         try:
+            self._ensure_learning_directory()
             with open(self.failure_log_file, 'w') as f:
                 data = [record.__dict__ for record in self.failure_records]
                 json.dump(data, f, indent=2)
@@ -120,6 +120,7 @@ class RepetitionPrevention:
     def _save_learning_records(self):
         """Save learning records to disk"""
         try:
+            self._ensure_learning_directory()
             with open(self.learning_log_file, 'w') as f:
                 data = [record.__dict__ for record in self.learning_records]
                 json.dump(data, f, indent=2)
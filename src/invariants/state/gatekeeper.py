@@ -75,7 +75,6 @@ class StateChangeGatekeeper:
         self.repo_path = repo_path
         self.evidence_requirements = self._load_evidence_requirements()
         self.audit_log_file = os.path.join(repo_path, ".hee", "audit", "state_changes.json")
-        self._ensure_audit_directory()
 
     def _load_evidence_requirements(self) -> Dict[StateChangeType, List[str]]:
         """
@@ -392,6 +391,7 @@ class StateChangeGatekeeper:
 
         # Write back to file
         try:
+            self._ensure_audit_directory()
             with open(self.audit_log_file, 'w') as f:
                 json.dump(audit_log, f, indent=2)
         except Exception as e:
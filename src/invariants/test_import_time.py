@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+Import-Time Benchmark for the Invariant Enforcement Engine
+Measures `python -X importtime` cost of src.invariants.engine and enforces a
+regression budget so one-shot CLI hooks keep a fast startup.
+
+Run directly to print the benchmark:
+    python src/invariants/test_import_time.py --bench
+"""
+
+import os
+import re
+import subprocess
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parents[2]
+
+# Cumulative import budget for src.invariants.engine, in microseconds.
+# Most of this is stdlib (logging, dataclasses); the sub-validators are lazy.
+IMPORT_BUDGET_US = int(os.environ.get("HEE_IMPORT_BUDGET_US", "150000"))
+
+LAZY_SUBMODULES = [
+    "src.invariants.proof.validator",
+    "src.invariants.state.gatekeeper",
+    "src.invariants.learning.prevention",
+    "src.invariants.evidence.manager",
+]
+
+IMPORTTIME_LINE = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|\s+(\s*)(\S+)$")
+
+
+def measure_import_time(module="src.invariants.engine", runs=5):
+    """
+    Measure the cumulative import time of a module in fresh interpreters.
+
+    Returns:
+        dict: best/median cumulative microseconds and the modules it pulled in
+    """
+    samples = []
+    imported = []
+    for _ in range(runs):
+        result = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+            capture_output=True, text=True, cwd=REPO_ROOT, check=True
+        )
+        imported = []
+        cumulative = None
+        for line in result.stderr.splitlines():
+            match = IMPORTTIME_LINE.match(line)
+            if not match:
+                continue
+            imported.append(match.group(4))
+            if match.group(4) == module:
+                cumulative = int(match.group(2))
+        samples.append(cumulative)
+
+    samples.sort()
+    return {
+        "module": module,
+        "best_us": samples[0],
+        "median_us": samples[len(samples) // 2],
+        "imported": imported
+    }
+
+
+class TestInvariantImportTime(unittest.TestCase):
+
+    def test_import_within_budget(self):
+        """Engine import stays under the regression budget"""
+        result = measure_import_time()
+        self.assertLessEqual(result["best_us"], IMPORT_BUDGET_US,
+                             f"src.invariants.engine import took {result['best_us']}us "
+                             f"(budget {IMPORT_BUDGET_US}us)")
+
+    def test_sub_validators_not_imported_eagerly(self):
+        """Importing the engine does not load any sub-validator"""
+        imported = set(measure_import_time(runs=1)["imported"])
+        for module in LAZY_SUBMODULES:
+            with self.subTest(module=module):
+                self.assertNotIn(module, imported)
+
+    def test_engine_construction_is_side_effect_free(self):
+        """Constructing the engine and validating does not create directories"""
+        sys.path.insert(0, str(REPO_ROOT))
+        from src.invariants.engine import InvariantEnforcementEngine, ValidationContext, InvariantResult
+
+        with tempfile.TemporaryDirectory() as tmp:
+            engine = InvariantEnforcementEngine(tmp)
+            context = ValidationContext(agent_type="chat-agent", action="chat",
+                                        claims=[], evidence_paths=[])
+            result, violations = engine.validate_action(context)
+
+            self.assertEqual(result, InvariantResult.PASS)
+            self.assertEqual(violations, [])
+            self.assertFalse(os.path.exists(os.path.join(tmp, ".hee")))
+
+    def test_package_exports_resolve_lazily(self):
+        """Package-level names resolve to the submodule objects on demand"""
+        sys.path.insert(0, str(REPO_ROOT))
+        import src.invariants as invariants
+        from src.invariants.proof.validator import ProofValidator
+
+        self.assertIs(invariants.ProofValidator, ProofValidator)
+        with self.assertRaises(AttributeError):
+            invariants.NotARealName
+
+
+if __name__ == '__main__':
+    if "--bench" in sys.argv:
+        for name in ["src.invariants", "src.invariants.engine", "src.invariants.agent_integration"]:
+            bench = measure_import_time(name)
+            print(f"{name}: best {bench['best_us']}us, median {bench['median_us']}us "
+                  f"({len(bench['imported'])} modules)")
+        sys.exit(0)
+    unittest.main(verbosity=2)
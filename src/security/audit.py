@@ -11,16 +11,85 @@ Security Requirements:
 - Forensic analysis capabilities
 """
 
+import io
 import json
+import os
+import re
+import gzip
+import hmac
+import mmap
+import queue
+import shutil
 import hashlib
+from contextlib import contextmanager
+from concurrent.futures import Future, ProcessPoolExecutor
 from datetime import datetime, timezone
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, Iterator, List, Optional, Tuple
 import logging
 import threading
+import time
 from dataclasses import dataclass, asdict
 
+try:
+    import fcntl
+except ImportError:  # not available on Windows, only needed for process_safe
+    fcntl = None
+
+try:
+    import zstandard
+except ImportError:  # optional, only needed for compression='zstd'
+    zstandard = None
+
 logger = logging.getLogger(__name__)
 
+# Hash chain: every event stores the integrity hash of the event before it, and
+# a checkpoint record carrying the chain hash is written every
+# CHECKPOINT_INTERVAL events and at the end of every sealed segment.
+# Checkpoints are HMAC-signed when a signing key is configured, and then
+# required: without them the chain could simply be recomputed. They also split
+# the log into ranges that can be verified in parallel.
+GENESIS_HASH = "0" * 64
+CHECKPOINT_INTERVAL = 1000
+CHECKPOINT_PREFIX = b'{"record_type": "checkpoint"'
+AUDIT_SIGNING_KEY_ENV = "HEE_AUDIT_SIGNING_KEY"
+
+# Logs smaller than this are verified in-process; process start-up costs more
+# than hashing a few thousand segments serially.
+PARALLEL_VERIFY_BYTES = 64 * 1024 * 1024
+
+# Partitioned logs write one segment per UTC day or hour of log time, e.g.
+# security_audit.2026-10-18T13.log, each with a sidecar index (.idx) holding
+# "offset<TAB>event epoch<TAB>event_type<TAB>severity" per event. Per-segment
+# summaries in <audit log>.manifest let queries skip whole segments.
+PARTITION_FORMATS = {
+    'day': '%Y-%m-%d',
+    'hour': '%Y-%m-%dT%H',
+}
+
+# Rotation seals the active segment by renaming it to the next numbered
+# segment (security_audit.000001.log, security_audit.2026-10-18T13.000001.log).
+# Sealed segments are never written again, so a background thread can
+# compress them and the retention policy can delete the oldest ones; the
+# chain head of the last deleted segment is kept in a signed <audit log>.anchor.
+DEFAULT_MAX_SEGMENT_BYTES = 64 * 1024 * 1024
+
+# Sealed segments of the global auditor expire after this many days. Set
+# HEE_AUDIT_RETENTION_DAYS to change it, or to "none" to keep them forever.
+DEFAULT_RETENTION_DAYS = 365
+AUDIT_RETENTION_DAYS_ENV = "HEE_AUDIT_RETENTION_DAYS"
+COMPRESSION_SUFFIXES = {
+    'gzip': '.gz',
+    'zstd': '.zst',
+}
+
+# Process-safe auditors serialize writers across processes with flock() on
+# <audit log>.lock and keep the chain head in <audit log>.seq as one
+# fixed-width "<sequence number> <chain hash>" line, rewritten in place.
+SEQUENCE_RECORD_FORMAT = "{:020d} {}\n"
+
+# (JSON line(s), segment path, index entry without offset)
+AuditRecord = Tuple[str, str, Optional[str]]
+
 @dataclass
 class SecurityEvent:
     """Security event for audit logging"""
@@ -33,6 +102,18 @@ class SecurityEvent:
     event_data: Optional[Dict[str, Any]] = None
     risk_assessment: Optional[str] = None
 
+@dataclass
+class AuditSegment:
+    """One file of the audit log"""
+    path: str
+    partition_key: Optional[str]
+    sequence: Optional[int]  # None for the active segment of its partition
+    compressed: bool
+
+    @property
+    def index_path(self) -> str:
+        return _uncompressed_path(self.path) + '.idx'
+
 class SecurityAuditor:
     """
     Security audit framework for HEE/HEER systems.
@@ -40,48 +121,597 @@ class SecurityAuditor:
     Provides comprehensive audit logging, monitoring, and compliance tracking.
     """
 
-    def __init__(self, audit_log_path: str = "security_audit.log"):
+    def __init__(self, audit_log_path: str = "security_audit.log", group_commit: bool = False,
+                 commit_interval: float = 0.0, commit_batch_size: int = 512, fsync: bool = False,
+                 checkpoint_interval: int = CHECKPOINT_INTERVAL, signing_key: Optional[bytes] = None,
+                 partition: Optional[str] = None, max_segment_bytes: Optional[int] = None,
+                 compression: Optional[str] = None, retention_days: Optional[float] = None,
+                 max_segments: Optional[int] = None, process_safe: bool = False):
+        """
+        Args:
+            audit_log_path: Path of the JSON Lines audit log; with partition
+                set, the base name that segment names are derived from
+            group_commit: Queue events for a single writer thread that writes
+                them in batches instead of opening the log once per event
+            commit_interval: Seconds the writer waits for more events before
+                committing a batch (group commit only)
+            commit_batch_size: Maximum events per batch write (group commit only)
+            fsync: fsync the audit log after every write or batch
+            checkpoint_interval: Events between checkpoint records
+            signing_key: HMAC key for checkpoint signatures; defaults to the
+                HEE_AUDIT_SIGNING_KEY environment variable
+            partition: 'day' or 'hour' to write indexed, time-partitioned
+                segments instead of a single file
+            max_segment_bytes: Rotate the active segment once it reaches this size
+            compression: 'gzip' or 'zstd' to compress sealed segments in the background
+            retention_days: Delete sealed segments last modified longer ago
+            max_segments: Keep at most this many sealed segments
+            process_safe: Coordinate sequence numbers, writes and maintenance
+                with other processes sharing the same audit log
+        """
+        if partition is not None and partition not in PARTITION_FORMATS:
+            raise ValueError(f"partition must be one of {sorted(PARTITION_FORMATS)}, got {partition!r}")
+        if compression is not None and compression not in COMPRESSION_SUFFIXES:
+            raise ValueError(f"compression must be one of {sorted(COMPRESSION_SUFFIXES)}, got {compression!r}")
+        if compression == 'zstd' and zstandard is None:
+            raise ValueError("compression='zstd' requires the zstandard package")
+        if process_safe and fcntl is None:
+            raise ValueError("process_safe requires fcntl file locking")
+
         self.audit_log_path = audit_log_path
+        self.partition = partition
+        self.max_segment_bytes = max_segment_bytes
+        self.compression = compression
+        self.retention_days = retention_days
+        self.max_segments = max_segments
+        self.process_safe = process_safe
+        self._lock_fds: Dict[str, Tuple[int, int]] = {}
         self._lock = threading.Lock()
         self.event_counter = 0
 
+        if signing_key is None and os.environ.get(AUDIT_SIGNING_KEY_ENV):
+            signing_key = os.environ[AUDIT_SIGNING_KEY_ENV].encode()
+        self.checkpoint_interval = checkpoint_interval
+        self.signing_key = signing_key
+        self._last_hash: Optional[str] = None
+
+        self.group_commit = group_commit
+        self.commit_interval = commit_interval
+        self.commit_batch_size = commit_batch_size
+        self.fsync = fsync
+
+        # (event, or None for a flush marker; future of its hash)
+        self._queue: "queue.Queue[Optional[Tuple[Optional[SecurityEvent], Future]]]" = queue.Queue()
+        self._writer: Optional[threading.Thread] = None
+        self._writer_lock = threading.Lock()
+        self._sync_writer = _SegmentWriter(self, keep_open=False)
+
+        self._maintenance: Optional[threading.Thread] = None
+        self._maintenance_due = threading.Event()
+        self._maintenance_lock = threading.Lock()
+        self._state_lock = threading.Lock()
+        self._closing = False
+
+    def _recover_chain_state(self) -> None:
+        """Continue the hash chain and sequence from the last record in the log"""
+        self._last_hash = GENESIS_HASH
+        for segment in reversed(self._segments()):
+            head = _chain_head(segment.path)
+            if head is not None:
+                break
+        else:
+            head = self._load_anchor()
+            if head is not None:
+                head = (head['chain_hash'], head['sequence_number'])
+
+        if head is not None:
+            self._last_hash, sequence_number = head
+            if isinstance(sequence_number, int):
+                self.event_counter = sequence_number
+
+    @contextmanager
+    def _process_lock(self, name: str = 'lock', blocking: bool = True) -> Iterator[bool]:
+        """
+        Hold an exclusive flock() on <audit log>.<name> in process-safe mode.
+
+        The descriptor is opened once per process: flock() locks belong to the
+        open file description, which a forked child would otherwise share.
+
+        Yields:
+            Whether the lock is held (always True when blocking)
+        """
+        if not self.process_safe:
+            yield True
+            return
+
+        pid, fd = self._lock_fds.get(name, (None, None))
+        if pid != os.getpid():
+            fd = os.open(f"{self.audit_log_path}.{name}", os.O_RDWR | os.O_CREAT, 0o644)
+            self._lock_fds[name] = (os.getpid(), fd)
+
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX if blocking else fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            yield False
+            return
+
+        try:
+            yield True
+        finally:
+            fcntl.flock(fd, fcntl.LOCK_UN)
+
+    def _load_sequence_state(self) -> None:
+        """Take the chain head another process may have advanced; call under the process lock"""
+        try:
+            with open(f"{self.audit_log_path}.seq", 'rb') as f:
+                sequence_number, chain_hash = f.read().split()
+            self.event_counter = int(sequence_number)
+            self._last_hash = chain_hash.decode()
+        except (FileNotFoundError, ValueError):
+            self._recover_chain_state()
+
+    def _discard_chain_head(self) -> None:
+        """
+        Forget the chain head after a failed write; call with self._lock held.
+
+        The failed records were never persisted, so the next event must chain
+        to the last record on disk, which is re-read from the log (and, when
+        process-safe, by whichever process writes next).
+        """
+        self._last_hash = None
+        if self.process_safe:
+            try:
+                os.remove(f"{self.audit_log_path}.seq")
+            except FileNotFoundError:
+                pass
+
+    def _store_sequence_state(self) -> None:
+        """Persist the chain head for the next writer; call under the process lock"""
+        fd = os.open(f"{self.audit_log_path}.seq", os.O_WRONLY | os.O_CREAT, 0o644)
+        try:
+            os.pwrite(fd, SEQUENCE_RECORD_FORMAT.format(self.event_counter, self._last_hash).encode(), 0)
+            if self.fsync:
+                os.fsync(fd)
+        finally:
+            os.close(fd)
+
+    def _segments(self) -> List[AuditSegment]:
+        """Existing log segments, oldest first"""
+        directory = os.path.dirname(self.audit_log_path) or '.'
+        base, ext = os.path.splitext(os.path.basename(self.audit_log_path))
+        pattern = re.compile(
+            re.escape(base)
+            + (r'\.(?P<key>\d{4}-\d{2}-\d{2}(?:T\d{2})?)' if self.partition else '')
+            + r'(?:\.(?P<seq>\d{6}))?' + re.escape(ext)
+            + r'(?P<compressed>' + '|'.join(re.escape(s) for s in COMPRESSION_SUFFIXES.values()) + r')?'
+        )
+
+        try:
+            names = os.listdir(directory)
+        except FileNotFoundError:
+            return []
+
+        segments = {}
+        for name in names:
+            match = pattern.fullmatch(name)
+            if not match:
+                continue
+            segment = AuditSegment(
+                path=os.path.join(os.path.dirname(self.audit_log_path), name),
+                partition_key=match.group('key') if self.partition else None,
+                sequence=int(match.group('seq')) if match.group('seq') else None,
+                compressed=bool(match.group('compressed'))
+            )
+            # While a segment is being compressed both forms exist; the
+            # uncompressed one is complete until it is removed
+            uncompressed = _uncompressed_path(segment.path)
+            if uncompressed in segments and not segments[uncompressed].compressed:
+                continue
+            segments[uncompressed] = segment
+
+        return sorted(segments.values(), key=lambda segment: (
+            segment.partition_key or '',
+            segment.sequence is None,
+            segment.sequence or 0
+        ))
+
+    def _segment_paths(self) -> List[str]:
+        """Existing log segment paths, oldest first"""
+        return [segment.path for segment in self._segments()]
+
+    def _partition_path(self, log_time: datetime) -> str:
+        """Segment that events logged at log_time are written to"""
+        base, ext = os.path.splitext(self.audit_log_path)
+        return f"{base}.{log_time.strftime(PARTITION_FORMATS[self.partition])}{ext}"
+
+    def _prepare_event(self, event: SecurityEvent) -> Tuple[str, "AuditRecord"]:
+        """
+        Assign a sequence number, chain and serialize an event once.
+
+        Must be called with self._lock held.
+
+        Returns:
+            Tuple of (event hash, record to write). The record holds the JSON
+            line(s) including the integrity hash and any checkpoint record that
+            follows the event, the segment path and the index entry.
+        """
+        if self._last_hash is None:
+            self._recover_chain_state()
+
+        # Add sequence number for ordering
+        self.event_counter += 1
+        log_time = datetime.now(timezone.utc)
+        event_dict = asdict(event)
+        event_dict['sequence_number'] = self.event_counter
+        event_dict['log_timestamp'] = log_time.isoformat()
+        event_dict['previous_hash'] = self._last_hash
+
+        # Create event hash for integrity verification. The hashed form is
+        # also the written form, with the hash appended as the last key.
+        event_json = json.dumps(event_dict, sort_keys=True)
+        event_hash = hashlib.sha256(event_json.encode()).hexdigest()
+        line = f'{event_json[:-1]}, "integrity_hash": "{event_hash}"}}\n'
+        self._last_hash = event_hash
+
+        if self.checkpoint_interval and self.event_counter % self.checkpoint_interval == 0:
+            line += self._checkpoint_record(self.event_counter, event_hash, event_dict['log_timestamp'])
+
+        if self.partition is None:
+            return event_hash, (line, self.audit_log_path, None)
+
+        epoch = _timestamp_epoch(event.timestamp)
+        index_entry = '\t'.join([
+            '' if epoch is None else repr(epoch),
+            _index_field(event.event_type),
+            _index_field(event.severity)
+        ])
+        return event_hash, (line, self._partition_path(log_time), index_entry)
+
+    def _checkpoint_record(self, sequence_number: int, chain_hash: str, log_timestamp: str) -> str:
+        """Serialize a checkpoint record; its key order makes it findable by prefix"""
+        algorithm, signature = _checkpoint_signature(self.signing_key, sequence_number, chain_hash)
+        return json.dumps({
+            'record_type': 'checkpoint',
+            'sequence_number': sequence_number,
+            'chain_hash': chain_hash,
+            'log_timestamp': log_timestamp,
+            'signature_algorithm': algorithm,
+            'signature': signature
+        }) + '\n'
+
     def log_security_event(self, event: SecurityEvent) -> str:
         """
         Log a security event with immutable audit trail.
 
+        In group commit mode this blocks until the batch containing the
+        event has been written; use log_security_event_async to not wait.
+
         Args:
             event: Security event to log
 
         Returns:
             Event hash for verification
         """
-        with self._lock:
-            # Add sequence number for ordering
-            self.event_counter += 1
-            event_dict = asdict(event)
-            event_dict['sequence_number'] = self.event_counter
-            event_dict['log_timestamp'] = datetime.now(timezone.utc).isoformat()
-
-            # Create event hash for integrity verification
-            event_json = json.dumps(event_dict, sort_keys=True)
-            event_hash = hashlib.sha256(event_json.encode()).hexdigest()
-            event_dict['integrity_hash'] = event_hash
-
-            # Log based on severity
-            log_level = getattr(logging, event.severity.upper(), logging.INFO)
-            logger.log(log_level, f"Security Event: {event.event_type} - {event.risk_assessment}")
+        if self.group_commit:
+            return self.log_security_event_async(event).result()
+
+        with self._lock, self._process_lock():
+            if self.process_safe:
+                self._load_sequence_state()
+            event_hash, record = self._prepare_event(event)
 
             # Write to audit log
             try:
-                with open(self.audit_log_path, 'a', encoding='utf-8') as f:
-                    json.dump(event_dict, f, ensure_ascii=False)
-                    f.write('\n')
+                self._sync_writer.write([record])
             except Exception as e:
                 logger.error(f"Failed to write audit log: {e}")
+                self._discard_chain_head()
                 raise
 
+            if self.process_safe:
+                self._store_sequence_state()
+
+            self._log_event_level(event)
             return event_hash
 
+    def log_security_event_async(self, event: SecurityEvent) -> "Future[str]":
+        """
+        Queue a security event for the group commit writer.
+
+        Args:
+            event: Security event to log
+
+        Returns:
+            Future resolving to the event hash once the event is written
+        """
+        if not self.group_commit:
+            future: "Future[str]" = Future()
+            try:
+                future.set_result(self.log_security_event(event))
+            except Exception as e:
+                future.set_exception(e)
+            return future
+
+        self._ensure_writer()
+        future = Future()
+
+        # The writer assigns sequence numbers in queue order when it commits a
+        # batch, so events queued behind a failed batch never chain to it
+        self._queue.put((event, future))
+        self._log_event_level(event)
+        return future
+
+    def _log_event_level(self, event: SecurityEvent) -> None:
+        """Log event based on severity"""
+        log_level = getattr(logging, event.severity.upper(), logging.INFO)
+        logger.log(log_level, f"Security Event: {event.event_type} - {event.risk_assessment}")
+
+    def _ensure_writer(self) -> None:
+        """Start the group commit writer thread if it is not running"""
+        if self._writer is not None and self._writer.is_alive():
+            return
+
+        with self._writer_lock:
+            if self._writer is None or not self._writer.is_alive():
+                self._writer = threading.Thread(target=self._writer_loop,
+                                                name="security-audit-writer", daemon=True)
+                self._writer.start()
+
+    def _writer_loop(self) -> None:
+        """Drain the queue in batches, one write (and optional fsync) per batch"""
+        # Another process may seal the open segment, so process-safe writers reopen per batch
+        writer = _SegmentWriter(self, keep_open=not self.process_safe)
+        stop = False
+        try:
+            while not stop:
+                item = self._queue.get()
+                if item is None:
+                    return
+
+                batch = [item]
+                deadline = time.monotonic() + self.commit_interval
+                while len(batch) < self.commit_batch_size:
+                    try:
+                        remaining = deadline - time.monotonic()
+                        item = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+                    except queue.Empty:
+                        break
+                    if item is None:
+                        stop = True
+                        break
+                    batch.append(item)
+
+                # The segment stays open between batches; it is reopened after a failure
+                try:
+                    hashes = self._commit_batch(writer, batch)
+                except Exception as e:
+                    logger.error(f"Failed to write audit log batch: {e}")
+                    for _, future in batch:
+                        future.set_exception(e)
+                else:
+                    for (_, future), event_hash in zip(batch, hashes):
+                        future.set_result(event_hash)
+        finally:
+            writer.close()
+
+    def _commit_batch(self, writer: "_SegmentWriter",
+                      batch: List[Tuple[Optional[SecurityEvent], Future]]) -> List[str]:
+        """Sequence, chain and write one batch from the group commit queue; returns the event hashes"""
+        # Sequence numbers may depend on other processes, so they are
+        # assigned under the process lock
+        with self._lock, self._process_lock():
+            if self.process_safe:
+                self._load_sequence_state()
+            hashes, records = [], []
+            for event, _ in batch:
+                if event is None:
+                    hashes.append('')
+                    continue
+                event_hash, record = self._prepare_event(event)
+                hashes.append(event_hash)
+                records.append(record)
+
+            try:
+                writer.write(records)
+            except Exception:
+                self._discard_chain_head()
+                raise
+
+            if self.process_safe:
+                self._store_sequence_state()
+            return hashes
+
+    def flush(self) -> None:
+        """Block until every queued event has been written"""
+        if not self.group_commit or self._writer is None:
+            return
+
+        marker: "Future[str]" = Future()
+        self._queue.put((None, marker))
+        marker.result()
+
+    def close(self) -> None:
+        """Flush queued events, stop the writer and maintenance threads and release lock files"""
+        if self._writer is not None:
+            self._queue.put(None)
+            self._writer.join()
+            self._writer = None
+
+        if self._maintenance is not None:
+            self._closing = True
+            self._maintenance_due.set()
+            self._maintenance.join()
+            self._maintenance = None
+            self._closing = False
+
+        for pid, fd in self._lock_fds.values():
+            if pid == os.getpid():
+                os.close(fd)
+        self._lock_fds.clear()
+
+    def _seal_segment(self, path: str) -> None:
+        """
+        Rename a full or finished active segment to the next numbered segment.
+
+        Called by the segment writer once it no longer writes to path.
+        """
+        if not os.path.exists(path):
+            return
+
+        # End the segment with a checkpoint over its last event, so a signature
+        # covers every event of a sealed segment
+        last = _last_record(path)
+        if (last is not None and last.get('record_type') != 'checkpoint' and last.get('integrity_hash')
+                and isinstance(last.get('sequence_number'), int)):
+            checkpoint = self._checkpoint_record(last['sequence_number'], last['integrity_hash'],
+                                                 datetime.now(timezone.utc).isoformat())
+            with open(path, 'ab') as f:
+                f.write(checkpoint.encode('utf-8'))
+                if self.fsync:
+                    f.flush()
+                    os.fsync(f.fileno())
+
+        base, ext = os.path.splitext(path)
+        sequence = 1 + max((segment.sequence for segment in self._segments()
+                            if segment.sequence is not None
+                            and os.path.splitext(_uncompressed_path(segment.path))[0][:-7] == base), default=0)
+        sealed = f"{base}.{sequence:06d}{ext}"
+
+        os.rename(path, sealed)
+        if os.path.exists(path + '.idx'):
+            os.rename(path + '.idx', sealed + '.idx')
+        self._rename_verification_state(path, sealed)
+        self._schedule_maintenance()
+
+    def _seal_stale_segments(self, current_key: str) -> None:
+        """
+        Seal the active segments of partitions older than current_key.
+
+        A writer seals its previous partition's segment when it moves on,
+        but one left active by a process that has exited would never be
+        sealed, compressed or expired. Call with the write locks held.
+        """
+        for segment in self._segments():
+            if segment.sequence is None and segment.partition_key < current_key:
+                self._seal_segment(segment.path)
+
+    def _schedule_maintenance(self) -> None:
+        """Wake the background thread that compresses and expires sealed segments"""
+        if not (self.compression or self.retention_days is not None or self.max_segments is not None):
+            return
+
+        with self._writer_lock:
+            if self._maintenance is None or not self._maintenance.is_alive():
+                self._maintenance = threading.Thread(target=self._maintenance_loop,
+                                                     name="security-audit-maintenance", daemon=True)
+                self._maintenance.start()
+        self._maintenance_due.set()
+
+    def _maintenance_loop(self) -> None:
+        while True:
+            self._maintenance_due.wait()
+            self._maintenance_due.clear()
+            try:
+                self.maintain()
+            except Exception as e:
+                logger.error(f"Audit log maintenance failed: {e}")
+            if self._closing and not self._maintenance_due.is_set():
+                return
+
+    def maintain(self) -> None:
+        """Seal segments of past partitions, compress sealed segments and apply the retention policy"""
+        with self._maintenance_lock, self._process_lock('maintenance.lock', blocking=False) as locked:
+            if not locked:
+                # Another process is already maintaining this log
+                return
+            if self.partition:
+                with self._lock, self._process_lock():
+                    self._seal_stale_segments(
+                        datetime.now(timezone.utc).strftime(PARTITION_FORMATS[self.partition]))
+            if self.compression:
+                for segment in self._segments():
+                    if segment.sequence is not None and not segment.compressed:
+                        self._compress_segment(segment.path)
+            self._apply_retention()
+
+    def _compress_segment(self, path: str) -> None:
+        """Replace a sealed segment by its compressed form"""
+        target = path + COMPRESSION_SUFFIXES[self.compression]
+        with open(path, 'rb') as source, _compressed_writer(target + '.tmp', self.compression) as output:
+            shutil.copyfileobj(source, output, 1024 * 1024)
+
+        # Keep the sealing time for the retention policy
+        stat = os.stat(path)
+        os.utime(target + '.tmp', (stat.st_atime, stat.st_mtime))
+        os.replace(target + '.tmp', target)
+        self._rename_verification_state(path, target)
+        os.remove(path)
+
+    def _apply_retention(self) -> None:
+        """Delete the oldest sealed segments beyond max_segments or retention_days"""
+        if self.retention_days is None and self.max_segments is None:
+            return
+
+        segments = self._segments()
+        sealed_count = sum(1 for segment in segments if segment.sequence is not None)
+        cutoff = time.time() - self.retention_days * 86400 if self.retention_days is not None else None
+
+        # Only a prefix of the sealed segments can go, so the remaining chain
+        # stays contiguous. Segments of past partitions were sealed first, so
+        # the active segments left are the ones still written to.
+        expired = []
+        for segment in segments:
+            if segment.sequence is None:
+                continue
+            over_count = self.max_segments is not None and sealed_count - len(expired) > self.max_segments
+            too_old = cutoff is not None and os.path.getmtime(segment.path) < cutoff
+            if not (over_count or too_old):
+                break
+            expired.append(segment)
+
+        if not expired:
+            return
+
+        head = _chain_head(expired[-1].path)
+        if head is not None:
+            self._save_anchor(expired[-1], *head)
+        for segment in expired:
+            os.remove(segment.path)
+            if os.path.exists(segment.index_path):
+                os.remove(segment.index_path)
+
+    def _anchor_path(self) -> str:
+        return f"{self.audit_log_path}.anchor"
+
+    def _save_anchor(self, segment: AuditSegment, chain_hash: str, sequence_number: int) -> None:
+        """Record where the chain stood at the end of the newest deleted segment"""
+        algorithm, signature = _checkpoint_signature(self.signing_key, sequence_number, chain_hash)
+        anchor = {
+            'segment': os.path.basename(_uncompressed_path(segment.path)),
+            'sequence_number': sequence_number,
+            'chain_hash': chain_hash,
+            'signature_algorithm': algorithm,
+            'signature': signature
+        }
+        with open(self._anchor_path() + '.tmp', 'w', encoding='utf-8') as f:
+            json.dump(anchor, f)
+        os.replace(self._anchor_path() + '.tmp', self._anchor_path())
+
+    def _load_anchor(self) -> Optional[Dict[str, Any]]:
+        try:
+            with open(self._anchor_path(), 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (FileNotFoundError, ValueError):
+            return None
+
+    def _rename_verification_state(self, old_path: str, new_path: str) -> None:
+        """Keep the incremental verification state pointing at a renamed segment"""
+        with self._state_lock:
+            state = self._load_verification_state()
+            if state is not None and state.get('segment') == os.path.basename(old_path):
+                state['segment'] = os.path.basename(new_path)
+                self._save_verification_state(state)
+
     def log_input_validation_failure(self, input_type: str, input_value: str,
                                    validation_error: str, user_context: Optional[Dict] = None) -> str:
         """
@@ -215,57 +845,151 @@ class SecurityAuditor:
     def get_audit_trail(self, start_time: Optional[datetime] = None,
                        end_time: Optional[datetime] = None,
                        event_type: Optional[str] = None,
-                       severity: Optional[str] = None) -> List[Dict[str, Any]]:
+                       severity: Optional[str] = None) -> Iterator[Dict[str, Any]]:
         """
         Retrieve audit trail with optional filtering.
 
+        Events are yielded lazily. Partitioned logs are queried through the
+        segment summaries and sidecar indexes, so only matching events are
+        read and parsed. Naive datetimes are taken as UTC.
+
         Args:
             start_time: Start time for filtering
             end_time: End time for filtering
             event_type: Event type filter
             severity: Severity level filter
 
-        Returns:
-            List of audit events matching criteria
+        Yields:
+            Audit events matching criteria
         """
-        events = []
+        start_epoch = _timestamp_epoch(start_time.isoformat()) if start_time else None
+        end_epoch = _timestamp_epoch(end_time.isoformat()) if end_time else None
+
+        def matches(epoch, entry_type, entry_severity):
+            if event_type and entry_type != event_type:
+                return False
+            if severity and entry_severity != severity:
+                return False
+            if start_epoch is not None and (epoch is None or epoch < start_epoch):
+                return False
+            if end_epoch is not None and (epoch is None or epoch > end_epoch):
+                return False
+            return True
 
         try:
-            with open(self.audit_log_path, 'r', encoding='utf-8') as f:
+            segments = self._segments()
+            if not segments:
+                logger.warning("Audit log file not found")
+                return
+
+            if self.partition is None:
+                for segment in segments:
+                    yield from self._scan_audit_trail(segment.path, matches)
+                return
+
+            for segment, summary in self._segment_summaries(segments):
+                if not _summary_may_match(summary, start_epoch, end_epoch, event_type, severity):
+                    continue
+
+                offsets = [offset for offset, epoch, entry_type, entry_severity
+                           in _read_segment_index(segment.index_path)
+                           if matches(epoch, entry_type, entry_severity)]
+                if not offsets:
+                    continue
+
+                with _open_segment(segment.path) as f:
+                    for offset in offsets:
+                        f.seek(offset)
+                        try:
+                            yield json.loads(f.readline())
+                        except json.JSONDecodeError as e:
+                            logger.error(f"Invalid audit log entry: {e}")
+
+        except Exception as e:
+            logger.error(f"Error reading audit log: {e}")
+
+    def _scan_audit_trail(self, path: str, matches) -> Iterator[Dict[str, Any]]:
+        """Filter an unindexed log line by line"""
+        try:
+            with io.TextIOWrapper(_open_segment(path), encoding='utf-8') as f:
                 for line in f:
                     if not line.strip():
                         continue
 
                     try:
                         event = json.loads(line)
-
-                        # Apply filters
-                        if start_time and datetime.fromisoformat(event['timestamp']) < start_time:
-                            continue
-                        if end_time and datetime.fromisoformat(event['timestamp']) > end_time:
-                            continue
-                        if event_type and event['event_type'] != event_type:
-                            continue
-                        if severity and event['severity'] != severity:
-                            continue
-
-                        events.append(event)
-
                     except json.JSONDecodeError as e:
                         logger.error(f"Invalid audit log entry: {e}")
                         continue
 
+                    if event.get('record_type') == 'checkpoint':
+                        continue
+                    if matches(_timestamp_epoch(event.get('timestamp')), event.get('event_type'),
+                               event.get('severity')):
+                        yield event
+
         except FileNotFoundError:
             logger.warning("Audit log file not found")
-        except Exception as e:
-            logger.error(f"Error reading audit log: {e}")
 
-        return events
+    def _segment_summaries(self, segments: List[AuditSegment]) -> Iterator[Tuple[AuditSegment, Dict[str, Any]]]:
+        """
+        Yield (segment, summary) pairs, rebuilding summaries whose index grew.
 
-    def verify_audit_integrity(self) -> Dict[str, Any]:
+        Summaries are cached in the manifest next to the audit log, so sealed
+        segments are only summarized once.
+        """
+        manifest_path = f"{self.audit_log_path}.manifest"
+        try:
+            with open(manifest_path, 'r', encoding='utf-8') as f:
+                manifest = json.load(f)
+        except (FileNotFoundError, ValueError):
+            manifest = {}
+
+        # Keyed by index name, which survives compression of the segment
+        names = {os.path.basename(segment.index_path) for segment in segments}
+        changed = not names.issuperset(manifest)
+        manifest = {name: summary for name, summary in manifest.items() if name in names}
+
+        for segment in segments:
+            name = os.path.basename(segment.index_path)
+            try:
+                index_size = os.path.getsize(segment.index_path)
+            except FileNotFoundError:
+                index_size = 0
+
+            summary = manifest.get(name)
+            if summary is None or summary.get('index_size') != index_size:
+                summary = _summarize_index(_read_segment_index(segment.index_path), index_size)
+                manifest[name] = summary
+                changed = True
+            yield segment, summary
+
+        if changed:
+            with open(manifest_path + '.tmp', 'w', encoding='utf-8') as f:
+                json.dump(manifest, f)
+            os.replace(manifest_path + '.tmp', manifest_path)
+
+    def verify_audit_integrity(self, incremental: bool = False,
+                               max_workers: Optional[int] = None) -> Dict[str, Any]:
         """
         Verify integrity of audit log.
 
+        Each event's own hash and its link to the previous event are checked,
+        so edited, deleted and reordered events are all reported. Checkpoint
+        records must match the chain and carry a valid signature.
+
+        With a signing key, checkpoints are also required: one after every
+        event whose sequence number is a multiple of checkpoint_interval and
+        one ending every sealed segment, with contiguous sequence numbers.
+        Missing and out-of-place checkpoints are violations. Events at the
+        end of the active segment after its last checkpoint are not covered
+        by a signature yet and are counted in uncheckpointed_events.
+
+        Args:
+            incremental: Resume after the last checkpoint verified by a
+                previous incremental run; counts cover only the new records
+            max_workers: Processes used to verify segments of large logs
+
         Returns:
             Integrity verification results
         """
@@ -273,48 +997,131 @@ class SecurityAuditor:
             'total_events': 0,
             'valid_events': 0,
             'invalid_events': 0,
-            'integrity_violations': []
+            'integrity_violations': [],
+            'checkpoints': 0,
+            'unverified_checkpoints': 0,
+            'uncheckpointed_events': 0,
+            'verified_from_offset': 0
         }
+        # Checkpoints (and hash-chained events) are only required when they
+        # cannot be recomputed
+        required_interval = self.checkpoint_interval if self.signing_key else None
 
         try:
-            with open(self.audit_log_path, 'r', encoding='utf-8') as f:
-                for line_num, line in enumerate(f, 1):
-                    if not line.strip():
-                        continue
-
-                    results['total_events'] += 1
-
-                    try:
-                        event = json.loads(line)
-
-                        # Verify integrity hash
-                        event_copy = event.copy()
-                        stored_hash = event_copy.pop('integrity_hash', None)
-
-                        if stored_hash:
-                            event_json = json.dumps(event_copy, sort_keys=True)
-                            calculated_hash = hashlib.sha256(event_json.encode()).hexdigest()
-
-                            if calculated_hash == stored_hash:
-                                results['valid_events'] += 1
-                            else:
-                                results['invalid_events'] += 1
-                                results['integrity_violations'].append({
-                                    'line': line_num,
-                                    'event_id': event.get('event_id', 'unknown'),
-                                    'stored_hash': stored_hash,
-                                    'calculated_hash': calculated_hash
-                                })
-                        else:
-                            # Legacy events without hash
-                            results['valid_events'] += 1
-
-                    except json.JSONDecodeError:
-                        results['invalid_events'] += 1
+            log_segments = self._segments()
+            segment_paths = [segment.path for segment in log_segments]
+            if not segment_paths:
+                raise FileNotFoundError(f"No audit log at {self.audit_log_path}")
+
+            start, previous_hash, previous_sequence, line_base = 0, GENESIS_HASH, 0, 0
+            state = self._load_verification_state() if incremental else None
+            if state is not None and self._verification_state_matches(state):
+                log_segments = log_segments[segment_paths.index(self._state_segment_path(state)):]
+                start = state['offset']
+                previous_hash = state['chain_hash']
+                previous_sequence = state['sequence_number']
+                line_base = state['line']
+            else:
+                if state is not None:
+                    results['integrity_violations'].append({
+                        'line': state.get('line'),
+                        'error': 'Verified checkpoint changed since last run'
+                    })
+
+                # Older segments were deleted by the retention policy
+                anchor = self._load_anchor()
+                if anchor is not None:
+                    algorithm, signature = _checkpoint_signature(self.signing_key, anchor.get('sequence_number'),
+                                                                 anchor.get('chain_hash'))
+                    if anchor.get('signature_algorithm') == 'hmac-sha256' and algorithm != 'hmac-sha256':
+                        results['unverified_checkpoints'] += 1
+                    elif anchor.get('signature_algorithm') != algorithm or not hmac.compare_digest(
+                            str(anchor.get('signature')), signature):
                         results['integrity_violations'].append({
-                            'line': line_num,
-                            'error': 'Invalid JSON'
+                            'line': 0,
+                            'error': 'Invalid retention anchor signature'
                         })
+                    previous_hash = anchor.get('chain_hash')
+                    previous_sequence = anchor.get('sequence_number')
+            results['verified_from_offset'] = start
+
+            # Split every segment at its checkpoints. A segment other than the
+            # first starts from an unknown chain head, checked when merging.
+            ranges = []
+            total_bytes = 0
+            for segment in log_segments:
+                path = segment.path
+                sealed = segment.sequence is not None
+                size = os.path.getsize(path)
+                total_bytes += size - start
+                if path != _uncompressed_path(path):
+                    ranges.append((path, start, None, previous_hash, previous_sequence, self.signing_key,
+                                   required_interval, sealed))
+                    start, previous_hash, previous_sequence = 0, None, None
+                    continue
+                for end, sequence, chain_hash in _find_checkpoints(path, start, size):
+                    ranges.append((path, start, end, previous_hash, previous_sequence, self.signing_key,
+                                   required_interval, sealed and end == size))
+                    start, previous_hash, previous_sequence = end, chain_hash, sequence
+                if start < size:
+                    ranges.append((path, start, size, previous_hash, previous_sequence, self.signing_key,
+                                   required_interval, sealed))
+                start, previous_hash, previous_sequence = 0, None, None
+
+            if len(ranges) > 1 and total_bytes >= PARALLEL_VERIFY_BYTES:
+                with ProcessPoolExecutor(max_workers=max_workers) as executor:
+                    segments = list(executor.map(_verify_log_range, *zip(*ranges), chunksize=16))
+            else:
+                segments = [_verify_log_range(*args) for args in ranges]
+
+            last_checkpoint = None
+            chain_head = None
+            last_sequence = None
+            for (path, range_start, _, range_previous_hash, *_), segment in zip(ranges, segments):
+                if range_start == 0 and path != ranges[0][0]:
+                    line_base = 0
+                segment_name = {'segment': os.path.basename(path)} if self.partition else {}
+
+                if (range_previous_hash is None and chain_head is not None
+                        and segment['first_previous_hash'] not in (None, chain_head)):
+                    # The previous segment does not end where this one continues
+                    results['invalid_events'] += 1
+                    segment['valid_events'] -= 1
+                    results['integrity_violations'].append(dict(
+                        segment_name,
+                        line=line_base + segment['first_chained_line'],
+                        error='Hash chain broken',
+                        expected_previous_hash=chain_head,
+                        previous_hash=segment['first_previous_hash']
+                    ))
+                if (required_interval is not None and range_previous_hash is None and last_sequence is not None
+                        and segment['first_sequence'] not in (None, last_sequence + 1)):
+                    results['integrity_violations'].append(dict(
+                        segment_name,
+                        line=line_base + segment['first_chained_line'],
+                        error='Sequence number gap',
+                        expected_sequence=last_sequence + 1,
+                        sequence_number=segment['first_sequence']
+                    ))
+                if segment['last_hash'] is not None:
+                    chain_head = segment['last_hash']
+                if segment['last_sequence'] is not None:
+                    last_sequence = segment['last_sequence']
+
+                for key in ('total_events', 'valid_events', 'invalid_events',
+                            'checkpoints', 'unverified_checkpoints', 'uncheckpointed_events'):
+                    results[key] += segment[key]
+                for violation in segment['integrity_violations']:
+                    violation['line'] += line_base
+                    results['integrity_violations'].append(dict(segment_name, **violation))
+                if segment['last_checkpoint'] is not None:
+                    last_checkpoint = dict(segment['last_checkpoint'], segment=os.path.basename(path),
+                                           line=line_base + segment['last_checkpoint']['line'])
+                line_base += segment['lines']
+
+            if incremental and last_checkpoint is not None and not results['integrity_violations']:
+                with self._state_lock:
+                    self._save_verification_state(last_checkpoint)
 
         except Exception as e:
             logger.error(f"Error verifying audit integrity: {e}")
@@ -322,8 +1129,527 @@ class SecurityAuditor:
 
         return results
 
+    def _verification_state_path(self) -> str:
+        return f"{self.audit_log_path}.verified"
+
+    def _load_verification_state(self) -> Optional[Dict[str, Any]]:
+        """Load the last verified checkpoint, if any"""
+        try:
+            with open(self._verification_state_path(), 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (FileNotFoundError, ValueError):
+            return None
+
+    def _save_verification_state(self, checkpoint: Dict[str, Any]) -> None:
+        """Atomically record the last verified checkpoint"""
+        path = self._verification_state_path()
+        with open(path + '.tmp', 'w', encoding='utf-8') as f:
+            json.dump(checkpoint, f)
+        os.replace(path + '.tmp', path)
+
+    def _state_segment_path(self, state: Dict[str, Any]) -> str:
+        """Segment holding the checkpoint a verification state refers to"""
+        path = os.path.join(os.path.dirname(self.audit_log_path), state['segment'])
+        if not os.path.exists(path):
+            # The segment may have been compressed since the state was saved
+            for suffix in COMPRESSION_SUFFIXES.values():
+                if os.path.exists(_uncompressed_path(path) + suffix):
+                    return _uncompressed_path(path) + suffix
+        return path
+
+    def _verification_state_matches(self, state: Dict[str, Any]) -> bool:
+        """Check the checkpoint a previous run ended on is still in place"""
+        try:
+            with _open_segment(self._state_segment_path(state)) as f:
+                f.seek(state['checkpoint_offset'])
+                record = json.loads(f.read(state['offset'] - state['checkpoint_offset']))
+        except (OSError, ValueError, KeyError):
+            return False
+
+        return (record.get('record_type') == 'checkpoint'
+                and record.get('sequence_number') == state['sequence_number']
+                and record.get('chain_hash') == state['chain_hash']
+                and record.get('signature') == state['signature'])
+
+
+class _SegmentWriter:
+    """
+    Appends audit records to their segments.
+
+    Seals a segment through the auditor when it reaches max_segment_bytes or
+    when writing moves on to the next partition.
+    """
+
+    def __init__(self, auditor: "SecurityAuditor", keep_open: bool = True):
+        self.auditor = auditor
+        self.keep_open = keep_open
+        self._path: Optional[str] = None
+        self._last_path: Optional[str] = None
+        self._log = None
+        self._index = None
+
+    def write(self, records: List[AuditRecord]) -> None:
+        """Append records, one write (and optional fsync) per segment touched"""
+        try:
+            start = 0
+            while start < len(records):
+                path = records[start][1]
+                end = start
+                while end < len(records) and records[end][1] == path:
+                    end += 1
+                self._write_segment(path, records[start:end])
+                start = end
+        except Exception:
+            self.close()
+            raise
+
+    def _write_segment(self, path: str, records: List[AuditRecord]) -> None:
+        if self._last_path is None and self.auditor.partition:
+            # Partitions an earlier process left active, e.g. before a restart
+            self.auditor._seal_stale_segments(_partition_key(path))
+        elif self._last_path is not None and path != self._last_path:
+            self.close()
+            self.auditor._seal_segment(self._last_path)
+        self._last_path = path
+
+        # Unbuffered, so a failed write can be cut off without a buffered
+        # remainder being appended on close
+        if self._log is None:
+            self._log = open(path, 'ab', buffering=0)
+            self._path = path
+
+        data = [line.encode('utf-8') for line, _, _ in records]
+        log_size = self._log.tell()
+        index_size = None
+        if records[0][2] is not None:
+            if self._index is None:
+                self._index = open(path + '.idx', 'ab', buffering=0)
+            index_size = self._index.tell()
+            offset = log_size
+            entries = []
+            for encoded, (_, _, index_entry) in zip(data, records):
+                entries.append(f"{offset}\t{index_entry}\n")
+                offset += len(encoded)
+
+        try:
+            _write_all(self._log, b''.join(data))
+            if index_size is not None:
+                _write_all(self._index, ''.join(entries).encode('utf-8'))
+
+            if self.auditor.fsync:
+                os.fsync(self._log.fileno())
+                if self._index is not None:
+                    os.fsync(self._index.fileno())
+        except Exception:
+            # Leave no partial record for the next write to append to
+            self._truncate(log_size, index_size)
+            raise
+
+        max_bytes = self.auditor.max_segment_bytes
+        if max_bytes and self._log.tell() >= max_bytes:
+            self.close()
+            self.auditor._seal_segment(path)
+        elif not self.keep_open:
+            self.close()
+
+    def _truncate(self, log_size: int, index_size: Optional[int]) -> None:
+        """Cut the open segment and index back to their sizes before a failed write"""
+        for handle, size in ((self._log, log_size), (self._index, index_size)):
+            if handle is not None and size is not None:
+                try:
+                    os.ftruncate(handle.fileno(), size)
+                except OSError as e:
+                    logger.error(f"Failed to truncate audit log after failed write: {e}")
+
+    def close(self) -> None:
+        for handle in (self._log, self._index):
+            if handle is not None:
+                handle.close()
+        self._path = self._log = self._index = None
+
+
+def _partition_key(path: str) -> str:
+    """Partition key of an active partitioned segment path, e.g. 2026-10-18T13"""
+    return os.path.splitext(os.path.basename(path))[0].rsplit('.', 1)[-1]
+
+
+def _write_all(handle, data: bytes) -> None:
+    """Write all of data to an unbuffered file, which may accept it in parts"""
+    view = memoryview(data)
+    while view:
+        view = view[handle.write(view):]
+
+
+def _uncompressed_path(path: str) -> str:
+    for suffix in COMPRESSION_SUFFIXES.values():
+        if path.endswith(suffix):
+            return path[:-len(suffix)]
+    return path
+
+
+def _open_segment(path: str):
+    """Open a segment for binary reading, decompressing transparently"""
+    if path.endswith(COMPRESSION_SUFFIXES['gzip']):
+        return gzip.open(path, 'rb')
+    if path.endswith(COMPRESSION_SUFFIXES['zstd']):
+        if zstandard is None:
+            raise RuntimeError(f"Reading {path} requires the zstandard package")
+        return io.BufferedReader(zstandard.ZstdDecompressor().stream_reader(open(path, 'rb'), closefd=True))
+    return open(path, 'rb')
+
+
+def _compressed_writer(path: str, compression: str):
+    if compression == 'gzip':
+        return gzip.open(path, 'wb')
+    return zstandard.ZstdCompressor().stream_writer(open(path, 'wb'), closefd=True)
+
+
+def _last_record(path: str, tail_bytes: int = 65536) -> Optional[Dict[str, Any]]:
+    """Last JSON record in a segment"""
+    try:
+        with _open_segment(path) as f:
+            if path == _uncompressed_path(path):
+                f.seek(0, os.SEEK_END)
+                f.seek(max(0, f.tell() - tail_bytes))
+                tail = f.read()
+            else:
+                tail = b''
+                for chunk in iter(lambda: f.read(1024 * 1024), b''):
+                    tail = (tail + chunk)[-tail_bytes:]
+    except FileNotFoundError:
+        return None
+
+    for raw in reversed(tail.splitlines()):
+        try:
+            record = json.loads(raw)
+        except ValueError:
+            continue
+        if isinstance(record, dict):
+            return record
+
+    return None
+
+
+def _chain_head(path: str) -> Optional[Tuple[str, Optional[int]]]:
+    """Chain hash and sequence number of the last record in a segment"""
+    record = _last_record(path)
+    last_hash = record and (record.get('chain_hash') or record.get('integrity_hash'))
+    if not last_hash:
+        return None
+    sequence_number = record.get('sequence_number')
+    return last_hash, sequence_number if isinstance(sequence_number, int) else None
+
+
+def _timestamp_epoch(timestamp: Any) -> Optional[float]:
+    """Epoch seconds of an ISO timestamp; naive timestamps are taken as UTC"""
+    try:
+        parsed = datetime.fromisoformat(timestamp)
+    except (TypeError, ValueError):
+        return None
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed.timestamp()
+
+
+def _index_field(value: Any) -> str:
+    return str(value).replace('\t', ' ').replace('\n', ' ')
+
+
+def _read_segment_index(index_path: str) -> List[Tuple[int, Optional[float], str, str]]:
+    """Parse a segment's sidecar index into (offset, epoch, event_type, severity)"""
+    entries = []
+    try:
+        with open(index_path, 'r', encoding='utf-8') as f:
+            for line in f:
+                fields = line.rstrip('\n').split('\t')
+                if len(fields) != 4:
+                    continue
+                entries.append((int(fields[0]), float(fields[1]) if fields[1] else None,
+                                fields[2], fields[3]))
+    except FileNotFoundError:
+        pass
+    return entries
+
+
+def _summarize_index(entries: List[Tuple[int, Optional[float], str, str]], index_size: int) -> Dict[str, Any]:
+    """Per-segment summary used to skip segments that cannot match a query"""
+    epochs = [epoch for _, epoch, _, _ in entries if epoch is not None]
+    return {
+        'index_size': index_size,
+        'min_epoch': min(epochs) if epochs else None,
+        'max_epoch': max(epochs) if epochs else None,
+        'event_types': sorted({event_type for _, _, event_type, _ in entries}),
+        'severities': sorted({severity for _, _, _, severity in entries})
+    }
+
+
+def _summary_may_match(summary: Dict[str, Any], start_epoch: Optional[float], end_epoch: Optional[float],
+                       event_type: Optional[str], severity: Optional[str]) -> bool:
+    """Whether a segment can hold any event matching the query"""
+    if event_type and event_type not in summary['event_types']:
+        return False
+    if severity and severity not in summary['severities']:
+        return False
+    if summary['min_epoch'] is None:
+        return start_epoch is None and end_epoch is None
+    if start_epoch is not None and summary['max_epoch'] < start_epoch:
+        return False
+    if end_epoch is not None and summary['min_epoch'] > end_epoch:
+        return False
+    return True
+
+
+def _checkpoint_signature(signing_key: Optional[bytes], sequence_number: int,
+                          chain_hash: str) -> Tuple[str, str]:
+    """Sign a checkpoint; without a key only an unkeyed digest is possible"""
+    payload = f"{sequence_number}:{chain_hash}".encode()
+    if signing_key:
+        return 'hmac-sha256', hmac.new(signing_key, payload, hashlib.sha256).hexdigest()
+    return 'sha256', hashlib.sha256(payload).hexdigest()
+
+
+def _find_checkpoints(path: str, start: int, end: int) -> List[Tuple[int, int, str]]:
+    """
+    Locate checkpoint records after start without parsing events.
+
+    Returns:
+        List of (offset just past the checkpoint line, sequence number, chain hash)
+    """
+    checkpoints = []
+    if end <= start:
+        return checkpoints
+
+    with open(path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        position = mm.find(CHECKPOINT_PREFIX, start, end)
+        while position != -1:
+            line_end = mm.find(b'\n', position, end)
+            line_end = end if line_end == -1 else line_end + 1
+            if position == start or mm[position - 1] == 0x0A:
+                try:
+                    record = json.loads(mm[position:line_end])
+                    checkpoints.append((line_end, record['sequence_number'], record['chain_hash']))
+                except (ValueError, KeyError):
+                    pass
+            position = mm.find(CHECKPOINT_PREFIX, line_end, end)
+
+    return checkpoints
+
+
+def _verify_log_range(path: str, start: int, end: Optional[int], previous_hash: Optional[str],
+                      previous_sequence: Optional[int], signing_key: Optional[bytes],
+                      required_interval: Optional[int] = None, ends_sealed_segment: bool = False) -> Dict[str, Any]:
+    """
+    Verify one byte range of an audit log segment.
+
+    Module-level so it can run in a process pool. Line numbers in the result
+    are relative to the range. With previous_hash None the range continues
+    from whatever its first event links to, and the caller checks that link.
+    Compressed segments are verified as one range with end None.
+
+    With required_interval set (0 for none), every event must be hashed and
+    chained, a checkpoint must follow every event whose sequence number is a
+    multiple of it and end the range if it ends a sealed segment; no other
+    checkpoints may appear.
+    """
+    results = {
+        'total_events': 0,
+        'valid_events': 0,
+        'invalid_events': 0,
+        'integrity_violations': [],
+        'checkpoints': 0,
+        'unverified_checkpoints': 0,
+        'last_checkpoint': None,
+        'lines': 0,
+        'first_previous_hash': None,
+        'first_chained_line': None,
+        'first_sequence': None,
+        'last_hash': None,
+        'last_sequence': None,
+        'uncheckpointed_events': 0
+    }
+
+    with _open_segment(path) as f:
+        f.seek(start)
+        lines = (f.read() if end is None else f.read(end - start)).splitlines(keepends=True)
+    results['lines'] = len(lines)
+    last_line = max((line_num for line_num, line in enumerate(lines, 1) if line.strip()), default=0)
+
+    def missing_checkpoint(uncovered):
+        line_num, event_id, sequence_number = uncovered
+        results['integrity_violations'].append({
+            'line': line_num,
+            'event_id': event_id,
+            'checkpoint': sequence_number,
+            'error': 'Missing checkpoint'
+        })
+
+    # (line, event id, sequence number) of the last event no checkpoint covers
+    # yet, and how many events that checkpoint will cover
+    uncovered = None
+    uncovered_events = 0
+    running_hash, sequence, offset = previous_hash, previous_sequence, start
+    for line_num, line in enumerate(lines, 1):
+        line_offset = offset
+        offset += len(line)
+        if not line.strip():
+            continue
+
+        try:
+            event = json.loads(line)
+        except json.JSONDecodeError:
+            results['total_events'] += 1
+            results['invalid_events'] += 1
+            results['integrity_violations'].append({
+                'line': line_num,
+                'error': 'Invalid JSON'
+            })
+            continue
+
+        if event.get('record_type') == 'checkpoint':
+            results['checkpoints'] += 1
+            algorithm, signature = _checkpoint_signature(signing_key, event.get('sequence_number'),
+                                                         event.get('chain_hash'))
+            if event.get('chain_hash') != running_hash or event.get('sequence_number') != sequence:
+                error = 'Checkpoint does not match hash chain'
+            elif event.get('signature_algorithm') == 'hmac-sha256' and algorithm != 'hmac-sha256':
+                # Signed with a key this verifier does not have
+                results['unverified_checkpoints'] += 1
+                error = None
+            elif event.get('signature_algorithm') != algorithm or not hmac.compare_digest(
+                    str(event.get('signature')), signature):
+                error = 'Invalid checkpoint signature'
+            else:
+                error = None
+
+            if not error and required_interval is not None:
+                tail = ends_sealed_segment and line_num == last_line
+                periodic = bool(required_interval) and isinstance(sequence, int) and sequence % required_interval == 0
+                if uncovered is None or not (periodic or tail):
+                    # Not directly after the event it covers, or after an
+                    # event that does not get a checkpoint
+                    error = 'Checkpoint out of place'
+            uncovered = None
+            uncovered_events = 0
+
+            if error:
+                results['integrity_violations'].append({
+                    'line': line_num,
+                    'checkpoint': event.get('sequence_number'),
+                    'error': error
+                })
+            else:
+                results['last_checkpoint'] = {
+                    'checkpoint_offset': line_offset,
+                    'offset': offset,
+                    'line': line_num,
+                    'sequence_number': sequence,
+                    'chain_hash': running_hash,
+                    'signature': event.get('signature')
+                }
+            continue
+
+        results['total_events'] += 1
+
+        # Verify integrity hash
+        stored_hash = event.pop('integrity_hash', None)
+        if required_interval is not None and (not stored_hash or 'previous_hash' not in event
+                                              or not isinstance(event.get('sequence_number'), int)):
+            # With a key, unhashed or unchained events would let an edited
+            # log pass without the chain and checkpoints it must carry
+            results['invalid_events'] += 1
+            results['integrity_violations'].append({
+                'line': line_num,
+                'event_id': event.get('event_id', 'unknown'),
+                'error': 'Event not hash-chained'
+            })
+            continue
+        if not stored_hash:
+            # Legacy events without hash
+            results['valid_events'] += 1
+            continue
+
+        event_json = json.dumps(event, sort_keys=True)
+        calculated_hash = hashlib.sha256(event_json.encode()).hexdigest()
+
+        intact = False
+        if calculated_hash != stored_hash:
+            results['invalid_events'] += 1
+            results['integrity_violations'].append({
+                'line': line_num,
+                'event_id': event.get('event_id', 'unknown'),
+                'stored_hash': stored_hash,
+                'calculated_hash': calculated_hash
+            })
+        elif 'previous_hash' in event and running_hash is None:
+            results['first_previous_hash'] = event['previous_hash']
+            results['first_chained_line'] = line_num
+            results['first_sequence'] = event.get('sequence_number')
+            results['valid_events'] += 1
+            intact = True
+        elif 'previous_hash' in event and event['previous_hash'] != running_hash:
+            # An event before this one was removed, inserted or reordered
+            results['invalid_events'] += 1
+            results['integrity_violations'].append({
+                'line': line_num,
+                'event_id': event.get('event_id', 'unknown'),
+                'error': 'Hash chain broken',
+                'expected_previous_hash': running_hash,
+                'previous_hash': event['previous_hash']
+            })
+        else:
+            results['valid_events'] += 1
+            intact = True
+
+        event_sequence = event.get('sequence_number')
+        if required_interval is not None and isinstance(event_sequence, int):
+            # Only for intact links: a removed event is already a broken chain
+            if intact and isinstance(sequence, int) and event_sequence != sequence + 1:
+                results['integrity_violations'].append({
+                    'line': line_num,
+                    'event_id': event.get('event_id', 'unknown'),
+                    'error': 'Sequence number gap',
+                    'expected_sequence': sequence + 1,
+                    'sequence_number': event_sequence
+                })
+            if uncovered is not None and required_interval and uncovered[2] % required_interval == 0:
+                missing_checkpoint(uncovered)
+            uncovered = (line_num, event.get('event_id', 'unknown'), event_sequence)
+            uncovered_events += 1
+
+        # Legacy hash-only events still anchor the chain for the next event
+        running_hash = results['last_hash'] = stored_hash
+        if isinstance(event_sequence, int):
+            sequence = results['last_sequence'] = event_sequence
+
+    if uncovered is not None:
+        if ends_sealed_segment or (required_interval and uncovered[2] % required_interval == 0):
+            missing_checkpoint(uncovered)
+        else:
+            # The end of the active segment, covered by the next checkpoint
+            results['uncheckpointed_events'] = uncovered_events
+
+    return results
+
+def _default_retention_days() -> Optional[float]:
+    """Retention of the global auditor: HEE_AUDIT_RETENTION_DAYS or DEFAULT_RETENTION_DAYS"""
+    value = os.environ.get(AUDIT_RETENTION_DAYS_ENV, '').strip()
+    if not value:
+        return DEFAULT_RETENTION_DAYS
+    if value.lower() == 'none':
+        return None
+    try:
+        days = float(value)
+        if days > 0:
+            return days
+    except ValueError:
+        pass
+    logger.warning(f"Ignoring invalid {AUDIT_RETENTION_DAYS_ENV}={value!r}, "
+                   f"keeping {DEFAULT_RETENTION_DAYS} days")
+    return DEFAULT_RETENTION_DAYS
+
 # Global security auditor instance
-security_auditor = SecurityAuditor()
+security_auditor = SecurityAuditor(max_segment_bytes=DEFAULT_MAX_SEGMENT_BYTES, compression='gzip',
+                                   retention_days=_default_retention_days())
 
 def get_security_auditor() -> SecurityAuditor:
     """Get the global security auditor instance"""
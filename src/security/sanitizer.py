@@ -13,11 +13,139 @@ Security Requirements:
 
 import re
 import html
-from typing import Optional, Dict, Any
+import functools
+import threading
+from typing import Optional, Dict, Any, Tuple, Callable
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Limits for sanitize_event_data traversal
+MAX_EVENT_DEPTH = 64
+MAX_EVENT_NODES = 100000
+
+# Memoization limits for short-string sanitizers
+SANITIZER_CACHE_SIZE = 4096  # Entries per sanitizer
+MAX_CACHEABLE_LENGTH = 256  # Longer inputs bypass the cache
+
+# Sanitizer name -> MemoizedSanitizer, for cache metrics
+_MEMOIZED_SANITIZERS: Dict[str, 'MemoizedSanitizer'] = {}
+
+class MemoizedSanitizer:
+    """
+    Bounded LRU cache in front of a short-string sanitizer.
+
+    Titles, tags, operator and workspace names repeat heavily in the event
+    stream, so results are cached per input string. Inputs longer than
+    max_length (or non-strings) bypass the cache. Sanitization log lines are
+    emitted when a value is first sanitized, not on cache hits.
+    """
+
+    def __init__(self, func: Callable[[str], str], maxsize: int = SANITIZER_CACHE_SIZE,
+                 max_length: int = MAX_CACHEABLE_LENGTH):
+        functools.update_wrapper(self, func)
+        self._func = func
+        self._cached = functools.lru_cache(maxsize=maxsize)(func)
+        self.max_length = max_length
+        self._bypassed = 0
+        self._bypass_lock = threading.Lock()
+
+    def __call__(self, value: str) -> str:
+        if not isinstance(value, str) or len(value) > self.max_length:
+            with self._bypass_lock:
+                self._bypassed += 1
+            return self._func(value)
+        return self._cached(value)
+
+    def stats(self) -> Dict[str, Any]:
+        """Return hit/miss counts and hit rate for this cache"""
+        info = self._cached.cache_info()
+        lookups = info.hits + info.misses
+        return {
+            'hits': info.hits,
+            'misses': info.misses,
+            'bypassed': self._bypassed,
+            'hit_rate': round(info.hits / lookups, 4) if lookups else 0.0,
+            'size': info.currsize,
+            'maxsize': info.maxsize
+        }
+
+    def cache_clear(self) -> None:
+        """Drop cached results and reset counters"""
+        self._cached.cache_clear()
+        with self._bypass_lock:
+            self._bypassed = 0
+
+def memoized_sanitizer(func: Callable[[str], str]) -> MemoizedSanitizer:
+    """Decorator registering a short-string sanitizer behind an LRU cache"""
+    memoized = MemoizedSanitizer(func)
+    _MEMOIZED_SANITIZERS[func.__name__] = memoized
+    return memoized
+
+class CompiledSanitizerEngine:
+    """
+    Compiled form of an ordered list of (pattern, replacement) rewrite rules.
+
+    Rules are compiled once. Before rewriting, content is probed to find the
+    first rule that matches; clean content - the common case - is returned
+    as-is, and rules that cannot match are skipped. Rewriting then applies
+    the remaining rules in order, so the output is identical to calling
+    re.sub once per rule.
+
+    For case-insensitive rules, ASCII content is lowercased once and probed
+    with case-sensitive copies of the rules, which lets the regex engine use
+    its fast literal-prefix search instead of matching case-folded
+    characters at every position.
+    """
+
+    def __init__(self, rules, flags=0, post_rules=()):
+        """
+        Args:
+            rules: Ordered (pattern, replacement) pairs applied with flags
+            flags: Regex flags for rules
+            post_rules: Ordered (pattern, replacement) pairs applied afterwards
+                without flags
+        """
+        self.rules = [(re.compile(pattern, flags), replacement) for pattern, replacement in rules]
+        self.rules += [(re.compile(pattern), replacement) for pattern, replacement in post_rules]
+
+        # Probes for lowercased ASCII content. A case-sensitive probe is only
+        # equivalent when the pattern has no uppercase letters (that also
+        # excludes escapes such as \S or \W).
+        self.ascii_probes = []
+        for (pattern, _), (compiled, _) in zip(list(rules) + list(post_rules), self.rules):
+            if compiled.flags & re.IGNORECASE and not re.search(r'[A-Z]', pattern):
+                self.ascii_probes.append((re.compile(pattern, compiled.flags & ~re.IGNORECASE), True))
+            else:
+                self.ascii_probes.append((compiled, False))
+
+    def first_matching_rule(self, content: str) -> Optional[int]:
+        """Return the index of the first rule that matches content, or None"""
+        if content.isascii():
+            lowered = content.lower()
+            for index, (probe, on_lowered) in enumerate(self.ascii_probes):
+                if probe.search(lowered if on_lowered else content):
+                    return index
+            return None
+
+        for index, (pattern, _) in enumerate(self.rules):
+            if pattern.search(content):
+                return index
+        return None
+
+    def sanitize(self, content: str) -> str:
+        """Apply all rules to content, skipping rules that cannot match"""
+        first = self.first_matching_rule(content)
+        if first is None:
+            return content
+
+        # Rules before the first match leave the content unchanged
+        sanitized = content
+        for pattern, replacement in self.rules[first:]:
+            sanitized = pattern.sub(replacement, sanitized)
+
+        return sanitized
+
 class ContentSanitizer:
     """
     Content sanitization for HEE/HEER systems.
@@ -51,6 +179,12 @@ class ContentSanitizer:
         (r'>\s*/dev/', '> [DEVICE REMOVED]'),
     ]
 
+    # Rewrites applied after DANGEROUS_PATTERNS (without regex flags)
+    MARKDOWN_POST_PATTERNS = [
+        # Neutralize autolinks that could be dangerous
+        (r'<([^>]+://[^>]+)>', r'[\1](\1)'),
+    ]
+
     @staticmethod
     def sanitize_markdown_content(content: str) -> str:
         """
@@ -67,17 +201,7 @@ class ContentSanitizer:
         if not content:
             return ""
 
-        sanitized = content
-
-        # Apply dangerous pattern neutralization
-        for pattern, replacement in ContentSanitizer.DANGEROUS_PATTERNS:
-            sanitized = re.sub(pattern, replacement, sanitized, flags=re.IGNORECASE | re.DOTALL)
-
-        # HTML entity encoding for remaining angle brackets
-        sanitized = re.sub(r'<([^>]+)>', r'<\1>', sanitized)
-
-        # Neutralize autolinks that could be dangerous
-        sanitized = re.sub(r'<([^>]+://[^>]+)>', r'[\1](\1)', sanitized)
+        sanitized = MARKDOWN_SANITIZER_ENGINE.sanitize(content)
 
         # Log sanitization if content was modified
         if sanitized != content:
@@ -115,6 +239,7 @@ class ContentSanitizer:
         return sanitized.strip()
 
     @staticmethod
+    @memoized_sanitizer
     def sanitize_task_title(title: str) -> str:
         """
         Sanitize task title with semantic preservation.
@@ -166,6 +291,7 @@ class ContentSanitizer:
         return sanitized
 
     @staticmethod
+    @memoized_sanitizer
     def sanitize_operator_name(name: str) -> str:
         """
         Sanitize operator/human name.
@@ -194,6 +320,7 @@ class ContentSanitizer:
         return sanitized
 
     @staticmethod
+    @memoized_sanitizer
     def sanitize_workspace_name(workspace: str) -> str:
         """
         Sanitize workspace name.
@@ -221,6 +348,7 @@ class ContentSanitizer:
         return sanitized
 
     @staticmethod
+    @memoized_sanitizer
     def sanitize_tag_content(tag: str) -> str:
         """
         Sanitize individual tag content.
@@ -252,50 +380,120 @@ class ContentSanitizer:
 
         return sanitized
 
+    @staticmethod
+    def cache_stats() -> Dict[str, Dict[str, Any]]:
+        """
+        Get cache metrics for the memoized short-string sanitizers.
+
+        Returns:
+            Mapping of sanitizer name to hits, misses, bypassed, hit_rate,
+            size and maxsize, plus a 'total' entry across all sanitizers
+        """
+        stats = {name: memoized.stats() for name, memoized in _MEMOIZED_SANITIZERS.items()}
+
+        hits = sum(entry['hits'] for entry in stats.values())
+        misses = sum(entry['misses'] for entry in stats.values())
+        stats['total'] = {
+            'hits': hits,
+            'misses': misses,
+            'bypassed': sum(entry['bypassed'] for entry in stats.values()),
+            'hit_rate': round(hits / (hits + misses), 4) if hits + misses else 0.0
+        }
+
+        return stats
+
+    @staticmethod
+    def clear_caches() -> None:
+        """Clear all memoized sanitizer caches"""
+        for memoized in _MEMOIZED_SANITIZERS.values():
+            memoized.cache_clear()
+
     @staticmethod
     def sanitize_event_data(event_data: Dict[str, Any]) -> Dict[str, Any]:
         """
         Sanitize event data for journaling.
 
+        Nested dictionaries and lists are walked iteratively and copied only
+        when something inside them changes, so unmodified event data is
+        returned as the original object.
+
         Args:
             event_data: Event data dictionary to sanitize
 
         Returns:
             Sanitized event data
+
+        Raises:
+            ValueError: If nesting exceeds MAX_EVENT_DEPTH or the event holds
+                more than MAX_EVENT_NODES values
         """
-        sanitized_data = {}
-
-        for key, value in event_data.items():
-            if isinstance(value, str):
-                # Sanitize string values
-                if key in ['title', 'description']:
-                    sanitized_data[key] = ContentSanitizer.sanitize_markdown_content(value)
-                else:
-                    sanitized_data[key] = ContentSanitizer.sanitize_plain_text(value)
-            elif isinstance(value, dict):
-                # Recursively sanitize nested dictionaries
-                sanitized_data[key] = ContentSanitizer.sanitize_event_data(value)
-            elif isinstance(value, list):
-                # Sanitize list contents
-                sanitized_list = []
-                for item in value:
-                    if isinstance(item, str):
-                        sanitized_list.append(ContentSanitizer.sanitize_plain_text(item))
-                    elif isinstance(item, dict):
-                        sanitized_list.append(ContentSanitizer.sanitize_event_data(item))
-                    else:
-                        sanitized_list.append(item)
-                sanitized_data[key] = sanitized_list
-            else:
-                # Keep non-string values as-is
-                sanitized_data[key] = value
+        sanitized_data, modified = ContentSanitizer._sanitize_event_tree(event_data)
 
         # Log if data was modified
-        if sanitized_data != event_data:
+        if modified:
             logger.info("Event data sanitized")
 
         return sanitized_data
 
+    @staticmethod
+    def _sanitize_event_tree(event_data: Dict[str, Any]) -> Tuple[Dict[str, Any], bool]:
+        """
+        Copy-on-write traversal behind sanitize_event_data.
+
+        String values under 'title'/'description' get markdown sanitization,
+        other strings plain text sanitization. Strings inside lists are always
+        plain text; nested lists are kept as-is.
+
+        Returns:
+            Tuple of (sanitized data, whether anything was modified)
+        """
+        # Frame: [source, items iterator, copy or None, is_dict, depth, parent frame, key in parent]
+        root = [event_data, iter(event_data.items()), None, True, 1, None, None]
+        stack = [root]
+        node_count = 0
+
+        while stack:
+            frame = stack[-1]
+            source, items, copy, is_dict, depth = frame[:5]
+
+            for key, value in items:
+                node_count += 1
+                if node_count > MAX_EVENT_NODES:
+                    raise ValueError(f"Event data exceeds {MAX_EVENT_NODES} values")
+
+                if isinstance(value, str):
+                    if is_dict and key in ('title', 'description'):
+                        sanitized = ContentSanitizer.sanitize_markdown_content(value)
+                    else:
+                        sanitized = ContentSanitizer.sanitize_plain_text(value)
+                    if sanitized != value:
+                        if copy is None:
+                            copy = frame[2] = dict(source) if is_dict else list(source)
+                        copy[key] = sanitized
+                elif isinstance(value, dict) or (is_dict and isinstance(value, list)):
+                    if depth >= MAX_EVENT_DEPTH:
+                        raise ValueError(f"Event data nested deeper than {MAX_EVENT_DEPTH} levels")
+                    child_is_dict = isinstance(value, dict)
+                    child_items = iter(value.items()) if child_is_dict else enumerate(value)
+                    stack.append([value, child_items, None, child_is_dict, depth + 1, frame, key])
+                    break
+            else:
+                # Container finished: hand a modified copy up to the parent
+                stack.pop()
+                parent = frame[5]
+                if copy is not None and parent is not None:
+                    if parent[2] is None:
+                        parent[2] = dict(parent[0]) if parent[3] else list(parent[0])
+                    parent[2][frame[6]] = copy
+
+        return (root[2], True) if root[2] is not None else (event_data, False)
+
+MARKDOWN_SANITIZER_ENGINE = CompiledSanitizerEngine(
+    ContentSanitizer.DANGEROUS_PATTERNS,
+    flags=re.IGNORECASE | re.DOTALL,
+    post_rules=ContentSanitizer.MARKDOWN_POST_PATTERNS
+)
+
 def demonstrate_sanitization():
     """
     Demonstrate sanitization capabilities.
@@ -0,0 +1,635 @@
+#!/usr/bin/env python3
+"""
+Tests for the Security Audit Log Writer
+Checks that synchronous and group commit logging produce a complete, ordered
+and verifiable audit log, and that the hash chain catches tampering.
+
+Run directly to print events/sec for both modes across thread counts, and
+full vs incremental verification times:
+    python src/security/test_audit.py --bench
+"""
+
+import errno
+import hashlib
+import json
+import logging
+import multiprocessing
+import os
+import sys
+import tempfile
+import threading
+import time
+import types
+import unittest
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from unittest.mock import patch
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from src.security import audit
+from src.security.audit import SecurityAuditor, SecurityEvent
+
+logging.disable(logging.CRITICAL)
+
+
+def make_event(index=0, timestamp=None, event_type="input_validation_failure", severity="medium"):
+    return SecurityEvent(
+        event_id=f"evt-{index}",
+        timestamp=timestamp or datetime.now(timezone.utc).isoformat(),
+        event_type=event_type,
+        severity=severity,
+        source="test_audit",
+        event_data={"input_type": "task_title", "index": index, "note": "café"},
+        risk_assessment="Invalid input blocked"
+    )
+
+
+def rechain(lines, edit=None):
+    """Drop checkpoints, apply edit to the events and recompute the plain SHA-256 chain, as a forger would"""
+    previous_hash = audit.GENESIS_HASH
+    rechained = []
+    for line in lines:
+        event = json.loads(line)
+        if event.get('record_type') == 'checkpoint':
+            continue
+        del event['integrity_hash']
+        if edit:
+            edit(event)
+        event['previous_hash'] = previous_hash
+        event_json = json.dumps(event, sort_keys=True)
+        previous_hash = hashlib.sha256(event_json.encode()).hexdigest()
+        rechained.append(f'{event_json[:-1]}, "integrity_hash": "{previous_hash}"}}\n')
+    return rechained
+
+
+def log_concurrently(auditor, threads, events_per_thread, wait=True):
+    """Log events from several threads; returns elapsed seconds"""
+    log = auditor.log_security_event if wait else auditor.log_security_event_async
+
+    def worker(offset):
+        for i in range(events_per_thread):
+            log(make_event(offset + i))
+
+    workers = [threading.Thread(target=worker, args=(t * events_per_thread,)) for t in range(threads)]
+    start = time.perf_counter()
+    for thread in workers:
+        thread.start()
+    for thread in workers:
+        thread.join()
+    auditor.flush()
+    return time.perf_counter() - start
+
+
+def log_from_process(log_path, events, options):
+    """Worker-pool entry point: log events through a fresh auditor"""
+    logging.disable(logging.CRITICAL)
+    auditor = SecurityAuditor(log_path, **options)
+    for i in range(events):
+        auditor.log_security_event_async(make_event(os.getpid() * 100000 + i))
+    auditor.close()
+
+
+def log_from_processes(log_path, processes, events_per_process, **options):
+    """Log from several processes at once; returns elapsed seconds"""
+    context = multiprocessing.get_context("fork" if "fork" in multiprocessing.get_all_start_methods() else None)
+    workers = [context.Process(target=log_from_process, args=(log_path, events_per_process, options))
+               for _ in range(processes)]
+    start = time.perf_counter()
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    return time.perf_counter() - start
+
+
+class TestSecurityAuditor(unittest.TestCase):
+
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.log_path = os.path.join(self._tmp.name, "audit.log")
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def read_events(self):
+        with open(self.log_path, encoding='utf-8') as f:
+            return [json.loads(line) for line in f if line.strip()]
+
+    def test_sync_events_verify(self):
+        """Synchronous events are written once each and pass verification"""
+        auditor = SecurityAuditor(self.log_path)
+        event_hash = auditor.log_security_event(make_event())
+
+        events = self.read_events()
+        self.assertEqual(len(events), 1)
+        self.assertEqual(events[0]['integrity_hash'], event_hash)
+        self.assertEqual(events[0]['event_data']['note'], "café")
+        self.assertEqual(auditor.verify_audit_integrity()['invalid_events'], 0)
+
+    def test_group_commit_concurrent_writers(self):
+        """Group commit writes every event exactly once, in sequence order"""
+        auditor = SecurityAuditor(self.log_path, group_commit=True, commit_interval=0.001)
+        log_concurrently(auditor, threads=8, events_per_thread=50)
+        auditor.close()
+
+        sequence = [event['sequence_number'] for event in self.read_events()]
+        self.assertEqual(sequence, list(range(1, 401)))
+
+        integrity = auditor.verify_audit_integrity()
+        self.assertEqual((integrity['valid_events'], integrity['invalid_events']), (400, 0))
+
+    def test_process_safe_sequence_numbers(self):
+        """Processes sharing a log get unique, contiguous sequence numbers and one chain"""
+        for group_commit in (False, True):
+            with self.subTest(group_commit=group_commit):
+                log_from_processes(self.log_path, 4, 50, process_safe=True, group_commit=group_commit,
+                                   max_segment_bytes=16384)
+                auditor = SecurityAuditor(self.log_path, process_safe=True)
+
+                # The second run appends to the log the first run wrote
+                expected = 400 if group_commit else 200
+                sequence = sorted(e['sequence_number'] for e in auditor.get_audit_trail())
+                self.assertEqual(sequence, list(range(1, expected + 1)))
+
+                integrity = auditor.verify_audit_integrity()
+                self.assertEqual((integrity['valid_events'], integrity['integrity_violations']),
+                                 (expected, []))
+
+    def test_async_future_reports_write_failure(self):
+        """A failed batch write surfaces through the event's future"""
+        auditor = SecurityAuditor(os.path.join(self._tmp.name, "missing", "audit.log"),
+                                  group_commit=True)
+        future = auditor.log_security_event_async(make_event())
+        with self.assertRaises(OSError):
+            future.result(timeout=5)
+        auditor.close()
+
+    def test_failed_write_does_not_break_chain(self):
+        """An event whose write fails is not chained to by the events after it"""
+        def partial_write(handle, data):
+            handle.write(data[:len(data) // 2])
+            raise OSError(errno.ENOSPC, "No space left on device")
+
+        def failing_fsync(fd):
+            raise OSError(errno.EIO, "Input/output error")
+
+        failures = [(audit, '_write_all', partial_write), (audit.os, 'fsync', failing_fsync)]
+        modes = [{}, {'group_commit': True}, {'process_safe': True}, {'process_safe': True, 'group_commit': True}]
+        for index, mode in enumerate(modes):
+            for module, name, failure in failures:
+                with self.subTest(mode=mode, failure=name):
+                    path = os.path.join(self._tmp.name, f"{index}-{name}.log")
+                    auditor = SecurityAuditor(path, fsync=True, checkpoint_interval=4, **mode)
+                    for i in range(5):
+                        auditor.log_security_event(make_event(i))
+
+                    with patch.object(module, name, failure):
+                        with self.assertRaises(OSError):
+                            auditor.log_security_event(make_event(99))
+
+                    for i in range(5, 10):
+                        auditor.log_security_event(make_event(i))
+                    auditor.close()
+
+                    trail = list(SecurityAuditor(path).get_audit_trail())
+                    self.assertEqual([e['event_id'] for e in trail], [f"evt-{i}" for i in range(10)])
+                    self.assertEqual([e['sequence_number'] for e in trail], list(range(1, 11)))
+                    integrity = SecurityAuditor(path).verify_audit_integrity()
+                    self.assertEqual((integrity['valid_events'], integrity['integrity_violations']), (10, []))
+
+
+class TestHashChain(unittest.TestCase):
+
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.log_path = os.path.join(self._tmp.name, "audit.log")
+        self.auditor = SecurityAuditor(self.log_path, checkpoint_interval=10, signing_key=b"test-key")
+        for i in range(35):
+            self.auditor.log_security_event(make_event(i))
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def rewrite_lines(self, edit):
+        with open(self.log_path, encoding='utf-8') as f:
+            lines = f.readlines()
+        with open(self.log_path, 'w', encoding='utf-8') as f:
+            f.writelines(edit(lines))
+
+    def test_clean_chain_verifies(self):
+        """Events and signed checkpoints verify, serially and in parallel"""
+        serial = self.auditor.verify_audit_integrity()
+        self.assertEqual((serial['valid_events'], serial['checkpoints']), (35, 3))
+        self.assertEqual(serial['integrity_violations'], [])
+
+        original = audit.PARALLEL_VERIFY_BYTES
+        audit.PARALLEL_VERIFY_BYTES = 0
+        try:
+            parallel = self.auditor.verify_audit_integrity(max_workers=2)
+        finally:
+            audit.PARALLEL_VERIFY_BYTES = original
+        self.assertEqual(parallel, serial)
+
+    def test_deleted_and_reordered_events_detected(self):
+        """Removing or swapping lines breaks the chain"""
+        self.rewrite_lines(lambda lines: lines[:3] + lines[4:])
+        violations = self.auditor.verify_audit_integrity()['integrity_violations']
+        self.assertEqual([v['error'] for v in violations], ['Hash chain broken'])
+
+        self.rewrite_lines(lambda lines: lines[:20] + [lines[21], lines[20]] + lines[22:])
+        self.assertTrue(self.auditor.verify_audit_integrity()['integrity_violations'])
+
+    def test_stripped_checkpoints_detected(self):
+        """An edited, re-chained log without its signed checkpoints does not verify"""
+        def edit(event):
+            if event['event_id'] == 'evt-5':
+                event['severity'] = 'low'
+
+        self.rewrite_lines(lambda lines: rechain(lines, edit))
+        result = self.auditor.verify_audit_integrity()
+        self.assertEqual(result['invalid_events'], 0)
+        self.assertEqual([(v['error'], v['checkpoint']) for v in result['integrity_violations']],
+                         [('Missing checkpoint', 10), ('Missing checkpoint', 20), ('Missing checkpoint', 30)])
+
+        # Without a key checkpoints can be recomputed, so they are not required
+        unkeyed = SecurityAuditor(self.log_path, checkpoint_interval=10).verify_audit_integrity()
+        self.assertEqual(unkeyed['integrity_violations'], [])
+
+    def test_unchained_downgrade_detected(self):
+        """Dropping the hashes or the chain fields does not turn events into unverified legacy ones"""
+        log_path = os.path.join(self._tmp.name, "downgrade.log")
+        auditor = SecurityAuditor(log_path, checkpoint_interval=3, signing_key=b"k")
+        for i in range(7):
+            auditor.log_security_event(make_event(i))
+        with open(log_path, encoding='utf-8') as f:
+            lines = [json.loads(line) for line in f if '"checkpoint"' not in line]
+
+        def unhashed(event):
+            del event['integrity_hash']
+            if event['event_id'] == 'evt-2':
+                event['severity'] = 'low'
+            return json.dumps(event) + "\n"
+
+        def unchained(event):
+            for name in ('integrity_hash', 'previous_hash', 'sequence_number'):
+                del event[name]
+            event['integrity_hash'] = hashlib.sha256(json.dumps(event, sort_keys=True).encode()).hexdigest()
+            return json.dumps(event) + "\n"
+
+        for downgrade, count in [(unhashed, 5), (unchained, 7)]:
+            with self.subTest(downgrade=downgrade.__name__):
+                with open(log_path, 'w', encoding='utf-8') as f:
+                    f.writelines(downgrade(dict(event)) for event in lines[:count])
+                result = auditor.verify_audit_integrity()
+                self.assertEqual((result['valid_events'], result['invalid_events']), (0, count))
+                self.assertEqual({v['error'] for v in result['integrity_violations']}, {'Event not hash-chained'})
+
+                # Without a key they are still read as legacy events
+                unkeyed = SecurityAuditor(log_path, checkpoint_interval=3).verify_audit_integrity()
+                self.assertEqual((unkeyed['valid_events'], unkeyed['integrity_violations']), (count, []))
+
+    def test_out_of_place_checkpoint_detected(self):
+        """A valid checkpoint repeated elsewhere is rejected"""
+        self.assertEqual(self.auditor.verify_audit_integrity()['uncheckpointed_events'], 5)
+        self.rewrite_lines(lambda lines: lines[:11] + [lines[10]] + lines[11:])
+        violations = self.auditor.verify_audit_integrity()['integrity_violations']
+        self.assertEqual([(v['line'], v['error']) for v in violations], [(12, 'Checkpoint out of place')])
+
+    def test_forged_checkpoint_signature_detected(self):
+        """A checkpoint signed with another key is rejected"""
+        other = SecurityAuditor(self.log_path, signing_key=b"other-key")
+        self.assertEqual(other.verify_audit_integrity()['integrity_violations'][0]['error'],
+                         'Invalid checkpoint signature')
+
+    def test_chain_continues_across_auditors(self):
+        """A new auditor on an existing log continues sequence and chain"""
+        SecurityAuditor(self.log_path, checkpoint_interval=10, signing_key=b"test-key").log_security_event(make_event())
+        with open(self.log_path, encoding='utf-8') as f:
+            last = json.loads(f.readlines()[-1])
+        self.assertEqual(last['sequence_number'], 36)
+        self.assertEqual(self.auditor.verify_audit_integrity()['invalid_events'], 0)
+
+    def test_incremental_verification_resumes_at_checkpoint(self):
+        """Incremental runs only re-verify records after the last checkpoint"""
+        first = self.auditor.verify_audit_integrity(incremental=True)
+        self.assertEqual(first['total_events'], 35)
+
+        for i in range(10):
+            self.auditor.log_security_event(make_event(100 + i))
+        second = self.auditor.verify_audit_integrity(incremental=True)
+        self.assertGreater(second['verified_from_offset'], 0)
+        self.assertEqual((second['total_events'], second['invalid_events']), (15, 0))
+
+        self.rewrite_lines(lambda lines: lines[:20] + lines[21:])
+        third = self.auditor.verify_audit_integrity(incremental=True)
+        self.assertEqual(third['integrity_violations'][0]['error'], 'Verified checkpoint changed since last run')
+        self.assertEqual(third['verified_from_offset'], 0)
+
+
+class TestPartitionedAuditTrail(unittest.TestCase):
+
+    BASE = datetime(2026, 1, 1, tzinfo=timezone.utc)
+
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.log_path = os.path.join(self._tmp.name, "audit.log")
+        self.auditor = SecurityAuditor(self.log_path, partition='hour', checkpoint_interval=7)
+        self.flat = SecurityAuditor(os.path.join(self._tmp.name, "flat.log"))
+        for i in range(40):
+            for auditor in (self.auditor, self.flat):
+                auditor.log_security_event(make_event(
+                    i, timestamp=(self.BASE + timedelta(hours=i)).isoformat(),
+                    event_type=("policy_violation", "runtime_anomaly")[i % 2],
+                    severity=("high", "low", "medium")[i % 3]))
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def age_segments(self):
+        """Pretend everything logged so far was logged on an earlier day"""
+        for path in self.auditor._segment_paths():
+            aged = os.path.join(os.path.dirname(path), os.path.basename(path).replace(".20", ".19", 1))
+            os.rename(path, aged)
+            os.rename(path + ".idx", aged + ".idx")
+
+    def test_queries_match_unindexed_scan(self):
+        """Indexed queries return the same events as a full scan, lazily"""
+        queries = [
+            {},
+            {"event_type": "policy_violation"},
+            {"severity": "low", "start_time": self.BASE + timedelta(hours=10)},
+            {"start_time": self.BASE + timedelta(hours=5), "end_time": datetime(2026, 1, 1, 20)},
+            {"event_type": "not_logged"},
+        ]
+        for query in queries:
+            with self.subTest(query=query):
+                trail = self.auditor.get_audit_trail(**query)
+                self.assertIsInstance(trail, types.GeneratorType)
+                self.assertEqual([e['event_id'] for e in trail],
+                                 [e['event_id'] for e in self.flat.get_audit_trail(**query)])
+
+    def test_segment_summaries_skip_segments(self):
+        """Segments whose summary cannot match are not read"""
+        self.age_segments()
+        self.auditor.log_security_event(make_event(99, event_type="late_event"))
+
+        self.assertGreaterEqual(len(self.auditor._segment_paths()), 2)
+        trail = list(self.auditor.get_audit_trail(event_type="late_event"))
+        self.assertEqual([e['event_id'] for e in trail], ['evt-99'])
+
+        with open(self.log_path + ".manifest", encoding='utf-8') as f:
+            manifest = json.load(f)
+        self.assertEqual(len(manifest), len(self.auditor._segment_paths()))
+
+    def test_chain_verified_across_segments(self):
+        """The hash chain continues into the next segment and breaks are caught"""
+        self.age_segments()
+        self.auditor = SecurityAuditor(self.log_path, partition='hour', checkpoint_interval=7)
+        self.auditor.log_security_event(make_event(99))
+
+        result = self.auditor.verify_audit_integrity()
+        self.assertEqual((result['valid_events'], result['invalid_events']), (41, 0))
+
+        # The restarted auditor sealed the earlier partitions, ending each
+        # with a checkpoint; drop the last event along with it
+        first = self.auditor._segment_paths()[0]
+        with open(first, encoding='utf-8') as f:
+            lines = f.readlines()
+        self.assertEqual(json.loads(lines[-1])['record_type'], 'checkpoint')
+        with open(first, 'w', encoding='utf-8') as f:
+            f.writelines(lines[:-2])
+        violations = self.auditor.verify_audit_integrity()['integrity_violations']
+        self.assertEqual([(v['segment'], v['line'], v['error']) for v in violations],
+                         [(os.path.basename(self.auditor._segment_paths()[1]), 1, 'Hash chain broken')])
+
+
+class TestRotationAndRetention(unittest.TestCase):
+
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.log_path = os.path.join(self._tmp.name, "audit.log")
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def log_events(self, auditor, count=60):
+        for i in range(count):
+            auditor.log_security_event(make_event(i))
+        auditor.maintain()
+        auditor.close()
+
+    def test_size_rotation_reads_across_segments(self):
+        """Full segments are sealed and read back in order"""
+        auditor = SecurityAuditor(self.log_path, max_segment_bytes=4096, checkpoint_interval=8)
+        self.log_events(auditor)
+
+        segments = auditor._segments()
+        self.assertGreater(len(segments), 3)
+        self.assertEqual([segment.sequence for segment in segments[:2]], [1, 2])
+        self.assertTrue(all(os.path.getsize(segment.path) < 4096 + 1024 for segment in segments))
+        self.assertEqual([e['event_id'] for e in auditor.get_audit_trail()], [f"evt-{i}" for i in range(60)])
+
+        result = auditor.verify_audit_integrity()
+        self.assertEqual((result['valid_events'], result['integrity_violations']), (60, []))
+
+    def test_sealed_segments_compressed(self):
+        """Sealed segments are gzip-compressed and still queryable and verifiable"""
+        auditor = SecurityAuditor(self.log_path, max_segment_bytes=4096, compression='gzip',
+                                  partition='day', checkpoint_interval=8)
+        self.log_events(auditor)
+
+        segments = auditor._segments()
+        self.assertTrue(all(segment.compressed for segment in segments if segment.sequence is not None))
+        self.assertTrue(all(segment.path.endswith('.log') for segment in segments if segment.sequence is None))
+        self.assertEqual(len(list(auditor.get_audit_trail(event_type="input_validation_failure"))), 60)
+
+        result = auditor.verify_audit_integrity(incremental=True)
+        self.assertEqual((result['valid_events'], result['integrity_violations']), (60, []))
+
+        # The stored checkpoint is found again after its segment was compressed
+        auditor.log_security_event(make_event(60))
+        rerun = auditor.verify_audit_integrity(incremental=True)
+        self.assertEqual(rerun['integrity_violations'], [])
+        self.assertLess(rerun['total_events'], 10)
+
+    def test_restart_seals_previous_partitions(self):
+        """Segments a previous process left active are sealed, so retention is not stuck on them"""
+        options = dict(partition='hour', checkpoint_interval=8, max_segments=1, signing_key=b"k")
+
+        def run_until_exit(key, auditor=None):
+            auditor = auditor or SecurityAuditor(self.log_path, **options)
+            for i in range(10):
+                auditor.log_security_event(make_event(i))
+            auditor.close()
+            # The process exits, and the clock moves on past its partition
+            active = [segment.path for segment in auditor._segments() if segment.sequence is None]
+            self.assertEqual(len(active), 1)
+            aged = active[0].replace(audit._partition_key(active[0]), key)
+            os.rename(active[0], aged)
+            os.rename(active[0] + ".idx", aged + ".idx")
+
+        run_until_exit("2000-01-01T00")
+        # The first write after a restart seals the earlier partition
+        run_until_exit("2000-01-01T01")
+        self.assertEqual([(segment.partition_key, segment.sequence) for segment in
+                          SecurityAuditor(self.log_path, **options)._segments()],
+                         [("2000-01-01T00", 1), ("2000-01-01T01", None)])
+
+        # maintain() seals it too, and retention then drops the older one
+        restarted = SecurityAuditor(self.log_path, **options)
+        restarted.maintain()
+        self.assertEqual([(segment.partition_key, segment.sequence) for segment in restarted._segments()],
+                         [("2000-01-01T01", 1)])
+        result = restarted.verify_audit_integrity()
+        self.assertEqual((result['valid_events'], result['integrity_violations']), (10, []))
+
+    def test_global_auditor_expires_segments(self):
+        """The global auditor has a default retention, configurable from the environment"""
+        self.assertEqual(audit.security_auditor.retention_days, audit._default_retention_days())
+        for value, expected in [(None, audit.DEFAULT_RETENTION_DAYS), ("30", 30), ("0.5", 0.5),
+                                ("none", None), ("-1", audit.DEFAULT_RETENTION_DAYS),
+                                ("soon", audit.DEFAULT_RETENTION_DAYS)]:
+            environ = {} if value is None else {audit.AUDIT_RETENTION_DAYS_ENV: value}
+            with self.subTest(value=value), patch.dict(os.environ, environ, clear=True):
+                self.assertEqual(audit._default_retention_days(), expected)
+
+    def test_retention_keeps_chain_verifiable(self):
+        """Deleting old segments leaves a signed anchor the chain continues from"""
+        auditor = SecurityAuditor(self.log_path, max_segment_bytes=4096, max_segments=2, signing_key=b"k")
+        self.log_events(auditor)
+
+        self.assertEqual(sum(1 for segment in auditor._segments() if segment.sequence is not None), 2)
+        result = auditor.verify_audit_integrity()
+        self.assertEqual(result['integrity_violations'], [])
+        self.assertLess(result['valid_events'], 60)
+
+        # Every sealed segment ends with a signed checkpoint
+        sealed = [segment.path for segment in auditor._segments() if segment.sequence is not None]
+        with open(sealed[-1], encoding='utf-8') as f:
+            lines = f.readlines()
+        self.assertEqual(json.loads(lines[-1])['record_type'], 'checkpoint')
+        with open(sealed[-1], 'w', encoding='utf-8') as f:
+            f.writelines(lines[:-1])
+        violations = auditor.verify_audit_integrity()['integrity_violations']
+        self.assertEqual([v['error'] for v in violations], ['Missing checkpoint'])
+        with open(sealed[-1], 'w', encoding='utf-8') as f:
+            f.writelines(lines)
+
+        with open(self.log_path + ".anchor", encoding='utf-8') as f:
+            anchor = json.load(f)
+        anchor['sequence_number'] += 1
+        with open(self.log_path + ".anchor", 'w', encoding='utf-8') as f:
+            json.dump(anchor, f)
+        errors = [v['error'] for v in auditor.verify_audit_integrity()['integrity_violations']]
+        self.assertIn('Invalid retention anchor signature', errors)
+
+
+def run_benchmark(thread_counts=(1, 8, 64), total_events=4000):
+    """Print events/sec for synchronous vs group commit logging"""
+    modes = [
+        ("sync", {}, True),
+        ("group", {"group_commit": True}, True),
+        ("group-async", {"group_commit": True}, False),
+        ("sync+fsync", {"fsync": True}, True),
+        ("group+fsync", {"group_commit": True, "fsync": True}, True),
+    ]
+    with tempfile.TemporaryDirectory() as tmp:
+        for label, options, wait in modes:
+            for threads in thread_counts:
+                path = os.path.join(tmp, f"{label}-{threads}.log")
+                auditor = SecurityAuditor(path, **options)
+                events = total_events // 10 if options.get("fsync") else total_events
+                elapsed = log_concurrently(auditor, threads, max(1, events // threads), wait)
+                auditor.close()
+                logged = max(1, events // threads) * threads
+                print(f"{label:12} {threads:>3} threads: {logged / elapsed:10.0f} events/sec")
+
+
+def run_verify_benchmark(total_events=200000):
+    """Print full, parallel and incremental verification times"""
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "verify.log")
+        auditor = SecurityAuditor(path, group_commit=True)
+        log_concurrently(auditor, 1, total_events, wait=False)
+        auditor.close()
+        size_mb = os.path.getsize(path) / 1e6
+
+        for label, options in [("full", {}), ("incremental", {"incremental": True})]:
+            start = time.perf_counter()
+            result = auditor.verify_audit_integrity(**options)
+            print(f"verify {label:19} {size_mb:6.1f}MB: {time.perf_counter() - start:6.2f}s "
+                  f"({result['total_events']} events)")
+
+        original = audit.PARALLEL_VERIFY_BYTES
+        audit.PARALLEL_VERIFY_BYTES = 0
+        start = time.perf_counter()
+        auditor.verify_audit_integrity()
+        print(f"verify {'full (process pool)':19} {size_mb:6.1f}MB: {time.perf_counter() - start:6.2f}s")
+        audit.PARALLEL_VERIFY_BYTES = original
+
+        auditor.log_security_event(make_event())
+        start = time.perf_counter()
+        result = auditor.verify_audit_integrity(incremental=True)
+        print(f"verify {'incremental (rerun)':19} {size_mb:6.1f}MB: {time.perf_counter() - start:6.2f}s "
+              f"({result['total_events']} events)")
+
+
+def run_query_benchmark(total_events=100000):
+    """Print get_audit_trail times for a flat log vs an indexed partitioned log"""
+    base = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    queries = [
+        ("rare type", {"event_type": "policy_violation"}),
+        ("1h window", {"start_time": base + timedelta(hours=10), "end_time": base + timedelta(hours=11)}),
+        ("everything", {}),
+    ]
+    with tempfile.TemporaryDirectory() as tmp:
+        flat = SecurityAuditor(os.path.join(tmp, "flat.log"), group_commit=True)
+        indexed = SecurityAuditor(os.path.join(tmp, "indexed.log"), group_commit=True, partition='hour')
+        for i in range(total_events):
+            event = make_event(i, timestamp=(base + timedelta(seconds=i)).isoformat(),
+                               event_type="policy_violation" if i % 100 == 0 else "content_sanitization")
+            flat.log_security_event_async(event)
+            indexed.log_security_event_async(event)
+        flat.close()
+        indexed.close()
+
+        for label, query in queries:
+            timings = []
+            for auditor in (flat, indexed):
+                start = time.perf_counter()
+                count = sum(1 for _ in auditor.get_audit_trail(**query))
+                timings.append(time.perf_counter() - start)
+            print(f"query {label:10} ({count:6} events): flat {timings[0]:6.3f}s  "
+                  f"indexed {timings[1]:6.3f}s  ({timings[0] / timings[1]:5.1f}x)")
+
+
+def run_multiprocess_benchmark(process_counts=(1, 4, 8), total_events=8000):
+    """Print events/sec and duplicate sequence numbers for a process pool sharing one log"""
+    modes = [
+        ("unsafe sync", {}),
+        ("safe sync", {"process_safe": True}),
+        ("unsafe group", {"group_commit": True}),
+        ("safe group", {"group_commit": True, "process_safe": True}),
+    ]
+    with tempfile.TemporaryDirectory() as tmp:
+        for label, options in modes:
+            for processes in process_counts:
+                path = os.path.join(tmp, f"{label.replace(' ', '-')}-{processes}.log")
+                events = total_events // processes
+                elapsed = log_from_processes(path, processes, events, **options)
+                with open(path, encoding='utf-8') as f:
+                    sequence = [json.loads(line).get('sequence_number') for line in f
+                                if not line.startswith('{"record_type"')]
+                print(f"{label:12} {processes:>2} processes: {len(sequence) / elapsed:8.0f} events/sec, "
+                      f"{len(sequence) - len(set(sequence)):5} duplicate sequence numbers")
+
+
+if __name__ == '__main__':
+    if "--bench" in sys.argv:
+        run_benchmark()
+        run_verify_benchmark()
+        run_query_benchmark()
+        run_multiprocess_benchmark()
+        sys.exit(0)
+    unittest.main(verbosity=2)
@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+"""
+Differential Tests for the Compiled Sanitizer Engine
+Checks sanitize_markdown_content against the original one-re.sub-per-pattern
+implementation on a fixed corpus plus generated inputs.
+
+Run directly to print the benchmark across input sizes:
+    python src/security/test_sanitizer.py --bench
+"""
+
+import logging
+import random
+import re
+import sys
+import timeit
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from src.security.sanitizer import ContentSanitizer, MARKDOWN_SANITIZER_ENGINE
+
+logging.disable(logging.CRITICAL)
+
+
+def reference_sanitize_markdown(content):
+    """Original sanitize_markdown_content, kept verbatim as the oracle"""
+    if not content:
+        return ""
+
+    sanitized = content
+    for pattern, replacement in ContentSanitizer.DANGEROUS_PATTERNS:
+        sanitized = re.sub(pattern, replacement, sanitized, flags=re.IGNORECASE | re.DOTALL)
+    sanitized = re.sub(r'<([^>]+)>', r'<\1>', sanitized)
+    sanitized = re.sub(r'<([^>]+://[^>]+)>', r'[\1](\1)', sanitized)
+    return sanitized
+
+
+DIFFERENTIAL_CORPUS = [
+    "",
+    "Normal title",
+    "Markdown: **bold** and *italic*\n\n- item 1\n- item 2",
+    "Title with <script>alert(1)</script>",
+    "<SCRIPT type='x'>\nmulti\nline\n</ScRiPt> tail",
+    "<script>never closed",
+    "click javascript:alert(1) here",
+    "<img src=x onerror=alert(1)>",
+    "onload = run() and onClick=go()",
+    "<b>bold</b> <i>it</i> </div>",
+    "<scr</b>ipt>alert(1)</script>",
+    "Path traversal: ../../../etc/passwd",
+    "windows ..\\..\\system32",
+    "....// and ..././",
+    "SQL injection; drop table users;",
+    "x ;   UNION select * from t",
+    "comment -- here and --\tthere",
+    "/* block */ and /* multi\nline */",
+    "/* unterminated",
+    "a; rm -rf / && del x | format c: `reboot` $shutdown",
+    "cat x > /dev/null; echo >/dev/sda",
+    "<http://example.com/path>",
+    "<-https://evil.example>",
+    "< ftp://host/file >",
+    "<a href='javascript:void(0)' onclick=x>link</a>",
+    "emoji 💣 and accents café naïve",
+    "nested <<script>script>alert(1)<</script>/script>",
+    "-- \n--\n-- -- ",
+    "<>",
+    "<<>>",
+    "; deleted items; selection; updates",
+    "JAVAſCRIPT: long s and \u212aelvin <ſcript>x</script>",
+    "Ünïcödé <B>bold</B> ..\\ ; DROP table",
+]
+
+FUZZ_ALPHABET = list("<>/\\.;-*&|`$:= \n\tabcdehilmnoprstuvwxyz") + [
+    "script", "</script>", "javascript:", "onerror", "drop", "union", "rm", "del",
+    "/dev/", "://", "../", "..\\", "/*", "*/", "-- ", "<b>", "</b>", "SELECT",
+    "JavaScript:", "ONLOAD", "ſ", "\u212a", "é", "RM", "<SCRIPT>",
+]
+
+
+def generated_inputs(count=5000, seed=2026):
+    rng = random.Random(seed)
+    for _ in range(count):
+        yield "".join(rng.choice(FUZZ_ALPHABET) for _ in range(rng.randint(1, 40)))
+
+
+class TestCompiledSanitizerEngine(unittest.TestCase):
+
+    def test_corpus_matches_reference(self):
+        """Engine output is byte-for-byte identical on the fixed corpus"""
+        for content in DIFFERENTIAL_CORPUS:
+            with self.subTest(content=content):
+                self.assertEqual(ContentSanitizer.sanitize_markdown_content(content),
+                                 reference_sanitize_markdown(content))
+
+    def test_generated_inputs_match_reference(self):
+        """Engine output is byte-for-byte identical on generated inputs"""
+        for content in generated_inputs():
+            self.assertEqual(ContentSanitizer.sanitize_markdown_content(content),
+                             reference_sanitize_markdown(content), repr(content))
+
+    def test_clean_content_returned_unchanged(self):
+        """Clean content is returned as the same object"""
+        content = "Plain description with **markdown** and a list\n- one\n- two"
+        self.assertIs(MARKDOWN_SANITIZER_ENGINE.sanitize(content), content)
+
+    def test_first_matching_rule(self):
+        """Probing finds the first rule that applies, including case variants"""
+        self.assertEqual(MARKDOWN_SANITIZER_ENGINE.first_matching_rule("x JavaScript: y ../z"), 1)
+        self.assertIsNone(MARKDOWN_SANITIZER_ENGINE.first_matching_rule("nothing to see"))
+
+
+class TestSanitizeEventData(unittest.TestCase):
+
+    def test_unmodified_event_returned_as_is(self):
+        """Clean events are returned without copying"""
+        event = {'title': 'Fix login', 'tags': ['a', 'b'], 'meta': {'user': 'bob', 'n': [1, {'x': 'y'}]}}
+        self.assertIs(ContentSanitizer.sanitize_event_data(event), event)
+
+    def test_modified_event_copies_only_changed_path(self):
+        """Only containers on the path to a change are copied"""
+        untouched = {'user': 'bob'}
+        event = {'title': '<b>x</b>', 'meta': untouched, 'items': [{'note': 'a  b'}, 'ok']}
+        sanitized = ContentSanitizer.sanitize_event_data(event)
+
+        self.assertEqual(sanitized, {'title': '[HTML REMOVED]x', 'meta': {'user': 'bob'},
+                                     'items': [{'note': 'a b'}, 'ok']})
+        self.assertIs(sanitized['meta'], untouched)
+        self.assertEqual(event['title'], '<b>x</b>')
+        self.assertEqual(event['items'][0]['note'], 'a  b')
+
+    def test_depth_guard(self):
+        """Deeply nested or self-referencing events are rejected"""
+        event = {}
+        event['self'] = event
+        with self.assertRaises(ValueError):
+            ContentSanitizer.sanitize_event_data(event)
+
+
+class TestMemoizedSanitizers(unittest.TestCase):
+
+    def setUp(self):
+        ContentSanitizer.clear_caches()
+
+    def test_repeated_tags_hit_cache(self):
+        """Repeated short inputs are served from the cache"""
+        for _ in range(3):
+            self.assertEqual(ContentSanitizer.sanitize_tag_content("Ops--Team"), "ops-team")
+
+        stats = ContentSanitizer.cache_stats()['sanitize_tag_content']
+        self.assertEqual((stats['hits'], stats['misses']), (2, 1))
+        self.assertAlmostEqual(stats['hit_rate'], 0.6667)
+
+    def test_long_inputs_bypass_cache(self):
+        """Inputs over the size cap are sanitized without caching"""
+        title = "x" * 1000 + "!!"
+        self.assertEqual(ContentSanitizer.sanitize_task_title(title), "x" * 1000 + "!")
+
+        stats = ContentSanitizer.cache_stats()['sanitize_task_title']
+        self.assertEqual((stats['bypassed'], stats['size']), (1, 0))
+
+
+def run_benchmark(sizes=(100, 1000, 10000, 100000)):
+    """Print reference vs engine timings for clean and dirty inputs"""
+    clean_unit = "Plain **markdown** description with a [link](docs/HEE.md) and text. "
+    unicode_unit = "Beschreibung mit Umlauten: äöü, naïve café, and **markdown**. "
+    dirty_unit = clean_unit + "<b>x</b> ../ "
+    for label, unit in [("clean", clean_unit), ("utf8", unicode_unit), ("dirty", dirty_unit)]:
+        for size in sizes:
+            content = (unit * (size // len(unit) + 1))[:size]
+            number = max(1, 200000 // size)
+            reference = timeit.timeit(lambda: reference_sanitize_markdown(content), number=number) / number
+            engine = timeit.timeit(lambda: MARKDOWN_SANITIZER_ENGINE.sanitize(content), number=number) / number
+            print(f"{label:5} {size:>7} chars: reference {reference * 1e6:9.1f}us  "
+                  f"engine {engine * 1e6:9.1f}us  ({reference / engine:4.1f}x)")
+
+
+if __name__ == '__main__':
+    if "--bench" in sys.argv:
+        run_benchmark()
+        sys.exit(0)
+    unittest.main(verbosity=2)
@@ -0,0 +1,275 @@
+#!/usr/bin/env python3
+"""
+Differential Tests for the Security Validator
+Checks validate_unicode_input against the original multi-pass implementation
+on a fixed corpus plus generated inputs, and the validate_records batch API,
+serial and across a process pool, against the per-record validators.
+
+Run directly to print the benchmark across input sizes:
+    python src/security/test_validator.py --bench
+"""
+
+import logging
+import random
+import sys
+import timeit
+import unicodedata
+import unittest
+import uuid
+from pathlib import Path
+from unittest.mock import patch
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from src.security import validator
+from src.security.validator import (
+    CONTROL_CHARS,
+    RECORD_FIELD_VALIDATORS,
+    REQUIRED_RECORD_FIELDS,
+    ZERO_WIDTH_CHARS,
+    SecurityValidator,
+    ValidationResult,
+)
+
+logging.disable(logging.CRITICAL)
+
+
+def reference_validate_unicode_input(input_str):
+    """Original validate_unicode_input, kept verbatim as the oracle"""
+    if not isinstance(input_str, str):
+        return ValidationResult(
+            is_valid=False,
+            error_message="Input must be string type"
+        )
+
+    normalized = unicodedata.normalize('NFC', input_str)
+
+    if any(c in CONTROL_CHARS for c in normalized):
+        return ValidationResult(
+            is_valid=False,
+            error_message="Control characters not allowed"
+        )
+
+    if any(c in ZERO_WIDTH_CHARS for c in normalized):
+        return ValidationResult(
+            is_valid=False,
+            error_message="Zero-width characters not allowed"
+        )
+
+    for char in normalized:
+        category = unicodedata.category(char)
+        if category.startswith(('Cf', 'Co', 'Cn')):
+            return ValidationResult(
+                is_valid=False,
+                error_message=f"Unicode category {category} not allowed"
+            )
+
+    return ValidationResult(
+        is_valid=True,
+        sanitized_value=normalized
+    )
+
+
+UNICODE_CORPUS = [
+    "",
+    "Normal title",
+    "tabs\tnewlines\nand\rreturns",
+    "bell\x07 inside",
+    "\x00\x01\x02",
+    "delete \x7f is Cc but not blocked",
+    "ASCII then zero-width\u200b",
+    "Valid input\ufeff",
+    "café naïve Ünïcödé",
+    "decomposed cafe\u0301 and A\u030a",
+    "mixed Ελληνικά русский 中文 العربية עברית",
+    "emoji 💣 and flags 🇩🇪",
+    "bidi \u202eevil\u202c override",
+    "isolate \u2066x\u2069 and marks \u200e\u200f",
+    "soft\u00adhyphen",
+    "private use \ue000",
+    "unassigned \u0378",
+    "noncharacter \uffff",
+    "control after non-ASCII é\x1b[31m",
+    "zero-width joiner after non-ASCII é\u200d",
+    "format then control é\u202e\x01",
+    "zero-width then format é\u202e\u200b",
+    "x" * 10000,
+    "é" * 5000 + "\x01",
+    ("Beschreibung mit Umlauten: äöü. " * 200) + "\u202e",
+    "\u212b Angstrom and \u2126 Ohm sign",
+]
+
+FUZZ_ALPHABET = list("abc XYZ09.-_\t\n\r") + [
+    "\x00", "\x01", "\x1b", "\x1f", "\x7f", "é", "e\u0301", "ß", "ñ", "\u03a9", "\u212b", "中", "文",
+    "ע", "ب", "💣", "\u200b", "\u200c", "\u200d", "\ufeff", "\u202a", "\u202e", "\u2066", "\u2069",
+    "\u200e", "\u00ad", "\ue000", "\U000f0000", "\u0378", "\uffff", "\ud7ff",
+]
+
+
+def generated_inputs(count=5000, seed=2027):
+    rng = random.Random(seed)
+    for _ in range(count):
+        yield "".join(rng.choice(FUZZ_ALPHABET) for _ in range(rng.randint(0, 40)))
+
+
+class TestUnicodeValidation(unittest.TestCase):
+
+    def test_corpus_matches_reference(self):
+        """Results and error messages match the original on the fixed corpus"""
+        for value in UNICODE_CORPUS:
+            with self.subTest(value=value[:40]):
+                self.assertEqual(SecurityValidator.validate_unicode_input(value),
+                                 reference_validate_unicode_input(value))
+
+    def test_generated_inputs_match_reference(self):
+        """Results and error messages match the original on generated inputs"""
+        for value in generated_inputs():
+            self.assertEqual(SecurityValidator.validate_unicode_input(value),
+                             reference_validate_unicode_input(value), repr(value))
+
+    def test_over_length_inputs_match_reference(self):
+        """Long inputs, clean and with a blocked character at the end, match the original"""
+        for unit in ["plain ascii ", "mixed café 中文 ", "ascii\x01", "é\u200b", "é\u202e"]:
+            value = unit * 2000
+            with self.subTest(unit=unit):
+                self.assertEqual(SecurityValidator.validate_unicode_input(value),
+                                 reference_validate_unicode_input(value))
+
+    def test_non_string_rejected(self):
+        """Non-string input is rejected like the original"""
+        for value in [None, 1, b"bytes", ["x"]]:
+            with self.subTest(value=value):
+                self.assertEqual(SecurityValidator.validate_unicode_input(value),
+                                 reference_validate_unicode_input(value))
+
+
+def reference_validate_record(record):
+    """(valid, errors, sanitized) of one record from the per-record validators"""
+    errors = {}
+    sanitized = {}
+    if not isinstance(record, dict):
+        errors['record'] = "Record must be a dictionary"
+        record = {}
+    for name in REQUIRED_RECORD_FIELDS:
+        if name not in record and 'record' not in errors:
+            errors[name] = f"Missing required field: {name}"
+    for name, (validate, _) in RECORD_FIELD_VALIDATORS.items():
+        sanitized[name] = None
+        if name in record:
+            result = validate(record[name])
+            if result.is_valid:
+                sanitized[name] = record[name] if result.sanitized_value is None else result.sanitized_value
+            else:
+                errors[name] = result.error_message
+    return not errors, errors, sanitized
+
+
+def generated_records(count, seed=2028):
+    """Records mixing valid and invalid values, with repeats for the unicode cache"""
+    rng = random.Random(seed)
+    titles = ["Fix login", "  Ship café release  ", "", "   ", "x" * 201, "bad\x01title", "Zero\u200bwidth"]
+    tags = [[], ["ops", "Ops"], ["a", "b"], ["x" * 51], [" "], ["t%d" % i for i in range(11)], ["\u202e"]]
+    for index in range(count):
+        record = {'title': rng.choice(titles)}
+        if rng.random() < 0.1:
+            del record['title']
+        if rng.random() < 0.5:
+            record['id'] = str(uuid.UUID(int=rng.getrandbits(128), version=4)) if rng.random() < 0.8 else "not-a-uuid"
+        if rng.random() < 0.5:
+            record['description'] = rng.choice(["", "Some **markdown**", "d" * 2001, "naïve\x1b"])
+        if rng.random() < 0.5:
+            record['tags'] = list(rng.choice(tags))
+        if rng.random() < 0.5:
+            record['workspace'] = rng.choice(["", " team ", "w" * 101, "ws\ufeff"])
+        for name, values in [('context', ['personal', 'work']), ('priority', ['low', 'urgent', 'none']),
+                             ('status', ['todo', 'done', 'later'])]:
+            if rng.random() < 0.5:
+                record[name] = rng.choice(values)
+        yield record
+
+
+class TestValidateRecords(unittest.TestCase):
+
+    def assertMatchesReference(self, records, result):
+        self.assertEqual(result.total, len(records))
+        self.assertEqual(set(result.sanitized), set(RECORD_FIELD_VALIDATORS))
+        for index, record in enumerate(records):
+            valid, errors, sanitized = reference_validate_record(record)
+            self.assertEqual(result.valid[index], valid, record)
+            self.assertEqual(result.errors[index], errors, record)
+            self.assertEqual({name: column[index] for name, column in result.sanitized.items()}, sanitized, record)
+
+    def test_serial_matches_per_record_validators(self):
+        """Valid mask, errors and sanitized columns match validating each record alone"""
+        records = list(generated_records(2000))
+        records.append("not a record")
+        result = SecurityValidator.validate_records(records)
+        self.assertMatchesReference(records, result)
+        self.assertGreater(result.valid_count, 0)
+        self.assertLess(result.valid_count, result.total)
+
+    def test_process_pool_matches_serial(self):
+        """At the pool threshold, chunked results equal the serial result in order"""
+        records = list(generated_records(1000, seed=7))
+        serial = SecurityValidator.validate_records(records)
+        with patch.object(validator, 'PARALLEL_RECORDS_THRESHOLD', len(records)), \
+                patch.object(validator, 'RECORDS_CHUNK_SIZE', 64), \
+                patch.object(validator, 'ProcessPoolExecutor', wraps=validator.ProcessPoolExecutor) as pool:
+            pooled = SecurityValidator.validate_records(records, max_workers=2)
+            # One record below the threshold stays serial
+            below = SecurityValidator.validate_records(records[:-1], max_workers=2)
+        self.assertEqual(pool.call_count, 1)
+        self.assertEqual(pooled, serial)
+        self.assertEqual(below.valid, serial.valid[:-1])
+        self.assertMatchesReference(records, pooled)
+
+    def test_unicode_cache_bounded(self):
+        """Short values are validated once per chunk, long ones every time"""
+        records = [{'title': f"title {index % 3}", 'description': f"unique {index} " + "d" * 300}
+                   for index in range(50)]
+        records += [{'title': f"distinct title {index}"} for index in range(50)]
+        with patch.object(validator, 'RECORDS_UNICODE_CACHE_SIZE', 8), \
+                patch.object(SecurityValidator, 'validate_unicode_input',
+                             wraps=SecurityValidator.validate_unicode_input) as validate:
+            result = SecurityValidator.validate_records(records)
+            calls = [call.args[0] for call in validate.call_args_list]
+        self.assertMatchesReference(records, result)
+        self.assertEqual(sum(value.startswith("title ") for value in calls), 3)
+        self.assertEqual(sum(value.startswith("unique ") for value in calls), 50)
+        self.assertEqual(sum(value.startswith("distinct ") for value in calls), 50)
+
+    def test_malformed_value_fails_only_its_field(self):
+        """A value a validator cannot handle is that record's error, not the batch's"""
+        records = [{'title': 'a'}, {'title': 'b', 'context': ['x'], 'priority': {'high': 1}},
+                   {'title': 'c', 'status': 'done'}]
+        for max_workers, threshold in [(None, validator.PARALLEL_RECORDS_THRESHOLD), (2, 1)]:
+            with self.subTest(max_workers=max_workers), \
+                    patch.object(validator, 'PARALLEL_RECORDS_THRESHOLD', threshold), \
+                    patch.object(validator, 'RECORDS_CHUNK_SIZE', 1):
+                result = SecurityValidator.validate_records(records, max_workers=max_workers)
+                self.assertEqual(result.valid, [True, False, True])
+                self.assertEqual(set(result.errors[1]), {'context', 'priority'})
+                self.assertIn("unhashable", result.errors[1]['context'])
+                self.assertEqual(result.sanitized['title'], ['a', 'b', 'c'])
+                self.assertEqual(result.sanitized['status'], [None, None, 'done'])
+
+
+def run_benchmark(sizes=(100, 1000, 10000, 100000)):
+    """Print reference vs single-pass timings for ASCII and non-ASCII inputs"""
+    ascii_unit = "Plain task description with some words and numbers 42. "
+    unicode_unit = "Beschreibung mit Umlauten: äöü, naïve café, 中文. "
+    for label, unit in [("ascii", ascii_unit), ("utf8", unicode_unit)]:
+        for size in sizes:
+            value = (unit * (size // len(unit) + 1))[:size]
+            number = max(1, 200000 // size)
+            reference = timeit.timeit(lambda: reference_validate_unicode_input(value), number=number) / number
+            current = timeit.timeit(lambda: SecurityValidator.validate_unicode_input(value), number=number) / number
+            print(f"{label:5} {size:>7} chars: reference {reference * 1e6:9.1f}us  "
+                  f"single-pass {current * 1e6:9.1f}us  ({reference / current:4.1f}x)")
+
+
+if __name__ == '__main__':
+    if "--bench" in sys.argv:
+        run_benchmark()
+        sys.exit(0)
+    unittest.main(verbosity=2)
@@ -12,10 +12,12 @@ Security Requirements:
 - Content length limits and format validation
 """
 
+import functools
 import unicodedata
 import re
-from typing import Optional, Dict, Any, List
-from dataclasses import dataclass
+from typing import Optional, Dict, Any, List, Callable, Iterable
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
 import logging
 
 logger = logging.getLogger(__name__)
@@ -27,9 +29,17 @@ MAX_TAG_LENGTH = 50
 MAX_TAGS_COUNT = 10
 MAX_WORKSPACE_LENGTH = 100
 
+# Batch validation tuning
+PARALLEL_RECORDS_THRESHOLD = 50000  # Use a process pool at or above this many records
+RECORDS_CHUNK_SIZE = 5000
+RECORDS_UNICODE_CACHE_SIZE = 4096  # Unicode results kept per chunk
+MAX_CACHEABLE_UNICODE_LENGTH = 256  # Longer values bypass the cache
+
 # Unicode security patterns
 CONTROL_CHARS = {chr(i) for i in range(32)} - {'\t', '\n', '\r'}
 ZERO_WIDTH_CHARS = {'\u200B', '\u200C', '\u200D', '\uFEFF'}  # BOM
+BLOCKED_UNICODE_CATEGORIES = frozenset({'Cf', 'Co', 'Cn'})  # Format, private use, unassigned
+ASCII_CONTROL_PATTERN = re.compile('[' + ''.join(re.escape(c) for c in sorted(CONTROL_CHARS)) + ']')
 
 # UUID v4 pattern
 UUID_V4_PATTERN = re.compile(
@@ -44,6 +54,28 @@ class ValidationResult:
     error_message: Optional[str] = None
     sanitized_value: Optional[str] = None
 
+@dataclass
+class RecordValidationResult:
+    """Columnar result of batch record validation (one entry per record)"""
+    valid: List[bool] = field(default_factory=list)
+    errors: List[Dict[str, str]] = field(default_factory=list)
+    sanitized: Dict[str, List[Any]] = field(default_factory=dict)
+
+    @property
+    def total(self) -> int:
+        return len(self.valid)
+
+    @property
+    def valid_count(self) -> int:
+        return sum(self.valid)
+
+    def extend(self, other: 'RecordValidationResult') -> None:
+        """Append another result's columns to this one"""
+        self.valid.extend(other.valid)
+        self.errors.extend(other.errors)
+        for name, column in other.sanitized.items():
+            self.sanitized.setdefault(name, []).extend(column)
+
 class SecurityValidator:
     """
     Comprehensive input validation for HEE/HEER systems.
@@ -71,11 +103,29 @@ class SecurityValidator:
                 error_message="Input must be string type"
             )
 
+        # ASCII fast path: ASCII text is already NFC and can only contain
+        # blocked characters from the control range
+        if input_str.isascii():
+            if ASCII_CONTROL_PATTERN.search(input_str):
+                logger.warning("Control character detected in input")
+                return ValidationResult(
+                    is_valid=False,
+                    error_message="Control characters not allowed"
+                )
+            return ValidationResult(
+                is_valid=True,
+                sanitized_value=input_str
+            )
+
         # Unicode normalization (NFC form required)
         normalized = unicodedata.normalize('NFC', input_str)
 
+        # Classify each distinct character once instead of walking the whole
+        # string once per rule
+        distinct_chars = set(normalized)
+
         # Control character blocking (except tab, newline, carriage return)
-        if any(c in CONTROL_CHARS for c in normalized):
+        if not distinct_chars.isdisjoint(CONTROL_CHARS):
             logger.warning("Control character detected in input")
             return ValidationResult(
                 is_valid=False,
@@ -83,23 +133,26 @@ class SecurityValidator:
             )
 
         # Zero-width character detection
-        if any(c in ZERO_WIDTH_CHARS for c in normalized):
+        if not distinct_chars.isdisjoint(ZERO_WIDTH_CHARS):
             logger.warning("Zero-width character detected in input")
             return ValidationResult(
                 is_valid=False,
                 error_message="Zero-width characters not allowed"
             )
 
-        # Check for suspicious unicode categories
-        for char in normalized:
-            category = unicodedata.category(char)
-            # Block format characters and private use
-            if category.startswith(('Cf', 'Co', 'Cn')):
-                logger.warning(f"Suspicious unicode category {category} in input")
-                return ValidationResult(
-                    is_valid=False,
-                    error_message=f"Unicode category {category} not allowed"
-                )
+        # Check for suspicious unicode categories (format characters, private
+        # use, unassigned); ASCII characters never fall in these categories
+        if any(unicodedata.category(char) in BLOCKED_UNICODE_CATEGORIES
+               for char in distinct_chars if not char.isascii()):
+            # Report the first offending character in input order
+            for char in normalized:
+                category = unicodedata.category(char)
+                if category in BLOCKED_UNICODE_CATEGORIES:
+                    logger.warning(f"Suspicious unicode category {category} in input")
+                    return ValidationResult(
+                        is_valid=False,
+                        error_message=f"Unicode category {category} not allowed"
+                    )
 
         return ValidationResult(
             is_valid=True,
@@ -107,18 +160,23 @@ class SecurityValidator:
         )
 
     @staticmethod
-    def validate_task_title(title: str) -> ValidationResult:
+    def validate_task_title(title: str,
+                            unicode_validator: Optional[Callable[[str], ValidationResult]] = None) -> ValidationResult:
         """
         Validate task title against HEE/HEER requirements.
 
         Args:
             title: Task title to validate
+            unicode_validator: Optional replacement for validate_unicode_input
+                (used by batch validation to reuse normalization results)
 
         Returns:
             ValidationResult with validation status
         """
+        unicode_validator = unicode_validator or SecurityValidator.validate_unicode_input
+
         # Unicode validation first
-        unicode_result = SecurityValidator.validate_unicode_input(title)
+        unicode_result = unicode_validator(title)
         if not unicode_result.is_valid:
             return unicode_result
 
@@ -150,18 +208,23 @@ class SecurityValidator:
         )
 
     @staticmethod
-    def validate_task_description(description: str) -> ValidationResult:
+    def validate_task_description(description: str,
+                                  unicode_validator: Optional[Callable[[str], ValidationResult]] = None) -> ValidationResult:
         """
         Validate task description against HEE/HEER requirements.
 
         Args:
             description: Task description to validate
+            unicode_validator: Optional replacement for validate_unicode_input
+                (used by batch validation to reuse normalization results)
 
         Returns:
             ValidationResult with validation status
         """
+        unicode_validator = unicode_validator or SecurityValidator.validate_unicode_input
+
         # Unicode validation first
-        unicode_result = SecurityValidator.validate_unicode_input(description)
+        unicode_result = unicode_validator(description)
         if not unicode_result.is_valid:
             return unicode_result
 
@@ -180,12 +243,15 @@ class SecurityValidator:
         )
 
     @staticmethod
-    def validate_task_tags(tags: List[str]) -> ValidationResult:
+    def validate_task_tags(tags: List[str],
+                           unicode_validator: Optional[Callable[[str], ValidationResult]] = None) -> ValidationResult:
         """
         Validate task tags against HEE/HEER requirements.
 
         Args:
             tags: List of tag strings to validate
+            unicode_validator: Optional replacement for validate_unicode_input
+                (used by batch validation to reuse normalization results)
 
         Returns:
             ValidationResult with validation status
@@ -202,12 +268,13 @@ class SecurityValidator:
                 error_message=f"Too many tags (max {MAX_TAGS_COUNT})"
             )
 
+        unicode_validator = unicode_validator or SecurityValidator.validate_unicode_input
         validated_tags = []
         seen_tags = set()
 
         for tag in tags:
             # Unicode validation
-            unicode_result = SecurityValidator.validate_unicode_input(tag)
+            unicode_result = unicode_validator(tag)
             if not unicode_result.is_valid:
                 return ValidationResult(
                     is_valid=False,
@@ -271,12 +338,15 @@ class SecurityValidator:
         return ValidationResult(is_valid=True)
 
     @staticmethod
-    def validate_workspace_name(workspace: str) -> ValidationResult:
+    def validate_workspace_name(workspace: str,
+                                unicode_validator: Optional[Callable[[str], ValidationResult]] = None) -> ValidationResult:
         """
         Validate workspace name against HEE/HEER requirements.
 
         Args:
             workspace: Workspace name to validate
+            unicode_validator: Optional replacement for validate_unicode_input
+                (used by batch validation to reuse normalization results)
 
         Returns:
             ValidationResult with validation status
@@ -284,8 +354,10 @@ class SecurityValidator:
         if not workspace:  # Empty string is allowed (optional field)
             return ValidationResult(is_valid=True, sanitized_value="")
 
+        unicode_validator = unicode_validator or SecurityValidator.validate_unicode_input
+
         # Unicode validation
-        unicode_result = SecurityValidator.validate_unicode_input(workspace)
+        unicode_result = unicode_validator(workspace)
         if not unicode_result.is_valid:
             return unicode_result
 
@@ -366,6 +438,115 @@ class SecurityValidator:
 
         return ValidationResult(is_valid=True)
 
+    @staticmethod
+    def validate_records(records: Iterable[Dict[str, Any]],
+                         max_workers: Optional[int] = None) -> RecordValidationResult:
+        """
+        Validate every field of many task records in one pass.
+
+        Unicode validation results of short values are shared across each
+        chunk in a bounded LRU cache, so repeated titles, tags and workspace
+        names are normalized once. Inputs of
+        PARALLEL_RECORDS_THRESHOLD records or more are split into chunks and
+        validated across a process pool.
+
+        Args:
+            records: Iterable of task record dictionaries
+            max_workers: Process pool size (default: os.cpu_count())
+
+        Returns:
+            RecordValidationResult with a valid mask, per-record field errors
+            and a column of sanitized values per field
+        """
+        records = list(records)
+
+        if len(records) < PARALLEL_RECORDS_THRESHOLD or max_workers == 1:
+            return _validate_record_chunk(records)
+
+        chunks = [records[i:i + RECORDS_CHUNK_SIZE]
+                  for i in range(0, len(records), RECORDS_CHUNK_SIZE)]
+
+        result = RecordValidationResult(sanitized={name: [] for name in RECORD_FIELD_VALIDATORS})
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            for chunk_result in executor.map(_validate_record_chunk, chunks):
+                result.extend(chunk_result)
+
+        return result
+
+# Field name -> validator for batch record validation. Validators taking a
+# unicode_validator share the batch normalization cache.
+RECORD_FIELD_VALIDATORS = {
+    'id': (SecurityValidator.validate_uuid, False),
+    'title': (SecurityValidator.validate_task_title, True),
+    'description': (SecurityValidator.validate_task_description, True),
+    'tags': (SecurityValidator.validate_task_tags, True),
+    'workspace': (SecurityValidator.validate_workspace_name, True),
+    'context': (SecurityValidator.validate_context_enum, False),
+    'priority': (SecurityValidator.validate_priority_enum, False),
+    'status': (SecurityValidator.validate_status_enum, False),
+}
+REQUIRED_RECORD_FIELDS = ('title',)
+
+def _validate_record_chunk(records: List[Dict[str, Any]]) -> RecordValidationResult:
+    """
+    Validate a list of records in the current process.
+
+    Kept at module level so it can be dispatched to a process pool.
+    """
+    unicode_cache = functools.lru_cache(maxsize=RECORDS_UNICODE_CACHE_SIZE)(SecurityValidator.validate_unicode_input)
+
+    def cached_unicode_validator(value: str) -> ValidationResult:
+        # Short values (titles, tags, workspaces) repeat; long or mostly
+        # unique ones would only grow the cache
+        if not isinstance(value, str) or len(value) > MAX_CACHEABLE_UNICODE_LENGTH:
+            return SecurityValidator.validate_unicode_input(value)
+        return unicode_cache(value)
+
+    result = RecordValidationResult(sanitized={name: [] for name in RECORD_FIELD_VALIDATORS})
+
+    for record in records:
+        record_errors = {}
+
+        if not isinstance(record, dict):
+            record_errors['record'] = "Record must be a dictionary"
+            record = {}
+
+        for name in REQUIRED_RECORD_FIELDS:
+            if name not in record and 'record' not in record_errors:
+                record_errors[name] = f"Missing required field: {name}"
+
+        for name, (validator, shares_unicode) in RECORD_FIELD_VALIDATORS.items():
+            column = result.sanitized[name]
+            if name not in record:
+                column.append(None)
+                continue
+
+            value = record[name]
+            # A value of the wrong type (e.g. an unhashable enum value) fails
+            # its own field, not the rest of the batch
+            try:
+                if shares_unicode:
+                    field_result = validator(value, unicode_validator=cached_unicode_validator)
+                else:
+                    field_result = validator(value)
+            except Exception as e:
+                logger.warning(f"Validator for field {name} raised {type(e).__name__}")
+                field_result = ValidationResult(
+                    is_valid=False,
+                    error_message=f"Invalid value for {name}: {e}"
+                )
+
+            if field_result.is_valid:
+                column.append(value if field_result.sanitized_value is None else field_result.sanitized_value)
+            else:
+                record_errors[name] = field_result.error_message
+                column.append(None)
+
+        result.valid.append(not record_errors)
+        result.errors.append(record_errors)
+
+    return result
+
 # Security test vectors (as defined in SECURITY.md)
 SECURITY_TEST_VECTORS = [
     # Unicode attacks
@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+Approval Daemon Client
+Asks a running approval_daemon.py for decisions over its Unix socket.
+Standard library only, so a hook process starts without yaml or the policy
+engine; every failure returns None and the caller evaluates in-process.
+"""
+
+import json
+import os
+import socket
+import sys
+
+DEFAULT_SOCKET_PATH = "var/smart-approval/approval.sock"
+SOCKET_ENV_VAR = "SMART_APPROVAL_SOCKET"
+REQUEST_TIMEOUT_SECONDS = 5.0
+
+def socket_path(path=None):
+    """Socket path: explicit, else $SMART_APPROVAL_SOCKET, else the default"""
+    return str(path or os.environ.get(SOCKET_ENV_VAR) or DEFAULT_SOCKET_PATH)
+
+def request(message, path=None, timeout=REQUEST_TIMEOUT_SECONDS):
+    """
+    Send one JSON message to the daemon and return its reply.
+
+    Returns:
+        dict or None: The reply, or None if no daemon answered or it
+        replied with an error
+    """
+    path = socket_path(path)
+    try:
+        # Only trust a socket created by this user
+        if os.stat(path).st_uid != os.getuid():
+            return None
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.settimeout(timeout)
+            sock.connect(path)
+            sock.sendall(json.dumps(message, default=str).encode() + b"\n")
+            with sock.makefile('rb') as reader:
+                reply = json.loads(reader.readline())
+    except (OSError, ValueError):
+        return None
+    if not isinstance(reply, dict) or "error" in reply:
+        return None
+    return reply
+
+def request_decision(command_string, context=None, cwd=None, path=None):
+    """Cline-format decision for a command from the daemon, or None"""
+    return request({
+        "op": "evaluate",
+        "command": command_string,
+        "cwd": cwd or os.getcwd(),
+        "context": context or {}
+    }, path)
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        print("Usage: python approval_client.py 'command to evaluate'")
+        sys.exit(1)
+
+    decision = request_decision(sys.argv[1])
+    if decision is None:
+        print(f"No approval daemon listening on {socket_path()}", file=sys.stderr)
+        sys.exit(2)
+
+    print(json.dumps(decision, indent=2))
+    sys.exit(1 if decision["requires_approval"] else 0)
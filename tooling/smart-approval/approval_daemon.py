@@ -0,0 +1,195 @@
+#!/usr/bin/env python3
+"""
+Smart Approval Decision Daemon
+Keeps a ClineSmartApprovalAdapter warm behind a Unix socket, so the approval
+hook pays neither interpreter startup for the policy engine nor YAML parsing
+per command, and reloads the safety profiles when the file changes.
+
+Protocol: one JSON object per line in each direction.
+    {"op": "evaluate", "command": "ls -la", "cwd": "/abs/dir", "context": {}}
+    {"op": "ping"}
+
+Usage:
+    python tooling/smart-approval/approval_daemon.py [--socket PATH] [--profiles PATH]
+"""
+
+import argparse
+import json
+import os
+import signal
+import socketserver
+import sys
+import threading
+from pathlib import Path
+
+# Add smart approval to path
+sys.path.insert(0, str(Path(__file__).parent))
+
+from approval_client import request, socket_path
+from cline_adapter import ClineSmartApprovalAdapter, to_cline_decision
+from prototype import CommandSafetyEvaluator, default_profiles_path
+
+# Longest request line accepted from a client
+MAX_REQUEST_BYTES = 1 << 20
+
+class ApprovalService:
+    """
+    Answers protocol messages from a warm adapter.
+
+    The profiles file is stat()ed before each evaluation; a new mtime, size
+    or inode rebuilds the evaluator, and with it its decision cache. If the
+    new profiles fail to load, the previous policy stays active until the
+    file changes again.
+    """
+
+    def __init__(self, profiles_path=None, log_path=None):
+        """
+        Args:
+            profiles_path: Safety profiles file (default: next to prototype.py)
+            log_path: Decision transcript (default: the adapter's)
+        """
+        self.profiles_path = Path(profiles_path or default_profiles_path())
+        self._profiles_stat = self._stat_profiles()
+        self.adapter = ClineSmartApprovalAdapter(log_path=log_path, profiles_path=self.profiles_path)
+        self.requests = 0
+        self.reloads = 0
+
+        # The evaluator's git-status cache and the transcript are not thread-safe
+        self._lock = threading.Lock()
+
+    def _stat_profiles(self):
+        try:
+            stat = os.stat(self.profiles_path)
+        except OSError:
+            return None
+        return (stat.st_mtime_ns, stat.st_size, stat.st_ino)
+
+    def reload_if_changed(self):
+        """Rebuild the evaluator if the profiles file changed; True if reloaded"""
+        current = self._stat_profiles()
+        if current == self._profiles_stat:
+            return False
+
+        self._profiles_stat = current
+        try:
+            self.adapter.evaluator = CommandSafetyEvaluator(self.profiles_path)
+        except Exception as e:
+            print(f"Warning: keeping previous safety profiles, reload of {self.profiles_path} failed: {e}",
+                  file=sys.stderr)
+            return False
+        self.reloads += 1
+        return True
+
+    def handle(self, message):
+        """Reply to one decoded protocol message"""
+        if not isinstance(message, dict):
+            return {"error": "request must be a JSON object"}
+
+        op = message.get("op", "evaluate")
+        if op == "ping":
+            evaluator = self.adapter.evaluator
+            return {"ok": True, "pid": os.getpid(), "requests": self.requests, "reloads": self.reloads,
+                    "policy_version": evaluator.policy_version, "decision_cache": evaluator.decision_cache.stats()}
+        if op != "evaluate":
+            return {"error": f"unknown op: {op}"}
+
+        command = message.get("command")
+        cwd = message.get("cwd")
+        if not isinstance(command, str):
+            return {"error": "command must be a string"}
+        if not isinstance(cwd, str) or not os.path.isabs(cwd):
+            return {"error": "cwd must be an absolute path"}
+
+        with self._lock:
+            self.requests += 1
+            self.reload_if_changed()
+            result = self.adapter.evaluate_command(command, message.get("context") or {}, cwd)
+        return to_cline_decision(result)
+
+class ApprovalRequestHandler(socketserver.StreamRequestHandler):
+    """Serves newline-delimited JSON requests until the client disconnects"""
+
+    def handle(self):
+        while True:
+            line = self.rfile.readline(MAX_REQUEST_BYTES + 1)
+            if not line:
+                return
+            if len(line) > MAX_REQUEST_BYTES:
+                self._reply({"error": "request too large"})
+                return
+            try:
+                reply = self.server.service.handle(json.loads(line))
+            except ValueError as e:
+                reply = {"error": f"invalid request: {e}"}
+            except Exception as e:
+                # The client falls back to evaluating in-process
+                reply = {"error": f"evaluation failed: {e}"}
+            self._reply(reply)
+
+    def _reply(self, reply):
+        self.wfile.write(json.dumps(reply).encode() + b"\n")
+
+class ApprovalServer(socketserver.ThreadingUnixStreamServer):
+    """Unix socket server, readable and writable by the owner only"""
+
+    daemon_threads = True
+
+    def __init__(self, path, service):
+        self.service = service
+        path = socket_path(path)
+        claim_socket_path(path)
+
+        old_umask = os.umask(0o177)
+        try:
+            super().__init__(path, ApprovalRequestHandler)
+        finally:
+            os.umask(old_umask)
+
+    def server_close(self):
+        super().server_close()
+        try:
+            os.unlink(self.server_address)
+        except OSError:
+            pass
+
+def claim_socket_path(path):
+    """
+    Make path available for binding.
+
+    Removes a socket left behind by a daemon that died, and refuses to
+    replace one that still answers.
+    """
+    Path(path).parent.mkdir(parents=True, exist_ok=True)
+    if not os.path.lexists(path):
+        return
+    if request({"op": "ping"}, path) is not None:
+        raise RuntimeError(f"An approval daemon is already listening on {path}")
+    os.unlink(path)
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve smart approval decisions over a Unix socket")
+    parser.add_argument("--socket", help="Socket path (default: $SMART_APPROVAL_SOCKET or var/smart-approval/approval.sock)")
+    parser.add_argument("--profiles", help="Safety profiles file (default: next to prototype.py)")
+    parser.add_argument("--transcript", help="Decision transcript (default: var/smart-approval/transcript.jsonl)")
+    args = parser.parse_args()
+
+    try:
+        service = ApprovalService(args.profiles, Path(args.transcript) if args.transcript else None)
+        server = ApprovalServer(args.socket, service)
+    except Exception as e:
+        print(f"Error starting approval daemon: {e}", file=sys.stderr)
+        sys.exit(1)
+
+    # SIGTERM unwinds through serve_forever like Ctrl-C, removing the socket
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+    print(f"Approval daemon listening on {server.server_address} (profiles: {service.profiles_path})")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        service.adapter.transcript.close()
+
+if __name__ == "__main__":
+    main()
@@ -3,8 +3,9 @@
 
 import argparse
 import sys
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Optional, Sequence, Union
 
 # Add the lib directory to path so we can import our modules
 sys.path.insert(0, str(Path(__file__).parent / "lib"))
@@ -12,96 +13,107 @@ sys.path.insert(0, str(Path(__file__).parent / "lib"))
 from lib.ingest import DataIngestor
 from lib.transform import MetricsAggregator
 from lib.render.base import RendererConfig, renderer_registry
+from lib.render.view_model import build_view_model
 
 
 def build_dashboard_bundle(
     data_path: str,
     output_path: str,
-    renderer_name: str = "plotly_static",
-    views: Optional[list] = None
+    renderer_names: Union[str, Sequence[str]] = "plotly_static",
+    views: Optional[list] = None,
+    jobs: Optional[int] = None
 ) -> Dict[str, Any]:
     """Build a complete dashboard bundle from metrics data.
 
+    Data is ingested and transformed once, into one immutable view model
+    that every requested renderer formats; the views of all renderers and
+    the JSON artifacts are written concurrently.
+
     Args:
         data_path: Path to directory containing transcript and metrics files
         output_path: Path where dashboard files should be written
-        renderer_name: Name of renderer to use
+        renderer_names: Name, or names, of the renderers to use
         views: List of views to generate (default: all supported views)
+        jobs: Threads rendering views (default: one per view, up to 8)
 
     Returns:
         Dictionary with build results and metadata
     """
+    if isinstance(renderer_names, str):
+        renderer_names = [renderer_names]
+    renderer_names = list(dict.fromkeys(renderer_names))
+
     print(f"Building dashboard bundle from: {data_path}")
     print(f"Output path: {output_path}")
-    print(f"Using renderer: {renderer_name}")
+    print(f"Using renderers: {', '.join(renderer_names)}")
+
+    # Resolve renderers and their views before any data is read
+    config = RendererConfig(output_path)
+    renderers = {}
+    views_to_render = {}
+    for renderer_name in renderer_names:
+        renderer = renderer_registry.get_renderer(renderer_name, config)
+        if not renderer:
+            available = renderer_registry.list_available_renderers()
+            raise ValueError(f"Renderer '{renderer_name}' not found. Available: {available}")
+
+        supported_views = renderer.get_supported_views()
+        if views is None:
+            renderer_views = supported_views
+        else:
+            renderer_views = [v for v in views if v in supported_views]
+            if not renderer_views:
+                raise ValueError(f"None of the requested views {views} are supported by {renderer_name}")
+        renderers[renderer_name] = renderer
+        views_to_render[renderer_name] = renderer_views
 
     # Step 1: Ingest data
     print("Step 1: Ingesting data...")
     ingestor = DataIngestor(data_path)
     ingested_data = ingestor.ingest_all_data()
-    print(f"  - Processed {len(ingested_data['transcripts'])} transcripts")
-    print(f"  - Extracted {len(ingested_data['events'])} events")
+    print(f"  - Found {len(ingested_data['transcripts'])} transcripts, {len(ingested_data['capsules'])} capsules")
 
-    # Step 2: Transform data
+    # Step 2: Transform data (events are read and validated as they are aggregated)
     print("Step 2: Transforming data...")
     aggregator = MetricsAggregator()
     processed_data = aggregator.process_ingested_data(ingested_data)
-    print("  - Computed metrics and aggregations")
-
-    # Step 3: Render views
-    print("Step 3: Rendering views...")
-
-    # Get renderer
-    config = RendererConfig(output_path)
-    renderer = renderer_registry.get_renderer(renderer_name, config)
-
-    if not renderer:
-        available = renderer_registry.list_available_renderers()
-        raise ValueError(f"Renderer '{renderer_name}' not found. Available: {available}")
-
-    # Determine which views to render
-    supported_views = renderer.get_supported_views()
-    if views is None:
-        views_to_render = supported_views
-    else:
-        views_to_render = [v for v in views if v in supported_views]
-        if not views_to_render:
-            raise ValueError(f"None of the requested views {views} are supported by {renderer_name}")
-
-    print(f"  - Rendering views: {views_to_render}")
-
-    # Render each view
-    rendered_files = {}
-    for view in views_to_render:
-        print(f"    - Rendering {view} view...")
-        if view == "overview":
-            output_file = renderer.render_overview_view(processed_data)
-        elif view == "decisions":
-            output_file = renderer.render_decisions_view(processed_data)
-        elif view == "replay_health":
-            output_file = renderer.render_replay_health_view(processed_data)
-        else:
-            print(f"      Warning: Unknown view '{view}', skipping")
-            continue
-
-        rendered_files[view] = output_file
-        print(f"      -> {output_file}")
-
-    # Step 4: Generate additional artifacts
-    print("Step 4: Generating additional artifacts...")
-
+    info = processed_data['ingestion_info']
+    print(f"  - Extracted {info['events']} events from {info['lines']} lines")
+    if info['rejected'] or info['malformed']:
+        print(f"  - Skipped {info['rejected']} invalid events, {info['malformed']} malformed lines")
+        for error in info['errors']:
+            print(f"      {error}")
+    view_model = build_view_model(processed_data)
+    print("  - Computed metrics, aggregations and view model")
+
+    # Step 3: Render views and artifacts
+    print("Step 3: Rendering views and artifacts...")
     output_dir = Path(output_path)
+    tasks = [(renderer_name, view) for renderer_name in renderers for view in views_to_render[renderer_name]]
+    for renderer_name in renderers:
+        print(f"  - {renderer_name}: {views_to_render[renderer_name]}")
+
+    workers = jobs or min(len(tasks) + 2, 8)
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="render") as executor:
+        rendered = [executor.submit(renderers[renderer_name].render_view, view, view_model)
+                    for renderer_name, view in tasks]
+        metrics_future = executor.submit(_generate_metrics_bundle, processed_data, output_dir)
+        alerts_future = executor.submit(_generate_alerts_bundle, processed_data, output_dir)
+
+        # Every task finishes before the pool exits; the first failure is raised
+        rendered_files = {renderer_name: {} for renderer_name in renderers}
+        for (renderer_name, view), future in zip(tasks, rendered):
+            rendered_files[renderer_name][view] = future.result()
+            print(f"    - {renderer_name} {view} -> {rendered_files[renderer_name][view]}")
+        metrics_bundle = metrics_future.result()
+        alerts_bundle = alerts_future.result()
 
-    # Generate metrics JSON bundle
-    metrics_bundle = _generate_metrics_bundle(processed_data, output_dir)
     print(f"  - Metrics bundle: {metrics_bundle}")
-
-    # Generate alerts JSON bundle
-    alerts_bundle = _generate_alerts_bundle(processed_data, output_dir)
     print(f"  - Alerts bundle: {alerts_bundle}")
 
     # Generate index HTML if overview exists
-    if "overview" in rendered_files:
+    index_file = None
+    if any("overview" in files for files in rendered_files.values()):
         index_file = _generate_index_html(output_dir, rendered_files)
         print(f"  - Index file: {index_file}")
 
@@ -113,9 +125,9 @@ def build_dashboard_bundle(
         'artifacts': {
             'metrics_bundle': metrics_bundle,
             'alerts_bundle': alerts_bundle,
-            'index_file': index_file if "overview" in rendered_files else None
+            'index_file': index_file
         },
-        'renderer': renderer_name,
+        'renderers': list(renderers),
         'views': views_to_render
     }
 
@@ -185,7 +197,7 @@ def _generate_alerts_bundle(processed_data: Dict[str, Any], output_dir: Path) ->
     return str(alerts_file)
 
 
-def _generate_index_html(output_dir: Path, rendered_files: Dict[str, str]) -> str:
+def _generate_index_html(output_dir: Path, rendered_files: Dict[str, Dict[str, str]]) -> str:
     """Generate main index.html that links to all views."""
     index_file = output_dir / "index.html"
 
@@ -301,6 +313,7 @@ Examples:
   %(prog)s /path/to/data /path/to/output
   %(prog)s /path/to/data /path/to/output --renderer plotly_static --views overview decisions
   %(prog)s /path/to/data /path/to/output --renderer json_bundle
+  %(prog)s /path/to/data /path/to/output --renderer plotly_static json_bundle markdown_report
         """
     )
 
@@ -316,9 +329,10 @@ Examples:
 
     parser.add_argument(
         '--renderer',
-        default='plotly_static',
+        nargs='+',
+        default=['plotly_static'],
         choices=renderer_registry.list_available_renderers(),
-        help='Renderer to use for generating visualizations (default: plotly_static)'
+        help='Renderers to use for generating visualizations, all from one ingest (default: plotly_static)'
     )
 
     parser.add_argument(
@@ -327,6 +341,12 @@ Examples:
         help='Specific views to generate (default: all supported views)'
     )
 
+    parser.add_argument(
+        '--jobs',
+        type=int,
+        help='Threads rendering views (default: one per view, up to 8)'
+    )
+
     parser.add_argument(
         '--list-renderers',
         action='store_true',
@@ -360,18 +380,21 @@ Examples:
             str(data_path),
             str(output_path),
             args.renderer,
-            args.views
+            args.views,
+            args.jobs
         )
 
+        rendered_count = sum(len(files) for files in result['rendered_files'].values())
         print("\nBuild Summary:")
-        print(f"  Renderer: {result['renderer']}")
-        print(f"  Views generated: {', '.join(result['views'])}")
-        print(f"  Files created: {len(result['rendered_files']) + len(result['artifacts'])}")
+        for renderer_name in result['renderers']:
+            print(f"  Renderer {renderer_name}: {', '.join(result['views'][renderer_name])}")
+        print(f"  Files created: {rendered_count + sum(1 for path in result['artifacts'].values() if path)}")
 
         # Print file locations
         print("\nGenerated files:")
-        for view, file_path in result['rendered_files'].items():
-            print(f"  - {view}: {file_path}")
+        for renderer_name, files in result['rendered_files'].items():
+            for view, file_path in files.items():
+                print(f"  - {renderer_name} {view}: {file_path}")
 
         for artifact_name, file_path in result['artifacts'].items():
             if file_path:
@@ -13,27 +13,40 @@ from pathlib import Path
 # Add smart approval to path
 sys.path.insert(0, str(Path(__file__).parent))
 
-from prototype import CommandSafetyEvaluator
+from approval_client import request_decision
+from transcript_writer import TranscriptWriter, iter_transcript_lines
 
 class ClineSmartApprovalAdapter:
     """Adapter that integrates smart approval with Cline's approval workflow"""
 
-    def __init__(self, log_path=None):
-        self.evaluator = CommandSafetyEvaluator()
-        self.log_path = log_path or Path("var/smart-approval/transcript.jsonl")
+    def __init__(self, log_path=None, profiles_path=None):
+        # Imported here so the daemon fast path in cline_approval_hook does
+        # not pay for yaml and the policy engine
+        from prototype import CommandSafetyEvaluator
+
+        self.evaluator = CommandSafetyEvaluator(profiles_path)
+        self.log_path = Path(log_path or "var/smart-approval/transcript.jsonl")
         self.log_path.parent.mkdir(parents=True, exist_ok=True)
 
         # Initialize transcript if it doesn't exist
         if not self.log_path.exists():
             self.log_path.touch()
 
-    def evaluate_command(self, command_string, context=None):
+        # Decisions are appended in batches, and each batch is folded into
+        # the rollup store the dashboards read
+        from rollup_store import RollupStore, default_rollups_path
+
+        self.rollups = RollupStore(default_rollups_path(self.log_path))
+        self.transcript = TranscriptWriter(self.log_path, on_flush=lambda: self.rollups.update(self.log_path))
+
+    def evaluate_command(self, command_string, context=None, cwd=None):
         """
         Evaluate command and return Cline-compatible approval decision
 
         Args:
             command_string: The command to evaluate
             context: Optional context dict (working_dir, user, etc.)
+            cwd: Directory the command runs in (default: current directory)
 
         Returns:
             dict: {
@@ -44,14 +57,18 @@ class ClineSmartApprovalAdapter:
             }
         """
         # Evaluate with smart approval engine
-        result = self.evaluator.evaluate_command(command_string)
+        cwd = cwd or os.getcwd()
+        result, cache_hit = self.evaluator.evaluate(command_string, cwd)
+        result["requires_approval"] = result["approval_required"]
 
         # Enhance result with additional context
         result["decision_details"] = {
             "command": command_string,
             "timestamp": datetime.utcnow().isoformat() + "Z",
-            "working_directory": os.getcwd(),
+            "working_directory": cwd,
             "evaluator_version": "1.0",
+            "policy_version": self.evaluator.policy_version,
+            "cache_hit": cache_hit,
             "context": context or {}
         }
 
@@ -61,23 +78,21 @@ class ClineSmartApprovalAdapter:
         return result
 
     def _log_decision(self, decision):
-        """Log decision to JSON Lines transcript"""
+        """Queue decision for the JSON Lines transcript"""
         try:
-            with open(self.log_path, 'a') as f:
-                json.dump(decision, f)
-                f.write('\n')
+            self.transcript.write(decision)
         except Exception as e:
             # Fail gracefully - don't break command execution
             print(f"Warning: Failed to log approval decision: {e}", file=sys.stderr)
 
     def get_transcript_summary(self):
-        """Get summary statistics from transcript"""
+        """Get summary statistics from transcript, rotated segments included"""
         try:
+            self.transcript.flush()
             decisions = []
-            with open(self.log_path, 'r') as f:
-                for line in f:
-                    if line.strip():
-                        decisions.append(json.loads(line))
+            for line in iter_transcript_lines(self.log_path):
+                if line.strip():
+                    decisions.append(json.loads(line))
 
             total = len(decisions)
             approved = sum(1 for d in decisions if not d.get("requires_approval", True))
@@ -92,25 +107,33 @@ class ClineSmartApprovalAdapter:
         except Exception:
             return {"error": "Failed to read transcript"}
 
+def to_cline_decision(result):
+    """Convert an adapter result to Cline's expected format"""
+    return {
+        "requires_approval": result["requires_approval"],
+        "reason": result["reason"],
+        "confidence": result["confidence"],
+        "details": result["decision_details"]
+    }
+
 # Cline Integration Hook
 # This would be called by Cline before command execution
 def cline_approval_hook(command_string, **kwargs):
     """
     Cline approval hook that integrates smart approval workflow
 
+    Asks the approval daemon (approval_daemon.py) when one is running, and
+    falls back to evaluating in-process otherwise.
+
     Returns:
         dict: Cline-compatible approval decision
     """
-    adapter = ClineSmartApprovalAdapter()
-    result = adapter.evaluate_command(command_string, kwargs)
+    decision = request_decision(command_string, kwargs)
+    if decision is not None:
+        return decision
 
-    # Convert to Cline's expected format
-    return {
-        "requires_approval": result["requires_approval"],
-        "reason": result["reason"],
-        "confidence": result["confidence"],
-        "details": result["decision_details"]
-    }
+    adapter = ClineSmartApprovalAdapter()
+    return to_cline_decision(adapter.evaluate_command(command_string, kwargs))
 
 if __name__ == "__main__":
     # CLI testing interface
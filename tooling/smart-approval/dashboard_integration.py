@@ -5,14 +5,28 @@ Surfaces daily metrics and alerts in monitoring dashboard.
 """
 
 import json
+import sys
 from pathlib import Path
-from datetime import datetime
+from datetime import datetime, timedelta, timezone
+
+# Add smart approval to path
+sys.path.insert(0, str(Path(__file__).parent))
+
+from rollup_store import RollupStore, default_rollups_path
+
+# History per timeseries resolution, in days
+TIMESERIES_DAYS = {
+    "minutely": 1,
+    "hourly": 90,
+    "daily": 90,
+}
 
 class SmartApprovalDashboard:
     """Dashboard integration for smart approval workflow metrics"""
 
-    def __init__(self, metrics_path=None):
+    def __init__(self, metrics_path=None, rollups_path=None):
         self.metrics_path = Path(metrics_path or "var/smart-approval/metrics.json")
+        self.rollups = RollupStore(rollups_path or default_rollups_path("var/smart-approval/transcript.jsonl"))
 
     def get_dashboard_data(self):
         """Get metrics data formatted for dashboard consumption"""
@@ -33,7 +47,8 @@ class SmartApprovalDashboard:
                     "override_rate": metrics.get("rates", {}).get("override_rate", 0),
                     "alerts": metrics.get("alerts", []),
                     "top_reasons": self._get_top_reasons(metrics),
-                    "status": self._calculate_status(metrics)
+                    "status": self._calculate_status(metrics),
+                    "timeseries_data": self.get_timeseries_data()
                 }
             }
 
@@ -45,6 +60,19 @@ class SmartApprovalDashboard:
                 }
             }
 
+    def get_timeseries_data(self):
+        """
+        Per-minute, hourly and daily decision series from the rollup store.
+
+        Points carry counts, per-minute prompt/override/deny rates and
+        reason counts; see RollupStore.timeseries.
+        """
+        now = datetime.now(timezone.utc)
+        return {
+            name: self.rollups.timeseries(resolution, now - timedelta(days=TIMESERIES_DAYS[name]))
+            for name, resolution in [("minutely", "minute"), ("hourly", "hour"), ("daily", "day")]
+        }
+
     def _get_empty_dashboard_data(self):
         """Return empty dashboard data for new deployments"""
         return {
@@ -57,7 +85,8 @@ class SmartApprovalDashboard:
                 "override_rate": 0,
                 "alerts": [],
                 "top_reasons": [],
-                "status": "initializing"
+                "status": "initializing",
+                "timeseries_data": self.get_timeseries_data()
             }
         }
 
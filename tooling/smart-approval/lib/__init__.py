@@ -0,0 +1 @@
+# Dashboard pipeline for smart approval metrics: ingest -> transform -> render
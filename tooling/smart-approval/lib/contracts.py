@@ -0,0 +1,188 @@
+"""JSON Schema contracts (contracts/*.schema.json) compiled into validators.
+
+Ingest validates every event, so a schema is compiled once into nested
+checks instead of being interpreted per document. Only the keywords the
+contracts use are supported; compiling a schema with any other keyword
+raises, so a contract cannot silently outgrow its validator.
+"""
+
+import json
+import re
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict
+
+CONTRACTS_DIR = Path(__file__).resolve().parent.parent / "contracts"
+
+# Keywords with no effect on validation
+_ANNOTATIONS = {"$schema", "$id", "$comment", "title", "description", "default", "examples"}
+
+def _is_number(value):
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+_TYPES = {
+    "object": lambda value: isinstance(value, dict),
+    "array": lambda value: isinstance(value, list),
+    "string": lambda value: isinstance(value, str),
+    "number": _is_number,
+    "integer": lambda value: (isinstance(value, int) and not isinstance(value, bool))
+    or (isinstance(value, float) and value.is_integer()),
+    "boolean": lambda value: isinstance(value, bool),
+    "null": lambda value: value is None,
+}
+
+_CLASSES = {
+    "object": (dict,),
+    "array": (list,),
+    "string": (str,),
+    "number": (int, float),
+    "integer": (int,),
+    "boolean": (bool,),
+    "null": (type(None),),
+}
+
+# check(document) raises ContractError at the first violation
+Check = Callable[[Any], None]
+
+
+class ContractError(ValueError):
+    """A document that does not satisfy a contract.
+
+    Attributes:
+        path: Where in the document, e.g. ".metadata" ("" for the document)
+        message: What is wrong there
+    """
+
+    def __init__(self, path: str, message: str):
+        super().__init__(path, message)
+        self.path = path
+        self.message = message
+
+    def __str__(self):
+        return f"${self.path}: {self.message}"
+
+
+def load_contract(name: str) -> Dict[str, Any]:
+    """Load contracts/<name>.schema.json."""
+    with open(CONTRACTS_DIR / f"{name}.schema.json", encoding='utf-8') as f:
+        return json.load(f)
+
+
+def compile_contract(name: str) -> Check:
+    """Compile contracts/<name>.schema.json; see compile_schema."""
+    return compile_schema(load_contract(name))
+
+
+_DATE_TIME = re.compile(r"[0-9]{4}-[0-9]{2}-[0-9]{2}[Tt][0-9]{2}:[0-9]{2}:[0-9]{2}(\.[0-9]+)?([Zz]|[+-][0-9]{2}:[0-9]{2})")
+
+
+def parse_date_time(value: str) -> datetime:
+    """Parse an RFC 3339 date-time into an aware datetime; raises ValueError."""
+    match = _DATE_TIME.fullmatch(value)
+    if match is None:
+        raise ValueError(f"Not an RFC 3339 date-time: {value!r}")
+    fraction, offset = match.groups()
+    # Python < 3.11 parses neither a 'Z' offset nor fractions other than 3 or 6 digits
+    if offset in ("Z", "z") or (fraction is not None and len(fraction) != 7):
+        fraction = (fraction + "00000")[:7] if fraction else ""
+        value = value[:19] + fraction + ("+00:00" if offset in ("Z", "z") else offset)
+    return datetime.fromisoformat(value)
+
+
+def is_date_time(value: str) -> bool:
+    """RFC 3339 date-time: a date, 'T', a time and a UTC offset or 'Z'."""
+    try:
+        parse_date_time(value)
+    except ValueError:
+        return False
+    return True
+
+
+_FORMATS = {"date-time": is_date_time}
+
+_KEYWORDS = {"type", "enum", "required", "properties", "additionalProperties", "items", "minimum", "maximum",
+             "format"}
+
+
+def _within(path, check, value):
+    """Run check on a part of a document, prefixing path to any violation"""
+    try:
+        check(value)
+    except ContractError as e:
+        raise ContractError(path + e.path, e.message) from None
+
+
+def compile_schema(schema: Dict[str, Any]) -> Check:
+    """Compile a JSON Schema (draft-07 subset) into a check.
+
+    Supported keywords: type, enum, required, properties,
+    additionalProperties, items, minimum, maximum and format (date-time;
+    other formats are annotations, as the draft allows). Keywords of a
+    type only constrain values of that type, as in the draft.
+
+    Args:
+        schema: Parsed schema
+
+    Returns:
+        check(document) that raises ContractError at the first violation
+
+    Raises:
+        ValueError: If the schema uses an unsupported keyword
+    """
+    unsupported = set(schema) - _ANNOTATIONS - _KEYWORDS
+    if unsupported:
+        raise ValueError(f"Unsupported schema keywords: {sorted(unsupported)}")
+
+    # Everything is folded into one closure: this runs for every property
+    # of every event, where a call per keyword costs more than the checks
+    names = schema.get("type", [])
+    names = names if isinstance(names, list) else [names]
+    type_checks = [_TYPES[name] for name in names]
+    # Classes that match outright; anything else (bool for number, 1.0 for
+    # integer, subclasses) goes through type_checks
+    classes = {cls for name in names for cls in _CLASSES[name]}
+    expected = " or ".join(names)
+
+    allowed = schema.get("enum")
+    bounded = "minimum" in schema or "maximum" in schema
+    minimum = schema.get("minimum", float("-inf"))
+    maximum = schema.get("maximum", float("inf"))
+    format_name = schema.get("format")
+    is_format = _FORMATS.get(format_name)
+    check_item = compile_schema(schema["items"]) if "items" in schema else None
+
+    is_object_schema = bool({"required", "properties", "additionalProperties"} & set(schema))
+    required = schema.get("required", [])
+    properties = {key: compile_schema(subschema) for key, subschema in schema.get("properties", {}).items()}
+    additional = schema.get("additionalProperties", True)
+    check_additional = compile_schema(additional) if isinstance(additional, dict) else None
+
+    def check(value):
+        if type_checks and value.__class__ not in classes and not any(is_type(value) for is_type in type_checks):
+            raise ContractError("", f"expected {expected}, got {type(value).__name__}")
+        if allowed is not None and value not in allowed:
+            raise ContractError("", f"{value!r} is not one of {allowed}")
+        if bounded and _is_number(value) and not minimum <= value <= maximum:
+            raise ContractError("", f"{value} is outside [{minimum}, {maximum}]")
+        if is_format is not None and isinstance(value, str) and not is_format(value):
+            raise ContractError("", f"{value!r} is not a {format_name}")
+        if check_item is not None and isinstance(value, list):
+            for index, item in enumerate(value):
+                _within(f"[{index}]", check_item, item)
+
+        if is_object_schema and isinstance(value, dict):
+            for key in required:
+                if key not in value:
+                    raise ContractError("", f"missing required property {key!r}")
+            for key, item in value.items():
+                check_property = properties.get(key, check_additional)
+                if check_property is not None:
+                    # Not _within(): the path is only formatted for a violation
+                    try:
+                        check_property(item)
+                    except ContractError as e:
+                        raise ContractError(f".{key}{e.path}", e.message) from None
+                elif additional is False:
+                    raise ContractError("", f"unexpected property {key!r}")
+    return check
@@ -0,0 +1,204 @@
+"""Streaming ingest of smart approval transcripts, events and state capsules.
+
+DataIngestor finds the JSON Lines transcripts under a data directory, with
+their rotated and gzipped segments, and the YAML state capsules next to
+them. Events are not loaded up front: ingest_all_data() returns an
+EventStream that reads and validates one line at a time, so memory does
+not grow with the size of the transcripts.
+
+Transcript lines are either events (contracts/events.schema.json) or
+decisions as logged by the Cline adapter, which are converted to events.
+"""
+
+import json
+import re
+import sys
+from datetime import date, datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Union
+
+import yaml
+
+# Add smart approval to path
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from transcript_writer import iter_transcript_lines
+from lib.contracts import ContractError, compile_contract
+
+# Sealed transcript segments (transcript.000001.jsonl[.gz]) are read
+# through their active transcript
+_SEGMENT = re.compile(r"(.+)\.\d{6}\.jsonl(?:\.gz)?")
+
+DENIED_REASON_PREFIX = "denied_pattern_"
+
+# Rejected lines whose errors are kept for the build report
+ERROR_SAMPLES = 10
+
+# json.loads() of bytes first sniffs their encoding; transcripts are UTF-8
+_decode_json = json.JSONDecoder().decode
+
+
+def decision_event(record: Dict[str, Any]) -> Dict[str, Any]:
+    """Event for a decision logged by the Cline adapter.
+
+    An overridden decision is an override_applied event, a command hitting
+    a denylist pattern a deny decision, any other command requiring
+    approval a prompt_processed event, and the rest approve decisions.
+    """
+    reason = record.get("reason")
+    if record.get("override_applied"):
+        event = {"event_type": "override_applied", "decision": "override"}
+    elif isinstance(reason, str) and reason.startswith(DENIED_REASON_PREFIX):
+        event = {"event_type": "decision_made", "decision": "deny"}
+    elif record.get("requires_approval", True):
+        event = {"event_type": "prompt_processed"}
+    else:
+        event = {"event_type": "decision_made", "decision": "approve"}
+
+    timestamp = record["decision_details"].get("timestamp")
+    if timestamp is not None:
+        event["timestamp"] = timestamp
+    if reason is not None:
+        event["reason"] = reason
+    if record.get("confidence") is not None:
+        event["confidence"] = record["confidence"]
+    if record.get("override_reason") is not None:
+        event["metadata"] = {"override_reason": record["override_reason"]}
+    return event
+
+
+class EventStream:
+    """Validated events of a set of transcripts, read lazily.
+
+    Each iteration re-reads the transcripts and recounts stats:
+        lines: Lines read
+        events: Events yielded
+        rejected: Lines that are not a valid event or adapter decision
+        malformed: Lines that are not a JSON object
+        partial: Unterminated lines, still being written
+
+    errors keeps the first ERROR_SAMPLES rejections as messages.
+    """
+
+    def __init__(self, transcripts: List[Path]):
+        self.transcripts = transcripts
+        self.stats = dict.fromkeys(("lines", "events", "rejected", "malformed", "partial"), 0)
+        self.errors = []
+        self._validate = compile_contract("events")
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        stats = self.stats = dict.fromkeys(self.stats, 0)
+        self.errors = []
+        validate = self._validate
+        for transcript in self.transcripts:
+            for line in iter_transcript_lines(transcript):
+                stats["lines"] += 1
+                if not line.endswith(b"\n"):
+                    stats["partial"] += 1
+                    continue
+                try:
+                    record = _decode_json(line.decode())
+                except ValueError:
+                    record = None
+                if not isinstance(record, dict):
+                    if line.strip():
+                        stats["malformed"] += 1
+                    continue
+
+                try:
+                    if "event_type" in record:
+                        event = record
+                    elif isinstance(record.get("decision_details"), dict):
+                        event = decision_event(record)
+                    else:
+                        raise ContractError("", "neither an event nor an adapter decision")
+                    validate(event)
+                except ContractError as e:
+                    stats["rejected"] += 1
+                    if len(self.errors) < ERROR_SAMPLES:
+                        self.errors.append(f"{transcript}: {e}")
+                    continue
+
+                stats["events"] += 1
+                yield event
+
+
+class DataIngestor:
+    """Finds and reads the data a dashboard is built from."""
+
+    def __init__(self, data_path: Union[str, Path]):
+        """
+        Args:
+            data_path: Directory searched recursively for transcripts
+                (*.jsonl) and state capsules (*.yaml, *.yml), or a single
+                transcript
+        """
+        self.data_path = Path(data_path)
+
+    def find_transcripts(self) -> List[Path]:
+        """Active transcripts, including ones of which only sealed segments remain."""
+        if self.data_path.is_file():
+            return [self.data_path]
+        transcripts = set()
+        for path in self.data_path.rglob("*.jsonl*"):
+            match = _SEGMENT.fullmatch(path.name)
+            if match:
+                transcripts.add(path.with_name(match.group(1) + ".jsonl"))
+            elif path.name.endswith(".jsonl"):
+                transcripts.add(path)
+        return sorted(transcripts)
+
+    def find_capsules(self) -> List[Path]:
+        """YAML state capsules."""
+        if self.data_path.is_file():
+            return []
+        return sorted(path for pattern in ("*.yaml", "*.yml") for path in self.data_path.rglob(pattern))
+
+    def phase_start(self, capsules: List[Path]) -> Optional[date]:
+        """Start of the latest observation period recorded in the capsules, if any."""
+        starts = []
+        for path in capsules:
+            try:
+                with open(path, encoding='utf-8') as f:
+                    document = yaml.safe_load(f)
+            except (OSError, yaml.YAMLError) as e:
+                print(f"Warning: Skipping unreadable capsule {path}: {e}", file=sys.stderr)
+                continue
+            capsule = document.get("capsule") if isinstance(document, dict) else None
+            if not isinstance(capsule, dict) or capsule.get("kind") != "observation_marker":
+                continue
+            period = capsule.get("observation_period")
+            start = period.get("start_date") if isinstance(period, dict) else None
+            if isinstance(start, str):
+                try:
+                    start = date.fromisoformat(start)
+                except ValueError:
+                    continue
+            if isinstance(start, date):
+                starts.append(start)
+        return max(starts, default=None)
+
+    def ingest_all_data(self) -> Dict[str, Any]:
+        """Locate transcripts and capsules; events are read when the stream is iterated.
+
+        Returns:
+            dict: {
+                "transcripts": [transcript paths],
+                "capsules": [capsule paths],
+                "events": EventStream,
+                "phase_start": date or None,
+                "ingestion_info": {"timestamp", "data_path"}
+            }
+        """
+        transcripts = self.find_transcripts()
+        capsules = self.find_capsules()
+        return {
+            'transcripts': [str(path) for path in transcripts],
+            'capsules': [str(path) for path in capsules],
+            'events': EventStream(transcripts),
+            'phase_start': self.phase_start(capsules),
+            'ingestion_info': {
+                'timestamp': datetime.now(timezone.utc).isoformat().replace('+00:00', 'Z'),
+                'data_path': str(self.data_path),
+            }
+        }
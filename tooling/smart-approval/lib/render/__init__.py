@@ -0,0 +1 @@
+# Renderer interface and registry; renderers live in tooling/smart-approval/renderers
@@ -0,0 +1,114 @@
+"""Renderer interface and registry for dashboard views.
+
+Renderers live in tooling/smart-approval/renderers and register themselves
+with renderer_registry when imported; the registry imports them the first
+time it is asked for one.
+"""
+
+import importlib
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Type, Union
+
+from lib.render.view_model import DashboardViewModel
+
+RENDERERS_DIR = Path(__file__).resolve().parent.parent.parent / "renderers"
+
+
+class RendererConfig:
+    """Where and how a renderer writes its views."""
+
+    def __init__(self, output_path: Union[str, Path]):
+        """
+        Args:
+            output_path: Directory the rendered files are written to
+        """
+        self.output_path = Path(output_path)
+
+
+class MetricsRenderer(ABC):
+    """Renders the views of a dashboard from its view model.
+
+    Each render_*_view method formats the build's DashboardViewModel and
+    returns the path of the file it wrote. Views of one or several
+    renderers may be rendered concurrently, so they must not keep state
+    between calls.
+    """
+
+    def __init__(self, config: RendererConfig):
+        self.config = config
+
+    @abstractmethod
+    def get_supported_views(self) -> List[str]:
+        """Return supported view names."""
+
+    @abstractmethod
+    def get_output_format(self) -> str:
+        """Return output format, e.g. 'html'."""
+
+    @abstractmethod
+    def render_overview_view(self, view: DashboardViewModel) -> str:
+        """Render KPIs and rate trends."""
+
+    @abstractmethod
+    def render_decisions_view(self, view: DashboardViewModel) -> str:
+        """Render recent decisions and deny reasons."""
+
+    @abstractmethod
+    def render_replay_health_view(self, view: DashboardViewModel) -> str:
+        """Render replay corpus status."""
+
+    def ensure_output_directory(self) -> None:
+        """Create the output directory if needed."""
+        self.config.output_path.mkdir(parents=True, exist_ok=True)
+
+    def render_view(self, name: str, view: DashboardViewModel) -> str:
+        """Render the view with this name; see get_supported_views."""
+        if name not in self.get_supported_views():
+            raise ValueError(f"{type(self).__name__} does not support the '{name}' view")
+        return getattr(self, f"render_{name}_view")(view)
+
+
+class RendererRegistry:
+    """Renderer classes by name."""
+
+    def __init__(self):
+        self._renderers = {}
+        self._loaded = False
+
+    def register(self, name: str, renderer_class: Type[MetricsRenderer]) -> None:
+        """Make a renderer available under name."""
+        self._renderers[name] = renderer_class
+
+    def get_renderer(self, name: str, config: RendererConfig) -> Optional[MetricsRenderer]:
+        """A renderer instance for config, or None if no renderer has that name."""
+        renderer_class = self._get_renderers().get(name)
+        return renderer_class(config) if renderer_class else None
+
+    def list_available_renderers(self) -> List[str]:
+        """Names of the registered renderers."""
+        return sorted(self._get_renderers())
+
+    def get_renderer_info(self, name: str) -> Optional[Dict[str, Any]]:
+        """Supported views and output format of a renderer, or None if no renderer has that name."""
+        renderer = self.get_renderer(name, RendererConfig("."))
+        if renderer is None:
+            return None
+        return {
+            'name': name,
+            'class': type(renderer).__name__,
+            'supported_views': renderer.get_supported_views(),
+            'output_format': renderer.get_output_format(),
+        }
+
+    def _get_renderers(self) -> Dict[str, Type[MetricsRenderer]]:
+        if not self._loaded:
+            # Set first: the renderer modules register while being imported
+            self._loaded = True
+            for module_path in sorted(RENDERERS_DIR.glob("*.py")):
+                if module_path.stem != "__init__":
+                    importlib.import_module(f"renderers.{module_path.stem}")
+        return self._renderers
+
+
+renderer_registry = RendererRegistry()
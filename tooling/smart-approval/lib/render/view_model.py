@@ -0,0 +1,192 @@
+"""Immutable view model shared by every renderer of a build.
+
+build_view_model() derives what the views show from the processed metrics
+once per build: KPIs, rate series, deny reasons with their shares, recent
+decisions, breakdowns and build info. Renderers only format it, so any
+number of renderers and views can render one model concurrently.
+
+The model is made of frozen dataclasses and tuples, so it can neither be
+changed by a renderer nor differ between them, and it pickles for process
+pools.
+"""
+
+import subprocess
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+# (key, label, unit, description, default) of the KPIs every overview shows
+KPIS = (
+    ('prompt_rate', 'Prompt Rate', 'per_minute', 'Rate of prompts processed per minute', 0),
+    ('override_rate', 'Override Rate', 'per_minute', 'Rate of human overrides per minute', 0),
+    ('deny_rate', 'Deny Rate', 'per_minute', 'Rate of denied requests per minute', 0),
+    ('safety_incidents', 'Safety Incidents', 'count', 'Number of safety incidents recorded', 0),
+    ('phase_day', 'Phase Day', 'day', 'Current phase day', 1),
+)
+
+# Replay results are not ingested yet; every renderer shows this status
+_REPLAY_PLACEHOLDER = {
+    'pass_rate': 0.95,
+    'total_tests': 1000,
+    'passed_tests': 950,
+    'failed_tests': 50,
+    'recent_failures': (
+        ('2026-01-28T20:00:00Z', 'test_123', 'Unexpected decision change', 'medium'),
+        ('2026-01-28T19:45:00Z', 'test_456', 'Timeout exceeded', 'low'),
+        ('2026-01-28T19:30:00Z', 'test_789', 'Assertion failed', 'high'),
+    ),
+}
+
+
+@dataclass(frozen=True)
+class BuildInfo:
+    build_timestamp: str
+    git_commit: str
+
+    @property
+    def short_commit(self) -> str:
+        return self.git_commit[:8]
+
+
+@dataclass(frozen=True)
+class Kpi:
+    key: str
+    label: str
+    value: Any
+    unit: str
+    description: str
+
+
+@dataclass(frozen=True)
+class RatePoint:
+    timestamp: str
+    prompt_rate: float
+    override_rate: float
+    deny_rate: float
+
+
+@dataclass(frozen=True)
+class DenyReason:
+    reason: str
+    count: int
+    share: float
+
+
+@dataclass(frozen=True)
+class RecentDecision:
+    timestamp: str
+    decision: str
+    reason: Optional[str]
+    confidence: Optional[float]
+    # Display forms, shared by the HTML and Markdown views
+    time_label: str
+    confidence_label: str
+
+
+@dataclass(frozen=True)
+class ReplayFailure:
+    timestamp: str
+    test_id: str
+    reason: str
+    severity: str
+
+
+@dataclass(frozen=True)
+class ReplayHealth:
+    pass_rate: float
+    total_tests: int
+    passed_tests: int
+    failed_tests: int
+    status: str
+    recent_failures: Tuple[ReplayFailure, ...]
+
+
+@dataclass(frozen=True)
+class DashboardViewModel:
+    build_info: BuildInfo
+    kpis: Tuple[Kpi, ...]
+    hourly_rates: Tuple[RatePoint, ...]
+    daily_rates: Tuple[RatePoint, ...]
+    # Most frequent first
+    deny_reasons: Tuple[DenyReason, ...]
+    # Newest first
+    recent_decisions: Tuple[RecentDecision, ...]
+    decision_total: int
+    decision_breakdown: Tuple[Tuple[str, int], ...]
+    avg_confidence: Optional[float]
+    incident_types: Tuple[Tuple[str, int], ...]
+    replay_health: ReplayHealth
+
+    def kpi(self, key: str) -> Kpi:
+        """The KPI with this key."""
+        for kpi in self.kpis:
+            if kpi.key == key:
+                return kpi
+        raise KeyError(key)
+
+
+def current_build_info() -> BuildInfo:
+    """Now, and the commit of the checkout this tool runs from ('unknown' outside git)."""
+    try:
+        result = subprocess.run(["git", "rev-parse", "HEAD"], cwd=Path(__file__).parent,
+                                capture_output=True, text=True, timeout=5)
+        commit = result.stdout.strip() if result.returncode == 0 else "unknown"
+    except (OSError, subprocess.SubprocessError):
+        commit = "unknown"
+    return BuildInfo(datetime.now(timezone.utc).isoformat().replace('+00:00', 'Z'), commit)
+
+
+def _rate_points(points) -> Tuple[RatePoint, ...]:
+    return tuple(RatePoint(point['timestamp'], point.get('prompt_rate', 0), point.get('override_rate', 0),
+                           point.get('deny_rate', 0)) for point in points)
+
+
+def _replay_health(replay: Dict[str, Any]) -> ReplayHealth:
+    pass_rate = replay['pass_rate']
+    if pass_rate >= 0.95:
+        status = 'healthy'
+    elif pass_rate >= 0.90:
+        status = 'warning'
+    else:
+        status = 'critical'
+    return ReplayHealth(pass_rate, replay['total_tests'], replay['passed_tests'], replay['failed_tests'], status,
+                        tuple(ReplayFailure(*failure) for failure in replay['recent_failures']))
+
+
+def build_view_model(processed_data: Dict[str, Any], build_info: Optional[BuildInfo] = None) -> DashboardViewModel:
+    """View model of the output of MetricsAggregator.process_ingested_data.
+
+    Args:
+        processed_data: {"metrics": ..., "ingestion_info": ...}
+        build_info: Build timestamp and commit (default: current_build_info())
+    """
+    metrics = processed_data.get('metrics', {})
+    aggregates = metrics.get('aggregates', {})
+    decisions = aggregates.get('decisions', {})
+    timeseries = metrics.get('timeseries_data', {})
+
+    deny_reasons = metrics.get('deny_reasons', {})
+    total_denies = sum(deny_reasons.values())
+    recent = []
+    for decision in metrics.get('recent_decisions', []):
+        confidence = decision.get('confidence')
+        recent.append(RecentDecision(
+            decision['timestamp'], decision['decision'], decision.get('reason'), confidence,
+            decision['timestamp'][:19], 'N/A' if confidence is None else f"{confidence:.2f}"))
+
+    return DashboardViewModel(
+        build_info=build_info or current_build_info(),
+        kpis=tuple(Kpi(key, label, metrics.get(key, default), unit, description)
+                   for key, label, unit, description, default in KPIS),
+        hourly_rates=_rate_points(timeseries.get('hourly', [])),
+        daily_rates=_rate_points(timeseries.get('daily', [])),
+        deny_reasons=tuple(DenyReason(reason, count, count / total_denies)
+                           for reason, count in sorted(deny_reasons.items(), key=lambda item: (-item[1], item[0]))),
+        recent_decisions=tuple(recent),
+        decision_total=decisions.get('total', sum(decisions.get('decision_breakdown', {}).values())),
+        decision_breakdown=tuple(decisions.get('decision_breakdown', {}).items()),
+        avg_confidence=decisions.get('avg_confidence'),
+        incident_types=tuple(aggregates.get('safety', {}).get('incident_types', {}).items()),
+        replay_health=_replay_health(_REPLAY_PLACEHOLDER),
+    )
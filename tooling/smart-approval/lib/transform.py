@@ -0,0 +1,185 @@
+"""Single-pass aggregation of ingested events into dashboard metrics.
+
+MetricsAggregator consumes the event stream once, keeping only counters:
+totals, per-hour buckets, reason and decision breakdowns, and a bounded
+heap of the most recent decisions. Memory grows with the hours the events
+span and the distinct reasons, not with the number of events. The result
+is checked against contracts/metrics.schema.json.
+"""
+
+import heapq
+from collections import Counter
+from datetime import date, datetime, timezone
+from typing import Any, Dict, Iterable, Optional
+
+from lib.contracts import compile_contract, parse_date_time
+
+# Most recent decisions kept for the decisions view
+RECENT_DECISIONS = 50
+
+# Per-bucket counters, in the order of the lists kept per hour
+BUCKET_COUNTERS = ("events", "decisions", "prompts", "denies", "overrides", "safety_incidents")
+_EVENTS, _DECISIONS, _PROMPTS, _DENIES, _OVERRIDES, _INCIDENTS = range(len(BUCKET_COUNTERS))
+
+
+def utc_timestamp(timestamp: str) -> str:
+    """A date-time in UTC without offset ("2026-10-19T13:45:07.123456"); sorts chronologically."""
+    # The adapter writes UTC with a "Z" suffix; slicing avoids parsing it
+    if timestamp[-1] in "Zz":
+        return timestamp[:-1]
+    return parse_date_time(timestamp).astimezone(timezone.utc).replace(tzinfo=None).isoformat()
+
+
+def _point(start: str, counts: list, minutes: int) -> Dict[str, Any]:
+    """Timeseries point for a bucket: its counts and per-minute rates."""
+    point = {"timestamp": start + "T00:00:00"[len(start) - 10:] + "Z"}
+    point.update(zip(BUCKET_COUNTERS, counts))
+    point["prompt_rate"] = counts[_PROMPTS] / minutes
+    point["override_rate"] = counts[_OVERRIDES] / minutes
+    point["deny_rate"] = counts[_DENIES] / minutes
+    return point
+
+
+class MetricsAggregator:
+    """Folds validated events into the metrics contract in one pass."""
+
+    def __init__(self, recent_decisions: int = RECENT_DECISIONS):
+        """
+        Args:
+            recent_decisions: Most recent decisions kept in recent_decisions
+        """
+        self.recent_decisions = recent_decisions
+        self._validate_metrics = compile_contract("metrics")
+
+    def aggregate(self, events: Iterable[Dict[str, Any]], phase_start: Optional[date] = None) -> Dict[str, Any]:
+        """Metrics of an event stream, read once.
+
+        Rates are per minute over the minutes from the first event to the
+        last; timeseries points are per minute within their hour or day.
+
+        Args:
+            events: Events valid against the events contract
+            phase_start: Start of the current observation phase, for phase_day
+
+        Returns:
+            Metrics valid against the metrics contract, plus
+            timeseries_data (hourly and daily points) and aggregates
+        """
+        hours = {}
+        event_types = Counter()
+        decision_breakdown = Counter()
+        deny_reasons = Counter()
+        incident_types = Counter()
+        profiles = Counter()
+        confidence_sum = 0.0
+        confidence_count = 0
+        recent = []
+        first = last = None
+        limit = self.recent_decisions
+
+        for sequence, event in enumerate(events):
+            timestamp = utc_timestamp(event["timestamp"])
+            if first is None or timestamp < first:
+                first = timestamp
+            if last is None or timestamp > last:
+                last = timestamp
+
+            counts = hours.get(timestamp[:13])
+            if counts is None:
+                counts = hours[timestamp[:13]] = [0] * len(BUCKET_COUNTERS)
+            counts[_EVENTS] += 1
+
+            event_type = event["event_type"]
+            event_types[event_type] += 1
+            decision = event.get("decision")
+            if event_type == "prompt_processed":
+                counts[_PROMPTS] += 1
+            elif event_type == "safety_incident":
+                counts[_INCIDENTS] += 1
+                incident_types[event.get("reason") or "unspecified"] += 1
+            if event_type == "override_applied" or decision == "override":
+                counts[_OVERRIDES] += 1
+
+            if decision is not None:
+                counts[_DECISIONS] += 1
+                decision_breakdown[decision] += 1
+                if decision == "deny":
+                    counts[_DENIES] += 1
+                    deny_reasons[event.get("reason") or "unspecified"] += 1
+                if len(recent) < limit:
+                    heapq.heappush(recent, (timestamp, sequence, event))
+                elif limit and timestamp >= recent[0][0]:
+                    heapq.heapreplace(recent, (timestamp, sequence, event))
+
+            confidence = event.get("confidence")
+            if confidence is not None:
+                confidence_sum += confidence
+                confidence_count += 1
+            if "profile" in event:
+                profiles[event["profile"]] += 1
+
+        totals = [sum(column) for column in zip(*hours.values())] or [0] * len(BUCKET_COUNTERS)
+        if first is None:
+            minutes = 1
+            timestamp = datetime.now(timezone.utc).replace(tzinfo=None).isoformat()
+        else:
+            span = datetime.fromisoformat(last[:16]) - datetime.fromisoformat(first[:16])
+            minutes = int(span.total_seconds() // 60) + 1
+            timestamp = last
+
+        days = {}
+        for hour, counts in hours.items():
+            day = days.setdefault(hour[:10], [0] * len(BUCKET_COUNTERS))
+            for index, count in enumerate(counts):
+                day[index] += count
+
+        metrics = {
+            "timestamp": timestamp + "Z",
+            "prompt_rate": totals[_PROMPTS] / minutes,
+            "override_rate": totals[_OVERRIDES] / minutes,
+            "deny_rate": totals[_DENIES] / minutes,
+            "safety_incidents": totals[_INCIDENTS],
+            "deny_reasons": dict(deny_reasons.most_common()),
+            "recent_decisions": [
+                {key: event[key] for key in ("timestamp", "decision", "reason", "confidence") if key in event}
+                for _, _, event in sorted(recent, reverse=True)
+            ],
+            "timeseries_data": {
+                "hourly": [_point(hour, hours[hour], 60) for hour in sorted(hours)],
+                "daily": [_point(day, days[day], 1440) for day in sorted(days)],
+            },
+            "aggregates": {
+                "events": dict(event_types),
+                "decisions": {
+                    "total": totals[_DECISIONS],
+                    "decision_breakdown": dict(decision_breakdown),
+                    "avg_confidence": confidence_sum / confidence_count if confidence_count else None,
+                },
+                "safety": {"incident_types": dict(incident_types)},
+            },
+            "window": {"start": first and first + "Z", "end": last and last + "Z", "minutes": minutes},
+        }
+        if profiles:
+            metrics["profile"] = profiles.most_common(1)[0][0]
+        if phase_start is not None:
+            metrics["phase_day"] = max(1, (date.fromisoformat(timestamp[:10]) - phase_start).days + 1)
+
+        self._validate_metrics(metrics)
+        return metrics
+
+    def process_ingested_data(self, ingested: Dict[str, Any]) -> Dict[str, Any]:
+        """Aggregate the output of DataIngestor.ingest_all_data.
+
+        Returns:
+            dict: {"metrics": aggregate() result, "ingestion_info": ingest info
+                with the stream's stats and sample errors}
+        """
+        events = ingested['events']
+        metrics = self.aggregate(events, ingested.get('phase_start'))
+
+        ingestion_info = dict(ingested.get('ingestion_info', {}))
+        ingestion_info['transcripts'] = len(ingested.get('transcripts', []))
+        ingestion_info['capsules'] = len(ingested.get('capsules', []))
+        ingestion_info.update(getattr(events, 'stats', {}))
+        ingestion_info['errors'] = list(getattr(events, 'errors', []))
+        return {'metrics': metrics, 'ingestion_info': ingestion_info}
@@ -5,51 +5,54 @@ Logs prompt_rate, override_rate, deny_rate, false_positive_reports.
 """
 
 import json
+import sys
 import time
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 from pathlib import Path
-from collections import defaultdict
+
+# Add smart approval to path
+sys.path.insert(0, str(Path(__file__).parent))
+
+from rollup_store import RollupStore, default_rollups_path
 
 class ApprovalMetricsCollector:
     """Collects and reports metrics on smart approval workflow performance"""
 
-    def __init__(self, transcript_path=None, metrics_path=None):
+    def __init__(self, transcript_path=None, metrics_path=None, rollups_path=None):
         self.transcript_path = Path(transcript_path or "var/smart-approval/transcript.jsonl")
         self.metrics_path = Path(metrics_path or "var/smart-approval/metrics.json")
         self.metrics_path.parent.mkdir(parents=True, exist_ok=True)
+        self.rollups = RollupStore(rollups_path or default_rollups_path(self.transcript_path))
 
     def collect_daily_metrics(self, days_back=1):
-        """Collect metrics for the last N days"""
-        since = datetime.utcnow() - timedelta(days=days_back)
-
-        decisions = []
-        if self.transcript_path.exists():
-            with open(self.transcript_path, 'r') as f:
-                for line in f:
-                    if line.strip():
-                        decision = json.loads(line)
-                        decision_time = datetime.fromisoformat(decision["decision_details"]["timestamp"].replace('Z', '+00:00'))
-                        if decision_time >= since:
-                            decisions.append(decision)
-
-        if not decisions:
+        """
+        Collect metrics for the last N days.
+
+        Only decisions appended since the rollup store was last updated
+        are read; see RollupStore.window for how exact the window is.
+        """
+        self.rollups.update(self.transcript_path)
+        since = datetime.now(timezone.utc) - timedelta(days=days_back)
+        counts = self.rollups.window(since)
+
+        if not counts["decisions"]:
             return {"error": "No decisions found in time range"}
 
         # Calculate metrics
-        total_decisions = len(decisions)
-        auto_approved = sum(1 for d in decisions if not d.get("requires_approval", True))
-        required_approval = total_decisions - auto_approved
-        overrides_applied = sum(1 for d in decisions if d.get("override_applied", False))
-
-        # Breakdown by reason
-        reasons = defaultdict(int)
-        for d in decisions:
-            reasons[d.get("reason", "unknown")] += 1
+        total_decisions = counts["decisions"]
+        required_approval = counts["prompts"]
+        auto_approved = total_decisions - required_approval
+        overrides_applied = counts["overrides"]
+        cache_lookups = counts["cache_lookups"]
+        cache_hits = counts["cache_hits"]
+        reasons = counts["reasons"]
 
         # Calculate rates
         prompt_rate = required_approval / total_decisions if total_decisions > 0 else 0
         override_rate = overrides_applied / total_decisions if total_decisions > 0 else 0
         approval_rate = auto_approved / total_decisions if total_decisions > 0 else 0
+        deny_rate = counts["denies"] / total_decisions if total_decisions > 0 else 0
+        cache_hit_rate = cache_hits / cache_lookups if cache_lookups else 0
 
         metrics = {
             "timestamp": datetime.utcnow().isoformat() + "Z",
@@ -61,7 +64,13 @@ class ApprovalMetricsCollector:
             "rates": {
                 "approval_rate": round(approval_rate, 3),
                 "prompt_rate": round(prompt_rate, 3),
-                "override_rate": round(override_rate, 3)
+                "override_rate": round(override_rate, 3),
+                "deny_rate": round(deny_rate, 3),
+                "cache_hit_rate": round(cache_hit_rate, 3)
+            },
+            "decision_cache": {
+                "lookups": cache_lookups,
+                "hits": cache_hits
             },
             "reasons_breakdown": dict(reasons),
             "alerts": []
@@ -105,6 +114,7 @@ Approval Rates:
 - Auto-approved: {metrics.get('rates', {}).get('approval_rate', 0):.1%}
 - Required prompts: {metrics.get('rates', {}).get('prompt_rate', 0):.1%}
 - Override usage: {metrics.get('rates', {}).get('override_rate', 0):.1%}
+- Decision cache hits: {metrics.get('rates', {}).get('cache_hit_rate', 0):.1%}
 
 Top Decision Reasons:
 """
@@ -6,115 +6,493 @@ Evaluates commands against safety profiles to determine approval requirements.
 
 import sys
 import os
+import hashlib
+import re
 import subprocess
+import time
 import yaml
+from collections import OrderedDict, deque
 from pathlib import Path
 
+from shell_parser import ShellSyntaxError, iter_simple_commands, parse_command
+
+# Profile file names looked up next to this script, in order
+PROFILE_FILENAMES = ("safety_profiles.yml", "safety_profiles.yaml")
+
+# Commands longer than this are matched against the denylist with C substring
+# searches; below it the Aho-Corasick walk is faster in CPython
+AUTOMATON_MAX_WALK_LENGTH = 64
+
+# How long a cached git-clean probe result stays valid while .git/index and
+# HEAD are unchanged. Editing a tracked file or creating an untracked one
+# changes neither, so a "clean" result is trusted only briefly; a "dirty"
+# result errs towards requiring approval and is kept longer.
+GIT_CLEAN_TTL_SECONDS = 1.0
+GIT_DIRTY_TTL_SECONDS = 30.0
+
+# Whitespace-separated tokens, keeping quoted strings (and an unterminated
+# quote through the end of the line) in one token, quotes included
+_LEGACY_TOKEN = re.compile(r"""(?:[^\s'"]+|"[^"]*"?|'[^']*'?)+""")
+
+# Memoized policy decisions per evaluator; longer commands bypass the cache
+DECISION_CACHE_SIZE = 1024
+MAX_CACHEABLE_COMMAND_LENGTH = 1024
+
+class DenylistAutomaton:
+    """
+    Aho-Corasick automaton over an ordered list of denied substrings.
+
+    first_match() returns the index of the first pattern, in list order,
+    that occurs anywhere in the text: the same answer as testing each
+    pattern with `in`, from one pass over the text. Transitions are fully
+    resolved at build time, so the walk is one dict lookup per character.
+
+    The walk runs at Python speed per character, so text longer than
+    max_walk_length is checked with the C substring search instead, which
+    is faster there.
+    """
+
+    def __init__(self, patterns, max_walk_length=AUTOMATON_MAX_WALK_LENGTH):
+        """
+        Args:
+            patterns: Denied substrings in priority order
+            max_walk_length: Longest text matched by walking the automaton
+        """
+        self.patterns = list(patterns)
+        self.max_walk_length = max_walk_length
+
+        # Trie of the patterns; each state keeps its best (lowest) pattern
+        # index, len(patterns) standing for none
+        no_match = len(self.patterns)
+        goto = [{}]
+        best = [no_match]
+        for index, pattern in enumerate(self.patterns):
+            state = 0
+            for char in pattern:
+                if char not in goto[state]:
+                    goto.append({})
+                    best.append(no_match)
+                    goto[state][char] = len(goto) - 1
+                state = goto[state][char]
+            best[state] = min(best[state], index)
+
+        # Breadth-first failure links; a state's transitions are its own
+        # edges over its failure state's (already resolved) transitions
+        self._delta = [dict(goto[0])] + [None] * (len(goto) - 1)
+        queue = deque((child, 0) for child in goto[0].values())
+        while queue:
+            state, fail_state = queue.popleft()
+            best[state] = min(best[state], best[fail_state])
+            self._delta[state] = {**self._delta[fail_state], **goto[state]}
+            for char, child in goto[state].items():
+                queue.append((child, self._delta[fail_state].get(char, 0)))
+        self._best = best
+
+    def first_match(self, text):
+        """Index of the first pattern (in list order) found in text, or None"""
+        if len(text) > self.max_walk_length:
+            for index, pattern in enumerate(self.patterns):
+                if pattern in text:
+                    return index
+            return None
+
+        delta, best = self._delta, self._best
+        state = 0
+        found = best[0]
+        for char in text:
+            state = delta[state].get(char, 0)
+            if best[state] < found:
+                found = best[state]
+                if found == 0:
+                    break
+        return found if found < len(self.patterns) else None
+
+class ExactPrefixSet:
+    """
+    Answers whether a text starts with any of a set of strings.
+
+    Strings are bucketed by length, so a query is one slice and hash
+    lookup per distinct length; in CPython that beats walking a
+    character trie.
+    """
+
+    def __init__(self, strings):
+        self.strings = frozenset(strings)
+        self.lengths = sorted({len(string) for string in self.strings})
+
+    def matches(self, text):
+        """True if text starts with one of the strings"""
+        strings = self.strings
+        for length in self.lengths:
+            if length > len(text):
+                return False
+            if text[:length] in strings:
+                return True
+        return False
+
+class CompiledPolicy:
+    """
+    Safety profiles compiled for evaluate_command.
+
+    The denylist_contains entries of every profile, in profile order, go
+    into one DenylistAutomaton; allowlists become hash sets, and the low_risk
+    exact list an ExactPrefixSet for its startswith check.
+
+    Entries are matched as written against a command padded with a space on
+    each side, so "su " needs a word end and " >" a preceding blank, and an
+    entry starting with a letter or digit only matches at the start of a
+    word ("kill" matches killall but not skill). Results report the entry
+    trimmed, as before.
+    """
+
+    def __init__(self, profiles):
+        """
+        Args:
+            profiles: Parsed safety profiles document
+        """
+        profile_map = profiles['command_safety_profiles']['profiles']
+
+        # A blank entry is kept as "", which matches every command
+        entries = [
+            (denied if denied.strip() else "", profile_name)
+            for profile_name, profile in profile_map.items()
+            if 'denylist_contains' in profile
+            for denied in profile['denylist_contains']
+        ]
+        self.denied = [(denied.strip(), profile_name) for denied, profile_name in entries]
+        self.denylist = DenylistAutomaton(denied for denied, _ in entries)
+        self._denied_entries = [denied for denied, _ in entries]
+        self._word_start = [re.compile(r'(?<!\w)' + re.escape(denied)) if re.match(r'\w', denied) else None
+                            for denied, _ in entries]
+
+        low_risk = profile_map['low_risk']
+        self.low_risk_exact = frozenset(low_risk.get('allowlist_exact', []))
+        self.low_risk_exact_prefixes = ExactPrefixSet(low_risk.get('allowlist_exact', []))
+        self.low_risk_prefixes = frozenset(low_risk.get('allowlist_prefixes', []))
+
+        # Untracked files count as dirty unless the profile opts out
+        self.ignore_untracked_files = bool(low_risk.get('ignore_untracked_files', False))
+
+        read_only = profile_map['read_only']
+        self.read_only_exact = frozenset(read_only.get('allowlist_exact', []))
+        self.read_only_prefixes = frozenset(read_only.get('allowlist_prefixes', []))
+
+    def denied_pattern(self, command_text):
+        """(trimmed pattern, profile name) of the first denylist entry in the command, or None"""
+        padded = f" {command_text} "
+        first = self.denylist.first_match(padded)
+        if first is None:
+            return None
+
+        # Entries before first do not occur at all; from there on, check
+        # the word-start condition in list order
+        for index in range(first, len(self.denied)):
+            word_start = self._word_start[index]
+            if word_start is None:
+                if self._denied_entries[index] in padded:
+                    return self.denied[index]
+            elif word_start.search(padded):
+                return self.denied[index]
+        return None
+
+class DecisionCache:
+    """
+    Bounded LRU cache of policy decisions.
+
+    Keys are (command string, policy version). A value is the pair of
+    results for a clean and a dirty working tree; rules that do not look at
+    git store the same result twice, so the probe is still only run for
+    low_risk commands and the clean state picks the result on every call.
+    """
+
+    def __init__(self, maxsize=DECISION_CACHE_SIZE, max_length=MAX_CACHEABLE_COMMAND_LENGTH):
+        self.maxsize = maxsize
+        self.max_length = max_length
+        self._entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.bypassed = 0
+
+    def cacheable(self, command_string):
+        return len(command_string) <= self.max_length
+
+    def get(self, key):
+        """Cached value for key, or None; counts the lookup"""
+        value = self._entries.get(key)
+        if value is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def put(self, key, value):
+        self._entries[key] = value
+        if len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def stats(self):
+        """Return hit/miss counts and hit rate for this cache"""
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'bypassed': self.bypassed,
+            'hit_rate': round(self.hits / lookups, 4) if lookups else 0.0,
+            'size': len(self._entries),
+            'maxsize': self.maxsize
+        }
+
+    def clear(self):
+        """Drop cached decisions and reset counters"""
+        self._entries.clear()
+        self.hits = self.misses = self.bypassed = 0
+
+def find_git_dir(path):
+    """
+    Locate the git directory for a working tree path without running git.
+
+    Follows the "gitdir:" file used by worktrees and submodules; returns
+    None outside a repository.
+    """
+    for directory in (path, *path.parents):
+        dot_git = directory / ".git"
+        if dot_git.is_dir():
+            return dot_git
+        if dot_git.is_file():
+            try:
+                content = dot_git.read_text().strip()
+            except OSError:
+                return None
+            if content.startswith("gitdir:"):
+                return (directory / content[len("gitdir:"):].strip()).resolve()
+            return None
+    return None
+
+def default_profiles_path():
+    """First of PROFILE_FILENAMES that exists next to this script"""
+    script_dir = Path(__file__).parent
+    return next((script_dir / name for name in PROFILE_FILENAMES if (script_dir / name).exists()),
+                script_dir / PROFILE_FILENAMES[0])
+
 class CommandSafetyEvaluator:
-    def __init__(self, profiles_path=None):
+    def __init__(self, profiles_path=None, clean_ttl=GIT_CLEAN_TTL_SECONDS, dirty_ttl=GIT_DIRTY_TTL_SECONDS,
+                 cache_size=DECISION_CACHE_SIZE):
         if profiles_path is None:
-            # Look for profiles relative to this script
-            script_dir = Path(__file__).parent
-            profiles_path = script_dir / "safety_profiles.yml"
+            profiles_path = default_profiles_path()
 
-        with open(profiles_path, 'r') as f:
-            self.profiles = yaml.safe_load(f)
+        with open(profiles_path, 'rb') as f:
+            raw_profiles = f.read()
+        self.profiles = yaml.safe_load(raw_profiles)
+
+        # Compiled once at load time; evaluate_command only does lookups
+        self.policy = CompiledPolicy(self.profiles)
+
+        # Content hash of the profiles; part of every decision cache key, so
+        # a cached decision never answers for a different policy
+        self.policy_version = hashlib.sha256(raw_profiles).hexdigest()[:12]
+        self.decision_cache = DecisionCache(cache_size)
+
+        # Last git-clean probe as (repository state, monotonic time, is_clean)
+        self.clean_ttl = clean_ttl
+        self.dirty_ttl = dirty_ttl
+        self._git_status_cache = None
+        self._git_dirs = {}
 
     def tokenize_command(self, command_string):
         """Tokenize command while preserving quoted strings"""
-        tokens = []
-        current_token = ""
-        in_quotes = False
-        quote_char = None
-
-        for char in command_string:
-            if char in ['"', "'"] and not in_quotes:
-                in_quotes = True
-                quote_char = char
-                current_token += char
-            elif char == quote_char and in_quotes:
-                in_quotes = False
-                current_token += char
-                quote_char = None
-            elif char.isspace() and not in_quotes:
-                if current_token:
-                    tokens.append(current_token)
-                    current_token = ""
-            else:
-                current_token += char
-
-        if current_token:
-            tokens.append(current_token)
-
-        return tokens
-
-    def check_git_status(self):
-        """Check if working directory is clean"""
+        return _LEGACY_TOKEN.findall(command_string)
+
+    def check_git_status(self, cwd=None):
+        """
+        Check if the working directory (cwd, default the current one) is clean.
+
+        The result of the `git status` probe is reused while .git/index,
+        HEAD and the branch ref are unchanged, for at most clean_ttl seconds
+        if the tree was clean and dirty_ttl seconds if it was dirty.
+        """
+        cwd = cwd or os.getcwd()
+        cached = self._git_status_cache
+        state = self._git_state(cwd)
+        if cached is not None and cached[0] == state:
+            age = time.monotonic() - cached[1]
+            if age < (self.clean_ttl if cached[2] else self.dirty_ttl):
+                return cached[2]
+
+        probed_at = time.monotonic()
+        is_clean = self._probe_git_status(cwd)
+        # git status may refresh the index, so key on the state it left behind
+        self._git_status_cache = (self._git_state(cwd), probed_at, is_clean)
+        return is_clean
+
+    def _probe_git_status(self, cwd):
+        """Run git status; True only if it succeeds and reports no changes"""
+        command = ['git', 'status', '--porcelain']
+        if self.policy.ignore_untracked_files:
+            command.append('--untracked-files=no')
         try:
-            result = subprocess.run(['git', 'status', '--porcelain'],
-                                  capture_output=True, text=True, cwd=os.getcwd())
-            return len(result.stdout.strip()) == 0
+            result = subprocess.run(command, capture_output=True, text=True, cwd=cwd)
+            return result.returncode == 0 and len(result.stdout.strip()) == 0
         except:
             return False  # Assume not clean if git fails
 
-    def evaluate_command(self, command_string):
-        """Evaluate command against safety profiles"""
-        tokens = self.tokenize_command(command_string)
-        if not tokens:
-            return {"approval_required": True, "confidence": 0.0, "reason": "empty_command"}
+    def _git_state(self, cwd):
+        """Fingerprint of the files a commit, checkout, add or reset rewrites"""
+        git_dir = self._git_dirs.get(cwd)
+        if git_dir is None:
+            git_dir = self._git_dirs[cwd] = find_git_dir(Path(cwd)) or False
+        if not git_dir:
+            return (cwd,)
+
+        state = [cwd]
+        for name in ('index', 'HEAD'):
+            try:
+                stat = os.stat(git_dir / name)
+                state.append((stat.st_mtime_ns, stat.st_size, stat.st_ino))
+            except OSError:
+                state.append(None)
+        try:
+            head = (git_dir / 'HEAD').read_text().strip()
+            state.append(head)
+            if head.startswith('ref: '):
+                state.append(os.stat(git_dir / head[len('ref: '):]).st_mtime_ns)
+        except OSError:
+            state.append(None)
+        return tuple(state)
+
+    def evaluate_command(self, command_string, cwd=None):
+        """Evaluate command against safety profiles, gating low_risk on cwd being clean"""
+        return self.evaluate(command_string, cwd)[0]
+
+    def evaluate(self, command_string, cwd=None):
+        """
+        Evaluate a command through the decision cache.
+
+        Returns:
+            tuple: (result dict, whether the decision came from the cache)
+        """
+        cache = self.decision_cache
+        if not cache.cacheable(command_string):
+            cache.bypassed += 1
+            outcomes = self._decide(command_string)
+            cache_hit = False
+        else:
+            key = (command_string, self.policy_version)
+            outcomes = cache.get(key)
+            cache_hit = outcomes is not None
+            if not cache_hit:
+                outcomes = self._decide(command_string)
+                cache.put(key, outcomes)
 
-        command_base = tokens[0]
-        full_command = ' '.join(tokens)
+        clean_result, dirty_result = outcomes
+        if clean_result is not dirty_result and not self.check_git_status(cwd):
+            return dict(dirty_result), cache_hit
+        return dict(clean_result), cache_hit
+
+    def _decide(self, command_string):
+        """
+        Policy decision for a command line, without probing git.
+
+        Every command the line would run (pipeline stages, list members,
+        subshell bodies and substitutions) is decided on its own and the
+        most restrictive decision wins. Lines that do not parse as shell
+        are checked against the denylist as a whole and otherwise need
+        approval.
+
+        Returns:
+            tuple: (result if the tree is clean, result if it is dirty); the
+            same dict twice when the rule does not depend on git
+        """
+        try:
+            commands = list(iter_simple_commands(parse_command(command_string)))
+        except ShellSyntaxError:
+            return self._decide_unparsed(command_string)
+
+        if not commands:
+            return _unconditional({"approval_required": True, "confidence": 0.0, "reason": "empty_command"})
+        if len(commands) == 1:
+            return self._decide_simple(*commands[0])
+
+        outcomes = [self._decide_simple(command, piped) for command, piped in commands]
+        clean_result = _most_restrictive([clean for clean, _ in outcomes])
+        dirty_result = _most_restrictive([dirty for _, dirty in outcomes])
+        return clean_result, dirty_result
+
+    def _decide_simple(self, command, piped):
+        """Outcome pair for one simple command, piped if it reads a pipe"""
+        full_command = ' '.join(command.texts)
+        command_text = full_command + ''.join(redirect.render() for redirect in command.redirects)
+        if piped:
+            command_text = "| " + command_text
 
         # Check for denied patterns first
-        for profile_name, profile in self.profiles['command_safety_profiles']['profiles'].items():
-            if 'denylist_contains' in profile:
-                for denied in profile['denylist_contains']:
-                    # Trim whitespace from denied patterns for matching
-                    trimmed_denied = denied.strip()
-                    if trimmed_denied in full_command:
-                        return {
-                            "approval_required": True,
-                            "confidence": 1.0,
-                            "reason": f"denied_pattern_{profile_name}",
-                            "denied_pattern": trimmed_denied
-                        }
-
-        # Check low_risk profile (requires clean working directory)
-        low_risk = self.profiles['command_safety_profiles']['profiles']['low_risk']
-        is_clean = self.check_git_status()
-
-        # First check for exact matches in low_risk
-        if full_command in low_risk.get('allowlist_exact', []):
-            if is_clean:
-                return {"approval_required": False, "confidence": 0.95, "reason": "low_risk_exact_clean"}
-            else:
-                return {"approval_required": True, "confidence": 0.95, "reason": "low_risk_exact_dirty"}
-
-        # Then check for prefix matches in low_risk
-        if command_base in low_risk.get('allowlist_prefixes', []):
-            # For prefix matches, check if the full command matches any exact commands
-            if any(full_command.startswith(exact) for exact in low_risk.get('allowlist_exact', [])):
-                if is_clean:
-                    return {"approval_required": False, "confidence": 0.95, "reason": "low_risk_exact_clean"}
-                else:
-                    return {"approval_required": True, "confidence": 0.95, "reason": "low_risk_exact_dirty"}
-            else:
-                if is_clean:
-                    return {"approval_required": False, "confidence": 0.8, "reason": "low_risk_prefix_clean"}
-                else:
-                    return {"approval_required": True, "confidence": 0.9, "reason": "low_risk_prefix_dirty"}
-
-# Check read_only profile
-        read_only = self.profiles['command_safety_profiles']['profiles']['read_only']
-        if full_command in read_only.get('allowlist_exact', []):
-            return {"approval_required": False, "confidence": 1.0, "reason": "read_only_exact"}
-
-        if command_base in read_only.get('allowlist_prefixes', []):
-            return {"approval_required": False, "confidence": 0.9, "reason": "read_only_prefix"}
+        policy = self.policy
+        denied = policy.denied_pattern(command_text)
+        if denied is not None:
+            trimmed_denied, profile_name = denied
+            return _unconditional({
+                "approval_required": True,
+                "confidence": 1.0,
+                "reason": f"denied_pattern_{profile_name}",
+                "denied_pattern": trimmed_denied
+            })
+
+        if not command.texts:
+            return _unconditional({"approval_required": True, "confidence": 0.5, "reason": "unknown_command"})
+        command_base = command.texts[0]
+
+        # Check low_risk profile (requires clean working directory, which
+        # evaluate() only probes once a low_risk rule matches)
+
+        # Exact matches in low_risk, or prefix matches whose full command
+        # starts with one of the exact commands
+        if full_command in policy.low_risk_exact or (
+                command_base in policy.low_risk_prefixes and policy.low_risk_exact_prefixes.matches(full_command)):
+            return ({"approval_required": False, "confidence": 0.95, "reason": "low_risk_exact_clean"},
+                    {"approval_required": True, "confidence": 0.95, "reason": "low_risk_exact_dirty"})
+
+        if command_base in policy.low_risk_prefixes:
+            return ({"approval_required": False, "confidence": 0.8, "reason": "low_risk_prefix_clean"},
+                    {"approval_required": True, "confidence": 0.9, "reason": "low_risk_prefix_dirty"})
+
+        # Check read_only profile
+        if full_command in policy.read_only_exact:
+            return _unconditional({"approval_required": False, "confidence": 1.0, "reason": "read_only_exact"})
+
+        if command_base in policy.read_only_prefixes:
+            return _unconditional({"approval_required": False, "confidence": 0.9, "reason": "read_only_prefix"})
 
         # Default: require approval for unknown commands
-        return {"approval_required": True, "confidence": 0.5, "reason": "unknown_command"}
+        return _unconditional({"approval_required": True, "confidence": 0.5, "reason": "unknown_command"})
+
+    def _decide_unparsed(self, command_string):
+        """Outcome for a line that is not valid shell: denied if it hits the denylist, else ambiguous"""
+        denied = self.policy.denied_pattern(' '.join(self.tokenize_command(command_string)))
+        if denied is not None:
+            trimmed_denied, profile_name = denied
+            return _unconditional({
+                "approval_required": True,
+                "confidence": 1.0,
+                "reason": f"denied_pattern_{profile_name}",
+                "denied_pattern": trimmed_denied
+            })
+        return _unconditional({"approval_required": True, "confidence": 0.5, "reason": "ambiguous_command"})
+
+def _unconditional(result):
+    """Outcome pair for a rule that does not depend on the git state"""
+    return (result, result)
+
+def _most_restrictive(results):
+    """
+    Combined decision for the commands of one line.
+
+    A denied command decides first, then any other command that needs
+    approval, in line order; if none does, the least confident approval.
+    """
+    required = [result for result in results if result["approval_required"]]
+    if required:
+        return next((result for result in required if "denied_pattern" in result), required[0])
+    return min(results, key=lambda result: result["confidence"])
 
 def main():
     if len(sys.argv) < 2:
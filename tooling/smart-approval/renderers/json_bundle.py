@@ -1,10 +1,15 @@
 """JSON API bundle renderer for metrics data."""
 
 import json
-from typing import Dict, Any, List
-from pathlib import Path
+from typing import Any, Dict, List
 
-from ..lib.render.base import MetricsRenderer, RendererConfig, renderer_registry
+from lib.render.base import MetricsRenderer, RendererConfig, renderer_registry
+from lib.render.view_model import DashboardViewModel
+
+
+def _as_dict(record: Any) -> Dict[str, Any]:
+    """Fields of a view model record; shallow, unlike dataclasses.asdict, as they are all scalars."""
+    return dict(vars(record))
 
 
 class JsonBundleRenderer(MetricsRenderer):
@@ -21,45 +26,22 @@ class JsonBundleRenderer(MetricsRenderer):
         """Return output format."""
         return 'json'
 
-    def render_overview_view(self, metrics_data: Dict[str, Any]) -> str:
+    def render_overview_view(self, view: DashboardViewModel) -> str:
         """Render overview data as JSON."""
         self.ensure_output_directory()
 
-        metrics = metrics_data.get('metrics', {})
-        build_info = self.get_build_info()
-
         # Structure overview data
         overview_data = {
             'view': 'overview',
-            'build_info': build_info,
+            'build_info': _as_dict(view.build_info),
             'kpis': {
-                'prompt_rate': {
-                    'value': metrics.get('prompt_rate', 0),
-                    'unit': 'per_minute',
-                    'description': 'Rate of prompts processed per minute'
-                },
-                'override_rate': {
-                    'value': metrics.get('override_rate', 0),
-                    'unit': 'per_minute',
-                    'description': 'Rate of human overrides per minute'
-                },
-                'deny_rate': {
-                    'value': metrics.get('deny_rate', 0),
-                    'unit': 'per_minute',
-                    'description': 'Rate of denied requests per minute'
-                },
-                'safety_incidents': {
-                    'value': metrics.get('safety_incidents', 0),
-                    'unit': 'count',
-                    'description': 'Number of safety incidents recorded'
-                },
-                'phase_day': {
-                    'value': metrics.get('phase_day', 1),
-                    'unit': 'day',
-                    'description': 'Current phase day'
-                }
+                kpi.key: {'value': kpi.value, 'unit': kpi.unit, 'description': kpi.description}
+                for kpi in view.kpis
             },
-            'timeseries': metrics.get('timeseries_data', {})
+            'timeseries': {
+                'hourly': [_as_dict(point) for point in view.hourly_rates],
+                'daily': [_as_dict(point) for point in view.daily_rates]
+            }
         }
 
         # Write to file
@@ -69,20 +51,25 @@ class JsonBundleRenderer(MetricsRenderer):
 
         return str(output_file)
 
-    def render_decisions_view(self, metrics_data: Dict[str, Any]) -> str:
+    def render_decisions_view(self, view: DashboardViewModel) -> str:
         """Render decisions data as JSON."""
         self.ensure_output_directory()
 
-        metrics = metrics_data.get('metrics', {})
-        build_info = self.get_build_info()
-
         # Structure decisions data
         decisions_data = {
             'view': 'decisions',
-            'build_info': build_info,
-            'deny_reasons_breakdown': metrics.get('deny_reasons', {}),
-            'recent_decisions': metrics.get('recent_decisions', []),
-            'decision_summary': metrics.get('aggregates', {}).get('decisions', {})
+            'build_info': _as_dict(view.build_info),
+            'deny_reasons_breakdown': {reason.reason: reason.count for reason in view.deny_reasons},
+            'recent_decisions': [
+                {'timestamp': decision.timestamp, 'decision': decision.decision, 'reason': decision.reason,
+                 'confidence': decision.confidence}
+                for decision in view.recent_decisions
+            ],
+            'decision_summary': {
+                'total': view.decision_total,
+                'decision_breakdown': dict(view.decision_breakdown),
+                'avg_confidence': view.avg_confidence
+            }
         }
 
         # Write to file
@@ -92,43 +79,22 @@ class JsonBundleRenderer(MetricsRenderer):
 
         return str(output_file)
 
-    def render_replay_health_view(self, metrics_data: Dict[str, Any]) -> str:
+    def render_replay_health_view(self, view: DashboardViewModel) -> str:
         """Render replay health data as JSON."""
         self.ensure_output_directory()
 
-        build_info = self.get_build_info()
-
-        # Mock replay health data - in real implementation, this would come from metrics
+        replay = view.replay_health
         replay_data = {
             'view': 'replay_health',
-            'build_info': build_info,
+            'build_info': _as_dict(view.build_info),
             'status': {
-                'pass_rate': 0.95,
-                'total_tests': 1000,
-                'passed_tests': 950,
-                'failed_tests': 50,
-                'last_run_timestamp': build_info['build_timestamp']
+                'pass_rate': replay.pass_rate,
+                'total_tests': replay.total_tests,
+                'passed_tests': replay.passed_tests,
+                'failed_tests': replay.failed_tests,
+                'last_run_timestamp': view.build_info.build_timestamp
             },
-            'recent_failures': [
-                {
-                    'timestamp': '2026-01-28T20:00:00Z',
-                    'test_id': 'test_123',
-                    'reason': 'Unexpected decision change',
-                    'severity': 'medium'
-                },
-                {
-                    'timestamp': '2026-01-28T19:45:00Z',
-                    'test_id': 'test_456',
-                    'reason': 'Timeout exceeded',
-                    'severity': 'low'
-                },
-                {
-                    'timestamp': '2026-01-28T19:30:00Z',
-                    'test_id': 'test_789',
-                    'reason': 'Assertion failed',
-                    'severity': 'high'
-                }
-            ]
+            'recent_failures': [_as_dict(failure) for failure in replay.recent_failures]
         }
 
         # Write to file
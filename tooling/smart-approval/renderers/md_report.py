@@ -1,11 +1,9 @@
 """Markdown report renderer for metrics data."""
 
-import json
-from typing import Dict, Any, List
-from pathlib import Path
-from datetime import datetime
+from typing import List
 
-from ..lib.render.base import MetricsRenderer, RendererConfig, renderer_registry
+from lib.render.base import MetricsRenderer, RendererConfig, renderer_registry
+from lib.render.view_model import DashboardViewModel
 
 
 class MarkdownReportRenderer(MetricsRenderer):
@@ -22,49 +20,46 @@ class MarkdownReportRenderer(MetricsRenderer):
         """Return output format."""
         return 'md'
 
-    def render_overview_view(self, metrics_data: Dict[str, Any]) -> str:
+    def render_overview_view(self, view: DashboardViewModel) -> str:
         """Render overview as markdown report."""
         self.ensure_output_directory()
 
-        metrics = metrics_data.get('metrics', {})
-        build_info = self.get_build_info()
+        build_info = view.build_info
 
         # Generate markdown content
         content = f"""# Smart Approval Dashboard - Overview Report
 
-**Generated:** {build_info['build_timestamp']}
-**Commit:** `{build_info['git_commit'][:8]}`
+**Generated:** {build_info.build_timestamp}
+**Commit:** `{build_info.short_commit}`
 
 ## Key Performance Indicators
 
 | Metric | Value | Unit | Description |
 |--------|-------|------|-------------|
-| Prompt Rate | {metrics.get('prompt_rate', 0):.1f} | per minute | Rate of prompts processed per minute |
-| Override Rate | {metrics.get('override_rate', 0):.1f} | per minute | Rate of human overrides per minute |
-| Deny Rate | {metrics.get('deny_rate', 0):.1f} | per minute | Rate of denied requests per minute |
-| Safety Incidents | {metrics.get('safety_incidents', 0)} | count | Number of safety incidents recorded |
-| Phase Day | {metrics.get('phase_day', 1)} | day | Current phase day |
+"""
+        for kpi in view.kpis:
+            value = f"{kpi.value:.1f}" if kpi.unit == 'per_minute' else kpi.value
+            content += f"| {kpi.label} | {value} | {kpi.unit.replace('_', ' ')} | {kpi.description} |\n"
 
+        content += """
 ## Trends Analysis
 
 ### Rate Trends (Last Hour)
 """
 
         # Add timeseries data
-        timeseries_data = metrics.get('timeseries_data', {}).get('hourly', [])
-        if timeseries_data:
+        if view.hourly_rates:
             content += "\n| Timestamp | Prompt Rate | Override Rate | Deny Rate |\n"
             content += "|-----------|-------------|---------------|-----------|\n"
 
-            for point in timeseries_data[-10:]:  # Last 10 data points
-                timestamp = point['timestamp'][:19]  # Format timestamp
-                content += f"| {timestamp} | {point['prompt_rate']:.1f} | {point['override_rate']:.1f} | {point['deny_rate']:.1f} |\n"
+            for point in view.hourly_rates[-10:]:  # Last 10 data points
+                content += (f"| {point.timestamp[:19]} | {point.prompt_rate:.1f} | {point.override_rate:.1f} "
+                            f"| {point.deny_rate:.1f} |\n")
 
         content += "\n## Safety Summary\n\n"
-        safety_aggregates = metrics.get('aggregates', {}).get('safety', {})
-        if safety_aggregates.get('incident_types'):
+        if view.incident_types:
             content += "### Incident Types\n\n"
-            for incident_type, count in safety_aggregates['incident_types'].items():
+            for incident_type, count in view.incident_types:
                 content += f"- **{incident_type}:** {count} incidents\n"
 
         # Write to file
@@ -74,58 +69,48 @@ class MarkdownReportRenderer(MetricsRenderer):
 
         return str(output_file)
 
-    def render_decisions_view(self, metrics_data: Dict[str, Any]) -> str:
+    def render_decisions_view(self, view: DashboardViewModel) -> str:
         """Render decisions analysis as markdown report."""
         self.ensure_output_directory()
 
-        metrics = metrics_data.get('metrics', {})
-        build_info = self.get_build_info()
+        build_info = view.build_info
 
         # Generate markdown content
         content = f"""# Smart Approval Dashboard - Decisions Report
 
-**Generated:** {build_info['build_timestamp']}
-**Commit:** `{build_info['git_commit'][:8]}`
+**Generated:** {build_info.build_timestamp}
+**Commit:** `{build_info.short_commit}`
 
 ## Decision Summary
 
 """
 
-        decision_aggregates = metrics.get('aggregates', {}).get('decisions', {})
-
-        if decision_aggregates.get('decision_breakdown'):
+        if view.decision_breakdown:
             content += "### Decision Breakdown\n\n"
-            for decision_type, count in decision_aggregates['decision_breakdown'].items():
+            for decision_type, count in view.decision_breakdown:
                 content += f"- **{decision_type.title()}:** {count} decisions\n"
 
-        if decision_aggregates.get('avg_confidence'):
-            content += f"\n**Average Confidence:** {decision_aggregates['avg_confidence']:.2%}\n\n"
+        if view.avg_confidence:
+            content += f"\n**Average Confidence:** {view.avg_confidence:.2%}\n\n"
 
         # Deny reasons
-        deny_reasons = metrics.get('deny_reasons', {})
-        if deny_reasons:
+        if view.deny_reasons:
             content += "## Deny Reasons Analysis\n\n"
             content += "| Reason | Count | Percentage |\n"
             content += "|--------|-------|------------|\n"
 
-            total_denies = sum(deny_reasons.values())
-            for reason, count in sorted(deny_reasons.items(), key=lambda x: x[1], reverse=True):
-                percentage = (count / total_denies * 100) if total_denies > 0 else 0
-                content += f"| {reason} | {count} | {percentage:.1f}% |\n"
+            for reason in view.deny_reasons:
+                content += f"| {reason.reason} | {reason.count} | {reason.share:.1%} |\n"
 
         # Recent decisions
-        recent_decisions = metrics.get('recent_decisions', [])
-        if recent_decisions:
+        if view.recent_decisions:
             content += "\n## Recent Decisions\n\n"
             content += "| Timestamp | Decision | Reason | Confidence |\n"
             content += "|-----------|----------|--------|------------|\n"
 
-            for decision in recent_decisions[:20]:  # Last 20 decisions
-                timestamp = decision.get('timestamp', '')[:19]
-                decision_type = decision.get('decision', 'unknown').title()
-                reason = decision.get('reason', 'N/A')
-                confidence = f"{decision.get('confidence', 0):.2f}" if decision.get('confidence') else 'N/A'
-                content += f"| {timestamp} | {decision_type} | {reason} | {confidence} |\n"
+            for decision in view.recent_decisions[:20]:  # Last 20 decisions
+                content += (f"| {decision.time_label} | {decision.decision.title()} | {decision.reason or 'N/A'} "
+                            f"| {decision.confidence_label} |\n")
 
         # Write to file
         output_file = self.config.output_path / "decisions.md"
@@ -134,52 +119,25 @@ class MarkdownReportRenderer(MetricsRenderer):
 
         return str(output_file)
 
-    def render_replay_health_view(self, metrics_data: Dict[str, Any]) -> str:
+    def render_replay_health_view(self, view: DashboardViewModel) -> str:
         """Render replay health status as markdown report."""
         self.ensure_output_directory()
 
-        build_info = self.get_build_info()
-
-        # Mock replay health data
-        replay_status = {
-            'pass_rate': 0.95,
-            'total_tests': 1000,
-            'passed_tests': 950,
-            'failed_tests': 50,
-            'recent_failures': [
-                {
-                    'timestamp': '2026-01-28T20:00:00Z',
-                    'test_id': 'test_123',
-                    'reason': 'Unexpected decision change',
-                    'severity': 'medium'
-                },
-                {
-                    'timestamp': '2026-01-28T19:45:00Z',
-                    'test_id': 'test_456',
-                    'reason': 'Timeout exceeded',
-                    'severity': 'low'
-                },
-                {
-                    'timestamp': '2026-01-28T19:30:00Z',
-                    'test_id': 'test_789',
-                    'reason': 'Assertion failed',
-                    'severity': 'high'
-                }
-            ]
-        }
+        build_info = view.build_info
+        replay_status = view.replay_health
 
         # Generate markdown content
         content = f"""# Smart Approval Dashboard - Replay Health Report
 
-**Generated:** {build_info['build_timestamp']}
-**Commit:** `{build_info['git_commit'][:8]}`
+**Generated:** {build_info.build_timestamp}
+**Commit:** `{build_info.short_commit}`
 
 ## Test Corpus Status
 
-- **Pass Rate:** {replay_status['pass_rate']:.1%}
-- **Total Tests:** {replay_status['total_tests']}
-- **Passed:** {replay_status['passed_tests']}
-- **Failed:** {replay_status['failed_tests']}
+- **Pass Rate:** {replay_status.pass_rate:.1%}
+- **Total Tests:** {replay_status.total_tests}
+- **Passed:** {replay_status.passed_tests}
+- **Failed:** {replay_status.failed_tests}
 
 ## Recent Test Failures
 
@@ -187,14 +145,14 @@ class MarkdownReportRenderer(MetricsRenderer):
 |-----------|---------|--------|----------|
 """
 
-        for failure in replay_status['recent_failures']:
-            content += f"| {failure['timestamp'][:19]} | {failure['test_id']} | {failure['reason']} | {failure['severity']} |\n"
+        for failure in replay_status.recent_failures:
+            content += f"| {failure.timestamp[:19]} | {failure.test_id} | {failure.reason} | {failure.severity} |\n"
 
         content += "\n## Health Assessment\n\n"
 
-        if replay_status['pass_rate'] >= 0.95:
+        if replay_status.status == 'healthy':
             content += "✅ **Status: Healthy** - Test pass rate is excellent.\n"
-        elif replay_status['pass_rate'] >= 0.90:
+        elif replay_status.status == 'warning':
             content += "⚠️ **Status: Warning** - Test pass rate needs attention.\n"
         else:
             content += "❌ **Status: Critical** - Test pass rate requires immediate action.\n"
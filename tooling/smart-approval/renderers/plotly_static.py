@@ -1,10 +1,10 @@
 """Plotly static HTML renderer for metrics visualization."""
 
 import json
-from typing import Dict, Any, List
-from pathlib import Path
+from typing import List
 
-from ..lib.render.base import MetricsRenderer, RendererConfig, renderer_registry
+from lib.render.base import MetricsRenderer, RendererConfig, renderer_registry
+from lib.render.view_model import DashboardViewModel
 
 
 class PlotlyStaticRenderer(MetricsRenderer):
@@ -21,15 +21,12 @@ class PlotlyStaticRenderer(MetricsRenderer):
         """Return output format."""
         return 'html'
 
-    def render_overview_view(self, metrics_data: Dict[str, Any]) -> str:
+    def render_overview_view(self, view: DashboardViewModel) -> str:
         """Render overview dashboard with KPI strip and timeseries charts."""
         self.ensure_output_directory()
 
-        metrics = metrics_data.get('metrics', {})
-        timeseries_data = metrics.get('timeseries_data', {})
-
         # Generate HTML content
-        html_content = self._generate_overview_html(metrics, timeseries_data)
+        html_content = self._generate_overview_html(view)
 
         # Write to file
         output_file = self.config.output_path / "overview.html"
@@ -38,14 +35,12 @@ class PlotlyStaticRenderer(MetricsRenderer):
 
         return str(output_file)
 
-    def render_decisions_view(self, metrics_data: Dict[str, Any]) -> str:
+    def render_decisions_view(self, view: DashboardViewModel) -> str:
         """Render decisions table view."""
         self.ensure_output_directory()
 
-        metrics = metrics_data.get('metrics', {})
-
         # Generate HTML content
-        html_content = self._generate_decisions_html(metrics)
+        html_content = self._generate_decisions_html(view)
 
         # Write to file
         output_file = self.config.output_path / "decisions.html"
@@ -54,14 +49,12 @@ class PlotlyStaticRenderer(MetricsRenderer):
 
         return str(output_file)
 
-    def render_replay_health_view(self, metrics_data: Dict[str, Any]) -> str:
+    def render_replay_health_view(self, view: DashboardViewModel) -> str:
         """Render replay health status view."""
         self.ensure_output_directory()
 
-        metrics = metrics_data.get('metrics', {})
-
         # Generate HTML content
-        html_content = self._generate_replay_health_html(metrics)
+        html_content = self._generate_replay_health_html(view)
 
         # Write to file
         output_file = self.config.output_path / "replay_health.html"
@@ -70,25 +63,18 @@ class PlotlyStaticRenderer(MetricsRenderer):
 
         return str(output_file)
 
-    def _generate_overview_html(self, metrics: Dict[str, Any], timeseries_data: Dict[str, Any]) -> str:
+    def _generate_overview_html(self, view: DashboardViewModel) -> str:
         """Generate HTML for overview dashboard."""
-        build_info = self.get_build_info()
+        build_info = view.build_info
 
         # Prepare data for charts
-        hourly_data = timeseries_data.get('hourly', [])
-        timestamps = [d['timestamp'] for d in hourly_data]
-        prompt_rates = [d['prompt_rate'] for d in hourly_data]
-        override_rates = [d['override_rate'] for d in hourly_data]
-        deny_rates = [d['deny_rate'] for d in hourly_data]
+        timestamps = [point.timestamp for point in view.hourly_rates]
+        prompt_rates = [point.prompt_rate for point in view.hourly_rates]
+        override_rates = [point.override_rate for point in view.hourly_rates]
+        deny_rates = [point.deny_rate for point in view.hourly_rates]
 
         # KPI values
-        kpi_data = {
-            'prompt_rate': metrics.get('prompt_rate', 0),
-            'override_rate': metrics.get('override_rate', 0),
-            'deny_rate': metrics.get('deny_rate', 0),
-            'safety_incidents': metrics.get('safety_incidents', 0),
-            'phase_day': metrics.get('phase_day', 1)
-        }
+        kpi_data = {kpi.key: kpi.value for kpi in view.kpis}
 
         return f"""
 <!DOCTYPE html>
@@ -178,8 +164,8 @@ class PlotlyStaticRenderer(MetricsRenderer):
         </div>
 
         <div class="footer">
-            <p>Generated: {build_info['build_timestamp']}<br/>
-            Commit: {build_info['git_commit'][:8]}</p>
+            <p>Generated: {build_info.build_timestamp}<br/>
+            Commit: {build_info.short_commit}</p>
         </div>
     </div>
 
@@ -226,18 +212,15 @@ class PlotlyStaticRenderer(MetricsRenderer):
 </html>
 """
 
-    def _generate_decisions_html(self, metrics: Dict[str, Any]) -> str:
+    def _generate_decisions_html(self, view: DashboardViewModel) -> str:
         """Generate HTML for decisions table view."""
-        build_info = self.get_build_info()
-
-        recent_decisions = metrics.get('recent_decisions', [])
-        deny_reasons = metrics.get('deny_reasons', {})
+        build_info = view.build_info
 
         # Prepare deny reasons data for chart
-        reason_labels = list(deny_reasons.keys())
-        reason_values = list(deny_reasons.values())
+        reason_labels = [reason.reason for reason in view.deny_reasons]
+        reason_values = [reason.count for reason in view.deny_reasons]
 
-        return f"""
+        html_content = f"""
 <!DOCTYPE html>
 <html>
 <head>
@@ -310,17 +293,13 @@ class PlotlyStaticRenderer(MetricsRenderer):
             <tbody>
 """
 
-        for decision in recent_decisions[:50]:  # Show last 50 decisions
-            decision_class = f"decision-{decision.get('decision', 'unknown').lower()}"
-            timestamp = decision.get('timestamp', '')[:19]  # Format timestamp
-            confidence = f"{decision.get('confidence', 0):.2f}" if decision.get('confidence') else 'N/A'
-
+        for decision in view.recent_decisions[:50]:  # Show last 50 decisions
             html_content += f"""
                 <tr>
-                    <td>{timestamp}</td>
-                    <td class="{decision_class}">{decision.get('decision', 'unknown').title()}</td>
-                    <td>{decision.get('reason', 'N/A')}</td>
-                    <td>{confidence}</td>
+                    <td>{decision.time_label}</td>
+                    <td class="decision-{decision.decision}">{decision.decision.title()}</td>
+                    <td>{decision.reason or 'N/A'}</td>
+                    <td>{decision.confidence_label}</td>
                 </tr>
 """
 
@@ -329,8 +308,8 @@ class PlotlyStaticRenderer(MetricsRenderer):
         </table>
 
         <div class="footer">
-            <p>Generated: {build_info['build_timestamp']}<br/>
-            Commit: {build_info['git_commit'][:8]}</p>
+            <p>Generated: {build_info.build_timestamp}<br/>
+            Commit: {build_info.short_commit}</p>
         </div>
     </div>
 
@@ -356,24 +335,14 @@ class PlotlyStaticRenderer(MetricsRenderer):
 </body>
 </html>
 """
+        return html_content
 
-    def _generate_replay_health_html(self, metrics: Dict[str, Any]) -> str:
+    def _generate_replay_health_html(self, view: DashboardViewModel) -> str:
         """Generate HTML for replay health view."""
-        build_info = self.get_build_info()
-
-        # Mock replay health data - in real implementation, this would come from metrics
-        replay_status = {
-            'pass_rate': 0.95,
-            'total_tests': 1000,
-            'failed_tests': 50,
-            'recent_failures': [
-                {'timestamp': '2026-01-28T20:00:00', 'reason': 'Unexpected decision change'},
-                {'timestamp': '2026-01-28T19:45:00', 'reason': 'Timeout exceeded'},
-                {'timestamp': '2026-01-28T19:30:00', 'reason': 'Assertion failed'}
-            ]
-        }
+        build_info = view.build_info
+        replay_status = view.replay_health
 
-        return f"""
+        html_content = f"""
 <!DOCTYPE html>
 <html>
 <head>
@@ -433,10 +402,10 @@ class PlotlyStaticRenderer(MetricsRenderer):
         <h1>Smart Approval Dashboard - Replay Health</h1>
 
         <div class="status-card">
-            <div class="status-value">{replay_status['pass_rate']:.1%}</div>
+            <div class="status-value">{replay_status.pass_rate:.1%}</div>
             <div class="status-label">Replay Corpus Pass Rate</div>
             <div style="margin-top: 10px; color: #666;">
-                {replay_status['total_tests'] - replay_status['failed_tests']}/{replay_status['total_tests']} tests passing
+                {replay_status.passed_tests}/{replay_status.total_tests} tests passing
             </div>
         </div>
 
@@ -444,11 +413,11 @@ class PlotlyStaticRenderer(MetricsRenderer):
         <div class="failures-list">
 """
 
-        for failure in replay_status['recent_failures']:
+        for failure in replay_status.recent_failures:
             html_content += f"""
             <div class="failure-item">
-                <strong>{failure['timestamp']}</strong><br/>
-                {failure['reason']}
+                <strong>{failure.timestamp[:19]}</strong><br/>
+                {failure.reason}
             </div>
 """
 
@@ -456,13 +425,14 @@ class PlotlyStaticRenderer(MetricsRenderer):
         </div>
 
         <div class="footer">
-            <p>Generated: {build_info['build_timestamp']}<br/>
-            Commit: {build_info['git_commit'][:8]}</p>
+            <p>Generated: {build_info.build_timestamp}<br/>
+            Commit: {build_info.short_commit}</p>
         </div>
     </div>
 </body>
 </html>
 """
+        return html_content
 
 
 # Register this renderer
@@ -0,0 +1,346 @@
+#!/usr/bin/env python3
+"""
+Rollup Store for Smart Approval Metrics
+Keeps per-minute, per-hour and per-day decision counts in SQLite, folded
+from the transcript as it is written, so metrics and dashboards read a few
+thousand rows instead of scanning transcripts.
+
+Buckets are keyed by their UTC start written as a prefix of the transcript
+timestamp ("2026-10-19T13:45", "2026-10-19T13", "2026-10-19"): keys sort
+chronologically and need no date parsing per decision.
+"""
+
+import json
+import os
+import sqlite3
+import sys
+import threading
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+# Add smart approval to path
+sys.path.insert(0, str(Path(__file__).parent))
+
+from transcript_writer import open_segment, open_transcript
+
+# Resolution: (bucket key length, minutes per bucket, days of buckets kept or None for all)
+RESOLUTIONS = {
+    "minute": (16, 1, 2),
+    "hour": (13, 60, 92),
+    "day": (10, 1440, None),
+}
+
+COUNTERS = ("decisions", "prompts", "denies", "overrides", "cache_lookups", "cache_hits")
+
+DENIED_REASON_PREFIX = "denied_pattern_"
+
+_SCHEMA = f"""
+CREATE TABLE IF NOT EXISTS buckets (
+    resolution TEXT NOT NULL,
+    start TEXT NOT NULL,
+    {", ".join(f"{counter} INTEGER NOT NULL" for counter in COUNTERS)},
+    PRIMARY KEY (resolution, start)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS reason_counts (
+    resolution TEXT NOT NULL,
+    start TEXT NOT NULL,
+    reason TEXT NOT NULL,
+    count INTEGER NOT NULL,
+    PRIMARY KEY (resolution, start, reason)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS state (
+    key TEXT PRIMARY KEY,
+    value
+);
+"""
+
+_UPSERT_BUCKET = f"""
+INSERT INTO buckets (resolution, start, {", ".join(COUNTERS)})
+VALUES (?, ?, {", ".join("?" for _ in COUNTERS)})
+ON CONFLICT (resolution, start) DO UPDATE SET
+{", ".join(f"{counter} = {counter} + excluded.{counter}" for counter in COUNTERS)}
+"""
+
+_UPSERT_REASON = """
+INSERT INTO reason_counts (resolution, start, reason, count) VALUES (?, ?, ?, ?)
+ON CONFLICT (resolution, start, reason) DO UPDATE SET count = count + excluded.count
+"""
+
+_INITIAL_STATE = {"generation": 1, "offset": 0, "lines": 0, "skipped_lines": 0,
+                  "minute_from": None, "hour_from": None}
+
+def default_rollups_path(transcript_path):
+    """Rollup store kept next to a transcript, named after it ("transcript.rollups.sqlite3")"""
+    transcript_path = Path(transcript_path)
+    return transcript_path.with_name(f"{transcript_path.stem}.rollups.sqlite3")
+
+def minute_key(timestamp):
+    """UTC minute bucket ("2026-10-19T13:45") of a transcript timestamp"""
+    # The adapter writes UTC with a "Z" suffix; slicing avoids parsing it,
+    # which Python < 3.11 cannot do with the suffix
+    if timestamp[-1:] not in ("Z", "z"):
+        parsed = datetime.fromisoformat(timestamp)
+        if parsed.tzinfo is not None:
+            timestamp = parsed.astimezone(timezone.utc).isoformat()
+    return timestamp[:16]
+
+def bucket_timestamp(start):
+    """ISO timestamp of a bucket key's start"""
+    return start + "T00:00:00"[len(start) - 10:] + "Z"
+
+def empty_counts():
+    counts = dict.fromkeys(COUNTERS, 0)
+    counts["reasons"] = {}
+    return counts
+
+class RollupStore:
+    """
+    SQLite store of decision counts per minute, hour and day.
+
+    update() folds transcript lines from a (generation, offset) cursor: the
+    byte offset into the segment that was active, and the generation it
+    gets when the transcript writer seals it. The cursor is committed in the
+    same transaction as the counts it covers, so each decision is counted
+    exactly once however many processes update the store.
+    """
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self._initialized = False
+        self._init_lock = threading.Lock()
+
+    def _connect(self):
+        # A connection per call: updates run on transcript flush threads
+        connection = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        with self._init_lock:
+            if not self._initialized:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                # Readers (dashboards) do not block the writer, nor it them
+                connection.execute("PRAGMA journal_mode=WAL")
+                connection.executescript(_SCHEMA)
+                self._initialized = True
+        connection.execute("PRAGMA synchronous=NORMAL")
+        return connection
+
+    def state(self, connection=None):
+        """Cursor, line counts and the day each fine resolution is complete from"""
+        state = dict(_INITIAL_STATE)
+        if connection is not None:
+            state.update(connection.execute("SELECT key, value FROM state"))
+        elif self.path.exists():
+            connection = self._connect()
+            try:
+                state.update(connection.execute("SELECT key, value FROM state"))
+            finally:
+                connection.close()
+        return state
+
+    def update(self, transcript_path):
+        """
+        Fold decisions appended to a transcript since the last update.
+
+        Returns:
+            int: Number of decisions folded
+        """
+        connection = self._connect()
+        try:
+            # Take the write lock before reading the cursor
+            connection.execute("BEGIN IMMEDIATE")
+            state = self.state(connection)
+            lines_before = state["lines"]
+            minutes = {}
+            self._read_transcript(Path(transcript_path), state, minutes)
+            self._write_buckets(connection, state, minutes)
+            connection.executemany("INSERT OR REPLACE INTO state (key, value) VALUES (?, ?)", state.items())
+            connection.execute("COMMIT")
+        except BaseException:
+            if connection.in_transaction:
+                connection.execute("ROLLBACK")
+            raise
+        finally:
+            connection.close()
+        return state["lines"] - lines_before
+
+    def _read_transcript(self, transcript_path, state, minutes):
+        """Fold lines after the cursor into per-minute counts, advancing the cursor"""
+        sealed, active = open_transcript(transcript_path)
+        try:
+            for generation, segment in sealed:
+                if generation < state["generation"]:
+                    continue
+                if generation > state["generation"]:
+                    state.update(generation=generation, offset=0)
+                # Listed under the lock but opened after it; open_segment
+                # follows a segment compressed in between
+                try:
+                    f = open_segment(segment)
+                except FileNotFoundError:
+                    print(f"Warning: {segment} was deleted before it was read", file=sys.stderr)
+                else:
+                    with f:
+                        self._fold_lines(f, state, minutes, sealed=True)
+                state.update(generation=generation + 1, offset=0)
+
+            # The active segment becomes the generation after the last sealed
+            # one; they differ only if sealed segments were deleted
+            state["generation"] = sealed[-1][0] + 1 if sealed else 1
+            if active is not None:
+                if os.fstat(active.fileno()).st_size < state["offset"]:
+                    # Replaced by something other than rotation
+                    print(f"Warning: {transcript_path} shrank, reading it from the start", file=sys.stderr)
+                    state["offset"] = 0
+                self._fold_lines(active, state, minutes, sealed=False)
+        finally:
+            if active is not None:
+                active.close()
+
+    @staticmethod
+    def _fold_lines(f, state, minutes, sealed):
+        """Fold lines from the cursor offset; stop before an unterminated last line unless sealed"""
+        f.seek(state["offset"])
+        for line in f:
+            if not line.endswith(b"\n") and not sealed:
+                break
+            state["offset"] += len(line)
+            if not line.strip():
+                continue
+            try:
+                decision = json.loads(line)
+                details = decision["decision_details"]
+                minute = minute_key(details["timestamp"])
+            except (ValueError, KeyError, TypeError, AttributeError):
+                state["skipped_lines"] += 1
+                continue
+
+            state["lines"] += 1
+            counts = minutes.get(minute)
+            if counts is None:
+                counts = minutes[minute] = empty_counts()
+            counts["decisions"] += 1
+            reason = decision.get("reason", "unknown")
+            if decision.get("requires_approval", True):
+                counts["prompts"] += 1
+                if reason.startswith(DENIED_REASON_PREFIX):
+                    counts["denies"] += 1
+            if decision.get("override_applied", False):
+                counts["overrides"] += 1
+            # Decision cache effectiveness; older transcript entries carry no flag
+            if "cache_hit" in details:
+                counts["cache_lookups"] += 1
+                counts["cache_hits"] += bool(details["cache_hit"])
+            counts["reasons"][reason] = counts["reasons"].get(reason, 0) + 1
+
+    def _write_buckets(self, connection, state, minutes):
+        """Add per-minute counts to every resolution and drop buckets past retention"""
+        today = datetime.now(timezone.utc)
+        for resolution, (key_length, _, keep_days) in RESOLUTIONS.items():
+            if keep_days is not None:
+                cutoff = (today - timedelta(days=keep_days)).strftime("%Y-%m-%d")
+                connection.execute("DELETE FROM buckets WHERE resolution = ? AND start < ?", (resolution, cutoff))
+                connection.execute("DELETE FROM reason_counts WHERE resolution = ? AND start < ?",
+                                   (resolution, cutoff))
+                covered_from = f"{resolution}_from"
+                if state[covered_from] is None or state[covered_from] < cutoff:
+                    state[covered_from] = cutoff
+            else:
+                cutoff = ""
+
+            buckets = {}
+            for minute, counts in minutes.items():
+                start = minute[:key_length]
+                if start < cutoff:
+                    continue
+                bucket = buckets.get(start)
+                if bucket is None:
+                    buckets[start] = bucket = empty_counts()
+                for counter in COUNTERS:
+                    bucket[counter] += counts[counter]
+                for reason, count in counts["reasons"].items():
+                    bucket["reasons"][reason] = bucket["reasons"].get(reason, 0) + count
+
+            connection.executemany(_UPSERT_BUCKET, [
+                (resolution, start, *(bucket[counter] for counter in COUNTERS))
+                for start, bucket in buckets.items()])
+            connection.executemany(_UPSERT_REASON, [
+                (resolution, start, reason, count)
+                for start, bucket in buckets.items() for reason, count in bucket["reasons"].items()])
+
+    def _ranges(self, since, state):
+        """
+        (resolution, first key, key bound or None) covering since until now.
+
+        Minute buckets cover the recent days, hour buckets the time before,
+        day buckets the rest; each range ends where a finer one takes over.
+        """
+        since_minute = since.astimezone(timezone.utc).strftime("%Y-%m-%dT%H:%M")
+        minute_from = state["minute_from"] or ""
+        hour_from = state["hour_from"] or ""
+        return [
+            ("minute", max(since_minute, minute_from), None),
+            ("hour", max(since_minute[:13], hour_from), minute_from),
+            ("day", since_minute[:10], hour_from),
+        ]
+
+    def window(self, since):
+        """
+        Counts of decisions from since until now.
+
+        Exact to the minute within the minute retention; further back the
+        window starts at the hour, or the day, containing since.
+        """
+        counts = empty_counts()
+        if not self.path.exists():
+            return counts
+
+        connection = self._connect()
+        try:
+            for resolution, first, bound in self._ranges(since, self.state(connection)):
+                condition = "resolution = ? AND start >= ?" + (" AND start < ?" if bound is not None else "")
+                parameters = (resolution, first) + ((bound,) if bound is not None else ())
+                row = connection.execute(
+                    f"SELECT {', '.join(f'sum({counter})' for counter in COUNTERS)} FROM buckets WHERE {condition}",
+                    parameters).fetchone()
+                for counter, value in zip(COUNTERS, row):
+                    counts[counter] += value or 0
+                for reason, count in connection.execute(
+                        f"SELECT reason, sum(count) FROM reason_counts WHERE {condition} GROUP BY reason", parameters):
+                    counts["reasons"][reason] = counts["reasons"].get(reason, 0) + count
+        finally:
+            connection.close()
+        return counts
+
+    def timeseries(self, resolution, since=None):
+        """
+        Buckets of one resolution, oldest first, as dashboard data points.
+
+        Rates are per minute, like the metrics schema's prompt_rate,
+        override_rate and deny_rate.
+        """
+        _, bucket_minutes, _ = RESOLUTIONS[resolution]
+        if not self.path.exists():
+            return []
+        first = since.astimezone(timezone.utc).strftime("%Y-%m-%dT%H:%M") if since is not None else ""
+        first = first[:RESOLUTIONS[resolution][0]]
+
+        connection = self._connect()
+        try:
+            reasons = {}
+            for start, reason, count in connection.execute(
+                    "SELECT start, reason, count FROM reason_counts WHERE resolution = ? AND start >= ?",
+                    (resolution, first)):
+                reasons.setdefault(start, {})[reason] = count
+            rows = connection.execute(
+                f"SELECT start, {', '.join(COUNTERS)} FROM buckets WHERE resolution = ? AND start >= ? ORDER BY start",
+                (resolution, first)).fetchall()
+        finally:
+            connection.close()
+
+        points = []
+        for start, *values in rows:
+            point = {"timestamp": bucket_timestamp(start), **dict(zip(COUNTERS, values))}
+            point["prompt_rate"] = point["prompts"] / bucket_minutes
+            point["override_rate"] = point["overrides"] / bucket_minutes
+            point["deny_rate"] = point["denies"] / bucket_minutes
+            point["reasons"] = reasons.get(start, {})
+            points.append(point)
+        return points
@@ -0,0 +1,598 @@
+#!/usr/bin/env python3
+"""
+Shell Command Parser for Smart Approval
+Parses a command line into command lists, pipelines, subshells and simple
+commands with their redirections, so each command the shell would run can
+be checked against the safety profiles on its own.
+
+Covers the POSIX shell grammar agents use on one line: quoting, escapes,
+line continuations, comments, `;` `&` `&&` `||` newlines, `|` `|&`,
+`( ... )` subshells, `$( ... )` and backtick substitutions, and fd
+redirections. Anything else (unbalanced quotes or parentheses, a missing
+command after an operator) raises ShellSyntaxError.
+"""
+
+import re
+
+# Runs of characters with no special meaning outside quotes
+_PLAIN_RUN = re.compile(r"[^ \t\n\r\f\v|&;()<>'\"\\`$]+")
+# Runs of characters with no special meaning inside double quotes
+_DOUBLE_QUOTED_RUN = re.compile(r'[^"\\`$]+')
+
+# One token after optional blanks (and backslash-newline continuations).
+# The word alternative covers words without substitutions; a word it stops
+# short of is rescanned character by character.
+_TOKEN = re.compile(r"""
+    [ \t\r\f\v]*(?:\\\n[ \t\r\f\v]*)*
+    (?:
+        (?P<comment>\#[^\n]*)
+      | (?P<fd>\d*)(?P<redirect>>>|>&|>\||<<<|<<-|<<|<&|<>|>|<)
+      | (?P<all_redirect>&>>|&>)
+      | (?P<op>&&|\|\||\|&|;;|[|&;()\n])
+      | (?P<word>(?:
+            [^ \t\n\r\f\v|&;()<>'"\\`$]+
+          | '[^']*'
+          | "[^"\\`$]*(?:(?:\\[\s\S]|\$(?!\())[^"\\`$]*)*"
+          | \\[\s\S]
+          | \$(?!\()
+        )+)
+      | (?P<eof>\Z)
+    )
+""", re.VERBOSE)
+_WORD_CONTINUES = frozenset("'\"\\`$")
+
+# Lines of plain words and list or pipeline operators: no quotes, escapes,
+# substitutions, comments, parentheses or redirections, and no whitespace
+# that str.split() separates on but the shell does not
+_PLAIN_LINE = re.compile("[^()<>'\"\\\\`$#\x1c-\x1f\x85\xa0\u1680\u2000-\u200a\u2028\u2029\u202f\u205f\u3000]*")
+# Operator characters; two-character operators are rejoined by _parse_plain
+_OPERATOR_CHAR = re.compile(r"([|&;\n])")
+_DOUBLE_OPERATORS = frozenset(("&&", "||", "|&", ";;"))
+_BLANKS = re.compile(r"[ \t\r\f\v]*(?:\\\n[ \t\r\f\v]*)*")
+
+# Quoted and escaped parts of a word without substitutions, for quote removal
+_WORD_PART = re.compile(r"""'([^']*)'|"((?:[^"\\]|\\[\s\S])*)"|\\([\s\S])""")
+_DOUBLE_QUOTED_ESCAPE = re.compile(r'\\([$`"\\\n])')
+
+# Characters a backslash escapes inside double quotes
+_DOUBLE_QUOTE_ESCAPES = '$`"\\\n'
+
+# Redirection operators that write to their target, and their rendering
+_OUTPUT_REDIRECTS = {">": ">", ">|": ">", "&>": ">", "<>": ">", ">>": ">>", "&>>": ">>"}
+_DUPLICATING_REDIRECTS = (">&", "<&")
+
+class ShellSyntaxError(ValueError):
+    """Raised when a command line is not valid (supported) shell syntax"""
+
+def _remove_quotes(part):
+    single, double, escaped = part.groups()
+    if single is not None:
+        return single
+    if double is not None:
+        return _DOUBLE_QUOTED_ESCAPE.sub(lambda match: "" if match.group(1) == "\n" else match.group(1), double)
+    return "" if escaped == "\n" else escaped
+
+class Word:
+    """
+    One shell word.
+
+    text is the word as written, quotes and escapes included; value is what
+    the shell passes on after quote removal, with substitutions left as
+    written. substitutions holds the parsed command list of every `$(...)`
+    or backtick substitution in the word.
+    """
+
+    __slots__ = ("text", "_value", "substitutions")
+
+    def __init__(self, text, value=None, substitutions=()):
+        self.text = text
+        self._value = value
+        self.substitutions = substitutions
+
+    @property
+    def value(self):
+        # Computed on first use; the policy only looks at text
+        if self._value is None:
+            self._value = _WORD_PART.sub(_remove_quotes, self.text)
+        return self._value
+
+    def __repr__(self):
+        return f"Word({self.text!r})"
+
+class Redirect:
+    """A redirection: operator (fd number stripped), optional fd, target word"""
+
+    def __init__(self, operator, fd, target):
+        self.operator = operator
+        self.fd = fd
+        self.target = target
+
+    def writes_file(self):
+        """True if the redirection can create or modify a file"""
+        if self.operator in _DUPLICATING_REDIRECTS:
+            # >&2 and 2>&1 duplicate descriptors; >&file is bash for &>file
+            return not (self.target.value.isdigit() or self.target.value == "-")
+        return self.operator in _OUTPUT_REDIRECTS
+
+    def render(self):
+        """Canonical ' > target' / ' >> target' / ' < target' text, or '' if harmless"""
+        if self.writes_file():
+            return f" {_OUTPUT_REDIRECTS.get(self.operator, '>')} {self.target.text}"
+        if self.operator.startswith("<") and self.operator not in _DUPLICATING_REDIRECTS:
+            return f" < {self.target.text}"
+        return ""
+
+    def __repr__(self):
+        return f"Redirect({self.fd or ''}{self.operator} {self.target.text!r})"
+
+class SimpleCommand:
+    """
+    Words and redirections of one command.
+
+    texts holds the text of each word. The flat parsers record only the
+    texts and Word objects are created on first use of words, since the
+    policy only looks at texts.
+    """
+
+    __slots__ = ("_words", "texts", "redirects")
+
+    def __init__(self, words, redirects, texts=None):
+        self._words = words
+        self.redirects = redirects
+        self.texts = [word.text for word in words] if texts is None else texts
+
+    @property
+    def words(self):
+        if self._words is None:
+            self._words = list(map(Word, self.texts))
+        return self._words
+
+    def __repr__(self):
+        return f"SimpleCommand({self.words!r}, {self.redirects!r})"
+
+class Subshell:
+    """A parenthesized command list and the redirections applied to it"""
+
+    def __init__(self, body, redirects):
+        self.body = body
+        self.redirects = redirects
+
+    def __repr__(self):
+        return f"Subshell({self.body!r}, {self.redirects!r})"
+
+class Pipeline:
+    """Commands connected by | or |&"""
+
+    def __init__(self, commands):
+        self.commands = commands
+
+    def __repr__(self):
+        return f"Pipeline({self.commands!r})"
+
+class CommandList:
+    """
+    Pipelines separated by ;, &, &&, || (newlines are reported as ;)
+
+    flat is True when the list has no subshells and no substitutions, so
+    its pipelines hold only simple commands.
+    """
+
+    def __init__(self, pipelines, separators, flat=False):
+        self.pipelines = pipelines
+        self.separators = separators
+        self.flat = flat
+
+    def __repr__(self):
+        return f"CommandList({self.pipelines!r}, {self.separators!r})"
+
+class _Token:
+    __slots__ = ("kind", "value", "fd")
+
+    def __init__(self, kind, value, fd=None):
+        self.kind = kind
+        self.value = value
+        self.fd = fd
+
+    def describe(self):
+        if self.kind == "eof":
+            return "end of command"
+        return repr(self.value.text if self.kind == "word" else self.value)
+
+def _parse_plain(source):
+    """
+    Parse a line of plain words and list or pipeline operators.
+
+    The operators are split off and each command split into words with C
+    string methods, so long pipelines and argument lists cost a few
+    allocations per word rather than a regex match and a trip through the
+    token loop. Returns None if the line has anything else (see _PLAIN_LINE).
+    """
+    if _PLAIN_LINE.fullmatch(source) is None:
+        return None
+    # [text, operator, text, ..., text]; "a && b" splits into "a ", "&", "", "&", " b"
+    parts = _OPERATOR_CHAR.split(source)
+    pipelines = []
+    separators = []
+    stages = []
+    after_and_or = None
+    last = len(parts) - 1
+    index = 0
+    while index <= last:
+        texts = parts[index].split()
+        if index == last:
+            value = None
+        else:
+            value = parts[index + 1]
+            if index + 3 <= last and not parts[index + 2] and value + parts[index + 3] in _DOUBLE_OPERATORS:
+                value += parts[index + 3]
+                index += 2
+        index += 2
+        if value == ";;":
+            raise ShellSyntaxError("';;' outside a case statement")
+
+        # Any operator, or the end of the line, ends the current command
+        if texts:
+            stages.append(SimpleCommand(None, [], texts))
+        elif value == "\n":
+            continue
+        elif value is None:
+            if stages:
+                raise ShellSyntaxError("expected a command, found end of command")
+            if after_and_or:
+                raise ShellSyntaxError(f"missing command after {after_and_or!r}")
+            break
+        else:
+            raise ShellSyntaxError(f"expected a command, found {value!r}")
+
+        if value is None:
+            pipelines.append(Pipeline(stages))
+            break
+        if value != "|" and value != "|&":
+            pipelines.append(Pipeline(stages))
+            stages = []
+            separators.append(";" if value == "\n" else value)
+            after_and_or = value if value in ("&&", "||") else None
+    return CommandList(pipelines, separators, flat=True)
+
+def _parse_flat(source):
+    """
+    Parse a line without subshells or substitutions in one regex pass.
+
+    Returns None if the line needs the recursive parser: it has parentheses,
+    or a word the token regex cannot match (a substitution, or a quote or
+    escape that does not terminate), which leaves a gap between matches.
+    """
+    pipelines = []
+    separators = []
+    stages = []
+    words = []
+    redirects = []
+    redirect = None
+    after_and_or = None
+    # The scanner matches each token where the previous one ended and stops
+    # at the first gap
+    for match in iter(_TOKEN.scanner(source).match, None):
+        kind = match.lastgroup
+        if kind == "word":
+            if redirect is None:
+                words.append(match.group(kind))
+            else:
+                redirects.append(Redirect(redirect[0], redirect[1], Word(match.group(kind))))
+                redirect = None
+            continue
+        if kind == "comment":
+            continue
+
+        value = match.group(kind)
+        if redirect is not None:
+            raise ShellSyntaxError(f"missing target after {redirect[0]!r}")
+        if kind == "redirect":
+            redirect = (value, match.group("fd") or None)
+            continue
+        if kind == "all_redirect":
+            redirect = (value, None)
+            continue
+        if value == "(" or value == ")":
+            return None
+        if value == ";;":
+            raise ShellSyntaxError("';;' outside a case statement")
+
+        # Any other token ends the current command
+        if words or redirects:
+            stages.append(SimpleCommand(None, redirects, words))
+            words = []
+            redirects = []
+        elif value == "\n":
+            continue
+        elif kind == "eof":
+            if stages:
+                raise ShellSyntaxError("expected a command, found end of command")
+            if after_and_or:
+                raise ShellSyntaxError(f"missing command after {after_and_or!r}")
+            break
+        else:
+            raise ShellSyntaxError(f"expected a command, found {value!r}")
+
+        if kind == "eof":
+            pipelines.append(Pipeline(stages))
+            break
+        if value != "|" and value != "|&":
+            pipelines.append(Pipeline(stages))
+            stages = []
+            separators.append(";" if value == "\n" else value)
+            after_and_or = value if value in ("&&", "||") else None
+    else:
+        return None
+    return CommandList(pipelines, separators, flat=True)
+
+class _Parser:
+    """Recursive-descent parser over source[pos:], stopping at closer if given"""
+
+    def __init__(self, source, pos=0):
+        self.source = source
+        self.pos = pos
+        self._lookahead = None
+
+    # Lexer
+
+    def peek(self):
+        if self._lookahead is None:
+            self._lookahead = self._lex()
+        return self._lookahead
+
+    def next(self):
+        token = self.peek()
+        self._lookahead = None
+        return token
+
+    def _lex(self):
+        source = self.source
+        while True:
+            match = _TOKEN.match(source, self.pos)
+            if match is None:
+                # Only a word _TOKEN cannot start, such as one opening with $(
+                self.pos = _BLANKS.match(source, self.pos).end()
+                return _Token("word", self._lex_word())
+            kind = match.lastgroup
+            if kind != "comment":
+                break
+            self.pos = match.end()
+
+        if kind == "word":
+            end = match.end()
+            if end < len(source) and source[end] in _WORD_CONTINUES:
+                # A substitution or unterminated quote; rescan the whole word
+                self.pos = match.start(kind)
+                return _Token("word", self._lex_word())
+            self.pos = end
+            return _Token("word", Word(match.group(kind)))
+
+        self.pos = match.end()
+        if kind == "eof":
+            return _Token("eof", None)
+        if kind == "redirect":
+            return _Token("redirect", match.group(kind), match.group("fd") or None)
+        if kind == "all_redirect":
+            return _Token("redirect", match.group(kind))
+        if match.group(kind) == ";;":
+            raise ShellSyntaxError("';;' outside a case statement")
+        return _Token("op", match.group(kind))
+
+    def _lex_word(self):
+        source = self.source
+        start = pos = self.pos
+        value = []
+        substitutions = []
+        while pos < len(source):
+            match = _PLAIN_RUN.match(source, pos)
+            if match:
+                value.append(match.group())
+                pos = match.end()
+                continue
+
+            char = source[pos]
+            if char == "'":
+                end = source.find("'", pos + 1)
+                if end < 0:
+                    raise ShellSyntaxError("unterminated single quote")
+                value.append(source[pos + 1:end])
+                pos = end + 1
+            elif char == '"':
+                pos = self._lex_double_quoted(pos + 1, value, substitutions)
+            elif char == "\\":
+                if pos + 1 >= len(source):
+                    raise ShellSyntaxError("trailing backslash")
+                if source[pos + 1] != "\n":
+                    value.append(source[pos + 1])
+                pos += 2
+            elif char == "$" or char == "`":
+                pos = self._lex_substitution(pos, value, substitutions)
+            else:
+                break
+
+        if pos == start:
+            raise ShellSyntaxError(f"unexpected {source[pos]!r}")
+        self.pos = pos
+        return Word(source[start:pos], "".join(value), substitutions)
+
+    def _lex_double_quoted(self, pos, value, substitutions):
+        """Scan a double-quoted string after its opening quote; return the position past it"""
+        source = self.source
+        while pos < len(source):
+            match = _DOUBLE_QUOTED_RUN.match(source, pos)
+            if match:
+                value.append(match.group())
+                pos = match.end()
+                continue
+
+            char = source[pos]
+            if char == '"':
+                return pos + 1
+            if char == "\\":
+                if pos + 1 >= len(source):
+                    break
+                escaped = source[pos + 1]
+                if escaped in _DOUBLE_QUOTE_ESCAPES:
+                    if escaped != "\n":
+                        value.append(escaped)
+                else:
+                    value.append("\\" + escaped)
+                pos += 2
+            else:
+                pos = self._lex_substitution(pos, value, substitutions)
+        raise ShellSyntaxError("unterminated double quote")
+
+    def _lex_substitution(self, pos, value, substitutions):
+        """Scan `$...` or a backtick substitution at pos; return the position past it"""
+        source = self.source
+        if source.startswith("$(", pos):
+            inner = _Parser(source, pos + 2)
+            substitutions.append(inner.parse_list(closer=")"))
+            if inner.next().value != ")":
+                raise ShellSyntaxError("unterminated $(")
+            end = inner.pos
+        elif source[pos] == "`":
+            end = pos + 1
+            while end < len(source) and source[end] != "`":
+                end += 2 if source[end] == "\\" else 1
+            if end >= len(source):
+                raise ShellSyntaxError("unterminated backtick")
+            inner_source = re.sub(r"\\([$`\\])", r"\1", source[pos + 1:end])
+            substitutions.append(parse_command(inner_source))
+            end += 1
+        else:
+            # $name, ${name}, $? and a lone $ expand to data, not commands
+            end = pos + 1
+        value.append(source[pos:end])
+        return end
+
+    # Grammar
+
+    def parse_list(self, closer=None):
+        """list := pipeline ((; | & | && | || | newline) pipeline)* [; | & | newline]"""
+        pipelines = []
+        separators = []
+        self._skip_newlines()
+        while not self._at_end(closer):
+            pipelines.append(self.parse_pipeline())
+            token = self.peek()
+            if token.kind != "op" or token.value not in ("&&", "||", ";", "&", "\n"):
+                if self._at_end(closer):
+                    break
+                raise ShellSyntaxError(f"unexpected {token.describe()}")
+
+            self.next()
+            separators.append(";" if token.value == "\n" else token.value)
+            self._skip_newlines()
+            if token.value in ("&&", "||") and self._at_end(closer):
+                raise ShellSyntaxError(f"missing command after {token.value!r}")
+        return CommandList(pipelines, separators)
+
+    def parse_pipeline(self):
+        """pipeline := command ((| | |&) newline* command)*"""
+        commands = [self.parse_command()]
+        while self.peek().kind == "op" and self.peek().value in ("|", "|&"):
+            self.next()
+            self._skip_newlines()
+            commands.append(self.parse_command())
+        return Pipeline(commands)
+
+    def parse_command(self):
+        """command := ( list ) redirect* | (word | redirect)+"""
+        token = self.peek()
+        if token.kind == "op" and token.value == "(":
+            self.next()
+            body = self.parse_list(closer=")")
+            if self.next().value != ")":
+                raise ShellSyntaxError("unterminated (")
+            if not body.pipelines:
+                raise ShellSyntaxError("empty subshell")
+            return Subshell(body, self._parse_redirects())
+
+        words = []
+        redirects = []
+        while True:
+            token = self.peek()
+            if token.kind == "word":
+                self._lookahead = None
+                words.append(token.value)
+            elif token.kind == "redirect":
+                redirects.append(self._parse_redirect())
+            else:
+                break
+        if not words and not redirects:
+            raise ShellSyntaxError(f"expected a command, found {token.describe()}")
+        return SimpleCommand(words, redirects)
+
+    def _parse_redirects(self):
+        redirects = []
+        while self.peek().kind == "redirect":
+            redirects.append(self._parse_redirect())
+        return redirects
+
+    def _parse_redirect(self):
+        token = self.next()
+        target = self.next()
+        if target.kind != "word":
+            raise ShellSyntaxError(f"missing target after {token.value!r}")
+        return Redirect(token.value, token.fd, target.value)
+
+    def _skip_newlines(self):
+        while self.peek().kind == "op" and self.peek().value == "\n":
+            self.next()
+
+    def _at_end(self, closer):
+        token = self.peek()
+        return token.kind == "eof" or (closer is not None and token.kind == "op" and token.value == closer)
+
+def parse_command(source):
+    """
+    Parse a command line.
+
+    Returns:
+        CommandList: The parsed command line (no pipelines if it is blank)
+
+    Raises:
+        ShellSyntaxError: If the line is not valid shell syntax
+    """
+    tree = _parse_plain(source)
+    if tree is not None:
+        return tree
+    tree = _parse_flat(source)
+    if tree is not None:
+        return tree
+
+    parser = _Parser(source)
+    tree = parser.parse_list()
+    token = parser.next()
+    if token.kind != "eof":
+        raise ShellSyntaxError(f"unexpected {token.describe()}")
+    return tree
+
+def iter_simple_commands(tree):
+    """
+    Yield (SimpleCommand, piped) for every command the line would run.
+
+    Covers pipeline stages, subshell bodies and substitutions nested in
+    words or redirect targets; piped is True for every pipeline stage
+    after the first. A subshell whose own redirections write a file
+    yields them as a command without words.
+    """
+    if tree.flat:
+        for pipeline in tree.pipelines:
+            yield pipeline.commands[0], False
+            for command in pipeline.commands[1:]:
+                yield command, True
+        return
+
+    for pipeline in tree.pipelines:
+        for stage, command in enumerate(pipeline.commands):
+            if isinstance(command, Subshell):
+                yield from iter_simple_commands(command.body)
+                if any(redirect.writes_file() for redirect in command.redirects):
+                    yield SimpleCommand([], command.redirects), stage > 0
+            else:
+                yield command, stage > 0
+            for word in [*getattr(command, "words", ()), *(redirect.target for redirect in command.redirects)]:
+                for substitution in word.substitutions:
+                    yield from iter_simple_commands(substitution)
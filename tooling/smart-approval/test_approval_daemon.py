@@ -0,0 +1,224 @@
+#!/usr/bin/env python3
+"""
+Tests for the Smart Approval Decision Daemon
+Runs the daemon on a temporary socket and checks its decisions against the
+in-process adapter, profile hot reload and the hook's fallback.
+
+Run directly with --bench to compare per-command hook latency:
+    python tooling/smart-approval/test_approval_daemon.py --bench
+"""
+
+import json
+import os
+import shutil
+import socket
+import stat
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import timeit
+import unittest
+import yaml
+from pathlib import Path
+from unittest.mock import patch
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent))
+
+import cline_adapter
+from approval_client import request, request_decision
+from approval_daemon import ApprovalServer, ApprovalService
+from prototype import default_profiles_path
+
+SMART_APPROVAL_DIR = Path(__file__).resolve().parent
+
+
+def start_daemon(directory, profiles_path=None):
+    """Serve an ApprovalService from directory on a background thread"""
+    service = ApprovalService(profiles_path, Path(directory) / "transcript.jsonl")
+    server = ApprovalServer(Path(directory) / "approval.sock", service)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return server
+
+
+def stop_daemon(server):
+    server.shutdown()
+    server.server_close()
+    server.service.adapter.transcript.close()
+
+
+def decision_without_details(decision):
+    return {key: value for key, value in decision.items() if key != "details"}
+
+
+class TestApprovalDaemon(unittest.TestCase):
+
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self._tmp.cleanup)
+        self.directory = Path(self._tmp.name)
+        self.profiles = self.directory / "safety_profiles.yml"
+        shutil.copy(default_profiles_path(), self.profiles)
+
+        self.server = start_daemon(self.directory, self.profiles)
+        self.addCleanup(stop_daemon, self.server)
+        self.socket = self.server.server_address
+
+    def test_decisions_match_in_process_adapter(self):
+        """The daemon answers exactly what the in-process adapter decides"""
+        adapter = cline_adapter.ClineSmartApprovalAdapter(self.directory / "local.jsonl", self.profiles)
+        self.addCleanup(adapter.transcript.close)
+        for command in ["ls -la", "git status", "rm -rf /", "mkdir build", "unknown_cmd", ""]:
+            with self.subTest(command=command):
+                decision = request_decision(command, {"user": "t"}, path=self.socket)
+                expected = cline_adapter.to_cline_decision(adapter.evaluate_command(command, {"user": "t"}))
+                self.assertEqual(decision_without_details(decision), decision_without_details(expected))
+                self.assertEqual(decision["details"]["context"], {"user": "t"})
+                self.assertEqual(decision["details"]["working_directory"], os.getcwd())
+
+        self.server.service.adapter.transcript.flush()
+        transcript = (self.directory / "transcript.jsonl").read_text().splitlines()
+        self.assertEqual(len(transcript), 6)
+        self.assertIn("requires_approval", json.loads(transcript[0]))
+
+    def test_multiple_requests_per_connection(self):
+        """One connection can carry several newline-delimited requests"""
+        with socket.socket(socket.AF_UNIX) as sock:
+            sock.connect(self.socket)
+            sock.sendall(b'{"op": "ping"}\n{"op": "evaluate", "command": "git status", "cwd": "/"}\nnot json\n')
+            with sock.makefile('rb') as reader:
+                replies = [json.loads(reader.readline()) for _ in range(3)]
+
+        self.assertTrue(replies[0]["ok"])
+        self.assertEqual(replies[1]["reason"], "read_only_exact")
+        self.assertIn("invalid request", replies[2]["error"])
+
+    def test_error_replies_are_none_for_client(self):
+        """Malformed requests get an error reply, which the client maps to None"""
+        self.assertIsNone(request({"op": "shutdown"}, self.socket))
+        self.assertIsNone(request({"op": "evaluate", "command": "ls", "cwd": "relative"}, self.socket))
+        self.assertIsNone(request({"op": "evaluate", "command": ["ls"], "cwd": "/"}, self.socket))
+
+    def test_profiles_hot_reload(self):
+        """Editing the profiles file changes the next decision"""
+        self.assertFalse(request_decision("ls -la", path=self.socket)["requires_approval"])
+        self.assertFalse(request_decision("ls -la", path=self.socket)["requires_approval"])
+        before = request({"op": "ping"}, self.socket)
+        self.assertEqual(before["decision_cache"]["hits"], 1)
+
+        profiles = yaml.safe_load(self.profiles.read_text())
+        profiles['command_safety_profiles']['profiles']['read_only']['denylist_contains'].append("ls -la")
+        self.profiles.write_text(yaml.safe_dump(profiles))
+        os.utime(self.profiles, ns=(time.time_ns(), time.time_ns() + 10**9))
+
+        decision = request_decision("ls -la", path=self.socket)
+        self.assertTrue(decision["requires_approval"])
+        self.assertTrue(decision["reason"].startswith("denied_pattern_"))
+        after = request({"op": "ping"}, self.socket)
+        self.assertEqual(after["reloads"], 1)
+        self.assertNotEqual(after["policy_version"], before["policy_version"])
+        self.assertEqual((after["decision_cache"]["hits"], after["decision_cache"]["size"]), (0, 1))
+        self.assertFalse(decision["details"]["cache_hit"])
+
+    def test_broken_profiles_keep_previous_policy(self):
+        """A profiles file that fails to parse leaves the running policy in place"""
+        self.profiles.write_text("command_safety_profiles: [unclosed\n")
+        os.utime(self.profiles, ns=(time.time_ns(), time.time_ns() + 10**9))
+
+        with patch('sys.stderr'):
+            decision = request_decision("git status", path=self.socket)
+        self.assertEqual(decision["reason"], "read_only_exact")
+        self.assertEqual(request({"op": "ping"}, self.socket)["reloads"], 0)
+
+    def test_socket_permissions_and_claim(self):
+        """The socket is owner-only, and a live daemon's socket is not taken over"""
+        self.assertEqual(stat.S_IMODE(os.stat(self.socket).st_mode), 0o600)
+        with self.assertRaises(RuntimeError):
+            ApprovalServer(self.socket, self.server.service)
+
+
+class TestApprovalHook(unittest.TestCase):
+
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self._tmp.cleanup)
+        self.directory = Path(self._tmp.name)
+        cwd = os.getcwd()
+        os.chdir(self.directory)
+        self.addCleanup(os.chdir, cwd)
+
+    def test_hook_uses_daemon(self):
+        """With a daemon running the hook does not build an adapter"""
+        server = start_daemon(self.directory)
+        self.addCleanup(stop_daemon, server)
+
+        with patch.dict(os.environ, {"SMART_APPROVAL_SOCKET": server.server_address}), \
+                patch.object(cline_adapter, 'ClineSmartApprovalAdapter') as adapter:
+            decision = cline_adapter.cline_approval_hook("git status", user="t")
+        adapter.assert_not_called()
+        self.assertEqual(decision["reason"], "read_only_exact")
+        self.assertEqual(decision["details"]["context"], {"user": "t"})
+
+    def test_hook_falls_back_without_daemon(self):
+        """Without a daemon (or with a stale socket) the hook evaluates in-process"""
+        stale = self.directory / "stale.sock"
+        with socket.socket(socket.AF_UNIX) as sock:
+            sock.bind(str(stale))
+
+        for path in [self.directory / "missing.sock", stale]:
+            with self.subTest(path=path.name), patch.dict(os.environ, {"SMART_APPROVAL_SOCKET": str(path)}):
+                decision = cline_adapter.cline_approval_hook("rm -rf /")
+                self.assertTrue(decision["requires_approval"])
+                self.assertTrue(decision["reason"].startswith("denied_pattern_"))
+
+        # A stale socket is replaced when a daemon starts on it
+        server = ApprovalServer(stale, ApprovalService(log_path=self.directory / "transcript.jsonl"))
+        self.addCleanup(server.server_close)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        self.addCleanup(server.shutdown)
+        self.assertTrue(request({"op": "ping"}, stale)["ok"])
+
+
+def run_benchmark(commands=200):
+    """Print per-command hook latency in-process, via a fresh interpreter, and via the daemon"""
+    with tempfile.TemporaryDirectory() as tmp:
+        os.chdir(tmp)
+        sock = str(Path(tmp) / "approval.sock")
+        hook = ("import sys; sys.path.insert(0, %r); import cline_adapter; "
+                "cline_adapter.cline_approval_hook('ls -la')" % str(SMART_APPROVAL_DIR))
+        env = dict(os.environ, SMART_APPROVAL_SOCKET=sock)
+
+        def fresh_process():
+            subprocess.run([sys.executable, "-c", hook], env=env, check=True)
+
+        def new_adapter():
+            adapters.append(cline_adapter.ClineSmartApprovalAdapter())
+            adapters[-1].evaluate_command("ls -la")
+
+        number = 10
+        cold = timeit.timeit(fresh_process, number=number) / number
+        adapters = []
+        per_call = timeit.timeit(new_adapter, number=commands) / commands
+        # Flush their transcripts before the directory goes away
+        for adapter in adapters:
+            adapter.transcript.close()
+
+        server = start_daemon(tmp)
+        try:
+            warm = timeit.timeit(fresh_process, number=number) / number
+            client = timeit.timeit(lambda: request_decision("ls -la", path=sock), number=commands) / commands
+        finally:
+            stop_daemon(server)
+
+    print(f"hook in fresh interpreter:  no daemon {cold * 1e3:6.1f}ms   daemon {warm * 1e3:6.1f}ms")
+    print(f"hook in running process:    new adapter {per_call * 1e3:6.2f}ms   daemon request {client * 1e3:6.2f}ms")
+
+
+if __name__ == '__main__':
+    if "--bench" in sys.argv:
+        run_benchmark()
+        sys.exit(0)
+    unittest.main(verbosity=2)
@@ -0,0 +1,195 @@
+#!/usr/bin/env python3
+"""
+Unit Tests for the Metrics Collector
+Checks collected metrics, read from the rollup store, against a full
+transcript scan across rotations, compression and partially written lines,
+and the bounds of the windows they cover.
+
+Run directly with --bench to time collection over growing windows:
+    python tooling/smart-approval/test_metrics_collector.py --bench
+"""
+
+import json
+import random
+import sys
+import tempfile
+import timeit
+import unittest
+from unittest.mock import patch
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent))
+
+from metrics_collector import ApprovalMetricsCollector
+from test_rollup_store import full_scan_counts, generated_decisions
+from transcript_writer import TranscriptWriter, sealed_segments
+
+
+def decision_at(timestamp, **details):
+    """An auto-approved decision logged at a UTC timestamp"""
+    details.update(command="ls", timestamp=timestamp.replace(tzinfo=None).isoformat() + "Z")
+    return {"requires_approval": False, "reason": "read_only_exact", "decision_details": details}
+
+
+def metrics_counts(metrics):
+    return {"total": metrics["total_decisions"], "auto_approved": metrics["auto_approved"],
+            "cache_lookups": metrics["decision_cache"]["lookups"], "cache_hits": metrics["decision_cache"]["hits"],
+            "reasons": metrics["reasons_breakdown"]}
+
+
+def expected_counts(counts):
+    return {"total": counts["decisions"], "auto_approved": counts["decisions"] - counts["prompts"],
+            "cache_lookups": counts["cache_lookups"], "cache_hits": counts["cache_hits"],
+            "reasons": counts["reasons"]}
+
+
+class TestApprovalMetricsCollector(unittest.TestCase):
+
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self._tmp.cleanup)
+        self.directory = Path(self._tmp.name)
+        self.transcript = self.directory / "transcript.jsonl"
+        self.writer = TranscriptWriter(self.transcript, max_bytes=20000, flush_interval=60)
+        self.addCleanup(self.writer.close)
+        self.collector = ApprovalMetricsCollector(self.transcript, self.directory / "metrics.json")
+        self.rng = random.Random(2026)
+
+    def append(self, count):
+        for decision in generated_decisions(count, self.rng):
+            self.writer.write(decision)
+        self.writer.flush()
+
+    def write(self, *decisions):
+        for decision in decisions:
+            self.writer.write(decision)
+        self.writer.flush()
+
+    def test_matches_full_scan_across_rotations(self):
+        """Metrics collected between batches agree with a scan of the whole transcript"""
+        lines = 0
+        for batch in [50, 120, 0, 300, 80]:
+            self.append(batch)
+            lines += batch
+            for days_back in [1, 2, 3]:
+                with self.subTest(lines=lines, days_back=days_back):
+                    metrics = self.collector.collect_daily_metrics(days_back=days_back)
+                    since = datetime.now(timezone.utc) - timedelta(days=days_back)
+                    expected = full_scan_counts(self.transcript, since)
+                    self.assertEqual(metrics_counts(metrics), expected_counts(expected))
+                    self.assertEqual(metrics["rates"]["cache_hit_rate"],
+                                     round(expected["cache_hits"] / expected["cache_lookups"], 3))
+
+        segments = sealed_segments(self.transcript)
+        self.assertGreater(len(segments), 1)
+        self.assertTrue(all(path.name.endswith(".gz") for _, path in segments))
+        self.assertEqual(self.collector.rollups.state()["lines"], lines)
+
+    def test_cursor_follows_rotation_and_compression(self):
+        """After segments are sealed and gzipped, a collection parses only the new lines"""
+        self.append(30)
+        self.collector.collect_daily_metrics()
+        state = self.collector.rollups.state()
+        self.assertEqual((state["generation"], state["lines"]), (1, 30))
+
+        self.append(400)
+        parsed = []
+        original_loads = json.loads
+
+        def counting_loads(s, **kwargs):
+            parsed.append(s)
+            return original_loads(s, **kwargs)
+
+        with patch("rollup_store.json.loads", counting_loads):
+            metrics = self.collector.collect_daily_metrics(days_back=3)
+        self.assertEqual(len(parsed), 400)
+        self.assertEqual(metrics["total_decisions"], 430)
+
+        segments = sealed_segments(self.transcript)
+        self.assertTrue(segments[0][1].name.endswith(".gz"))
+        state = self.collector.rollups.state()
+        self.assertEqual((state["generation"], state["lines"]), (segments[-1][0] + 1, 430))
+
+    def test_partial_line_waits(self):
+        """An unterminated last line is counted once it is complete"""
+        line = json.dumps(decision_at(datetime.now(timezone.utc), cache_hit=True))
+        with open(self.transcript, 'a') as f:
+            f.write(line[:20])
+        self.assertIn("error", self.collector.collect_daily_metrics())
+        self.assertEqual(self.collector.rollups.state()["offset"], 0)
+
+        with open(self.transcript, 'a') as f:
+            f.write(line[20:] + "\n")
+        metrics = self.collector.collect_daily_metrics()
+        self.assertEqual(metrics["total_decisions"], 1)
+        self.assertEqual(self.collector.rollups.state()["skipped_lines"], 0)
+
+    def test_window_bounds(self):
+        """Windows are exact to the minute recently, then start at since's hour, then its day"""
+        now = datetime.now(timezone.utc).replace(second=30, microsecond=0)
+        recent = now - timedelta(days=1)
+        hourly = (now - timedelta(days=10)).replace(minute=30)
+        daily = (now - timedelta(days=150)).replace(hour=12, minute=0)
+        self.write(
+            decision_at(recent - timedelta(minutes=1)), decision_at(recent), decision_at(recent + timedelta(seconds=20)),
+            decision_at(hourly - timedelta(minutes=31)), decision_at(hourly - timedelta(minutes=29)),
+            decision_at(daily - timedelta(hours=12, minutes=1)), decision_at(daily - timedelta(hours=11, minutes=59)),
+        )
+        self.collector.collect_daily_metrics()
+        store = self.collector.rollups
+
+        self.assertEqual(store.window(recent)["decisions"], 2)
+        self.assertEqual(store.window(recent.replace(second=0))["decisions"], 2)
+        self.assertEqual(store.window(recent + timedelta(minutes=1))["decisions"], 0)
+        self.assertEqual(store.window(hourly)["decisions"], 4)
+        self.assertEqual(store.window(hourly.replace(minute=0) + timedelta(hours=1))["decisions"], 3)
+        self.assertEqual(store.window(daily)["decisions"], 6)
+        self.assertEqual(store.window(daily - timedelta(days=1))["decisions"], 7)
+        self.assertEqual(store.window(now + timedelta(minutes=1))["decisions"], 0)
+
+        self.assertEqual(self.collector.collect_daily_metrics(days_back=1)["total_decisions"], 2)
+        self.assertEqual(self.collector.collect_daily_metrics(days_back=200)["total_decisions"], 7)
+
+    def test_cache_hit_rate(self):
+        """The hit rate counts only decisions that looked up the cache"""
+        now = datetime.now(timezone.utc)
+        self.write(*(decision_at(now) for _ in range(3)))
+        metrics = self.collector.collect_daily_metrics()
+        self.assertEqual(metrics["decision_cache"], {"lookups": 0, "hits": 0})
+        self.assertEqual(metrics["rates"]["cache_hit_rate"], 0)
+
+        self.write(decision_at(now, cache_hit=True), decision_at(now, cache_hit=True),
+                   decision_at(now, cache_hit=True), decision_at(now, cache_hit=False))
+        metrics = self.collector.collect_daily_metrics()
+        self.assertEqual(metrics["total_decisions"], 7)
+        self.assertEqual(metrics["decision_cache"], {"lookups": 4, "hits": 3})
+        self.assertEqual(metrics["rates"]["cache_hit_rate"], 0.75)
+        self.assertIn("Decision cache hits: 75.0%", self.collector.get_summary_report())
+
+
+def run_benchmark(history=100000, windows=(1, 7, 30, 90)):
+    """Print seconds per collection over growing windows of a 90-day transcript"""
+    rng = random.Random(2026)
+    with tempfile.TemporaryDirectory() as tmp:
+        transcript = Path(tmp) / "transcript.jsonl"
+        writer = TranscriptWriter(transcript)
+        for decision in generated_decisions(history, rng, spread_hours=90 * 24):
+            writer.write(decision)
+        writer.close()
+
+        collector = ApprovalMetricsCollector(transcript, Path(tmp) / "metrics.json")
+        collector.collect_daily_metrics()
+        for days_back in windows:
+            seconds = min(timeit.repeat(lambda: collector.collect_daily_metrics(days_back=days_back),
+                                        number=10, repeat=3)) / 10
+            total = collector.collect_daily_metrics(days_back=days_back)["total_decisions"]
+            print(f"{days_back:>3} days ({total:>6} decisions): {seconds * 1e3:6.2f}ms")
+
+
+if __name__ == '__main__':
+    if "--bench" in sys.argv:
+        run_benchmark()
+        sys.exit(0)
+    unittest.main(verbosity=2)
@@ -0,0 +1,483 @@
+#!/usr/bin/env python3
+"""
+Unit Tests for the Dashboard Pipeline
+Checks contract validation, streaming ingest of rotated transcripts,
+single-pass aggregation against a reference computed from a list, bounded
+memory, the shared view model, and dashboard builds with several renderers.
+
+Run directly with --bench for ingest, aggregation and build throughput:
+    python tooling/smart-approval/test_pipeline.py --bench
+"""
+
+import contextlib
+import io
+import multiprocessing
+import json
+import pickle
+import random
+import sys
+import tempfile
+import timeit
+import tracemalloc
+import unittest
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import FrozenInstanceError
+from datetime import date, datetime, timedelta, timezone
+from pathlib import Path
+from unittest.mock import patch
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent))
+
+from lib.contracts import ContractError, compile_contract, compile_schema
+from lib.ingest import DataIngestor, EventStream, decision_event
+from lib.render.base import MetricsRenderer, RendererConfig, renderer_registry
+from lib.render.view_model import BuildInfo, build_view_model
+from lib.transform import MetricsAggregator
+from transcript_writer import TranscriptWriter, sealed_segments
+
+import cli
+
+REASONS = ["read_only_exact", "read_only_prefix", "denied_pattern_dangerous", "unknown_command"]
+
+
+def generated_decisions(count, rng, start=None, spread_hours=24):
+    """Adapter decisions spread over the spread_hours before start (default: now)"""
+    start = start or datetime.now(timezone.utc)
+    for _ in range(count):
+        timestamp = start - timedelta(seconds=rng.uniform(0, spread_hours * 3600))
+        reason = rng.choice(REASONS)
+        decision = {"requires_approval": reason in REASONS[2:], "confidence": rng.choice([0.5, 0.9, 1.0]),
+                    "reason": reason, "decision_details": {
+                        "command": "ls", "cache_hit": False,
+                        "timestamp": timestamp.replace(tzinfo=None).isoformat() + "Z"}}
+        if rng.random() < 0.05:
+            decision["override_applied"] = True
+            decision["override_reason"] = "force_approve:ls"
+        yield decision
+
+
+def generated_events(count, rng, spread_hours=24):
+    """Events of every type, with UTC offsets other than Z"""
+    start = datetime.now(timezone.utc)
+    for _ in range(count):
+        timestamp = (start - timedelta(seconds=rng.uniform(0, spread_hours * 3600))).astimezone(
+            timezone(timedelta(hours=rng.choice([-5, 0, 2]))))
+        event_type = rng.choice(["prompt_processed", "decision_made", "decision_made", "override_applied",
+                                 "safety_incident", "replay_test"])
+        event = {"timestamp": timestamp.isoformat(), "event_type": event_type, "reason": rng.choice(REASONS)}
+        if event_type == "decision_made":
+            event["decision"] = rng.choice(["approve", "deny", "override"])
+            event["confidence"] = rng.random()
+        if rng.random() < 0.5:
+            event["profile"] = rng.choice(["read_only", "low_risk"])
+        yield event
+
+
+def reference_metrics(events):
+    """Reference: the counts of aggregate(), from a list of every event"""
+    events = list(events)
+    parsed = [datetime.fromisoformat(event["timestamp"]).astimezone(timezone.utc) for event in events]
+    decisions = [event for event in events if "decision" in event]
+    minutes = (max(parsed).replace(second=0, microsecond=0)
+               - min(parsed).replace(second=0, microsecond=0)).total_seconds() // 60 + 1
+    overrides = sum(event["event_type"] == "override_applied" or event.get("decision") == "override"
+                    for event in events)
+    newest = sorted(zip(parsed, range(len(events)), events), key=lambda item: item[:2], reverse=True)
+    return {
+        "prompt_rate": sum(event["event_type"] == "prompt_processed" for event in events) / minutes,
+        "override_rate": overrides / minutes,
+        "deny_rate": sum(event["decision"] == "deny" for event in decisions) / minutes,
+        "safety_incidents": sum(event["event_type"] == "safety_incident" for event in events),
+        "deny_reasons": dict(Counter(event["reason"] for event in decisions if event["decision"] == "deny")),
+        "decision_breakdown": dict(Counter(event["decision"] for event in decisions)),
+        "hours": len({timestamp.strftime("%Y-%m-%dT%H") for timestamp in parsed}),
+        "recent": [event for _, _, event in newest if "decision" in event],
+    }
+
+
+class TestContracts(unittest.TestCase):
+
+    def setUp(self):
+        self.validate = compile_contract("events")
+
+    def test_valid_events(self):
+        """Events using every property of the contract are accepted"""
+        for event in generated_events(200, random.Random(1)):
+            self.validate(event)
+        self.validate({"timestamp": "2026-01-28T20:00:00.5+05:30", "event_type": "replay_test",
+                       "metadata": {"anything": [1, 2]}})
+        for timestamp in ["2026-01-28T20:00:00Z", "2026-01-28t20:00:00.1234567z", "2026-01-28T20:00:00.25-08:00"]:
+            with self.subTest(timestamp=timestamp):
+                self.validate({"timestamp": timestamp, "event_type": "replay_test"})
+
+    def test_violations(self):
+        """Each violation raises ContractError naming where it is"""
+        valid = {"timestamp": "2026-01-28T20:00:00Z", "event_type": "decision_made"}
+        cases = [
+            ({"event_type": "decision_made"}, "$: missing required property 'timestamp'"),
+            ({**valid, "timestamp": "2026-01-28T20:00:00"}, "$.timestamp"),
+            ({**valid, "timestamp": "2026-01-28"}, "$.timestamp"),
+            ({**valid, "timestamp": "2026-01-28T20:00Z"}, "$.timestamp"),
+            ({**valid, "timestamp": "2026-02-30T20:00:00Z"}, "$.timestamp"),
+            ({**valid, "timestamp": "2026-01-28T20:00:00.Z"}, "$.timestamp"),
+            ({**valid, "event_type": "decided"}, "$.event_type"),
+            ({**valid, "decision": "maybe"}, "$.decision"),
+            ({**valid, "confidence": 1.5}, "$.confidence"),
+            ({**valid, "confidence": True}, "$.confidence"),
+            ({**valid, "metadata": []}, "$.metadata"),
+            ([valid], "$: expected object"),
+        ]
+        for document, where in cases:
+            with self.subTest(document=document):
+                with self.assertRaises(ContractError) as raised:
+                    self.validate(document)
+                self.assertTrue(str(raised.exception).startswith(where), str(raised.exception))
+
+        validate_metrics = compile_contract("metrics")
+        with self.assertRaisesRegex(ContractError, r"^\$\.recent_decisions\[1\]\.decision: "):
+            validate_metrics({"timestamp": valid["timestamp"], "recent_decisions": [
+                {"timestamp": valid["timestamp"], "decision": "deny"},
+                {"timestamp": valid["timestamp"], "decision": "prompt"}]})
+        with self.assertRaisesRegex(ContractError, r"^\$\.deny_reasons\.rm: "):
+            validate_metrics({"timestamp": valid["timestamp"], "deny_reasons": {"rm": -1}})
+
+    def test_unsupported_keywords_rejected(self):
+        """Compiling a schema with a keyword the validator does not implement fails"""
+        with self.assertRaisesRegex(ValueError, "pattern"):
+            compile_schema({"type": "object", "properties": {"reason": {"type": "string", "pattern": "^d"}}})
+
+
+class TestIngest(unittest.TestCase):
+
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self._tmp.cleanup)
+        self.directory = Path(self._tmp.name)
+        self.rng = random.Random(2026)
+
+    def write_transcript(self, path, records, **kwargs):
+        writer = TranscriptWriter(path, flush_interval=60, **kwargs)
+        for index, record in enumerate(records):
+            writer.write(record)
+            # Segments rotate between batches
+            if index % 20 == 0:
+                writer.flush()
+        writer.close()
+
+    def test_decision_events(self):
+        """Adapter decisions become events of the matching type and decision"""
+        details = {"decision_details": {"timestamp": "2026-01-28T20:00:00Z"}, "confidence": 0.5}
+        cases = [
+            ({"requires_approval": False, "reason": "read_only_exact"}, ("decision_made", "approve")),
+            ({"requires_approval": True, "reason": "denied_pattern_read_only"}, ("decision_made", "deny")),
+            ({"requires_approval": True, "reason": "unknown_command"}, ("prompt_processed", None)),
+            ({"requires_approval": False, "reason": "unknown_command", "override_applied": True},
+             ("override_applied", "override")),
+        ]
+        for record, (event_type, decision) in cases:
+            with self.subTest(record=record):
+                event = decision_event({**details, **record})
+                self.assertEqual((event["event_type"], event.get("decision")), (event_type, decision))
+                self.assertEqual((event["timestamp"], event["reason"], event["confidence"]),
+                                 ("2026-01-28T20:00:00Z", record["reason"], 0.5))
+
+    def test_reads_rotated_transcripts(self):
+        """Each transcript is found once and read across its sealed, gzipped segments"""
+        self.write_transcript(self.directory / "agent-a" / "transcript.jsonl",
+                              generated_decisions(300, self.rng), max_bytes=8000)
+        self.write_transcript(self.directory / "agent-b" / "events.jsonl", generated_events(50, self.rng))
+        self.assertGreater(len(sealed_segments(self.directory / "agent-a" / "transcript.jsonl")), 1)
+
+        ingested = DataIngestor(self.directory).ingest_all_data()
+        self.assertEqual([Path(path).relative_to(self.directory).as_posix() for path in ingested["transcripts"]],
+                         ["agent-a/transcript.jsonl", "agent-b/events.jsonl"])
+        events = list(ingested["events"])
+        self.assertEqual(len(events), 350)
+        self.assertEqual(ingested["events"].stats,
+                         {"lines": 350, "events": 350, "rejected": 0, "malformed": 0, "partial": 0})
+
+    def test_invalid_lines_are_counted(self):
+        """Invalid events, malformed and unterminated lines are skipped and counted"""
+        transcript = self.directory / "transcript.jsonl"
+        valid = json.dumps({"timestamp": "2026-01-28T20:00:00Z", "event_type": "replay_test"})
+        lines = [valid, "", "not json", "[1]", json.dumps({"reason": "no event type"})]
+        lines += [json.dumps({"timestamp": "2026-01-28T20:00:00Z", "event_type": "decided"})] * 20
+        transcript.write_text("\n".join(lines) + "\n" + valid)
+
+        stream = EventStream([transcript])
+        self.assertEqual(len(list(stream)), 1)
+        self.assertEqual(stream.stats, {"lines": 26, "events": 1, "rejected": 21, "malformed": 2, "partial": 1})
+        self.assertEqual(len(stream.errors), 10)
+        self.assertIn("neither an event nor an adapter decision", stream.errors[0])
+
+        # Iterating again rereads and recounts
+        self.assertEqual(len(list(stream)), 1)
+        self.assertEqual(stream.stats["lines"], 26)
+
+    def test_phase_start_from_capsules(self):
+        """The latest observation marker in the state capsules starts the phase"""
+        capsules = self.directory / "capsules"
+        capsules.mkdir()
+        (capsules / "start.yaml").write_text(
+            "capsule:\n  kind: observation_marker\n  observation_period:\n    start_date: 2026-01-28\n")
+        (capsules / "later.yml").write_text(
+            "capsule:\n  kind: observation_marker\n  observation_period:\n    start_date: '2026-02-04'\n")
+        (capsules / "other.yaml").write_text("capsule:\n  kind: release\n")
+        (capsules / "broken.yaml").write_text("capsule: [\n")
+
+        ingestor = DataIngestor(self.directory)
+        with contextlib.redirect_stderr(io.StringIO()):
+            ingested = ingestor.ingest_all_data()
+        self.assertEqual(len(ingested["capsules"]), 4)
+        self.assertEqual(ingested["phase_start"], date(2026, 2, 4))
+
+
+class TestTransform(unittest.TestCase):
+
+    def test_matches_reference(self):
+        """One pass over the stream gives the counts computed from the full list"""
+        events = list(generated_events(3000, random.Random(7), spread_hours=30))
+        metrics = MetricsAggregator(recent_decisions=25).aggregate(iter(events))
+        expected = reference_metrics(events)
+
+        for key in ["prompt_rate", "override_rate", "deny_rate"]:
+            self.assertAlmostEqual(metrics[key], expected[key], msg=key)
+        self.assertEqual(metrics["safety_incidents"], expected["safety_incidents"])
+        self.assertEqual(metrics["deny_reasons"], expected["deny_reasons"])
+        self.assertEqual(metrics["aggregates"]["decisions"]["decision_breakdown"], expected["decision_breakdown"])
+        self.assertEqual(len(metrics["timeseries_data"]["hourly"]), expected["hours"])
+        self.assertEqual(sum(point["events"] for point in metrics["timeseries_data"]["daily"]), 3000)
+        self.assertEqual([decision["timestamp"] for decision in metrics["recent_decisions"]],
+                         [event["timestamp"] for event in expected["recent"][:25]])
+        self.assertIn(metrics["profile"], ("read_only", "low_risk"))
+
+    def test_empty_stream(self):
+        """No events still gives metrics valid against the contract"""
+        metrics = MetricsAggregator().aggregate(iter([]), phase_start=date.today() - timedelta(days=2))
+        self.assertEqual((metrics["deny_rate"], metrics["recent_decisions"]), (0, []))
+        self.assertIn(metrics["phase_day"], (3, 4))
+
+    def test_bounded_memory(self):
+        """Peak memory does not grow with the number of events aggregated"""
+        def peak(count):
+            aggregator = MetricsAggregator()
+            tracemalloc.start()
+            try:
+                aggregator.aggregate(generated_events(count, random.Random(3)))
+                return tracemalloc.get_traced_memory()[1]
+            finally:
+                tracemalloc.stop()
+
+        small, large = peak(5000), peak(50000)
+        self.assertLess(large, small * 1.5, (small, large))
+
+
+def write_adapter_transcript(path, count, seed=5, **kwargs):
+    writer = TranscriptWriter(path, flush_interval=60)
+    for decision in generated_decisions(count, random.Random(seed), **kwargs):
+        writer.write(decision)
+    writer.close()
+
+
+class TestViewModel(unittest.TestCase):
+
+    def setUp(self):
+        events = generated_events(500, random.Random(11))
+        self.processed = {"metrics": MetricsAggregator().aggregate(events), "ingestion_info": {}}
+        self.view = build_view_model(self.processed, BuildInfo("2026-10-19T00:00:00Z", "0123456789abcdef"))
+
+    def test_derived_once(self):
+        """KPIs, shares, orderings and labels are computed from the metrics"""
+        metrics = self.processed["metrics"]
+        self.assertEqual([kpi.key for kpi in self.view.kpis],
+                         ["prompt_rate", "override_rate", "deny_rate", "safety_incidents", "phase_day"])
+        self.assertEqual(self.view.kpi("deny_rate").value, metrics["deny_rate"])
+        self.assertEqual(self.view.kpi("phase_day").value, 1)
+        counts = [reason.count for reason in self.view.deny_reasons]
+        self.assertEqual(counts, sorted(counts, reverse=True))
+        self.assertAlmostEqual(sum(reason.share for reason in self.view.deny_reasons), 1)
+        self.assertEqual(len(self.view.hourly_rates), len(metrics["timeseries_data"]["hourly"]))
+        decision = self.view.recent_decisions[0]
+        self.assertEqual(decision.time_label, decision.timestamp[:19])
+        self.assertEqual(self.view.build_info.short_commit, "01234567")
+
+    def test_immutable_and_picklable(self):
+        """Renderers cannot change the shared model, and it can cross process boundaries"""
+        with self.assertRaises(FrozenInstanceError):
+            self.view.kpis[0].value = 99
+        with self.assertRaises(TypeError):
+            self.view.deny_reasons[0] = None
+        self.assertEqual(pickle.loads(pickle.dumps(self.view)), self.view)
+
+
+class TestBuild(unittest.TestCase):
+
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self._tmp.cleanup)
+        self.directory = Path(self._tmp.name)
+        self.data = self.directory / "data"
+        write_adapter_transcript(self.data / "transcript.jsonl", 200)
+
+    def build(self, *args, **kwargs):
+        with contextlib.redirect_stdout(io.StringIO()):
+            return cli.build_dashboard_bundle(str(self.data), *args, **kwargs)
+
+    def test_every_renderer(self):
+        """A bundle builds from an adapter transcript with each registered renderer"""
+        self.assertEqual(renderer_registry.list_available_renderers(),
+                         ["json_bundle", "markdown_report", "plotly_static"])
+        for name in renderer_registry.list_available_renderers():
+            with self.subTest(renderer=name):
+                result = self.build(str(self.directory / name), name)
+                self.assertEqual(result["build_info"]["events"], 200)
+                self.assertEqual(set(result["rendered_files"][name]), {"overview", "decisions", "replay_health"})
+                for path in result["rendered_files"][name].values():
+                    self.assertTrue(Path(path).is_file(), path)
+                bundle = json.loads(Path(result["artifacts"]["metrics_bundle"]).read_text())
+                self.assertEqual(bundle["data"]["aggregates"]["decisions"]["total"]
+                                 + bundle["data"]["aggregates"]["events"].get("prompt_processed", 0), 200)
+
+    def test_renderers_share_one_ingest_and_model(self):
+        """Several renderers are built from one pass over the data and one view model"""
+        models = []
+        original_render_view = MetricsRenderer.render_view
+
+        def recording_render_view(renderer, name, view):
+            models.append(view)
+            return original_render_view(renderer, name, view)
+
+        output = self.directory / "bundle"
+        with patch.object(MetricsAggregator, "aggregate", autospec=True,
+                          side_effect=MetricsAggregator.aggregate) as aggregate, \
+                patch.object(MetricsRenderer, "render_view", recording_render_view):
+            result = self.build(str(output), ["plotly_static", "json_bundle", "markdown_report"],
+                                ["overview", "decisions"])
+
+        self.assertEqual(aggregate.call_count, 1)
+        self.assertEqual(len(models), 6)
+        self.assertTrue(all(model is models[0] for model in models))
+        self.assertEqual(result["renderers"], ["plotly_static", "json_bundle", "markdown_report"])
+        self.assertEqual(sorted(path.name for path in output.iterdir() if path.is_file()), [
+            "decisions.html", "decisions.json", "decisions.md", "index.html",
+            "overview.html", "overview.json", "overview.md"])
+
+        # The decisions page is complete, table rows included
+        page = (output / "decisions.html").read_text()
+        self.assertTrue(page.rstrip().endswith("</html>"))
+        self.assertIn('<td class="decision-', page)
+
+        # Every output embeds the same build
+        build_timestamp = json.loads((output / "overview.json").read_text())["build_info"]["build_timestamp"]
+        self.assertIn(build_timestamp, (output / "overview.md").read_text())
+        self.assertIn(build_timestamp, page)
+
+    def test_rendering_order_independent(self):
+        """Rendering on one thread or many writes the same files"""
+        renderers = ["plotly_static", "json_bundle", "markdown_report"]
+        build_info = BuildInfo("2026-10-19T00:00:00Z", "0123456789abcdef")
+        with patch("lib.render.view_model.current_build_info", return_value=build_info):
+            self.build(str(self.directory / "serial"), renderers, jobs=1)
+            self.build(str(self.directory / "threaded"), renderers, jobs=8)
+        for path in (self.directory / "serial").iterdir():
+            if path.is_file():
+                self.assertEqual(path.read_bytes(), (self.directory / "threaded" / path.name).read_bytes(), path.name)
+
+    def test_unknown_renderer_fails_before_ingest(self):
+        """An unknown renderer name is reported without reading any data"""
+        with patch.object(cli.DataIngestor, "ingest_all_data") as ingest:
+            with self.assertRaisesRegex(ValueError, "'svg'.*json_bundle"):
+                self.build(str(self.directory / "bundle"), ["json_bundle", "svg"])
+        ingest.assert_not_called()
+
+
+def run_benchmark(decisions=200000):
+    """Print lines/sec through ingest and aggregation, and peak memory against loading every event first"""
+    rng = random.Random(2026)
+    with tempfile.TemporaryDirectory() as tmp:
+        transcript = Path(tmp) / "transcript.jsonl"
+        writer = TranscriptWriter(transcript, max_bytes=8 * 1024 * 1024)
+        for decision in generated_decisions(decisions, rng, spread_hours=90 * 24):
+            writer.write(decision)
+        writer.close()
+        segments = len(sealed_segments(transcript))
+
+        aggregator = MetricsAggregator()
+        validate = compile_contract("events")
+        events = list(EventStream([transcript]))
+
+        def streaming():
+            return aggregator.aggregate(EventStream([transcript]))
+
+        def loaded():
+            # Every event in memory before aggregating
+            return aggregator.aggregate(list(EventStream([transcript])))
+
+        def peak(build):
+            tracemalloc.start()
+            try:
+                build()
+                return tracemalloc.get_traced_memory()[1]
+            finally:
+                tracemalloc.stop()
+
+        validation = min(timeit.repeat(lambda: [validate(event) for event in events], number=1, repeat=3))
+        aggregation = min(timeit.repeat(lambda: aggregator.aggregate(events), number=1, repeat=3))
+        end_to_end = min(timeit.repeat(streaming, number=1, repeat=3))
+        streaming_peak, loaded_peak = peak(streaming), peak(loaded)
+
+    print(f"{decisions} decisions, {segments} gzipped segments + active transcript")
+    print(f"validation {decisions / validation:10.0f} events/sec   "
+          f"aggregation {decisions / aggregation:10.0f} events/sec")
+    print(f"read + validate + aggregate {decisions / end_to_end:10.0f} lines/sec ({end_to_end:5.2f}s)")
+    print(f"peak memory: streaming {streaming_peak / 2**20:6.1f} MiB   "
+          f"events loaded first {loaded_peak / 2**20:6.1f} MiB")
+
+
+def run_build_benchmark(decisions=50000):
+    """Print build time for one build per renderer vs one build for all, and rendering alone on pools"""
+    renderers = ["plotly_static", "json_bundle", "markdown_report"]
+    with tempfile.TemporaryDirectory() as tmp:
+        data = Path(tmp) / "data"
+        write_adapter_transcript(data / "transcript.jsonl", decisions, spread_hours=90 * 24)
+
+        def build(names, jobs=None):
+            with contextlib.redirect_stdout(io.StringIO()):
+                cli.build_dashboard_bundle(str(data), str(Path(tmp) / "out"), names, jobs=jobs)
+
+        separate = min(timeit.repeat(lambda: [build(name, jobs=1) for name in renderers], number=1, repeat=3))
+        combined_serial = min(timeit.repeat(lambda: build(renderers, jobs=1), number=1, repeat=3))
+        combined = min(timeit.repeat(lambda: build(renderers), number=1, repeat=3))
+
+        processed = MetricsAggregator().process_ingested_data(DataIngestor(data).ingest_all_data())
+        view = build_view_model(processed)
+        tasks = [(renderer_registry.get_renderer(name, RendererConfig(Path(tmp) / "render")), view_name)
+                 for name in renderers for view_name in ("overview", "decisions", "replay_health")]
+
+        def render(executor=None):
+            if executor is None:
+                return [renderer.render_view(view_name, view) for renderer, view_name in tasks]
+            with executor:
+                return [future.result() for future in
+                        [executor.submit(renderer.render_view, view_name, view) for renderer, view_name in tasks]]
+
+        serial = min(timeit.repeat(render, number=1, repeat=5))
+        threads = min(timeit.repeat(lambda: render(ThreadPoolExecutor(8)), number=1, repeat=5))
+        processes = min(timeit.repeat(lambda: render(ProcessPoolExecutor(8, mp_context=multiprocessing.get_context(
+            "fork"))), number=1, repeat=5))
+
+    print(f"{decisions} decisions over 90 days, {len(renderers)} renderers x 3 views")
+    print(f"one build per renderer {separate * 1e3:8.1f}ms   one build, serial {combined_serial * 1e3:8.1f}ms   "
+          f"one build, threads {combined * 1e3:8.1f}ms  ({separate / combined:4.1f}x)")
+    print(f"rendering only: serial {serial * 1e3:6.1f}ms   threads {threads * 1e3:6.1f}ms   "
+          f"processes {processes * 1e3:6.1f}ms")
+
+
+if __name__ == '__main__':
+    if "--bench" in sys.argv:
+        run_benchmark()
+        run_build_benchmark()
+        sys.exit(0)
+    unittest.main(verbosity=2)
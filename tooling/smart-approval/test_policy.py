@@ -1,18 +1,119 @@
 #!/usr/bin/env python3
 """
 Unit Tests for Smart Approval Policy Engine
-Tests tokenization, deny/allow precedence, git-clean gating.
+Tests tokenization, deny/allow precedence, git-clean gating, and checks the
+compiled policy against the original evaluator and the replay corpus.
+
+Run directly with --bench to print decisions/sec:
+    python tooling/smart-approval/test_policy.py --bench
 """
 
+import os
+import random
+import re
+import subprocess
+import tempfile
+import timeit
 import unittest
 import sys
+import yaml
 from pathlib import Path
 from unittest.mock import patch, MagicMock
 
 # Add parent directory to path for imports
 sys.path.insert(0, str(Path(__file__).parent))
 
-from prototype import CommandSafetyEvaluator
+from cline_adapter import ClineSmartApprovalAdapter
+from metrics_collector import ApprovalMetricsCollector
+from prototype import CommandSafetyEvaluator, DenylistAutomaton
+
+REPLAY_CORPUS = Path(__file__).parent / "replay_corpus.yaml"
+
+
+def reference_evaluate_command(evaluator, command_string):
+    """Original evaluate_command, kept verbatim as the oracle"""
+    tokens = evaluator.tokenize_command(command_string)
+    if not tokens:
+        return {"approval_required": True, "confidence": 0.0, "reason": "empty_command"}
+
+    command_base = tokens[0]
+    full_command = ' '.join(tokens)
+
+    for profile_name, profile in evaluator.profiles['command_safety_profiles']['profiles'].items():
+        if 'denylist_contains' in profile:
+            for denied in profile['denylist_contains']:
+                trimmed_denied = denied.strip()
+                if trimmed_denied in full_command:
+                    return {
+                        "approval_required": True,
+                        "confidence": 1.0,
+                        "reason": f"denied_pattern_{profile_name}",
+                        "denied_pattern": trimmed_denied
+                    }
+
+    low_risk = evaluator.profiles['command_safety_profiles']['profiles']['low_risk']
+    is_clean = evaluator.check_git_status()
+
+    if full_command in low_risk.get('allowlist_exact', []):
+        if is_clean:
+            return {"approval_required": False, "confidence": 0.95, "reason": "low_risk_exact_clean"}
+        else:
+            return {"approval_required": True, "confidence": 0.95, "reason": "low_risk_exact_dirty"}
+
+    if command_base in low_risk.get('allowlist_prefixes', []):
+        if any(full_command.startswith(exact) for exact in low_risk.get('allowlist_exact', [])):
+            if is_clean:
+                return {"approval_required": False, "confidence": 0.95, "reason": "low_risk_exact_clean"}
+            else:
+                return {"approval_required": True, "confidence": 0.95, "reason": "low_risk_exact_dirty"}
+        else:
+            if is_clean:
+                return {"approval_required": False, "confidence": 0.8, "reason": "low_risk_prefix_clean"}
+            else:
+                return {"approval_required": True, "confidence": 0.9, "reason": "low_risk_prefix_dirty"}
+
+    read_only = evaluator.profiles['command_safety_profiles']['profiles']['read_only']
+    if full_command in read_only.get('allowlist_exact', []):
+        return {"approval_required": False, "confidence": 1.0, "reason": "read_only_exact"}
+
+    if command_base in read_only.get('allowlist_prefixes', []):
+        return {"approval_required": False, "confidence": 0.9, "reason": "read_only_prefix"}
+
+    return {"approval_required": True, "confidence": 0.5, "reason": "unknown_command"}
+
+
+def replay_cases():
+    """Yield (command, git clean, expected) for every replay corpus decision"""
+    with open(REPLAY_CORPUS) as f:
+        corpus = yaml.safe_load(f)['replay_corpus']
+    for case in corpus['test_cases']:
+        for key, clean in [('expected', True), ('expected', False),
+                           ('expected_clean_repo', True), ('expected_dirty_repo', False)]:
+            if key in case:
+                yield case['command'], clean, case[key]
+
+
+def reference_denied_pattern(evaluator, command_text):
+    """Denylist rule spelled out: first entry, in profile order, found at a word start"""
+    padded = f" {command_text} "
+    for profile_name, profile in evaluator.profiles['command_safety_profiles']['profiles'].items():
+        for denied in profile.get('denylist_contains', []):
+            entry = denied if denied.strip() else ""
+            prefix = r'(?<!\w)' if re.match(r'\w', entry) else ''
+            if re.search(prefix + re.escape(entry), padded):
+                return (denied.strip(), profile_name)
+    return None
+
+
+def generated_commands(evaluator, count=3000, seed=2026):
+    """Commands assembled from profile entries, fragments and quoting"""
+    profiles = evaluator.profiles['command_safety_profiles']['profiles'].values()
+    vocabulary = [entry for profile in profiles for values in profile.values() if isinstance(values, list)
+                  for entry in values]
+    vocabulary += ["-la", ".", "--", "x", "'a b'", '"c  d"', "|", ">", "/tmp/t", "  ", "\t", "r", "m"]
+    rng = random.Random(seed)
+    for _ in range(count):
+        yield " ".join(rng.choice(vocabulary) for _ in range(rng.randint(1, 5)))
 
 class TestCommandSafetyEvaluator(unittest.TestCase):
 
@@ -115,5 +216,329 @@ class TestCommandSafetyEvaluator(unittest.TestCase):
             result = self.evaluator.check_git_status()
             self.assertFalse(result)  # Should default to False on error
 
+class TestCompiledPolicy(unittest.TestCase):
+
+    def setUp(self):
+        self.evaluator = CommandSafetyEvaluator()
+
+    def test_replay_corpus_decisions(self):
+        """Every replay corpus command gets its expected decision"""
+        for command, clean, expected in replay_cases():
+            with self.subTest(command=command, clean=clean):
+                with patch.object(self.evaluator, 'check_git_status', return_value=clean):
+                    result = self.evaluator.evaluate_command(command)
+                    self.assertEqual(result, reference_evaluate_command(self.evaluator, command))
+                self.assertEqual((result["approval_required"], result["reason"], result["confidence"]),
+                                 (expected["requires_approval"], expected["reason"], expected["confidence"]))
+
+    def test_generated_denylist_matches_reference(self):
+        """The automaton and word-start checks find the same entry as the spelled-out rule"""
+        for command in generated_commands(self.evaluator):
+            for text in (command, "| " + command):
+                self.assertEqual(self.evaluator.policy.denied_pattern(text),
+                                 reference_denied_pattern(self.evaluator, text), repr(text))
+
+    def test_plain_commands_never_stricter_than_original(self):
+        """On commands without shell syntax, only mid-word denylist hits are dropped"""
+        plain = [command for command in generated_commands(self.evaluator)
+                 if not re.search(r"[|&;()<>`$\\'\"#]", command)]
+        self.assertGreater(len(plain), 500)
+        for clean in (True, False):
+            with patch.object(self.evaluator, 'check_git_status', return_value=clean):
+                for command in plain:
+                    original = reference_evaluate_command(self.evaluator, command)
+                    result = self.evaluator.evaluate_command(command)
+                    if "denied_pattern" in result:
+                        self.assertIn("denied_pattern", original, repr(command))
+                    else:
+                        self.assertTrue("denied_pattern" in original or result == original, repr(command))
+
+    def test_pattern_priority_and_edge_profiles(self):
+        """Profile and list order decide between overlapping and blank patterns"""
+        profiles = {'command_safety_profiles': {'profiles': {
+            'read_only': {'allowlist_prefixes': ['ls'], 'allowlist_exact': ['ls'],
+                          'denylist_contains': ['rm -rf', ' rm ', 'hers', 'she', '   ']},
+            'low_risk': {'allowlist_prefixes': ['mkdir'], 'allowlist_exact': ['', 'mkdir -p'],
+                         'denylist_contains': ['rm']},
+        }}}
+        with tempfile.NamedTemporaryFile('w', suffix='.yaml', delete=False) as f:
+            yaml.safe_dump(profiles, f)
+        evaluator = CommandSafetyEvaluator(f.name)
+        Path(f.name).unlink()
+
+        # safe_dump sorts keys, so low_risk is the first profile
+        for command, expected in [("ushers rm -rf x", ("rm", "low_risk")), ("she sells", ("she", "read_only")),
+                                  ("hers", ("hers", "read_only")), ("ushers", ("", "read_only")),
+                                  ("perm", ("", "read_only"))]:
+            with self.subTest(command=command):
+                self.assertEqual(evaluator.policy.denied_pattern(command), expected)
+                self.assertEqual(reference_denied_pattern(evaluator, command), expected)
+
+    def test_automaton_first_match(self):
+        """The automaton reports the first pattern in list order, wherever it occurs"""
+        automaton = DenylistAutomaton(["hers", "his", "she", "he"])
+        self.assertEqual(automaton.first_match("ushers"), 0)
+        self.assertEqual(automaton.first_match("ahishe"), 1)
+        self.assertEqual(automaton.first_match("she"), 2)
+        self.assertEqual(automaton.first_match("the"), 3)
+        self.assertIsNone(automaton.first_match("xyz"))
+        self.assertIsNone(DenylistAutomaton([]).first_match("anything"))
+
+    def test_walk_and_substring_search_agree(self):
+        """Short and long texts get the same answer from either matching path"""
+        patterns = [pattern for pattern, _ in self.evaluator.policy.denied]
+        walk = DenylistAutomaton(patterns, max_walk_length=10 ** 9)
+        search = DenylistAutomaton(patterns, max_walk_length=0)
+        for command in generated_commands(self.evaluator):
+            self.assertEqual(walk.first_match(command), search.first_match(command), repr(command))
+
+
+class TestGitCleanProbe(unittest.TestCase):
+
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.repo = Path(self._tmp.name)
+        self.git('init', '-q')
+        (self.repo / "tracked.txt").write_text("v1\n")
+        self.git('add', 'tracked.txt')
+        self.git('commit', '-q', '-m', 'base')
+
+        cwd = os.getcwd()
+        os.chdir(self.repo)
+        self.addCleanup(os.chdir, cwd)
+        self.addCleanup(self._tmp.cleanup)
+
+    def git(self, *args):
+        subprocess.run(['git', '-c', 'user.name=t', '-c', 'user.email=t@example.com', *args],
+                       cwd=self.repo, check=True, capture_output=True)
+
+    def counting_evaluator(self, **kwargs):
+        evaluator = CommandSafetyEvaluator(**kwargs)
+        probe = evaluator._probe_git_status
+        evaluator.probes = 0
+
+        def counted(cwd):
+            evaluator.probes += 1
+            return probe(cwd)
+        evaluator._probe_git_status = counted
+        return evaluator
+
+    def test_probe_only_for_low_risk_rules(self):
+        """Read-only, denied and unknown commands never run git status"""
+        evaluator = self.counting_evaluator()
+        for command in ["git status", "ls -la", "rm -rf x", "unknown_cmd", ""]:
+            evaluator.evaluate_command(command)
+        self.assertEqual(evaluator.probes, 0)
+
+        self.assertEqual(evaluator.evaluate_command("mkdir x")["reason"], "low_risk_prefix_clean")
+        self.assertEqual(evaluator.probes, 1)
+
+    def test_cached_until_index_or_head_changes(self):
+        """Repeated checks reuse the probe until the index or HEAD changes"""
+        evaluator = self.counting_evaluator(clean_ttl=60)
+        self.assertTrue(evaluator.check_git_status())
+        self.assertTrue(evaluator.check_git_status())
+        self.assertEqual(evaluator.probes, 1)
+
+        (self.repo / "tracked.txt").write_text("v2\n")
+        self.git('add', 'tracked.txt')
+        self.assertFalse(evaluator.check_git_status())
+        self.assertEqual(evaluator.probes, 2)
+
+        self.git('commit', '-q', '-m', 'second')
+        self.assertTrue(evaluator.check_git_status())
+        self.git('checkout', '-q', '-b', 'topic')
+        self.assertTrue(evaluator.check_git_status())
+        self.assertEqual(evaluator.probes, 4)
+
+    def test_clean_result_expires_before_dirty(self):
+        """Work tree edits do not touch the index, so clean results expire quickly"""
+        evaluator = self.counting_evaluator(clean_ttl=0, dirty_ttl=60)
+        self.assertTrue(evaluator.check_git_status())
+        (self.repo / "tracked.txt").write_text("edited\n")
+        self.assertFalse(evaluator.check_git_status())
+        (self.repo / "tracked.txt").write_text("v1\n")
+        self.assertFalse(evaluator.check_git_status())
+        self.assertEqual(evaluator.probes, 2)
+
+    def test_untracked_files(self):
+        """Untracked files are dirty unless the low_risk profile ignores them"""
+        (self.repo / "new.txt").write_text("x\n")
+        self.assertFalse(CommandSafetyEvaluator().check_git_status())
+
+        evaluator = CommandSafetyEvaluator()
+        evaluator.policy.ignore_untracked_files = True
+        with patch('subprocess.run', wraps=subprocess.run) as run:
+            self.assertTrue(evaluator.check_git_status())
+        self.assertEqual(run.call_args[0][0], ['git', 'status', '--porcelain', '--untracked-files=no'])
+
+    def test_outside_repository_not_clean(self):
+        """A failing git status (no repository) is treated as dirty"""
+        with tempfile.TemporaryDirectory() as outside:
+            os.chdir(outside)
+            with patch.dict(os.environ, {'GIT_CEILING_DIRECTORIES': str(Path(outside).parent)}):
+                self.assertFalse(CommandSafetyEvaluator().check_git_status())
+
+
+class TestShellGrammarPolicy(unittest.TestCase):
+
+    def setUp(self):
+        self.evaluator = CommandSafetyEvaluator()
+
+    def decide(self, command, clean=True):
+        with patch.object(self.evaluator, 'check_git_status', return_value=clean):
+            result = self.evaluator.evaluate_command(command)
+        return result["reason"], result.get("denied_pattern")
+
+    def test_each_command_decided(self):
+        """Every command in lists, pipelines, subshells and substitutions is checked"""
+        cases = [
+            ("git status && git diff", ("read_only_exact", None)),
+            ("git status; ls -la", ("read_only_prefix", None)),
+            ("cat script.sh | sh", ("unknown_command", None)),
+            ("ls; mkdir build", ("low_risk_prefix_clean", None)),
+            ("ls -la\nrm -rf build", ("denied_pattern_read_only", "rm")),
+            ("cat x | tee out.txt", ("denied_pattern_read_only", "| tee")),
+            ("ls $(rm -rf build)", ("denied_pattern_read_only", "rm")),
+            ("ls `sudo id`", ("denied_pattern_read_only", "sudo")),
+            ("(cd build && make)", ("denied_pattern_low_risk", "make")),
+            ("(ls) > listing.txt", ("denied_pattern_read_only", ">")),
+            ("echo hi>out.txt", ("denied_pattern_read_only", ">")),
+            ("ls 2>/dev/null", ("denied_pattern_read_only", ">")),
+            ("unknown_cmd || ls", ("unknown_command", None)),
+        ]
+        for command, expected in cases:
+            with self.subTest(command=command):
+                self.assertEqual(self.decide(command), expected)
+
+        self.assertEqual(self.decide("ls; mkdir build", clean=False), ("low_risk_prefix_dirty", None))
+
+    def test_mid_word_matches_are_not_denials(self):
+        """Denylist entries no longer match inside longer words"""
+        for command, expected in [
+            ("cat results.txt", "read_only_prefix"),      # "su "
+            ("cat format.txt", "read_only_prefix"),       # "rm "
+            ("grep skill notes.md", "read_only_prefix"),  # "kill"
+            ("ls algorithms/", "read_only_prefix"),       # "go "
+            ("ls 2>&1", "read_only_prefix"),              # ">"
+            ("ls # rm -rf /", "read_only_prefix"),        # comment
+        ]:
+            with self.subTest(command=command):
+                self.assertEqual(self.decide(command), (expected, None))
+                self.assertIn("denied_pattern", reference_evaluate_command(self.evaluator, command))
+
+        self.assertEqual(self.decide("killall x"), ("denied_pattern_read_only", "kill"))
+        self.assertEqual(self.decide("cat x | tee"), ("denied_pattern_read_only", "| tee"))
+
+    def test_unparsable_commands_need_approval(self):
+        """Lines that are not valid shell are checked as a whole and never approved"""
+        self.assertEqual(self.decide("ls 'unterminated"), ("ambiguous_command", None))
+        self.assertEqual(self.decide("ls )"), ("ambiguous_command", None))
+        self.assertEqual(self.decide("ls && "), ("ambiguous_command", None))
+        self.assertEqual(self.decide("sudo ls 'x"), ("denied_pattern_read_only", "sudo"))
+
+
+class TestDecisionCache(unittest.TestCase):
+
+    def setUp(self):
+        self.evaluator = CommandSafetyEvaluator()
+
+    def test_repeated_commands_hit_cache(self):
+        """Repeated commands are served from the cache as independent copies"""
+        first, hit = self.evaluator.evaluate("git status")
+        self.assertFalse(hit)
+        first["requires_approval"] = "mutated"
+
+        second, hit = self.evaluator.evaluate("git status")
+        self.assertTrue(hit)
+        self.assertEqual(second, {"approval_required": False, "confidence": 1.0, "reason": "read_only_exact"})
+
+        stats = self.evaluator.decision_cache.stats()
+        self.assertEqual((stats['hits'], stats['misses'], stats['size']), (1, 1, 1))
+
+    def test_git_state_applied_on_hit(self):
+        """Cached low_risk decisions still follow the current clean state"""
+        for clean, reason in [(True, "low_risk_prefix_clean"), (False, "low_risk_prefix_dirty"),
+                              (True, "low_risk_prefix_clean")]:
+            with patch.object(self.evaluator, 'check_git_status', return_value=clean):
+                self.assertEqual(self.evaluator.evaluate_command("mkdir build")["reason"], reason)
+        self.assertEqual(self.evaluator.decision_cache.stats()['hits'], 2)
+
+        with patch.object(self.evaluator, 'check_git_status') as check:
+            self.evaluator.evaluate_command("ls -la")
+            self.evaluator.evaluate_command("ls -la")
+        check.assert_not_called()
+
+    def test_lru_bound_and_long_commands(self):
+        """The cache keeps the most recent commands and skips very long ones"""
+        evaluator = CommandSafetyEvaluator(cache_size=2)
+        for command in ["ls a", "ls b", "ls a", "ls c", "ls a", "ls b"]:
+            evaluator.evaluate_command(command)
+        self.assertEqual(evaluator.decision_cache.stats()['hits'], 2)
+
+        long_command = "cat " + "x" * 2000
+        self.assertEqual(evaluator.evaluate(long_command), ({"approval_required": False, "confidence": 0.9,
+                                                             "reason": "read_only_prefix"}, False))
+        self.assertEqual(evaluator.decision_cache.stats()['bypassed'], 1)
+
+    def test_policy_version_tracks_profile_content(self):
+        """Evaluators over different profile contents have different cache keys"""
+        with open(Path(__file__).parent / "safety_profiles.yaml") as f:
+            profiles = yaml.safe_load(f)
+        profiles['command_safety_profiles']['profiles']['read_only']['denylist_contains'].append("git status")
+        with tempfile.NamedTemporaryFile('w', suffix='.yml', delete=False) as f:
+            yaml.safe_dump(profiles, f)
+        evaluator = CommandSafetyEvaluator(f.name)
+        Path(f.name).unlink()
+
+        self.assertNotEqual(evaluator.policy_version, self.evaluator.policy_version)
+        self.assertEqual(CommandSafetyEvaluator().policy_version, self.evaluator.policy_version)
+        self.assertTrue(evaluator.evaluate_command("git status")["approval_required"])
+
+    def test_hit_rate_in_metrics(self):
+        """Cache hits are logged per decision and summarized by the metrics collector"""
+        with tempfile.TemporaryDirectory() as tmp:
+            transcript = Path(tmp) / "transcript.jsonl"
+            adapter = ClineSmartApprovalAdapter(log_path=transcript)
+            for command in ["git status", "git status", "ls", "git status"]:
+                adapter.evaluate_command(command)
+            adapter.transcript.flush()
+
+            metrics = ApprovalMetricsCollector(transcript, Path(tmp) / "metrics.json").collect_daily_metrics()
+        self.assertEqual(metrics["decision_cache"], {"lookups": 4, "hits": 2})
+        self.assertEqual(metrics["rates"]["cache_hit_rate"], 0.5)
+
+
+def run_benchmark(number=20000):
+    """Print decisions/sec of the original, compiled and cached evaluators"""
+    evaluator = CommandSafetyEvaluator(cache_size=0)
+    cached = CommandSafetyEvaluator()
+    commands = [command for command, _, _ in replay_cases()]
+    long_command = "cat " + " ".join(f"src/module_{i}/file_{i}.py" for i in range(40))
+    # A plain function, not a mock: calling a MagicMock costs more than a decision
+    evaluator.check_git_status = cached.check_git_status = lambda cwd=None: True
+    for label, batch in [("replay corpus", commands), ("long command", [long_command])]:
+        repeat = number // len(batch)
+        decisions = repeat * len(batch)
+        reference = timeit.timeit(lambda: [reference_evaluate_command(evaluator, c) for c in batch], number=repeat)
+        compiled = timeit.timeit(lambda: [evaluator.evaluate_command(c) for c in batch], number=repeat)
+        hits = timeit.timeit(lambda: [cached.evaluate_command(c) for c in batch], number=repeat)
+        print(f"{label:14} evaluate      reference {decisions / reference:9.0f}/sec  "
+              f"compiled {decisions / compiled:9.0f}/sec  ({reference / compiled:4.1f}x)  "
+              f"cached {decisions / hits:9.0f}/sec  ({reference / hits:4.1f}x)")
+
+        # The same decisions with tokenizing taken out, to isolate policy matching
+        tokens = {command: evaluator.tokenize_command(command) for command in batch}
+        evaluator.tokenize_command = tokens.__getitem__
+        reference = timeit.timeit(lambda: [reference_evaluate_command(evaluator, c) for c in batch], number=repeat)
+        compiled = timeit.timeit(lambda: [evaluator.evaluate_command(c) for c in batch], number=repeat)
+        del evaluator.tokenize_command
+        print(f"{label:14} policy match  reference {decisions / reference:9.0f}/sec  "
+              f"compiled {decisions / compiled:9.0f}/sec  ({reference / compiled:4.1f}x)")
+
+
 if __name__ == '__main__':
+    if "--bench" in sys.argv:
+        run_benchmark()
+        sys.exit(0)
     unittest.main(verbosity=2)
@@ -0,0 +1,306 @@
+#!/usr/bin/env python3
+"""
+Unit Tests for the Rollup Store
+Checks the minute/hour/day rollups against a full transcript scan, across
+rotations, compression, partially written lines and concurrent updaters,
+and the timeseries the dashboards read.
+
+Run directly with --bench to compare against re-reading the transcript:
+    python tooling/smart-approval/test_rollup_store.py --bench
+"""
+
+import json
+import multiprocessing
+import random
+import sys
+import tempfile
+import timeit
+import unittest
+from unittest.mock import patch
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent))
+
+from cline_adapter import ClineSmartApprovalAdapter
+from dashboard_integration import SmartApprovalDashboard
+from metrics_collector import ApprovalMetricsCollector
+import rollup_store
+from rollup_store import RollupStore, default_rollups_path
+from transcript_writer import TranscriptWriter, iter_transcript_lines, sealed_segments
+
+REASONS = ["read_only_exact", "read_only_prefix", "denied_pattern_dangerous", "unknown_command"]
+
+
+def generated_decisions(count, rng, start=None, spread_hours=60):
+    """Decisions spread over the spread_hours before start (default: now)"""
+    start = start or datetime.now(timezone.utc)
+    for _ in range(count):
+        timestamp = start - timedelta(seconds=rng.uniform(0, spread_hours * 3600))
+        details = {"command": "ls", "timestamp": timestamp.replace(tzinfo=None).isoformat() + "Z"}
+        if rng.random() < 0.8:
+            details["cache_hit"] = rng.random() < 0.5
+        reason = rng.choice(REASONS)
+        decision = {"requires_approval": reason in REASONS[2:] or rng.random() < 0.1, "reason": reason,
+                    "decision_details": details}
+        if rng.random() < 0.05:
+            decision["override_applied"] = True
+        yield decision
+
+
+def full_scan_counts(transcript_path, since):
+    """Reference: read every line, keeping decisions from since's UTC minute onwards"""
+    since_minute = since.replace(second=0, microsecond=0)
+    counts = {"decisions": 0, "prompts": 0, "denies": 0, "overrides": 0, "cache_lookups": 0, "cache_hits": 0,
+              "reasons": {}}
+    for line in iter_transcript_lines(transcript_path):
+        decision = json.loads(line)
+        details = decision["decision_details"]
+        if datetime.fromisoformat(details["timestamp"].replace('Z', '+00:00')) < since_minute:
+            continue
+        counts["decisions"] += 1
+        counts["prompts"] += decision["requires_approval"]
+        counts["denies"] += decision["reason"].startswith("denied_pattern_")
+        counts["overrides"] += decision.get("override_applied", False)
+        if "cache_hit" in details:
+            counts["cache_lookups"] += 1
+            counts["cache_hits"] += details["cache_hit"]
+        counts["reasons"][decision["reason"]] = counts["reasons"].get(decision["reason"], 0) + 1
+    return counts
+
+
+def update_store(rollups_path, transcript_path, results):
+    results.put(RollupStore(rollups_path).update(transcript_path))
+
+
+class TestRollupStore(unittest.TestCase):
+
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self._tmp.cleanup)
+        self.directory = Path(self._tmp.name)
+        self.transcript = self.directory / "transcript.jsonl"
+        self.writer = TranscriptWriter(self.transcript, max_bytes=20000, flush_interval=60)
+        self.addCleanup(self.writer.close)
+        self.store = RollupStore(default_rollups_path(self.transcript))
+        self.rng = random.Random(2026)
+
+    def append(self, count, **kwargs):
+        for decision in generated_decisions(count, self.rng, **kwargs):
+            self.writer.write(decision)
+        self.writer.flush()
+
+    def test_matches_full_scan_across_rotations(self):
+        """Rollups updated between batches agree with a scan of the whole transcript"""
+        collector = ApprovalMetricsCollector(self.transcript, self.directory / "metrics.json")
+        lines = 0
+        for batch in [50, 120, 0, 300, 80]:
+            self.append(batch)
+            lines += batch
+            for days_back in [1, 2, 3]:
+                with self.subTest(lines=lines, days_back=days_back):
+                    metrics = collector.collect_daily_metrics(days_back=days_back)
+                    since = datetime.now(timezone.utc) - timedelta(days=days_back)
+                    expected = full_scan_counts(self.transcript, since)
+                    self.assertEqual(self.store.window(since), expected)
+                    self.assertEqual((metrics["total_decisions"], metrics["required_approval"],
+                                      metrics["reasons_breakdown"]),
+                                     (expected["decisions"], expected["prompts"], expected["reasons"]))
+
+        self.assertGreater(len(sealed_segments(self.transcript)), 1)
+        self.assertEqual(self.store.state()["lines"], lines)
+
+    def test_reads_only_new_lines(self):
+        """An update parses only the lines appended since the previous one"""
+        self.append(200)
+        self.assertEqual(self.store.update(self.transcript), 200)
+        offset = self.store.state()["offset"]
+
+        self.append(7)
+        parsed = []
+        original_loads = json.loads
+
+        def counting_loads(s, **kwargs):
+            parsed.append(s)
+            return original_loads(s, **kwargs)
+
+        with patch("rollup_store.json.loads", counting_loads):
+            self.assertEqual(self.store.update(self.transcript), 7)
+        self.assertEqual(len(parsed), 7)
+        self.assertEqual(self.store.state()["lines"], 207)
+        self.assertNotEqual(self.store.state()["offset"], offset)
+
+    def test_segment_sealed_mid_read(self):
+        """A segment sealed and compressed after an update is finished from the cursor offset"""
+        self.append(30)
+        self.store.update(self.transcript)
+        self.assertEqual(self.store.state()["generation"], 1)
+
+        self.append(400)
+        self.assertEqual(self.store.update(self.transcript), 400)
+        segments = sealed_segments(self.transcript)
+        self.assertTrue(segments[0][1].name.endswith(".gz"))
+        self.assertEqual(self.store.state()["generation"], segments[-1][0] + 1)
+
+    def test_segment_compressed_after_listing(self):
+        """A sealed segment compressed between listing and opening is read from its gzipped form"""
+        transcript = self.directory / "raced.jsonl"
+        writer = TranscriptWriter(transcript, max_bytes=20000, compress=False, flush_interval=60)
+        self.addCleanup(writer.close)
+        for batch in range(8):
+            for decision in generated_decisions(50, self.rng):
+                writer.write(decision)
+            writer.flush()
+        listed = sealed_segments(transcript)
+        self.assertGreater(len(listed), 1)
+        self.assertFalse(any(path.name.endswith(".gz") for _, path in listed))
+
+        open_transcript = rollup_store.open_transcript
+
+        def open_then_compress(path):
+            segments, active = open_transcript(path)
+            for _, segment in segments:
+                writer._compress(segment)
+            return segments, active
+
+        store = RollupStore(default_rollups_path(transcript))
+        with patch.object(rollup_store, "open_transcript", open_then_compress):
+            self.assertEqual(store.update(transcript), 400)
+        since = datetime.now(timezone.utc) - timedelta(days=5)
+        self.assertEqual(store.window(since), full_scan_counts(transcript, since))
+
+    def test_partial_line_waits(self):
+        """An unterminated last line is folded once it is complete"""
+        line = json.dumps(next(generated_decisions(1, self.rng)))
+        with open(self.transcript, 'a') as f:
+            f.write(line[:20])
+        self.assertEqual(self.store.update(self.transcript), 0)
+        with open(self.transcript, 'a') as f:
+            f.write(line[20:] + "\n")
+        self.assertEqual(self.store.update(self.transcript), 1)
+
+    def test_coarser_buckets_past_retention(self):
+        """Further back than minute and hour retention, windows start at the hour, then the day"""
+        now = datetime.now(timezone.utc)
+        self.append(20, start=now - timedelta(days=150), spread_hours=48)
+        self.append(30, start=now - timedelta(days=30), spread_hours=48)
+        self.append(10)
+        self.store.update(self.transcript)
+
+        state = self.store.state()
+        self.assertTrue(all(point["timestamp"][:10] >= state["minute_from"] for point in self.store.timeseries("minute")))
+        self.assertTrue(all(point["timestamp"][:10] >= state["hour_from"] for point in self.store.timeseries("hour")))
+        self.assertEqual(sum(point["decisions"] for point in self.store.timeseries("day")), 60)
+
+        since = now - timedelta(days=200)
+        self.assertEqual(self.store.window(since)["decisions"], 60)
+        since = now - timedelta(days=31, hours=3, minutes=17)
+        self.assertEqual(self.store.window(since), full_scan_counts(
+            self.transcript, since.replace(minute=0)))
+
+    def test_timeseries_points(self):
+        """Timeseries points carry counts, per-minute rates and reasons"""
+        self.append(300, spread_hours=5)
+        self.store.update(self.transcript)
+        hourly = self.store.timeseries("hour")
+        self.assertIn(len(hourly), (5, 6))
+        self.assertEqual([point["timestamp"] for point in hourly], sorted(point["timestamp"] for point in hourly))
+        self.assertTrue(hourly[0]["timestamp"].endswith(":00:00Z"))
+        for point in hourly:
+            self.assertAlmostEqual(point["deny_rate"], point["denies"] / 60)
+            self.assertEqual(sum(point["reasons"].values()), point["decisions"])
+        self.assertEqual(sum(point["decisions"] for point in self.store.timeseries("minute")), 300)
+
+    def test_transcripts_in_one_directory_kept_apart(self):
+        """Two transcripts side by side each get their own store and cursor"""
+        other = self.directory / "other.jsonl"
+        other_writer = TranscriptWriter(other, max_bytes=20000, flush_interval=60)
+        self.addCleanup(other_writer.close)
+        other_store = RollupStore(default_rollups_path(other))
+        self.assertNotEqual(other_store.path, self.store.path)
+
+        since = datetime.now(timezone.utc) - timedelta(days=5)
+        for batch, other_batch in [(120, 45), (0, 300), (80, 10)]:
+            self.append(batch)
+            for decision in generated_decisions(other_batch, self.rng):
+                other_writer.write(decision)
+            other_writer.flush()
+            self.store.update(self.transcript)
+            other_store.update(other)
+            self.assertEqual(self.store.window(since), full_scan_counts(self.transcript, since))
+            self.assertEqual(other_store.window(since), full_scan_counts(other, since))
+
+        self.assertEqual(self.store.state()["lines"], 200)
+        self.assertEqual(other_store.state()["lines"], 355)
+
+    def test_concurrent_updates_count_once(self):
+        """Updaters in several processes fold every decision exactly once"""
+        self.append(500)
+        context = multiprocessing.get_context("fork")
+        results = context.Queue()
+        processes = [context.Process(target=update_store, args=(self.store.path, self.transcript, results))
+                     for _ in range(4)]
+        for process in processes:
+            process.start()
+        for process in processes:
+            process.join(60)
+            self.assertEqual(process.exitcode, 0)
+
+        self.assertEqual(sorted(results.get() for _ in processes), [0, 0, 0, 500])
+        self.assertEqual(self.store.window(datetime.now(timezone.utc) - timedelta(days=5))["decisions"], 500)
+
+    def test_maintained_as_decisions_are_logged(self):
+        """The adapter's transcript flushes update the store, which the dashboard reads"""
+        adapter = ClineSmartApprovalAdapter(log_path=self.directory / "agent" / "transcript.jsonl")
+        for command in ["git status", "rm -rf /", "git status"]:
+            adapter.evaluate_command(command)
+        adapter.transcript.flush()
+
+        dashboard = SmartApprovalDashboard(self.directory / "agent" / "metrics.json", adapter.rollups.path)
+        series = dashboard.get_dashboard_data()["smart_approval"]["timeseries_data"]
+        self.assertEqual(sum(point["decisions"] for point in series["hourly"]), 3)
+        self.assertEqual(sum(point["denies"] for point in series["minutely"]), 1)
+
+
+def run_benchmark(history=100000, new=1000):
+    """Print collection after new decisions (full scan vs rollups) and 90-day timeseries reads"""
+    rng = random.Random(2026)
+    with tempfile.TemporaryDirectory() as tmp:
+        transcript = Path(tmp) / "transcript.jsonl"
+        writer = TranscriptWriter(transcript)
+        for decision in generated_decisions(history, rng, spread_hours=90 * 24):
+            writer.write(decision)
+        writer.flush()
+
+        collector = ApprovalMetricsCollector(transcript, Path(tmp) / "metrics.json")
+        started = timeit.default_timer()
+        collector.collect_daily_metrics()
+        initial = timeit.default_timer() - started
+        new_decisions = list(generated_decisions(new, rng, spread_hours=1))
+
+        def append_and(collect):
+            for decision in new_decisions:
+                writer.write(decision)
+            writer.flush()
+            collect()
+
+        since = datetime.now(timezone.utc) - timedelta(days=1)
+        full = min(timeit.repeat(lambda: append_and(lambda: full_scan_counts(transcript, since)), number=1, repeat=3))
+        incremental = min(timeit.repeat(lambda: append_and(collector.collect_daily_metrics), number=1, repeat=3))
+        dashboard = SmartApprovalDashboard(Path(tmp) / "metrics.json", collector.rollups.path)
+        series = min(timeit.repeat(dashboard.get_timeseries_data, number=1, repeat=3))
+        points = sum(len(points) for points in dashboard.get_timeseries_data().values())
+        writer.close()
+
+    print(f"{history} decisions over 90 days, first fold into rollups {initial * 1e3:8.1f}ms")
+    print(f"+{new} new, last-day metrics: full scan {full * 1e3:8.1f}ms   "
+          f"rollups {incremental * 1e3:8.1f}ms  ({full / incremental:5.1f}x)")
+    print(f"dashboard timeseries ({points} points, 90 days hourly + daily) {series * 1e3:8.1f}ms")
+
+
+if __name__ == '__main__':
+    if "--bench" in sys.argv:
+        run_benchmark()
+        sys.exit(0)
+    unittest.main(verbosity=2)
@@ -0,0 +1,234 @@
+#!/usr/bin/env python3
+"""
+Unit Tests for the Smart Approval Shell Parser
+Checks command structure, quoting against shlex, syntax errors, the flat
+fast paths against the recursive parser, and the tokenizer against the
+original per-character loop.
+
+Run directly with --bench to compare against the original tokenizer:
+    python tooling/smart-approval/test_shell_parser.py --bench
+"""
+
+import random
+import shlex
+import sys
+import timeit
+import unittest
+from pathlib import Path
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent))
+
+from prototype import CommandSafetyEvaluator
+from shell_parser import ShellSyntaxError, Subshell, _Parser, iter_simple_commands, parse_command
+
+
+def shape(tree):
+    """Nested lists of word texts, with separators, for comparing trees"""
+    result = []
+    for index, pipeline in enumerate(tree.pipelines):
+        stages = []
+        for command in pipeline.commands:
+            if isinstance(command, Subshell):
+                stages.append(("(", shape(command.body)))
+            else:
+                stages.append([word.text for word in command.words] +
+                              [f"{r.fd or ''}{r.operator}{r.target.text}" for r in command.redirects])
+        result.append(stages)
+        if index < len(tree.separators):
+            result.append(tree.separators[index])
+    return result
+
+
+def reference_tokenize_command(command_string):
+    """Original per-character CommandSafetyEvaluator.tokenize_command, kept as the oracle"""
+    tokens = []
+    current_token = ""
+    in_quotes = False
+    quote_char = None
+
+    for char in command_string:
+        if char in ['"', "'"] and not in_quotes:
+            in_quotes = True
+            quote_char = char
+            current_token += char
+        elif char == quote_char and in_quotes:
+            in_quotes = False
+            current_token += char
+            quote_char = None
+        elif char.isspace() and not in_quotes:
+            if current_token:
+                tokens.append(current_token)
+                current_token = ""
+        else:
+            current_token += char
+
+    if current_token:
+        tokens.append(current_token)
+
+    return tokens
+
+
+def recursive_parse(command):
+    """parse_command without the flat fast paths"""
+    parser = _Parser(command)
+    tree = parser.parse_list()
+    if parser.next().kind != "eof":
+        raise ShellSyntaxError("trailing input")
+    return tree
+
+
+def simple_commands(tree):
+    return [(command.texts, [word.text for word in command.words], piped)
+            for command, piped in iter_simple_commands(tree)]
+
+
+# Shell blanks, and whitespace str.split() separates on but the shell does not
+SPACES = [" ", "  ", "\t", "\x0b", "\x0c", "\r", "\x1c", "\x85", "\xa0", "\u2003", "\u3000"]
+
+LONG_COMMANDS = [
+    ("long", "cat " + " ".join(f"src/module_{i}/file_{i}.py" for i in range(40))),
+    ("long quoted", "echo " + " ".join(f'"arg {i}"' for i in range(60))),
+    ("long pipeline", " | ".join(f"grep -v pattern_{i}" for i in range(20))),
+]
+
+WORD_ALPHABET = ["a", "bc", "-x", "'q r'", '"d  e"', '"f\\"g"', "h\\ i", "j'k'l", "''", '""', "\\$", "m=n"]
+
+
+def generated_word_lines(count=2000, seed=2026):
+    rng = random.Random(seed)
+    for _ in range(count):
+        yield " ".join("".join(rng.choice(WORD_ALPHABET) for _ in range(rng.randint(1, 3)))
+                       for _ in range(rng.randint(1, 6)))
+
+
+FUZZ_ALPHABET = list("ab $()`'\"\\|&;<>#\n\t12-") + ["$(", "&&", "||", ">>", "2>&1", "<<"]
+
+
+class TestShellParser(unittest.TestCase):
+
+    def test_structure(self):
+        """Lists, pipelines, subshells and redirections parse into the expected shape"""
+        cases = [
+            ("ls -la", [[["ls", "-la"]]]),
+            ("a && b || c; d & e", [[["a"]], "&&", [["b"]], "||", [["c"]], ";", [["d"]], "&", [["e"]]]),
+            ("a | b |& c", [[["a"], ["b"], ["c"]]]),
+            ("a\n\nb;", [[["a"]], ";", [["b"]], ";"]),
+            ("(cd x && make) > log 2>&1", [[("(", [[["cd", "x"]], "&&", [["make"]]])]]),
+            ("echo hi>out 2>>err <in", [[["echo", "hi", ">out", "2>>err", "<in"]]]),
+            ("a &>all", [[["a", "&>all"]]]),
+            ("a | \\\n  b", [[["a"], ["b"]]]),
+            ("ls # comment | rm", [[["ls"]]]),
+            ("echo a#b", [[["echo", "a#b"]]]),
+            ("", []),
+            ("   \n  ", []),
+        ]
+        for command, expected in cases:
+            with self.subTest(command=command):
+                self.assertEqual(shape(parse_command(command)), expected)
+
+    def test_substitutions_are_commands(self):
+        """Commands inside $(...) and backticks are yielded as commands of their own"""
+        tree = parse_command('echo "x $(date; id -u)" `whoami` > "$(mktemp)"')
+        commands = [[word.value for word in command.words] for command, _ in iter_simple_commands(tree)]
+        self.assertEqual(commands, [["echo", "x $(date; id -u)", "`whoami`"],
+                                    ["date"], ["id", "-u"], ["whoami"], ["mktemp"]])
+
+    def test_piped_stages(self):
+        """Only stages after the first in a pipeline are marked piped"""
+        tree = parse_command("a | b; c | (d; e)")
+        self.assertEqual([(command.words[0].text, piped) for command, piped in iter_simple_commands(tree)],
+                         [("a", False), ("b", True), ("c", False), ("d", False), ("e", False)])
+
+    def test_word_values_match_shlex(self):
+        """Quote removal and escapes agree with shlex in POSIX mode"""
+        for line in generated_word_lines():
+            commands = list(iter_simple_commands(parse_command(line)))
+            self.assertEqual(len(commands), 1, repr(line))
+            self.assertEqual([word.value for word in commands[0][0].words], shlex.split(line), repr(line))
+
+    def test_syntax_errors(self):
+        """Unbalanced or incomplete input raises ShellSyntaxError"""
+        for command in ["echo 'a", 'echo "a', "echo \\", "a &&", "| a", "a ||| b", "a ;; b", "(a",
+                        "a)", "()", "$(a", "`a", "a >", "a > | b", "a <(b)"]:
+            with self.subTest(command=command), self.assertRaises(ShellSyntaxError):
+                parse_command(command)
+
+    def test_fast_paths_match_recursive_parser(self):
+        """Plain and flat lines parse as the recursive parser parses them, errors included"""
+        rng = random.Random(2027)
+        alphabets = [["a", "bc", "-x", "|", "||", "|&", "&", "&&", ";", ";;", "\n"] + SPACES, FUZZ_ALPHABET]
+        for alphabet in alphabets:
+            for _ in range(5000):
+                command = "".join(rng.choice(alphabet) for _ in range(rng.randint(1, 20)))
+                try:
+                    expected = simple_commands(recursive_parse(command))
+                except ShellSyntaxError:
+                    expected = ShellSyntaxError
+                try:
+                    tree = parse_command(command)
+                    actual = simple_commands(tree)
+                except ShellSyntaxError:
+                    actual = ShellSyntaxError
+                self.assertEqual(actual, expected, repr(command))
+                if actual is not ShellSyntaxError:
+                    self.assertEqual(shape(tree), shape(recursive_parse(command)), repr(command))
+
+    def test_tokenize_command_matches_reference(self):
+        """The regex tokenizer splits like the original per-character loop"""
+        evaluator = CommandSafetyEvaluator()
+        rng = random.Random(2028)
+        alphabet = ["a", "bc", "'", '"', "\\", "|", "$x"] + SPACES
+        commands = [command for _, command in LONG_COMMANDS] + [
+            "".join(rng.choice(alphabet) for _ in range(rng.randint(0, 30))) for _ in range(5000)]
+        for command in commands:
+            self.assertEqual(evaluator.tokenize_command(command), reference_tokenize_command(command), repr(command))
+
+    def test_long_commands_faster_than_legacy_tokenizer(self):
+        """Parsing long argument lists and pipelines beats the original tokenizer alone"""
+        def best(function, command):
+            return min(timeit.repeat(lambda: function(command), number=200, repeat=5))
+
+        for label, command in LONG_COMMANDS:
+            legacy = best(reference_tokenize_command, command)
+            with self.subTest(label=label):
+                self.assertLess(best(CommandSafetyEvaluator().tokenize_command, command), legacy)
+                if label != "long quoted":
+                    # Quoted words go through the token regex, at about the
+                    # original's speed; see run_benchmark
+                    self.assertLess(best(lambda line: list(iter_simple_commands(parse_command(line))), command),
+                                    legacy)
+
+    def test_fuzz_only_raises_syntax_errors(self):
+        """Arbitrary input either parses or raises ShellSyntaxError"""
+        rng = random.Random(2026)
+        for _ in range(5000):
+            command = "".join(rng.choice(FUZZ_ALPHABET) for _ in range(rng.randint(1, 30)))
+            try:
+                list(iter_simple_commands(parse_command(command)))
+            except ShellSyntaxError:
+                pass
+
+
+def run_benchmark():
+    """Print original tokenizer vs regex tokenizer vs parser timings for short and long commands"""
+    evaluator = CommandSafetyEvaluator()
+    for label, command in [("short", 'git commit -m "fix: bug in parser" --amend')] + LONG_COMMANDS:
+        number = max(200, 200000 // len(command))
+
+        def best(function):
+            return min(timeit.repeat(lambda: function(command), number=number, repeat=5)) / number
+
+        legacy = best(reference_tokenize_command)
+        tokenized = best(evaluator.tokenize_command)
+        parsed = best(lambda line: list(iter_simple_commands(parse_command(line))))
+        print(f"{label:13} {len(command):5} chars: original tokenizer {legacy * 1e6:7.1f}us  "
+              f"tokenize_command {tokenized * 1e6:6.1f}us ({legacy / tokenized:4.1f}x)  "
+              f"parse_command {parsed * 1e6:6.1f}us ({legacy / parsed:4.1f}x)")
+
+
+if __name__ == '__main__':
+    if "--bench" in sys.argv:
+        run_benchmark()
+        sys.exit(0)
+    unittest.main(verbosity=2)
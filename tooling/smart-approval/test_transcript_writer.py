@@ -0,0 +1,191 @@
+#!/usr/bin/env python3
+"""
+Unit Tests for the Decision Transcript Writer
+Checks batching, size and day rotation, compression of sealed segments and
+concurrent writers in several processes.
+
+Run directly with --bench to compare against one open/append per decision:
+    python tooling/smart-approval/test_transcript_writer.py --bench
+"""
+
+import gzip
+import json
+import multiprocessing
+import os
+import sys
+import tempfile
+import threading
+import time
+import timeit
+import unittest
+from pathlib import Path
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent))
+
+from transcript_writer import TranscriptWriter, iter_transcript_lines, sealed_segments
+
+
+def decision(index, writer=0):
+    return {"writer": writer, "index": index, "reason": "read_only_exact", "padding": "x" * 64}
+
+
+def write_decisions(path, writer_id, count, max_bytes):
+    writer = TranscriptWriter(path, max_bytes=max_bytes, batch_lines=7)
+    for index in range(count):
+        writer.write(decision(index, writer_id))
+    writer.close()
+
+
+class TestTranscriptWriter(unittest.TestCase):
+
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self._tmp.cleanup)
+        self.path = Path(self._tmp.name) / "transcript.jsonl"
+
+    def read_records(self):
+        return [json.loads(line) for line in iter_transcript_lines(self.path)]
+
+    def test_batches_until_flush(self):
+        """Records are queued and appended in order by flush()"""
+        writer = TranscriptWriter(self.path, flush_interval=60)
+        self.addCleanup(writer.close)
+        record = decision(0)
+        writer.write(record)
+        record["index"] = 99
+        writer.write(decision(1))
+        self.assertFalse(self.path.exists() and self.path.read_text())
+
+        writer.flush()
+        self.assertEqual([r["index"] for r in self.read_records()], [0, 1])
+
+    def test_background_flush(self):
+        """The flush thread appends queued records within the flush interval"""
+        writer = TranscriptWriter(self.path, flush_interval=0.05)
+        self.addCleanup(writer.close)
+        writer.write(decision(0))
+        deadline = time.monotonic() + 5
+        while not (self.path.exists() and self.path.read_text()) and time.monotonic() < deadline:
+            time.sleep(0.01)
+        self.assertEqual(len(self.read_records()), 1)
+
+    def test_closed_writer_rejects_writes(self):
+        """close() flushes, and writing afterwards raises"""
+        writer = TranscriptWriter(self.path, flush_interval=60)
+        writer.write(decision(0))
+        writer.close()
+        self.assertEqual(len(self.read_records()), 1)
+        with self.assertRaises(ValueError):
+            writer.write(decision(1))
+
+    def test_close_waits_for_background_flush(self):
+        """close() returns only after the flush thread's callback has finished"""
+        started = threading.Event()
+        finished = []
+
+        def slow_callback():
+            started.set()
+            time.sleep(0.2)
+            finished.append(True)
+
+        writer = TranscriptWriter(self.path, batch_lines=1, on_flush=slow_callback)
+        writer.write(decision(0))
+        self.assertTrue(started.wait(5))
+        writer.close()
+        self.assertEqual(finished, [True])
+        self.assertEqual(len(self.read_records()), 1)
+
+    def test_size_rotation_and_compression(self):
+        """Full segments are sealed as numbered, gzipped segments and read back in order"""
+        writer = TranscriptWriter(self.path, max_bytes=1000, flush_interval=60)
+        self.addCleanup(writer.close)
+        for index in range(40):
+            writer.write(decision(index))
+            writer.flush()
+
+        segments = sealed_segments(self.path)
+        self.assertGreater(len(segments), 2)
+        self.assertEqual([generation for generation, _ in segments], list(range(1, len(segments) + 1)))
+        for _, segment in segments:
+            self.assertTrue(segment.name.endswith(".jsonl.gz"))
+            self.assertLessEqual(len(gzip.decompress(segment.read_bytes())), 1000)
+        self.assertLessEqual(self.path.stat().st_size, 1000)
+        self.assertEqual([r["index"] for r in self.read_records()], list(range(40)))
+
+    def test_daily_rotation(self):
+        """The first batch of a new UTC day seals the previous day's segment"""
+        writer = TranscriptWriter(self.path, compress=False, flush_interval=60)
+        self.addCleanup(writer.close)
+        writer.write(decision(0))
+        writer.flush()
+        yesterday = time.time() - 86400
+        os.utime(self.path, (yesterday, yesterday))
+
+        writer.write(decision(1))
+        writer.flush()
+        writer.write(decision(2))
+        writer.flush()
+        segments = sealed_segments(self.path)
+        self.assertEqual([(generation, path.name) for generation, path in segments],
+                         [(1, "transcript.000001.jsonl")])
+        self.assertEqual([r["index"] for r in self.read_records()], [0, 1, 2])
+
+    def test_interrupted_compression_lists_uncompressed(self):
+        """A segment whose compression did not finish is read from its uncompressed form"""
+        sealed = self.path.with_name("transcript.000001.jsonl")
+        sealed.write_text(json.dumps(decision(0)) + "\n")
+        Path(f"{sealed}.gz").write_bytes(gzip.compress(b"{\"partial"))
+        self.assertEqual(sealed_segments(self.path), [(1, sealed)])
+        self.assertEqual([r["index"] for r in self.read_records()], [0])
+
+    def test_concurrent_processes(self):
+        """Writers in several processes never interleave or lose lines across rotations"""
+        writers, count = 4, 300
+        context = multiprocessing.get_context("fork")
+        processes = [context.Process(target=write_decisions, args=(self.path, writer, count, 20000))
+                     for writer in range(writers)]
+        for process in processes:
+            process.start()
+        for process in processes:
+            process.join(60)
+            self.assertEqual(process.exitcode, 0)
+
+        records = self.read_records()
+        self.assertEqual(len(records), writers * count)
+        self.assertGreater(len(sealed_segments(self.path)), 1)
+        for writer in range(writers):
+            self.assertEqual([r["index"] for r in records if r["writer"] == writer], list(range(count)))
+
+
+def run_benchmark(decisions=20000):
+    """Print decisions/sec appended by open/append per decision and by the writer"""
+    records = [decision(index) for index in range(decisions)]
+    with tempfile.TemporaryDirectory() as tmp:
+        legacy_path = Path(tmp) / "legacy.jsonl"
+
+        def legacy():
+            for record in records:
+                with open(legacy_path, 'a') as f:
+                    json.dump(record, f)
+                    f.write('\n')
+
+        def buffered():
+            writer = TranscriptWriter(Path(tmp) / "transcript.jsonl")
+            for record in records:
+                writer.write(record)
+            writer.close()
+
+        legacy_time = min(timeit.repeat(legacy, number=1, repeat=3))
+        # Includes the final flush, so every decision is on disk
+        buffered_time = min(timeit.repeat(buffered, number=1, repeat=3))
+
+    print(f"open/append per decision {decisions / legacy_time:10.0f}/sec   "
+          f"TranscriptWriter {decisions / buffered_time:10.0f}/sec  ({legacy_time / buffered_time:4.1f}x)")
+
+
+if __name__ == '__main__':
+    if "--bench" in sys.argv:
+        run_benchmark()
+        sys.exit(0)
+    unittest.main(verbosity=2)
@@ -0,0 +1,301 @@
+#!/usr/bin/env python3
+"""
+Decision Transcript Writer
+Appends approval decisions to the JSON Lines transcript in batches from a
+background thread, rotating it by size and UTC day and gzipping the
+segments it seals.
+
+Several agents (in-process hooks, the approval daemon) may share one
+transcript: every batch is appended with one write() while holding
+flock() on <transcript>.lock, which also serializes rotation.
+
+Rotation renames the active transcript.jsonl to the next numbered segment
+(transcript.000001.jsonl, transcript.000002.jsonl, ...), which becomes
+transcript.000001.jsonl.gz once compressed. Sealed segments are never
+written again.
+"""
+
+import atexit
+import gzip
+import json
+import os
+import re
+import shutil
+import sys
+import threading
+import time
+import weakref
+from contextlib import contextmanager
+from pathlib import Path
+
+try:
+    import fcntl
+except ImportError:  # not available on Windows; batches are then only serialized in-process
+    fcntl = None
+
+DEFAULT_MAX_SEGMENT_BYTES = 64 * 1024 * 1024
+FLUSH_INTERVAL_SECONDS = 0.5
+# Pending lines that wake the flush thread before the interval is up
+FLUSH_BATCH_LINES = 1000
+# The flush thread exits after this long without writes and restarts on the next one
+IDLE_THREAD_SECONDS = 5.0
+
+COMPRESSED_SUFFIX = ".gz"
+
+# Writers with lines that may still be pending, flushed at interpreter exit
+_live_writers = weakref.WeakSet()
+
+def sealed_segments(path):
+    """
+    Sealed segments of a transcript as (generation, path), oldest first.
+
+    While a segment is being compressed both forms exist; the uncompressed
+    one is complete until it is removed, so it is the one listed.
+    """
+    path = Path(path)
+    pattern = re.compile(re.escape(path.stem) + r"\.(\d{6})" + re.escape(path.suffix)
+                         + r"(" + re.escape(COMPRESSED_SUFFIX) + r")?")
+    try:
+        names = os.listdir(path.parent)
+    except FileNotFoundError:
+        return []
+
+    segments = {}
+    for name in names:
+        match = pattern.fullmatch(name)
+        if not match:
+            continue
+        generation = int(match.group(1))
+        if generation in segments and not match.group(2):
+            segments[generation] = path.parent / name
+        else:
+            segments.setdefault(generation, path.parent / name)
+    return sorted(segments.items())
+
+def open_segment(path):
+    """
+    Open a transcript segment for binary reading, compressed or not.
+
+    A segment listed uncompressed may be compressed before it is opened.
+    Its gzipped form replaces it before the original is removed, so that
+    is opened instead.
+    """
+    if str(path).endswith(COMPRESSED_SUFFIX):
+        return gzip.open(path, 'rb')
+    try:
+        return open(path, 'rb')
+    except FileNotFoundError:
+        return gzip.open(f"{path}{COMPRESSED_SUFFIX}", 'rb')
+
+@contextmanager
+def transcript_lock(path, shared=False):
+    """Hold flock() on <transcript>.lock; writers take it exclusively"""
+    if fcntl is None:
+        yield
+        return
+
+    fd = os.open(f"{path}.lock", os.O_RDWR | os.O_CREAT, 0o644)
+    try:
+        fcntl.flock(fd, fcntl.LOCK_SH if shared else fcntl.LOCK_EX)
+        yield
+    finally:
+        os.close(fd)
+
+def open_transcript(path):
+    """
+    Sealed segments and the active segment, opened together.
+
+    Taken under the transcript lock, so no rotation falls between listing
+    and opening. If the active segment is sealed later, the open file
+    becomes the next generation after the listed ones.
+
+    Returns:
+        tuple: (sealed_segments() list, binary file of the active segment or None)
+    """
+    if not Path(path).parent.is_dir():
+        return [], None
+    with transcript_lock(path, shared=True):
+        try:
+            active = open(path, 'rb')
+        except FileNotFoundError:
+            active = None
+        return sealed_segments(path), active
+
+def iter_transcript_lines(path):
+    """Yield the raw lines of every sealed segment, then of the active transcript"""
+    for _, segment in [*sealed_segments(path), (None, Path(path))]:
+        try:
+            with open_segment(segment) as f:
+                yield from f
+        except FileNotFoundError:
+            # Sealed by another writer, or deleted, since it was listed
+            continue
+
+class TranscriptWriter:
+    """
+    Buffered, rotating JSON Lines writer.
+
+    write() serializes the record and queues the line; a background thread
+    appends queued lines every flush_interval seconds, or as soon as
+    batch_lines are pending. Lines still queued at interpreter exit are
+    flushed by an atexit handler, so only a killed process loses them.
+    """
+
+    def __init__(self, path, max_bytes=DEFAULT_MAX_SEGMENT_BYTES, rotate_daily=True, compress=True,
+                 flush_interval=FLUSH_INTERVAL_SECONDS, batch_lines=FLUSH_BATCH_LINES, on_flush=None):
+        """
+        Args:
+            path: Active transcript file
+            max_bytes: Seal the active segment before it would grow past this
+            rotate_daily: Seal the active segment on the first write of a new UTC day
+            compress: Gzip segments after sealing them
+            flush_interval: Seconds queued lines may wait for the flush thread
+            batch_lines: Pending lines that trigger a flush before the interval
+            on_flush: Called without arguments after each batch is appended,
+                e.g. to fold it into the rollup store
+        """
+        self.path = Path(path)
+        self.max_bytes = max_bytes
+        self.rotate_daily = rotate_daily
+        self.compress = compress
+        self.flush_interval = flush_interval
+        self.batch_lines = batch_lines
+        self.on_flush = on_flush
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+
+        self._pending = []
+        self._condition = threading.Condition()
+        self._thread = None
+        self._closed = False
+
+        # Serializes batches of this process in queue order; the flock()
+        # serializes them against other processes
+        self._write_lock = threading.Lock()
+
+        _live_writers.add(self)
+
+    def write(self, record):
+        """Queue one record; it is serialized now, so later changes to it are not logged"""
+        line = json.dumps(record) + "\n"
+        with self._condition:
+            if self._closed:
+                raise ValueError("write to closed TranscriptWriter")
+            self._pending.append(line)
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._flush_loop, name="transcript-writer", daemon=True)
+                self._thread.start()
+            elif len(self._pending) >= self.batch_lines:
+                self._condition.notify()
+
+    def flush(self):
+        """Append every queued line now, in the calling thread"""
+        with self._write_lock:
+            with self._condition:
+                lines, self._pending = self._pending, []
+            if not lines:
+                return
+            try:
+                sealed = self._append("".join(lines).encode())
+            except Exception as e:
+                # Fail gracefully - don't break command execution
+                print(f"Warning: Failed to log {len(lines)} approval decision(s): {e}", file=sys.stderr)
+                return
+        if sealed is not None and self.compress:
+            self._compress(sealed)
+        if self.on_flush is not None:
+            try:
+                self.on_flush()
+            except Exception as e:
+                print(f"Warning: Transcript flush callback failed: {e}", file=sys.stderr)
+
+    def close(self):
+        """Flush queued lines; later writes raise ValueError"""
+        with self._condition:
+            self._closed = True
+            self._condition.notify()
+            thread = self._thread
+        # The thread may have taken the last batch; wait for its flush callback
+        if thread is not None and thread is not threading.current_thread():
+            thread.join()
+        self.flush()
+        _live_writers.discard(self)
+
+    def _flush_loop(self):
+        while True:
+            with self._condition:
+                self._condition.wait_for(lambda: self._pending or self._closed, timeout=IDLE_THREAD_SECONDS)
+                if self._closed or not self._pending:
+                    self._thread = None
+                    return
+                # Give the batch until the interval is up to fill
+                self._condition.wait_for(lambda: len(self._pending) >= self.batch_lines or self._closed,
+                                         timeout=self.flush_interval)
+            self.flush()
+
+    def _append(self, data):
+        """
+        Append data to the active segment, rotating it first if due.
+
+        The segment is opened per batch, under the lock, so a rotation by
+        another writer is always seen.
+
+        Returns:
+            Path of the segment sealed by this call, or None
+        """
+        sealed = None
+        with transcript_lock(self.path):
+            fd = os.open(self.path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+            try:
+                if self._rotation_due(os.fstat(fd), len(data)):
+                    sealed = self._seal()
+                    os.close(fd)
+                    fd = os.open(self.path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+
+                view = memoryview(data)
+                while view:
+                    view = view[os.write(fd, view):]
+            finally:
+                os.close(fd)
+        return sealed
+
+    def _rotation_due(self, stat, incoming):
+        if stat.st_size == 0:
+            return False
+        if stat.st_size + incoming > self.max_bytes:
+            return True
+        # The active segment was last written on an earlier UTC day
+        return self.rotate_daily and int(stat.st_mtime // 86400) != int(time.time() // 86400)
+
+    def _seal(self):
+        """Rename the active segment to the next generation; call under the process lock"""
+        segments = sealed_segments(self.path)
+        generation = segments[-1][0] + 1 if segments else 1
+        sealed = self.path.with_name(f"{self.path.stem}.{generation:06d}{self.path.suffix}")
+        os.rename(self.path, sealed)
+        return sealed
+
+    def _compress(self, path):
+        """Replace a sealed segment by its gzipped form"""
+        target = Path(f"{path}{COMPRESSED_SUFFIX}")
+        temporary = Path(f"{target}.{os.getpid()}.tmp")
+        try:
+            with open(path, 'rb') as source, gzip.open(temporary, 'wb') as output:
+                shutil.copyfileobj(source, output, 1024 * 1024)
+
+            # Keep the sealing time for retention by age
+            stat = os.stat(path)
+            os.utime(temporary, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+            os.replace(temporary, target)
+            os.remove(path)
+        except OSError as e:
+            # The segment stays readable uncompressed
+            print(f"Warning: Failed to compress transcript segment {path}: {e}", file=sys.stderr)
+            try:
+                os.remove(temporary)
+            except OSError:
+                pass
+
+@atexit.register
+def _flush_live_writers():
+    for writer in list(_live_writers):
+        writer.flush()